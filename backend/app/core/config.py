@@ -82,6 +82,7 @@ class Settings(BaseSettings):
     PLAID_CLIENT_ID: Optional[str] = None
     PLAID_SECRET: Optional[str] = None
     PLAID_ENV: str = "sandbox"  # sandbox, development, or production
+    PLAID_HOST: Optional[str] = None  # Overrides PLAID_ENV's URL, e.g. a local fake Plaid server
     
     class Config:
         env_file = ".env"
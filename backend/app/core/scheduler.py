@@ -222,6 +222,74 @@ class RecommendationScheduler:
         )
         
         logger.info("RLHF Learning jobs configured: daily reconciliation (9PM), weekly summary (Sat 9AM), outcome tracking (10PM)")
+
+        # =================================================================
+        # NET WORTH SNAPSHOT: 11:45 PM PT daily
+        # =================================================================
+        # Materializes the day's net worth rows for the dashboard
+        self.scheduler.add_job(
+            self.run_net_worth_snapshot,
+            trigger=CronTrigger(
+                hour=23,
+                minute=45,
+                timezone=PT
+            ),
+            id='net_worth_snapshot',
+            name='Net Worth Snapshot (11:45 PM PT)',
+            replace_existing=True
+        )
+
+        # =================================================================
+        # INSIGHTS REFRESH: 12:05 AM PT daily
+        # =================================================================
+        # Re-runs the insight passes that depend on the day (and any whose
+        # data changed) so the first dashboard load of the day is a read
+        self.scheduler.add_job(
+            self.run_insights_refresh,
+            trigger=CronTrigger(
+                hour=0,
+                minute=5,
+                timezone=PT
+            ),
+            id='insights_refresh',
+            name='Insights Refresh (12:05 AM PT)',
+            replace_existing=True
+        )
+
+        # =================================================================
+        # TAX-LOSS HARVEST SCAN: 8:15 PM PT (after the evening scan)
+        # =================================================================
+        # Values all open lots against one quote snapshot and alerts on
+        # harvest candidates without wash-sale conflicts
+        self.scheduler.add_job(
+            self.run_harvest_scan,
+            trigger=CronTrigger(
+                hour=20,
+                minute=15,
+                day_of_week='mon-fri',
+                timezone=PT
+            ),
+            id='tax_harvest_scan',
+            name='Tax-Loss Harvest Scan (8:15 PM PT)',
+            replace_existing=True
+        )
+
+        # =================================================================
+        # PORTFOLIO VALUATION: 5:30 PM PT (after the day's closes publish)
+        # =================================================================
+        # Stores the day's closes and extends the daily account valuations;
+        # accounts whose transactions changed are revalued from the start
+        self.scheduler.add_job(
+            self.run_portfolio_valuation,
+            trigger=CronTrigger(
+                hour=17,
+                minute=30,
+                timezone=PT
+            ),
+            id='portfolio_valuation',
+            name='Portfolio Valuation (5:30 PM PT)',
+            replace_existing=True
+        )
     
     def run_full_technical_analysis(self):
         """
@@ -651,9 +719,9 @@ class RecommendationScheduler:
         try:
             from app.modules.strategies.recommendation_models import (
                 PositionRecommendation,
-                RecommendationSnapshot,
                 generate_recommendation_id
             )
+            from app.modules.strategies.recommendation_projection import get_latest_snapshot
             from datetime import date
             
             context = rec.get("context", {})
@@ -687,9 +755,7 @@ class RecommendationScheduler:
                 return
             
             # Get the latest snapshot
-            latest_snapshot = db.query(RecommendationSnapshot).filter(
-                RecommendationSnapshot.recommendation_id == v2_rec.id
-            ).order_by(RecommendationSnapshot.snapshot_number.desc()).first()
+            latest_snapshot = get_latest_snapshot(db, v2_rec.id)
             
             if latest_snapshot:
                 now = datetime.utcnow()
@@ -906,17 +972,17 @@ class RecommendationScheduler:
         """
         Track outcomes for completed positions.
 
-        Called at 10 PM PT daily.
+        Called at 10 PM PT daily. Consumes the day's close/expire/assign
+        events from the transaction change feed rather than re-scanning history.
         """
         from datetime import date
         db: Session = SessionLocal()
         try:
             logger.info("Running outcome tracking...")
 
-            from app.modules.strategies.reconciliation_service import get_reconciliation_service
+            from app.modules.strategies.outcome_tracker import get_outcome_tracker
 
-            service = get_reconciliation_service(db)
-            result = service.track_position_outcomes(date.today())
+            result = get_outcome_tracker(db).run(date.today())
 
             logger.info(f"Outcome tracking complete: {result}")
 
@@ -925,6 +991,100 @@ class RecommendationScheduler:
         finally:
             db.close()
 
+    def run_net_worth_snapshot(self):
+        """
+        Materialize today's net worth snapshot.
+
+        Called at 11:45 PM PT. Rebuilds the sections whose source data changed
+        and copies the rest forward, so the wealth history has a row per day.
+        """
+        db: Session = SessionLocal()
+        try:
+            from app.modules.dashboard.net_worth import refresh_net_worth
+
+            result = refresh_net_worth(db)
+            logger.info(f"Net worth snapshot {result.snapshot_date}: rebuilt {result.rebuilt}, copied {result.copied}")
+
+        except Exception as e:
+            logger.error(f"Error in net worth snapshot: {e}", exc_info=True)
+        finally:
+            db.close()
+
+    def run_insights_refresh(self):
+        """
+        Refresh the materialized dashboard insights.
+
+        Called at 12:05 AM PT. Re-runs only the discovery passes whose data
+        changed, plus the day-dependent ones.
+        """
+        db: Session = SessionLocal()
+        try:
+            from app.modules.dashboard.insight_store import refresh_insights
+
+            result = refresh_insights(db)
+            logger.info(f"Insights refresh {result.refreshed_on}: re-ran {result.passes}, {result.written} insights")
+
+        except Exception as e:
+            logger.error(f"Error in insights refresh: {e}", exc_info=True)
+        finally:
+            db.close()
+
+    def run_portfolio_valuation(self):
+        """
+        Refresh the daily portfolio valuations.
+
+        Called at 5:30 PM PT. Fetches only the closes each symbol is missing.
+        """
+        db: Session = SessionLocal()
+        try:
+            from app.modules.investments.valuation_engine import refresh_valuations
+
+            result = refresh_valuations(db)
+            logger.info(
+                f"Portfolio valuation through {result.valued_through}: "
+                f"{len(result.rewritten)} rewritten, {len(result.extended)} extended, {result.rows_written} rows"
+            )
+
+        except Exception as e:
+            logger.error(f"Error in portfolio valuation: {e}", exc_info=True)
+        finally:
+            db.close()
+
+    def run_harvest_scan(self):
+        """
+        Scan open lots for tax-loss-harvest candidates.
+
+        Called at 8:15 PM PT on weekdays. Sends an alert when candidates
+        without wash-sale conflicts would save at least HARVEST_ALERT_MIN_SAVINGS.
+        """
+        db: Session = SessionLocal()
+        try:
+            logger.info("Running tax-loss harvest scan...")
+
+            from app.modules.tax.harvest_scanner import HARVEST_ALERT_MIN_SAVINGS, scan_harvest_candidates
+
+            result = scan_harvest_candidates(db)
+            clean = [c for c in result["candidates"] if not c["wash_sale_conflict"]]
+            savings = sum(c["tax_savings"] for c in clean)
+
+            logger.info(f"Harvest scan complete: {len(result['candidates'])} candidates, {len(clean)} clean, ${savings:,.0f} savings")
+
+            if clean and savings >= HARVEST_ALERT_MIN_SAVINGS:
+                lines = [
+                    f"{c['symbol']} ({c['account_id']}): ${-c['unrealized_gain']:,.0f} {c['term']}-term loss, saves ${c['tax_savings']:,.0f}"
+                    for c in clean[:5]
+                ]
+                get_notification_service().send_alert(
+                    title="Tax-Loss Harvest Candidates",
+                    message="\n".join(lines) + f"\n\nTotal estimated savings: ${savings:,.0f}",
+                    priority="low"
+                )
+
+        except Exception as e:
+            logger.error(f"Error in harvest scan: {e}", exc_info=True)
+        finally:
+            db.close()
+
     def send_expense_notifications(self):
         """
         Check for expenses due tomorrow and send notifications.
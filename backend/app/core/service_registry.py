@@ -0,0 +1,246 @@
+"""
+Registry of lazily loaded service singletons.
+
+get_income_service(), get_salary_service() and friends each kept a module
+global that loaded everything on first access, so the first request after a
+deploy paid for every CSV/PDF parse. Invalidation was a full reset that no
+ingestion ever triggered.
+
+Each singleton is declared once with a ServiceSpec:
+
+- depends_on: services loaded (and invalidated) before/with it
+- cost: "expensive" services are warmed in a background thread after
+  startup; "cheap" ones load on first use
+- data_sources: tables the service is built from; invalidate_sources()
+  drops exactly the services built from the tables an ingestion wrote
+- max_age: optional seconds after which a loaded instance is rebuilt
+
+registry.get(name) loads on demand (once, even under concurrent requests)
+and records the state of every service for the readiness endpoint.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+CHEAP = "cheap"
+EXPENSIVE = "expensive"
+
+# Service states reported by status()
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+@dataclass(frozen=True)
+class ServiceSpec:
+    """How to build one singleton."""
+    name: str
+    factory: Callable[[], Any]
+    depends_on: Tuple[str, ...] = ()
+    cost: str = CHEAP
+    data_sources: Tuple[str, ...] = ()
+    max_age: Optional[float] = None
+
+
+class _Entry:
+    def __init__(self, spec: ServiceSpec):
+        self.spec = spec
+        self.instance: Any = None
+        self.state = NOT_LOADED
+        self.loaded_at: Optional[datetime] = None
+        self.loaded_monotonic: Optional[float] = None
+        self.load_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.lock = threading.Lock()
+
+    def is_fresh(self) -> bool:
+        if self.state != READY:
+            return False
+        max_age = self.spec.max_age
+        return max_age is None or time.monotonic() - self.loaded_monotonic < max_age
+
+
+class ServiceRegistry:
+    """Lazy, thread-safe singletons with declared dependencies."""
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self._warm_up_thread: Optional[threading.Thread] = None
+
+    def register(self, spec: ServiceSpec) -> ServiceSpec:
+        """Declare a service. Re-registering a name replaces it (and drops its instance)."""
+        with self._lock:
+            self._entries[spec.name] = _Entry(spec)
+        return spec
+
+    def _entry(self, name: str) -> _Entry:
+        try:
+            return self._entries[name]
+        except KeyError:
+            raise KeyError(f"Unknown service: {name}") from None
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def get(self, name: str) -> Any:
+        """The service instance, loading it (and its dependencies) on first use."""
+        entry = self._entry(name)
+        if entry.is_fresh():
+            return entry.instance
+
+        for dependency in entry.spec.depends_on:
+            self.get(dependency)
+
+        with entry.lock:
+            # Another thread may have finished the load while we waited
+            if entry.is_fresh():
+                return entry.instance
+
+            entry.state = LOADING
+            started = time.monotonic()
+            try:
+                instance = entry.spec.factory()
+            except Exception as e:
+                entry.state = FAILED
+                entry.error = str(e)
+                entry.instance = None
+                logger.error(f"[SERVICE_REGISTRY] Failed to load {name}: {e}")
+                raise
+
+            entry.load_seconds = round(time.monotonic() - started, 3)
+            entry.instance = instance
+            entry.loaded_at = datetime.utcnow()
+            entry.loaded_monotonic = time.monotonic()
+            entry.error = None
+            entry.state = READY
+            logger.info(f"[SERVICE_REGISTRY] Loaded {name} in {entry.load_seconds}s")
+            return instance
+
+    def peek(self, name: str) -> Any:
+        """The loaded instance, or None without loading."""
+        entry = self._entry(name)
+        return entry.instance if entry.state == READY else None
+
+    # ------------------------------------------------------------------
+    # Invalidation
+    # ------------------------------------------------------------------
+
+    def _dependents(self, names: Set[str]) -> Set[str]:
+        """`names` plus every service that (transitively) depends on one of them."""
+        result = set(names)
+        changed = True
+        while changed:
+            changed = False
+            for name, entry in self._entries.items():
+                if name not in result and result.intersection(entry.spec.depends_on):
+                    result.add(name)
+                    changed = True
+        return result
+
+    def invalidate(self, *names: str) -> List[str]:
+        """Drop the named services and their dependents; they reload on next use."""
+        for name in names:
+            self._entry(name)
+        dropped = []
+        for name in sorted(self._dependents(set(names))):
+            entry = self._entries[name]
+            with entry.lock:
+                if entry.state != NOT_LOADED:
+                    dropped.append(name)
+                entry.instance = None
+                entry.state = NOT_LOADED
+                entry.loaded_at = None
+                entry.loaded_monotonic = None
+                entry.error = None
+        if dropped:
+            logger.info(f"[SERVICE_REGISTRY] Invalidated {', '.join(dropped)}")
+        return dropped
+
+    def invalidate_sources(self, sources: Iterable[str], reload: bool = False) -> List[str]:
+        """
+        Invalidate the services built from any of `sources` (table names).
+
+        With reload=True the dropped expensive services are rebuilt in the
+        background instead of on the next request.
+        """
+        sources = set(sources)
+        names = [name for name, entry in self._entries.items() if sources.intersection(entry.spec.data_sources)]
+        if not names:
+            return []
+        dropped = self.invalidate(*names)
+        if reload:
+            expensive = [name for name in dropped if self._entries[name].spec.cost == EXPENSIVE]
+            if expensive:
+                self.start_warm_up(names=expensive)
+        return dropped
+
+    # ------------------------------------------------------------------
+    # Warm-up and readiness
+    # ------------------------------------------------------------------
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """Load `names` (default: every expensive service); returns name -> state."""
+        if names is None:
+            names = [name for name, entry in self._entries.items() if entry.spec.cost == EXPENSIVE]
+        for name in names:
+            try:
+                self.get(name)
+            except Exception:
+                pass  # recorded as failed; the next request retries
+        return {name: self._entries[name].state for name in names}
+
+    def start_warm_up(self, delay: float = 0.0, names: Optional[Iterable[str]] = None) -> threading.Thread:
+        """warm_up(names) in a daemon thread, after `delay` seconds."""
+        names = None if names is None else list(names)
+
+        def run():
+            if delay:
+                time.sleep(delay)
+            started = time.monotonic()
+            states = self.warm_up(names)
+            logger.info(f"[SERVICE_REGISTRY] Warm-up finished in {time.monotonic() - started:.1f}s: {states}")
+
+        thread = threading.Thread(target=run, name="service-warm-up", daemon=True)
+        self._warm_up_thread = thread
+        thread.start()
+        return thread
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Readiness report: ready when every expensive service has loaded.
+
+        A failed service is reported but does not block readiness once the
+        warm-up has tried it; requests retry the load.
+        """
+        services = {}
+        ready = True
+        for name, entry in self._entries.items():
+            spec = entry.spec
+            services[name] = {
+                "state": entry.state,
+                "cost": spec.cost,
+                "depends_on": list(spec.depends_on),
+                "data_sources": list(spec.data_sources),
+                "loaded_at": entry.loaded_at.isoformat() if entry.loaded_at else None,
+                "load_seconds": entry.load_seconds,
+                "error": entry.error,
+            }
+            if spec.cost == EXPENSIVE and entry.state in (NOT_LOADED, LOADING):
+                ready = False
+
+        warming = self._warm_up_thread is not None and self._warm_up_thread.is_alive()
+        return {"ready": ready, "warming_up": warming, "services": services}
+
+
+# Application-wide registry; services register themselves on import
+registry = ServiceRegistry()
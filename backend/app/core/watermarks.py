@@ -0,0 +1,47 @@
+"""
+Table watermarks for input fingerprints.
+
+A watermark is (row count, max(id), max(updated_at)) over a table or a
+filtered slice of one: the count catches deletes, max(id) inserts and
+max(updated_at) edits. Caches that derive results from tables (the tax
+forecast, net worth snapshots, dashboard insights) hash the watermarks of
+what they read, so a result stays valid until that data changes and no
+ingestion path has to remember to invalidate it.
+"""
+
+from typing import Any, Dict, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+
+def source_watermarks(
+    db: Session,
+    sources: Sequence[Tuple[Any, Any, Any]],
+    slices: Optional[Mapping[str, Tuple[Any, Any, Any, Any]]] = None,
+) -> Dict[str, Tuple[Any, ...]]:
+    """
+    Watermarks of every source, in one SELECT.
+
+    `sources` are (model, id column, updated_at column), keyed by table name
+    in the result. `slices` maps a name to (model, id column, updated_at
+    column, filter) for the watermarks of only the rows matching the filter.
+    """
+    named = [(model.__tablename__, model, id_column, updated_column, None)
+             for model, id_column, updated_column in sources]
+    named.extend((name, *source) for name, source in (slices or {}).items())
+
+    columns = []
+    for _, model, id_column, updated_column, where in named:
+        count = select(func.count()).select_from(model)
+        max_id = select(func.max(id_column))
+        max_updated = select(func.max(updated_column))
+        if where is not None:
+            count, max_id, max_updated = count.where(where), max_id.where(where), max_updated.where(where)
+        columns.extend(query.scalar_subquery() for query in (count, max_id, max_updated))
+    row = db.execute(select(*columns)).one()
+
+    return {
+        name: tuple(row[3 * i:3 * i + 3])
+        for i, (name, _, _, _, _) in enumerate(named)
+    }
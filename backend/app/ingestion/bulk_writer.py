@@ -0,0 +1,337 @@
+"""
+Batch writer for parsed investment transactions.
+
+save_investment_transaction() handles one record at a time: an account
+lookup, a full account scan for fuzzy account matching, an exact duplicate
+query, a cross-account duplicate query and an ORM insert. A 5,000-line
+Robinhood CSV cost ~25,000 queries, even when re-importing a file whose rows
+all exist already.
+
+save_investment_transactions() does the same work per file:
+
+1. Resolve every distinct (source, account_id) once against the source's
+   preloaded accounts (creating missing ones).
+2. Load the existing transactions in the file's date range with one query
+   and apply the cross-account rules in memory (same source, date, symbol,
+   type and amount = duplicate; rows parked in a generic account move to the
+   specific one).
+3. INSERT the remaining rows in chunks with ON CONFLICT (dedup_hash) DO
+   NOTHING RETURNING, backed by the unique dedup_hash index.
+4. Append change-feed events and income rollup deltas for the created rows.
+
+Counts (created / updated / skipped) match the per-record path.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from app.ingestion.parsers.base import ParsedRecord
+from app.modules.investments.dedup import dedup_hash_of, transaction_dedup_hash
+from app.modules.investments.models import (
+    InvestmentAccount,
+    InvestmentTransaction,
+    TransactionChangeEvent,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# Rows per INSERT/UPDATE statement, for every chunked bulk write
+CHUNK_SIZE = 1000
+
+# (source, transaction_date, symbol, transaction_type, amount) - the
+# cross-account duplicate key; '' and 'UNKNOWN' symbols are equivalent
+CrossKey = Tuple[str, date, str, str, Optional[Decimal]]
+
+
+def _as_date(value: Any) -> Any:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def _amount_key(value: Any) -> Optional[Decimal]:
+    if value is None or value == '':
+        return None
+    return Decimal(str(value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+def cross_account_key(source: str, transaction_date: Any, symbol: Optional[str],
+                      transaction_type: str, amount: Any) -> CrossKey:
+    """Key under which two transactions are duplicates across accounts."""
+    symbol = symbol or ''
+    if symbol == 'UNKNOWN':
+        symbol = ''
+    return (source, _as_date(transaction_date), symbol, transaction_type, _amount_key(amount))
+
+
+@dataclass
+class PreparedTransaction:
+    """A parsed record normalized into investment_transactions column values."""
+    values: Dict[str, Any]
+    cross_key: CrossKey
+    account_hints: Dict[str, Any]  # account_name/account_type for a new account
+
+
+@dataclass
+class ExistingTransaction:
+    id: int
+    account_id: str
+    cross_key: CrossKey
+
+
+@dataclass
+class BatchPlan:
+    """What to do with a file's transactions, decided in memory."""
+    inserts: List[PreparedTransaction]
+    # (existing transaction id, specific account_id to move it to)
+    migrations: List[Tuple[int, str]]
+    skipped: int
+
+
+def prepare_transactions(records: Iterable[ParsedRecord], ingestion_id: Optional[int] = None) -> Tuple[List[PreparedTransaction], int]:
+    """
+    Normalize records the way save_investment_transaction() does.
+
+    Returns the prepared rows and the number of records that cannot be
+    stored (missing date, type or amount).
+    """
+    from app.ingestion.services import _normalize_account_id
+
+    prepared = []
+    invalid = 0
+    for record in records:
+        data = record.data
+        source = data.get("source", "unknown")
+        account_id = _normalize_account_id(data.get("account_id", "default"))
+        transaction_date = _as_date(data.get("transaction_date"))
+        symbol = data.get("symbol", "")
+        transaction_type = data.get("transaction_type", "")
+        quantity = data.get("quantity")
+        amount = data.get("amount")
+
+        if transaction_date is None or not transaction_type or amount is None or symbol is None:
+            invalid += 1
+            continue
+
+        record_hash = hashlib.sha256(
+            f"{source}:{account_id}:{transaction_date}:{symbol}:{transaction_type}:{quantity}:{amount}".encode()
+        ).hexdigest()
+
+        prepared.append(PreparedTransaction(
+            values={
+                "source": source,
+                "account_id": account_id,
+                "transaction_date": transaction_date,
+                "symbol": symbol,
+                "description": data.get("description"),
+                "transaction_type": transaction_type,
+                "quantity": quantity,
+                "price_per_share": data.get("price_per_share") or data.get("price"),
+                "amount": amount,
+                "fees": data.get("fees", 0),
+                "record_hash": record_hash,
+                "dedup_hash": transaction_dedup_hash(
+                    source, account_id, transaction_date, symbol, transaction_type, quantity, amount
+                ),
+                "ingestion_id": ingestion_id,
+            },
+            cross_key=cross_account_key(source, transaction_date, symbol, transaction_type, amount),
+            account_hints={
+                "account_name": data.get("account_name"),
+                "account_type": data.get("account_type"),
+            },
+        ))
+    return prepared, invalid
+
+
+def plan_batch(prepared: List[PreparedTransaction], existing: Iterable[ExistingTransaction]) -> BatchPlan:
+    """
+    Apply the cross-account duplicate rules to a whole file.
+
+    A row matching an existing transaction (or an earlier row of the same
+    file) is skipped, except that a match parked in a generic account is
+    moved to the row's specific account once.
+    """
+    from app.ingestion.services import GENERIC_ACCOUNT_IDS
+
+    first_existing: Dict[CrossKey, ExistingTransaction] = {}
+    for txn in existing:
+        first_existing.setdefault(txn.cross_key, txn)
+
+    plan = BatchPlan(inserts=[], migrations=[], skipped=0)
+    seen = set()
+    for row in prepared:
+        key = row.cross_key
+        match = first_existing.get(key)
+        if match is not None:
+            account_id = row.values["account_id"]
+            if match.account_id in GENERIC_ACCOUNT_IDS and account_id not in GENERIC_ACCOUNT_IDS:
+                plan.migrations.append((match.id, account_id))
+                match.account_id = account_id  # later rows see the migrated account
+            else:
+                plan.skipped += 1
+            continue
+        if key in seen:
+            plan.skipped += 1
+            continue
+        seen.add(key)
+        plan.inserts.append(row)
+    return plan
+
+
+def _resolve_accounts(db: Session, prepared: List[PreparedTransaction]) -> None:
+    """Find or create each distinct (source, account_id) once."""
+    from app.ingestion.services import _ensure_investment_account
+
+    # First record's name/type hints per account
+    records_by_account: Dict[Tuple[str, str], dict] = {}
+    for row in prepared:
+        records_by_account.setdefault((row.values["source"], row.values["account_id"]), row.account_hints)
+
+    sources = {source for source, _account_id in records_by_account}
+    accounts_by_source: Dict[str, List[InvestmentAccount]] = {source: [] for source in sources}
+    for account in db.query(InvestmentAccount).filter(InvestmentAccount.source.in_(sources)).all():
+        accounts_by_source[account.source].append(account)
+
+    for (source, account_id), data in records_by_account.items():
+        _ensure_investment_account(db, source, account_id, data, source_accounts=accounts_by_source[source])
+
+
+def _load_existing(db: Session, prepared: List[PreparedTransaction]) -> List[ExistingTransaction]:
+    """Existing transactions that can collide with the file's cross-account keys."""
+    sources = {row.values["source"] for row in prepared}
+    types = {row.values["transaction_type"] for row in prepared}
+    dates = [row.values["transaction_date"] for row in prepared]
+
+    rows = db.query(
+        InvestmentTransaction.id,
+        InvestmentTransaction.account_id,
+        InvestmentTransaction.source,
+        InvestmentTransaction.transaction_date,
+        InvestmentTransaction.symbol,
+        InvestmentTransaction.transaction_type,
+        InvestmentTransaction.amount,
+    ).filter(
+        InvestmentTransaction.source.in_(sources),
+        InvestmentTransaction.transaction_type.in_(types),
+        InvestmentTransaction.transaction_date >= min(dates),
+        InvestmentTransaction.transaction_date <= max(dates),
+    ).order_by(InvestmentTransaction.id).all()
+
+    return [
+        ExistingTransaction(
+            id=row.id,
+            account_id=row.account_id,
+            cross_key=cross_account_key(row.source, row.transaction_date, row.symbol, row.transaction_type, row.amount),
+        )
+        for row in rows
+    ]
+
+
+def move_transaction(db: Session, txn: InvestmentTransaction, account_id: str) -> None:
+    """
+    Move a transaction to another account along with everything keyed on its
+    account: its income rollup month, its change-feed event and its
+    dedup_hash. Does not flush or commit.
+    """
+    from app.modules.income.income_rollup import record_income_transaction
+
+    record_income_transaction(db, txn, sign=-1)
+    txn.account_id = account_id
+    txn.dedup_hash = dedup_hash_of(txn)
+    record_income_transaction(db, txn)
+    db.query(TransactionChangeEvent).filter(
+        TransactionChangeEvent.transaction_id == txn.id
+    ).update({TransactionChangeEvent.account_id: account_id}, synchronize_session=False)
+
+
+def _apply_migrations(db: Session, migrations: List[Tuple[int, str]]) -> None:
+    """Move transactions out of generic accounts."""
+    if not migrations:
+        return
+    txns = {
+        txn.id: txn for txn in db.query(InvestmentTransaction).filter(
+            InvestmentTransaction.id.in_([txn_id for txn_id, _ in migrations])
+        ).all()
+    }
+    for txn_id, account_id in migrations:
+        move_transaction(db, txns[txn_id], account_id)
+    db.flush()
+
+
+def _insert_chunks(db: Session, rows: List[PreparedTransaction]) -> List[Any]:
+    """INSERT ... ON CONFLICT (dedup_hash) DO NOTHING; returns the created rows."""
+    table = InvestmentTransaction.__table__
+    now = datetime.utcnow()
+    created = []
+    for start in range(0, len(rows), CHUNK_SIZE):
+        chunk = rows[start:start + CHUNK_SIZE]
+        stmt = insert(table).values([
+            {**row.values, "created_at": now, "updated_at": now} for row in chunk
+        ]).on_conflict_do_nothing(
+            index_elements=['dedup_hash']
+        ).returning(
+            table.c.id,
+            table.c.source,
+            table.c.account_id,
+            table.c.transaction_date,
+            table.c.transaction_type,
+            table.c.symbol,
+            table.c.description,
+            table.c.amount,
+        )
+        created.extend(db.execute(stmt).all())
+    return created
+
+
+def save_investment_transactions(
+    db: Session,
+    records: List[ParsedRecord],
+    ingestion_id: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Save a file's transaction/dividend records in bulk.
+
+    Runs inside a savepoint and does not commit. Returns created, updated
+    and skipped counts.
+    """
+    from app.modules.investments.change_feed import record_transaction_event
+    from app.modules.income.income_rollup import record_income_transactions
+
+    prepared, invalid = prepare_transactions(records, ingestion_id)
+    result = {"created": 0, "updated": 0, "skipped": invalid}
+    if not prepared:
+        return result
+
+    savepoint = db.begin_nested()
+    try:
+        _resolve_accounts(db, prepared)
+        plan = plan_batch(prepared, _load_existing(db, prepared))
+        _apply_migrations(db, plan.migrations)
+        created = _insert_chunks(db, plan.inserts)
+
+        # Close/expire/assign events and income months for the new rows
+        for row in created:
+            record_transaction_event(db, row)
+        record_income_transactions(db, created)
+        db.flush()
+        savepoint.commit()
+    except Exception:
+        savepoint.rollback()
+        raise
+
+    result["created"] = len(created)
+    result["updated"] = len(plan.migrations)
+    # Rows dropped by ON CONFLICT were inserted concurrently or share a dedup key
+    result["skipped"] += plan.skipped + (len(plan.inserts) - len(created))
+    logger.info(
+        f"[BULK_INGEST] {len(prepared)} transactions: created={result['created']}, "
+        f"updated={result['updated']}, skipped={result['skipped']}"
+    )
+    return result
@@ -13,6 +13,7 @@ from datetime import datetime
 from typing import Optional, Tuple
 
 from app.ingestion.parsers.base import BaseParser, ParseResult, ParsedRecord, RecordType
+from app.ingestion.parsers.pdf_text import PdfText
 
 
 class BankOfAmericaParser(BaseParser):
@@ -63,8 +64,6 @@ class BankOfAmericaParser(BaseParser):
     
     def parse(self, file_path: Path) -> ParseResult:
         """Parse Bank of America PDF statement and extract balance."""
-        import pdfplumber
-        
         records = []
         warnings = []
         errors = []
@@ -74,9 +73,9 @@ class BankOfAmericaParser(BaseParser):
         }
         
         try:
-            with pdfplumber.open(file_path) as pdf:
+            with PdfText.open(file_path) as pdf:
                 # Extract text from first page
-                first_page_text = pdf.pages[0].extract_text() or ""
+                first_page_text = pdf.text(0)
                 
                 # Extract account info
                 account_type, account_number = self._extract_account_info(first_page_text)
@@ -5,8 +5,8 @@ All source-specific parsers must implement this interface.
 
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any
-from dataclasses import dataclass
+from typing import Any, Iterable
+from dataclasses import dataclass, field
 from enum import Enum
 
 
@@ -41,6 +41,29 @@ class ParseResult:
     metadata: dict[str, Any]  # File-level metadata (account info, date range, etc.)
 
 
+@dataclass
+class FileFingerprint:
+    """
+    Cheap summary of a file, extracted in a single open.
+
+    Used to route a file to its parser without every parser reopening it
+    (see app.ingestion.pipeline.fingerprint_file).
+    """
+    path: Path
+    suffix: str  # lowercased
+    sha256: str
+    size: int = 0
+    page_count: int = 0
+    first_page_text: str = ""  # PDFs, lowercased
+    head_text: str = ""  # text files, first 2000 characters
+    csv_headers: set[str] = field(default_factory=set)
+    sheet_names: list[str] = field(default_factory=list)
+
+    def first_page_contains(self, identifiers: Iterable[str]) -> bool:
+        """True if any (lowercase) identifier appears on the first PDF page."""
+        return any(identifier in self.first_page_text for identifier in identifiers)
+
+
 class BaseParser(ABC):
     """
     Abstract base class for all file parsers.
@@ -83,6 +106,16 @@ class BaseParser(ABC):
         """
         pass
     
+    def matches(self, fingerprint: FileFingerprint) -> bool:
+        """
+        Check if this parser can handle a file from its fingerprint.
+        
+        Parsers that only inspect the first page, CSV header or first few
+        KB of a file override this so dispatch never reopens the file.
+        The default falls back to can_parse().
+        """
+        return self.can_parse(fingerprint.path)
+    
     @abstractmethod
     def parse(self, file_path: Path) -> ParseResult:
         """
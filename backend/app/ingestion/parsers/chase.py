@@ -14,7 +14,8 @@ from pathlib import Path
 from datetime import datetime
 from typing import Optional, Tuple, List, Dict
 
-from app.ingestion.parsers.base import BaseParser, ParseResult, ParsedRecord, RecordType
+from app.ingestion.parsers.base import BaseParser, FileFingerprint, ParseResult, ParsedRecord, RecordType
+from app.ingestion.parsers.pdf_text import PdfText
 
 
 class ChaseParser(BaseParser):
@@ -69,10 +70,12 @@ class ChaseParser(BaseParser):
         
         return False
     
+    def matches(self, fingerprint: FileFingerprint) -> bool:
+        """Same check as can_parse(), on the already-extracted first page."""
+        return fingerprint.suffix == '.pdf' and fingerprint.first_page_contains(self.CHASE_IDENTIFIERS)
+    
     def parse(self, file_path: Path) -> ParseResult:
         """Parse Chase PDF statement and extract balances for all accounts."""
-        import pdfplumber
-        
         records = []
         warnings = []
         errors = []
@@ -82,11 +85,8 @@ class ChaseParser(BaseParser):
         }
         
         try:
-            with pdfplumber.open(file_path) as pdf:
-                # Extract text from all pages
-                full_text = ""
-                for page in pdf.pages[:5]:  # Check first 5 pages
-                    full_text += (page.extract_text() or "") + "\n"
+            with PdfText.open(file_path) as pdf:
+                full_text = pdf.full_text(stop=5)  # Check first 5 pages
                 
                 # Extract statement date
                 statement_date = self._extract_statement_date(full_text, file_path.name)
@@ -14,7 +14,7 @@ from datetime import datetime
 from typing import Optional, List
 from io import StringIO
 
-from app.ingestion.parsers.base import BaseParser, ParseResult, ParsedRecord, RecordType
+from app.ingestion.parsers.base import BaseParser, FileFingerprint, ParseResult, ParsedRecord, RecordType
 
 
 class FidelityCSVParser(BaseParser):
@@ -26,6 +26,16 @@ class FidelityCSVParser(BaseParser):
     source_name = "fidelity"
     supported_extensions = [".csv", ".CSV"]
     
+    # Fidelity-specific patterns near the top of an export
+    FIDELITY_PATTERNS = [
+        "Health Savings Account",
+        "FIDELITY",
+        "Symbol/CUSIP",
+        "FXAIX",
+        "FSMDX",
+        "FDRXX",
+    ]
+    
     def can_parse(self, file_path: Path) -> bool:
         """Check if this is a Fidelity CSV statement."""
         if file_path.suffix.lower() != '.csv':
@@ -35,17 +45,7 @@ class FidelityCSVParser(BaseParser):
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read(2000)
                 
-            # Look for Fidelity-specific patterns
-            fidelity_patterns = [
-                "Health Savings Account",
-                "FIDELITY",
-                "Symbol/CUSIP",
-                "FXAIX",
-                "FSMDX",
-                "FDRXX",
-            ]
-            
-            for pattern in fidelity_patterns:
+            for pattern in self.FIDELITY_PATTERNS:
                 if pattern in content:
                     return True
                     
@@ -54,6 +54,12 @@ class FidelityCSVParser(BaseParser):
         
         return False
     
+    def matches(self, fingerprint: FileFingerprint) -> bool:
+        """Same check as can_parse(), on the already-read first 2000 characters."""
+        if fingerprint.suffix != '.csv':
+            return False
+        return any(pattern in fingerprint.head_text for pattern in self.FIDELITY_PATTERNS)
+    
     def parse(self, file_path: Path) -> ParseResult:
         """Parse Fidelity CSV statement and extract holdings."""
         records = []
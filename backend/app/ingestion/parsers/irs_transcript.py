@@ -13,6 +13,7 @@ from typing import Any, Optional, Dict, List
 from decimal import Decimal
 
 from app.ingestion.parsers.base import BaseParser, ParseResult, ParsedRecord, RecordType
+from app.ingestion.parsers.pdf_text import PdfText
 
 
 class IRSTranscriptParser(BaseParser):
@@ -61,8 +62,6 @@ class IRSTranscriptParser(BaseParser):
     
     def parse(self, file_path: Path) -> ParseResult:
         """Parse IRS Wage and Income Transcript PDF."""
-        import pdfplumber
-        
         records = []
         warnings = []
         errors = []
@@ -72,11 +71,9 @@ class IRSTranscriptParser(BaseParser):
         }
         
         try:
-            with pdfplumber.open(file_path) as pdf:
-                # Extract all text
-                full_text = ""
-                for page in pdf.pages:
-                    full_text += (page.extract_text() or "") + "\n"
+            with PdfText.open(file_path) as pdf:
+                # Every page is a form; pages are released as they are read
+                full_text = pdf.full_text()
                 
                 # Determine owner from filename
                 filename = file_path.stem
@@ -0,0 +1,190 @@
+"""
+Lazy, page-level PDF text extraction shared by the PDF parsers.
+
+The PDF parsers used to run pdfplumber's extract_text() on every page and
+concatenate the result before any regex work - some several times over the
+same document. Brokerage statements are 40-100 pages, most of them
+disclosures that are thrown away.
+
+PdfText wraps an open pdfplumber document:
+
+- text(i) extracts one page on first use and memoizes it, then releases the
+  page's parsed objects so memory stays flat while streaming.
+- An optional crop box (fractions of the page) limits extraction to the
+  region a parser cares about, e.g. without running headers/footers.
+- sections() takes PdfSection declarations ("Account Activity" through
+  "Important Information"), skips pages outside them - start markers are
+  probed with the cheaper extract_text_simple() - and stops reading once
+  every declared section has ended.
+
+Usage:
+    with PdfText.open(file_path) as pdf:
+        first_page = pdf.text(0)
+        sections = pdf.sections([
+            PdfSection('activity', start=r'Account Activity', end=r'^Important Information', from_page=1),
+        ])
+        activity_text = sections.text('activity')
+"""
+
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+# (x0, top, x1, bottom) as fractions of the page width/height
+CropBox = Tuple[float, float, float, float]
+
+
+@dataclass
+class PdfSection:
+    """
+    A run of pages a parser needs.
+
+    The section opens on the first page (at or after `from_page`) whose text
+    matches `start` (None = opens on `from_page`) and includes every page up
+    to and including the one matching `end`. Without an `end` it runs to
+    the last page unless `max_pages` closes it first. Markers are regular
+    expressions, matched case-insensitively and per line (re.MULTILINE).
+    """
+    name: str
+    start: Optional[str] = None
+    end: Optional[str] = None
+    from_page: int = 0
+    max_pages: Optional[int] = None
+
+
+@dataclass
+class SectionPages:
+    """Page texts collected for each declared section."""
+    pages: Dict[str, List[Tuple[int, str]]] = field(default_factory=dict)
+    pages_read: int = 0
+
+    def found(self, name: str) -> bool:
+        return bool(self.pages.get(name))
+
+    def page_texts(self, name: str) -> List[str]:
+        return [text for _index, text in self.pages.get(name, [])]
+
+    def text(self, name: str) -> str:
+        return "\n".join(self.page_texts(name))
+
+
+def _marker(pattern: Optional[str]) -> Optional["re.Pattern"]:
+    return re.compile(pattern, re.IGNORECASE | re.MULTILINE) if pattern else None
+
+
+class PdfText:
+    """Memoized per-page text of one open pdfplumber document."""
+
+    def __init__(self, pdf, crop: Optional[CropBox] = None):
+        self.pdf = pdf
+        self.crop = crop
+        self._text: Dict[int, str] = {}
+        self._probe: Dict[int, str] = {}
+        self.pages_extracted = 0
+
+    @classmethod
+    @contextmanager
+    def open(cls, file_path: Union[str, Path], crop: Optional[CropBox] = None) -> Iterator["PdfText"]:
+        import pdfplumber
+
+        with pdfplumber.open(file_path) as pdf:
+            yield cls(pdf, crop=crop)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf.pages)
+
+    def _page(self, index: int):
+        page = self.pdf.pages[index]
+        if self.crop:
+            x0, top, x1, bottom = self.crop
+            page = page.crop((x0 * page.width, top * page.height, x1 * page.width, bottom * page.height))
+        return page
+
+    def _release(self, index: int) -> None:
+        # Drop pdfminer's parsed layout objects for the page
+        try:
+            self.pdf.pages[index].close()
+        except Exception:
+            pass
+
+    def text(self, index: int) -> str:
+        """Layout text of page `index` (0-based), extracted once."""
+        if index not in self._text:
+            self._text[index] = self._page(index).extract_text() or ""
+            self.pages_extracted += 1
+            self._probe.pop(index, None)
+            self._release(index)
+        return self._text[index]
+
+    def probe(self, index: int) -> str:
+        """Cheap text for marker detection; the full text if already extracted."""
+        if index in self._text:
+            return self._text[index]
+        if index not in self._probe:
+            page = self._page(index)
+            simple = getattr(page, "extract_text_simple", None)
+            self._probe[index] = (simple() if simple else page.extract_text()) or ""
+            self._release(index)
+        return self._probe[index]
+
+    def page_texts(self, start: int = 0, stop: Optional[int] = None) -> Iterator[str]:
+        """Yield page texts lazily, in order."""
+        stop = self.page_count if stop is None else min(stop, self.page_count)
+        for index in range(start, stop):
+            yield self.text(index)
+
+    def full_text(self, start: int = 0, stop: Optional[int] = None) -> str:
+        """Pages [start, stop) joined with newlines, as the parsers used to build."""
+        return "".join(text + "\n" for text in self.page_texts(start, stop))
+
+    def sections(self, sections: Sequence[PdfSection]) -> SectionPages:
+        """
+        Collect the pages of each declared section in one forward pass.
+
+        Pages before a section's start marker are only probed; reading stops
+        as soon as every section has ended.
+        """
+        starts = {s.name: _marker(s.start) for s in sections}
+        ends = {s.name: _marker(s.end) for s in sections}
+        result = SectionPages(pages={s.name: [] for s in sections})
+        waiting = list(sections)
+        active: List[PdfSection] = []
+
+        for index in range(self.page_count):
+            if not waiting and not active:
+                break
+            result.pages_read = index + 1
+
+            for section in list(waiting):
+                if index < section.from_page:
+                    continue
+                start = starts[section.name]
+                if start is None or start.search(self.probe(index)):
+                    waiting.remove(section)
+                    active.append(section)
+
+            if not active:
+                continue
+
+            text = self.text(index)
+            for section in list(active):
+                collected = result.pages[section.name]
+                collected.append((index, text))
+
+                # On the opening page, only an end marker after the start counts
+                search_from = 0
+                start = starts[section.name]
+                if len(collected) == 1 and start is not None:
+                    match = start.search(text)
+                    search_from = match.end() if match else 0
+
+                end = ends[section.name]
+                if (end is not None and end.search(text, search_from)) or (
+                    section.max_pages is not None and len(collected) >= section.max_pages
+                ):
+                    active.remove(section)
+
+        return result
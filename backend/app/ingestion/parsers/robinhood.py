@@ -12,7 +12,7 @@ from pathlib import Path
 from datetime import datetime
 from typing import Any, Optional
 
-from app.ingestion.parsers.base import BaseParser, ParseResult, ParsedRecord, RecordType
+from app.ingestion.parsers.base import BaseParser, FileFingerprint, ParseResult, ParsedRecord, RecordType
 
 
 class RobinhoodParser(BaseParser):
@@ -129,6 +129,13 @@ class RobinhoodParser(BaseParser):
             
         return False
     
+    def matches(self, fingerprint: FileFingerprint) -> bool:
+        """Same check as can_parse(), on the already-read header row."""
+        if fingerprint.suffix not in self.supported_extensions:
+            return False
+        headers = fingerprint.csv_headers
+        return self.TRANSACTION_COLUMNS.issubset(headers) or self.HOLDINGS_COLUMNS.issubset(headers)
+    
     def parse(self, file_path: Path) -> ParseResult:
         """Parse Robinhood CSV file."""
         headers = self._read_csv_headers(file_path)
@@ -20,7 +20,7 @@ from datetime import datetime
 from typing import Any, Optional, Tuple
 from decimal import Decimal
 
-from app.ingestion.parsers.base import BaseParser, ParseResult, ParsedRecord, RecordType
+from app.ingestion.parsers.base import BaseParser, FileFingerprint, ParseResult, ParsedRecord, RecordType
 
 
 class RobinhoodPDFParser(BaseParser):
@@ -70,6 +70,10 @@ class RobinhoodPDFParser(BaseParser):
         
         return False
     
+    def matches(self, fingerprint: FileFingerprint) -> bool:
+        """Same check as can_parse(), on the already-extracted first page."""
+        return fingerprint.suffix == '.pdf' and fingerprint.first_page_contains(self.ROBINHOOD_IDENTIFIERS)
+    
     def parse(self, file_path: Path) -> ParseResult:
         """
         Robinhood account statement PDFs provide no value - skip them.
@@ -16,7 +16,8 @@ from datetime import datetime
 from typing import Optional, Tuple
 from decimal import Decimal
 
-from app.ingestion.parsers.base import BaseParser, ParseResult, ParsedRecord, RecordType
+from app.ingestion.parsers.base import BaseParser, FileFingerprint, ParseResult, ParsedRecord, RecordType
+from app.ingestion.parsers.pdf_text import PdfSection, PdfText
 
 
 class SchwabPDFParser(BaseParser):
@@ -61,10 +62,21 @@ class SchwabPDFParser(BaseParser):
         
         return False
     
+    def matches(self, fingerprint: FileFingerprint) -> bool:
+        """Same check as can_parse(), on the already-extracted first page."""
+        return fingerprint.suffix == '.pdf' and fingerprint.first_page_contains(self.SCHWAB_IDENTIFIERS)
+    
+    # Positions pages, only read when page 1 has no portfolio value. The
+    # heading opens the section anywhere on a page; only a heading line closes it
+    POSITIONS_SECTION = PdfSection(
+        "positions",
+        start=r"Positions",
+        end=r"^(Transaction Detail|Pending / Open Activity)",
+        from_page=1,
+    )
+    
     def parse(self, file_path: Path) -> ParseResult:
         """Parse Schwab PDF statement and extract holdings."""
-        import pdfplumber
-        
         records = []
         warnings = []
         errors = []
@@ -74,9 +86,9 @@ class SchwabPDFParser(BaseParser):
         }
         
         try:
-            with pdfplumber.open(file_path) as pdf:
+            with PdfText.open(file_path) as pdf:
                 # Extract account info from first page
-                first_page_text = pdf.pages[0].extract_text() or ""
+                first_page_text = pdf.text(0)
                 
                 owner, account_name, account_number = self._extract_account_info(first_page_text)
                 statement_date = self._extract_statement_date(first_page_text)
@@ -96,21 +108,19 @@ class SchwabPDFParser(BaseParser):
                 # Extract holdings ONLY to calculate portfolio value if not found on page 1
                 # We do NOT create HOLDING records from PDFs - they're historical and would
                 # overwrite current positions with old data
-                holdings = []
-                for page in pdf.pages:
-                    page_text = page.extract_text() or ""
-                    page_holdings = self._extract_holdings(page_text)
-                    holdings.extend(page_holdings)
-                
-                # Extract cash balance
-                cash_balance = self._extract_cash_balance(first_page_text)
-                
-                # Calculate portfolio value from holdings if not found on page 1
-                if not portfolio_value and holdings:
-                    calculated_value = sum(h.get("market_value", 0) or 0 for h in holdings)
-                    if cash_balance:
-                        calculated_value += cash_balance
-                    portfolio_value = calculated_value
+                if not portfolio_value:
+                    holdings = []
+                    positions = pdf.sections([self.POSITIONS_SECTION])
+                    for page_text in [first_page_text] + positions.page_texts("positions"):
+                        holdings.extend(self._extract_holdings(page_text))
+                    
+                    if holdings:
+                        calculated_value = sum(h.get("market_value", 0) or 0 for h in holdings)
+                        cash_balance = self._extract_cash_balance(first_page_text)
+                        if cash_balance:
+                            calculated_value += cash_balance
+                        portfolio_value = calculated_value
+                    metadata["pages_read"] = positions.pages_read
                 
                 # Create portfolio snapshot record - this is the ONLY record type from PDFs
                 if statement_date and portfolio_value:
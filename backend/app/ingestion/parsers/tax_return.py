@@ -19,6 +19,7 @@ from pathlib import Path
 from typing import Any, Optional, Dict, List
 
 from app.ingestion.parsers.base import BaseParser, ParseResult, ParsedRecord, RecordType
+from app.ingestion.parsers.pdf_text import PdfText
 
 
 class TaxReturnParser(BaseParser):
@@ -63,8 +64,6 @@ class TaxReturnParser(BaseParser):
     
     def parse(self, file_path: Path) -> ParseResult:
         """Parse tax return PDF and extract comprehensive tax data."""
-        import pdfplumber
-        
         records = []
         warnings = []
         errors = []
@@ -74,17 +73,17 @@ class TaxReturnParser(BaseParser):
         }
         
         try:
-            with pdfplumber.open(file_path) as pdf:
-                first_page_text = pdf.pages[0].extract_text() or ""
+            # Helpers share one PdfText, so each page is extracted at most once
+            with PdfText.open(file_path) as pdf:
+                first_page_text = pdf.text(0)
                 
                 tax_data = {}
                 
                 # Check format type
                 if 'FEDERAL TAX SUMMARY' in first_page_text or (
-                    len(pdf.pages) > 1 and 'FEDERAL TAX SUMMARY' in (pdf.pages[1].extract_text() or '')
+                    pdf.page_count > 1 and 'FEDERAL TAX SUMMARY' in pdf.text(1)
                 ):
-                    for i in range(min(3, len(pdf.pages))):
-                        page_text = pdf.pages[i].extract_text() or ''
+                    for page_text in pdf.page_texts(stop=3):
                         if 'FEDERAL TAX SUMMARY' in page_text:
                             tax_data = self._parse_tax_preparer_format(page_text, pdf)
                             break
@@ -141,7 +140,7 @@ class TaxReturnParser(BaseParser):
             metadata=metadata
         )
     
-    def _extract_all_schedules(self, pdf) -> Dict[str, Any]:
+    def _extract_all_schedules(self, pdf: PdfText) -> Dict[str, Any]:
         """Extract data from all relevant schedules."""
         details = {
             "income_sources": {},
@@ -152,24 +151,20 @@ class TaxReturnParser(BaseParser):
             "w2_breakdown": [],
         }
         
-        all_text = ""
-        for page in pdf.pages:
-            all_text += (page.extract_text() or "") + "\n"
+        all_text = pdf.full_text()
         
         # Extract 1040 main form income
         details["income_sources"] = self._extract_1040_income(all_text)
         
         # Extract Schedule E (Rental Income)
-        for page in pdf.pages:
-            text = page.extract_text() or ""
+        for text in pdf.page_texts():
             if 'Supplemental Income and Loss' in text or ('Schedule E' in text and 'Rents received' in text):
                 rental_data = self._extract_schedule_e(text)
                 if rental_data:
                     details["rental_properties"].extend(rental_data)
         
         # Extract Schedule B (Interest and Dividends)
-        for page in pdf.pages:
-            text = page.extract_text() or ""
+        for text in pdf.page_texts():
             if 'Schedule B' in text and 'Interest and' in text:
                 schedule_b = self._extract_schedule_b(text)
                 if schedule_b.get("total_interest") and schedule_b["total_interest"] > 0:
@@ -180,8 +175,7 @@ class TaxReturnParser(BaseParser):
                         details["income_sources"]["ordinary_dividends"] = schedule_b["total_dividends"]
         
         # Extract Schedule D (Capital Gains)
-        for page in pdf.pages:
-            text = page.extract_text() or ""
+        for text in pdf.page_texts():
             if ('Schedule D' in text or 'Capital Gains and Losses' in text) and ('Short-Term' in text or 'Long-Term' in text):
                 cap_gains = self._extract_schedule_d(text)
                 if cap_gains:
@@ -457,7 +451,7 @@ class TaxReturnParser(BaseParser):
         
         return result
     
-    def _parse_tax_summary_format(self, summary_text: str, pdf) -> Dict[str, Any]:
+    def _parse_tax_summary_format(self, summary_text: str, pdf: PdfText) -> Dict[str, Any]:
         """Parse the tax summary format (e.g., '2022 Tax Summary (1040)')."""
         data = {}
         
@@ -513,12 +507,11 @@ class TaxReturnParser(BaseParser):
         
         return data
     
-    def _parse_tax_preparer_format(self, summary_text: str, pdf) -> Dict[str, Any]:
+    def _parse_tax_preparer_format(self, summary_text: str, pdf: PdfText) -> Dict[str, Any]:
         """Parse the tax preparer summary format."""
         data = {}
         
-        for page in pdf.pages[:2]:
-            text = page.extract_text() or ''
+        for text in pdf.page_texts(stop=2):
             year_match = re.search(r'(\d{4})\s+TAX RETURN', text)
             if year_match:
                 data['year'] = int(year_match.group(1))
@@ -554,11 +547,11 @@ class TaxReturnParser(BaseParser):
         
         return data
     
-    def _parse_form_8879_format(self, pdf) -> Dict[str, Any]:
+    def _parse_form_8879_format(self, pdf: PdfText) -> Dict[str, Any]:
         """Parse the standard IRS Form 8879 format."""
         data = {}
         
-        federal_text = pdf.pages[0].extract_text() or ''
+        federal_text = pdf.text(0)
         
         year_match = re.search(r'December 31,?\s*(\d{4})', federal_text)
         if year_match:
@@ -577,8 +570,8 @@ class TaxReturnParser(BaseParser):
             elif 'Amount you owe' in line:
                 data['federal_owed'] = self._parse_form_value(line, 5)
         
-        if len(pdf.pages) > 1:
-            ca_text = pdf.pages[1].extract_text() or ''
+        if pdf.page_count > 1:
+            ca_text = pdf.text(1)
             if 'California' in ca_text:
                 for line in ca_text.split('\n'):
                     if 'Refund' in line and 'Amount you owe' not in line:
@@ -608,10 +601,9 @@ class TaxReturnParser(BaseParser):
         
         return 0
     
-    def _extract_ca_540_tax(self, pdf) -> Optional[int]:
+    def _extract_ca_540_tax(self, pdf: PdfText) -> Optional[int]:
         """Extract total California tax from Form 540."""
-        for page in pdf.pages:
-            text = page.extract_text() or ''
+        for text in pdf.page_texts():
             
             if ('540' in text and 'California' in text) or 'Form 540' in text:
                 lines = text.split('\n')
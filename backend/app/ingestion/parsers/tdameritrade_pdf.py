@@ -18,6 +18,7 @@ from typing import Optional, Tuple, List, Dict
 from decimal import Decimal
 
 from app.ingestion.parsers.base import BaseParser, ParseResult, ParsedRecord, RecordType
+from app.ingestion.parsers.pdf_text import PdfSection, PdfText
 
 
 class TDAmeritradePDFParser(BaseParser):
@@ -73,10 +74,22 @@ class TDAmeritradePDFParser(BaseParser):
         
         return False
     
+    # The only pages parse() reads; cover letters and disclosures are skipped.
+    # Headings open a section anywhere on the page, as the full-text find() did;
+    # only a heading line closes one, so a passing mention can't cut it short.
+    SECTIONS = [
+        PdfSection("summary", max_pages=3),
+        PdfSection("positions", start=r"Account Positions", end=r"^Account Activity", from_page=2),
+        PdfSection(
+            "activity",
+            start=r"Account Activity",
+            end=r"^\s*(Important Information|Account Disclosures|Disclosures)\s*$",
+            from_page=2,
+        ),
+    ]
+    
     def parse(self, file_path: Path) -> ParseResult:
         """Parse TD Ameritrade PDF statement and extract holdings + transactions."""
-        import pdfplumber
-        
         records = []
         warnings = []
         errors = []
@@ -86,17 +99,21 @@ class TDAmeritradePDFParser(BaseParser):
         }
         
         try:
-            with pdfplumber.open(file_path) as pdf:
-                full_text = ""
-                for page in pdf.pages:
-                    full_text += (page.extract_text() or "") + "\n"
+            with PdfText.open(file_path) as pdf:
+                sections = pdf.sections(self.SECTIONS)
+                metadata["pages_read"] = sections.pages_read
+                
+                summary_text = sections.text("summary")
+                positions_text = sections.text("positions")
+                activity_text = sections.text("activity")
+                statement_text = "\n".join([summary_text, positions_text, activity_text])
                 
                 # Extract account info
-                account_number, owner = self._extract_account_info(full_text)
-                statement_date = self._extract_statement_date(full_text, file_path.name)
+                account_number, owner = self._extract_account_info(statement_text)
+                statement_date = self._extract_statement_date(statement_text, file_path.name)
                 
                 # Determine account type from filename or content
-                account_type = self._determine_account_type(file_path.name, full_text)
+                account_type = self._determine_account_type(file_path.name, statement_text)
                 
                 # Create account_id
                 if owner and owner != "Unknown":
@@ -110,12 +127,12 @@ class TDAmeritradePDFParser(BaseParser):
                 metadata["account_id"] = account_id
                 
                 # Extract portfolio value
-                portfolio_value = self._extract_portfolio_value(full_text)
+                portfolio_value = self._extract_portfolio_value(statement_text)
                 
                 # Extract holdings ONLY to calculate portfolio value if not found directly
                 # We do NOT create HOLDING records from PDFs - they're historical and would
                 # overwrite current positions with old data
-                holdings = self._extract_holdings(full_text)
+                holdings = self._extract_holdings(summary_text + "\n" + positions_text)
                 
                 # Calculate portfolio value from holdings if not found
                 if not portfolio_value and holdings:
@@ -123,7 +140,7 @@ class TDAmeritradePDFParser(BaseParser):
                 
                 # Extract transactions from Account Activity section
                 # Transactions are historical records that don't overwrite current state
-                transactions = self._extract_transactions(full_text)
+                transactions = self._extract_transactions(activity_text)
                 
                 # Create transaction records (historical, additive - these are OK from PDFs)
                 for txn in transactions:
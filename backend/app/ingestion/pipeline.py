@@ -0,0 +1,467 @@
+"""
+Inbox Ingestion Pipeline
+
+/scan and /process-all used to try every parser's can_parse() on every file.
+The PDF parsers each reopen the file with pdfplumber to read the first page,
+so an unrecognized PDF was opened once per parser, hashed separately, and
+then parsed serially on the request thread.
+
+The pipeline instead:
+
+1. Reads each file once: SHA-256, plus a FileFingerprint (first-page text,
+   CSV header row, first 2000 characters, Excel sheet names).
+2. Routes it with a single dispatch step - the first parser whose
+   matches(fingerprint) accepts it. Files whose content was already
+   ingested successfully are moved to processed without parsing.
+3. Runs parser.parse() in a process pool, keeping at most `max_pending`
+   jobs in flight so a large inbox does not queue every result in memory.
+4. Saves each finished file in its own transaction on the calling thread:
+   ingestion log, records, commit, verify, then move to processed. A failure
+   rolls back only that file.
+5. When the run completes, invalidates the registered services built from
+   the tables its files wrote (see app.core.service_registry) and refreshes
+   the dashboard net worth (see app.modules.dashboard.net_worth).
+
+Usage:
+    pipeline = IngestionPipeline(db)
+    outcomes = pipeline.run([("investments/robinhood", inbox / "investments" / "robinhood")])
+"""
+
+import csv
+import hashlib
+import io
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.service_registry import registry
+from app.ingestion.parsers.base import BaseParser, FileFingerprint, ParseResult, RecordType
+from app.ingestion.services import save_records, create_ingestion_log, complete_ingestion_log
+from app.shared.models.ingestion import IngestionLog
+
+logger = logging.getLogger(__name__)
+
+
+# Characters of a text file kept for pattern checks (matches FidelityCSVParser)
+HEAD_TEXT_CHARS = 2000
+_HEAD_BYTES = 16 * 1024
+_EXCEL_SUFFIXES = {'.xlsx', '.xlsm'}
+
+# Tables save_records() writes for each record type
+RECORD_TABLES = {
+    RecordType.TRANSACTION: ("investment_transactions", "income_monthly_rollup"),
+    RecordType.DIVIDEND: ("investment_transactions", "income_monthly_rollup"),
+    RecordType.HOLDING: ("investment_holdings", "investment_accounts"),
+    RecordType.CASH_SNAPSHOT: ("cash_transactions", "cash_accounts"),
+    RecordType.TAX_RECORD: ("income_tax_returns",),
+    RecordType.ACCOUNT_SUMMARY: ("portfolio_snapshots",),
+}
+
+
+def fingerprint_file(file_path: Path) -> FileFingerprint:
+    """Hash `file_path` and extract its dispatch fingerprint from one read."""
+    data = file_path.read_bytes()
+    fingerprint = FileFingerprint(
+        path=file_path,
+        suffix=file_path.suffix.lower(),
+        sha256=hashlib.sha256(data).hexdigest(),
+        size=len(data),
+    )
+
+    if fingerprint.suffix == '.pdf':
+        try:
+            import pdfplumber
+
+            with pdfplumber.open(io.BytesIO(data)) as pdf:
+                fingerprint.page_count = len(pdf.pages)
+                if pdf.pages:
+                    fingerprint.first_page_text = (pdf.pages[0].extract_text() or "").lower()
+        except Exception as e:
+            logger.warning(f"[INGESTION] Could not read first page of {file_path.name}: {e}")
+
+    elif fingerprint.suffix in _EXCEL_SUFFIXES:
+        try:
+            from openpyxl import load_workbook
+
+            workbook = load_workbook(io.BytesIO(data), read_only=True)
+            fingerprint.sheet_names = list(workbook.sheetnames)
+            workbook.close()
+        except Exception as e:
+            logger.warning(f"[INGESTION] Could not read sheet names of {file_path.name}: {e}")
+
+    else:
+        text = data[:_HEAD_BYTES].decode('utf-8-sig', errors='replace')
+        fingerprint.head_text = text[:HEAD_TEXT_CHARS]
+        if fingerprint.suffix == '.csv':
+            first_line = text.splitlines()[0] if text else ""
+            try:
+                headers = next(csv.reader([first_line]), [])
+            except csv.Error:
+                headers = []
+            fingerprint.csv_headers = {h.strip() for h in headers}
+
+    return fingerprint
+
+
+def dispatch(fingerprint: FileFingerprint, parsers: Sequence[BaseParser]) -> Optional[BaseParser]:
+    """First parser (in priority order) that accepts the fingerprint, or None."""
+    for parser in parsers:
+        try:
+            if parser.matches(fingerprint):
+                return parser
+        except Exception as e:
+            logger.warning(f"[INGESTION] {parser.source_name} check failed for {fingerprint.path.name}: {e}")
+    return None
+
+
+def _parse_file_worker(parser_cls: type, file_path: str) -> ParseResult:
+    """Process-pool entry point: parse one file with a fresh parser instance."""
+    return parser_cls().parse(Path(file_path))
+
+
+@dataclass
+class FileOutcome:
+    """What happened to one inbox file."""
+    file_path: Path
+    folder_name: str
+    module: str
+    parser: Optional[str] = None
+    # success, skipped_duplicate, error, exception, unmatched
+    status: str = "unmatched"
+    ingestion_id: Optional[int] = None
+    original_ingestion_id: Optional[int] = None
+    records_created: int = 0
+    records_updated: int = 0
+    records_skipped: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def file_name(self) -> str:
+        return self.file_path.name
+
+
+@dataclass
+class _ParseJob:
+    fingerprint: FileFingerprint
+    folder_name: str
+    folder_path: Path
+    module: str
+    parser: BaseParser
+
+
+class IngestionPipeline:
+    """
+    Fingerprint-dispatched, parallel ingestion of inbox folders.
+
+    Parsing runs in worker processes; all database work and file moves
+    happen on the calling thread, one transaction per file.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        parsers: Optional[Sequence[BaseParser]] = None,
+        workers: Optional[int] = None,
+        max_pending: Optional[int] = None,
+        verify: bool = True,
+    ):
+        if parsers is None:
+            from app.ingestion.router import get_all_parsers
+            parsers = get_all_parsers()
+        self.db = db
+        self.parsers = list(parsers)
+        self.workers = workers if workers is not None else min(4, os.cpu_count() or 1)
+        self.max_pending = max_pending or 2 * max(self.workers, 1)
+        self.verify = verify
+        # Tables written by files committed in the current run
+        self.touched_tables: Set[str] = set()
+
+    def run(self, folders: Sequence[Tuple[str, Path]]) -> List[FileOutcome]:
+        """
+        Ingest every visible file in `folders` ((name, path) pairs).
+
+        Returns one FileOutcome per file, in folder/file order.
+        """
+        from app.ingestion.router import _get_module_from_folder
+
+        outcomes: List[FileOutcome] = []
+        jobs: List[Tuple[_ParseJob, FileOutcome]] = []
+
+        for folder_name, folder_path in folders:
+            if not folder_path.exists():
+                continue
+            module = _get_module_from_folder(folder_path)
+            files = sorted(f for f in folder_path.iterdir() if f.is_file() and not f.name.startswith('.'))
+
+            for file_path in files:
+                outcome = FileOutcome(file_path=file_path, folder_name=folder_name, module=module)
+                outcomes.append(outcome)
+                try:
+                    fingerprint = fingerprint_file(file_path)
+                except Exception as e:
+                    outcome.status = "exception"
+                    outcome.errors = [str(e)]
+                    logger.error(f"[INGESTION] Could not read {file_path.name}: {e}")
+                    continue
+
+                parser = dispatch(fingerprint, self.parsers)
+                if parser is None:
+                    continue
+                outcome.parser = parser.source_name
+                jobs.append((_ParseJob(fingerprint, folder_name, folder_path, module, parser), outcome))
+
+        # Content already ingested: move aside without parsing
+        done = self._successful_logs([job.fingerprint.sha256 for job, _ in jobs])
+        to_parse = []
+        for job, outcome in jobs:
+            existing = done.get(job.fingerprint.sha256)
+            if existing is not None:
+                self._skip_duplicate(job, outcome, existing)
+            else:
+                to_parse.append((job, outcome))
+
+        self.touched_tables = set()
+        try:
+            self._parse_and_save(to_parse)
+        finally:
+            if self.touched_tables:
+                registry.invalidate_sources(self.touched_tables, reload=True)
+                self._refresh_net_worth()
+        return outcomes
+
+    def _refresh_net_worth(self) -> None:
+        """Re-materialize the dashboard net worth when this run wrote one of its tables."""
+        from app.modules.dashboard.net_worth import NET_WORTH_TABLES, refresh_net_worth
+
+        if not self.touched_tables & NET_WORTH_TABLES:
+            return
+        try:
+            refresh_net_worth(self.db)
+        except Exception as e:
+            logger.error(f"[INGESTION] Net worth refresh failed: {e}")
+
+    # ------------------------------------------------------------------
+    # Parsing
+    # ------------------------------------------------------------------
+
+    def _parse_and_save(self, jobs: List[Tuple[_ParseJob, FileOutcome]]) -> None:
+        """Parse `jobs` with a bounded number in flight, saving each as it finishes."""
+        if not jobs:
+            return
+
+        if self.workers > 1 and len(jobs) > 1:
+            try:
+                pool = ProcessPoolExecutor(max_workers=min(self.workers, len(jobs)))
+            except Exception as e:
+                logger.warning(f"[INGESTION] Process pool unavailable ({e}), parsing sequentially")
+                pool = None
+            if pool is not None:
+                with pool:
+                    self._run_in_pool(pool, jobs)
+                return
+
+        for job, outcome in jobs:
+            try:
+                result = job.parser.parse(job.fingerprint.path)
+            except Exception as e:
+                self._save(job, outcome, None, e)
+            else:
+                self._save(job, outcome, result, None)
+
+    def _run_in_pool(self, pool: ProcessPoolExecutor, jobs: List[Tuple[_ParseJob, FileOutcome]]) -> None:
+        queue = iter(jobs)
+        in_flight: Dict[Any, Tuple[_ParseJob, FileOutcome]] = {}
+
+        def submit_next() -> bool:
+            item = next(queue, None)
+            if item is None:
+                return False
+            job, _outcome = item
+            future = pool.submit(_parse_file_worker, type(job.parser), str(job.fingerprint.path))
+            in_flight[future] = item
+            return True
+
+        while len(in_flight) < self.max_pending and submit_next():
+            pass
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                job, outcome = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self._save(job, outcome, None, e)
+                else:
+                    self._save(job, outcome, result, None)
+                submit_next()
+
+    # ------------------------------------------------------------------
+    # Per-file transactions
+    # ------------------------------------------------------------------
+
+    def _save(
+        self,
+        job: _ParseJob,
+        outcome: FileOutcome,
+        result: Optional[ParseResult],
+        error: Optional[Exception]
+    ) -> None:
+        """Record one file's parse result in its own transaction."""
+        file_path = job.fingerprint.path
+        db = self.db
+        ingestion_log = None
+        committed = False
+
+        try:
+            # An identical file earlier in this run may have just been ingested
+            existing = self._successful_logs([job.fingerprint.sha256]).get(job.fingerprint.sha256)
+            if existing is not None:
+                self._skip_duplicate(job, outcome, existing)
+                return
+
+            ingestion_log = create_ingestion_log(
+                db=db,
+                file_name=file_path.name,
+                file_path=str(file_path),
+                source=job.parser.source_name,
+                module=job.module,
+            )
+            ingestion_log.file_hash = job.fingerprint.sha256
+            outcome.ingestion_id = ingestion_log.id
+
+            if error is not None:
+                raise error
+
+            ingestion_log.records_in_file = len(result.records) if result.records else 0
+
+            if result.success:
+                save_result = {"created": 0, "updated": 0, "skipped": 0}
+                if result.records:
+                    save_result = save_records(db, result.records, ingestion_log.id)
+                complete_ingestion_log(
+                    db=db,
+                    log=ingestion_log,
+                    status="success",
+                    records_created=save_result.get("created", 0),
+                    records_updated=save_result.get("updated", 0),
+                    records_skipped=save_result.get("skipped", 0),
+                )
+                self._commit(ingestion_log.id)
+                committed = True
+                if save_result.get("created", 0) or save_result.get("updated", 0):
+                    for record_type in {record.record_type for record in result.records}:
+                        self.touched_tables.update(RECORD_TABLES.get(record_type, ()))
+                created, updated = self._verified_counts(ingestion_log.id, save_result)
+
+                # Side-effects only after the commit is verified
+                self._move_to_processed(file_path, job.folder_path)
+                outcome.status = "success"
+                outcome.records_created = created
+                outcome.records_updated = updated
+                outcome.records_skipped = save_result.get("skipped", 0)
+                logger.info(
+                    f"[INGESTION] Processed {file_path.name} (ingestion_id={ingestion_log.id}): "
+                    f"created={created}, updated={updated}, skipped={outcome.records_skipped}"
+                )
+            else:
+                errors = result.errors or ["Parser reported failure"]
+                error_msg = "; ".join(errors[:5])
+                complete_ingestion_log(db=db, log=ingestion_log, status="failed", error_message=error_msg)
+                self._commit(ingestion_log.id)
+                outcome.status = "error"
+                outcome.errors = list(errors)
+                logger.warning(f"[INGESTION] Parse errors for {file_path.name}: {error_msg}")
+
+        except Exception as e:
+            db.rollback()
+            error_msg = str(e)
+            outcome.status = "exception"
+            outcome.errors = [error_msg]
+            logger.error(f"[INGESTION] Exception processing {file_path.name}: {error_msg}", exc_info=True)
+
+            # The file's own work was rolled back; record the failure on its
+            # log (already committed if verification or the move failed)
+            try:
+                if not committed:
+                    ingestion_log = create_ingestion_log(
+                        db=db,
+                        file_name=file_path.name,
+                        file_path=str(file_path),
+                        source=job.parser.source_name,
+                        module=job.module,
+                    )
+                    ingestion_log.file_hash = job.fingerprint.sha256
+                complete_ingestion_log(db=db, log=ingestion_log, status="failed", error_message=error_msg)
+                db.commit()
+                outcome.ingestion_id = ingestion_log.id
+            except Exception:
+                db.rollback()
+                outcome.ingestion_id = None
+
+    def _commit(self, log_id: int) -> None:
+        try:
+            self.db.commit()
+        except Exception as commit_error:
+            self.db.rollback()
+            raise RuntimeError(f"Database commit failed for ingestion {log_id}: {commit_error}")
+
+    def _verified_counts(self, log_id: int, save_result: Dict[str, int]) -> Tuple[int, int]:
+        """Re-read the committed log from a separate session; raise if it is missing."""
+        if not self.verify:
+            return save_result.get("created", 0), save_result.get("updated", 0)
+
+        from app.core.database import SessionLocal
+
+        verification_session = SessionLocal()
+        try:
+            verified_log = verification_session.query(IngestionLog).filter(
+                IngestionLog.id == log_id
+            ).first()
+            if not verified_log:
+                raise RuntimeError(
+                    f"VERIFICATION FAILED: Ingestion log {log_id} not found after commit. "
+                    f"File NOT moved to processed."
+                )
+            return verified_log.records_created or 0, verified_log.records_updated or 0
+        finally:
+            verification_session.close()
+
+    def _successful_logs(self, file_hashes: List[str]) -> Dict[str, IngestionLog]:
+        """file_hash -> an earlier successful ingestion of that content."""
+        if not file_hashes:
+            return {}
+        logs = self.db.query(IngestionLog).filter(
+            IngestionLog.file_hash.in_(set(file_hashes)),
+            IngestionLog.status == "success"
+        ).all()
+        return {log.file_hash: log for log in logs}
+
+    def _skip_duplicate(self, job: _ParseJob, outcome: FileOutcome, existing: IngestionLog) -> None:
+        file_path = job.fingerprint.path
+        logger.info(
+            f"Skipping {file_path.name}: identical content already processed "
+            f"as '{existing.file_name}' (ingestion_id={existing.id})"
+        )
+        self._move_to_processed(file_path, job.folder_path)
+        outcome.status = "skipped_duplicate"
+        outcome.original_ingestion_id = existing.id
+
+    def _move_to_processed(self, file_path: Path, folder_path: Path) -> Path:
+        """Move an inbox file to the mirrored processed folder without overwriting."""
+        processed_dir = settings.PROCESSED_DIR / folder_path.relative_to(settings.INBOX_DIR)
+        processed_dir.mkdir(parents=True, exist_ok=True)
+        dest_path = processed_dir / file_path.name
+        if dest_path.exists():
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            dest_path = processed_dir / f"{file_path.stem}_{timestamp}{file_path.suffix}"
+        shutil.move(str(file_path), str(dest_path))
+        return dest_path
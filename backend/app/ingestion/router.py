@@ -7,26 +7,14 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import Optional
 from pathlib import Path
-import shutil
 import logging
 
 from app.core.database import get_db
 from app.core.config import settings
-from app.ingestion.services import save_records, create_ingestion_log, complete_ingestion_log
-import hashlib
 
 logger = logging.getLogger(__name__)
 
 
-def _compute_file_hash(file_path: Path) -> str:
-    """Compute SHA256 hash of file contents for tracking."""
-    sha256_hash = hashlib.sha256()
-    with open(file_path, "rb") as f:
-        for byte_block in iter(lambda: f.read(4096), b""):
-            sha256_hash.update(byte_block)
-    return sha256_hash.hexdigest()
-
-
 def _get_module_from_folder(folder_path: Path) -> str:
     """Determine module name from folder path."""
     folder_str = str(folder_path).lower()
@@ -67,7 +55,7 @@ def trigger_inbox_scan(db: Session = Depends(get_db)):
     Processes any new files found.
     Creates ingestion logs for tracking and debugging.
     """
-    parsers = get_all_parsers()
+    from app.ingestion.pipeline import IngestionPipeline
     
     # Define inbox folders to scan
     inbox_folders = [
@@ -78,188 +66,58 @@ def trigger_inbox_scan(db: Session = Depends(get_db)):
         settings.INBOX_DIR / "cash" / "chase",
         settings.INBOX_DIR / "cash" / "bank_of_america",
     ]
+    folders_scanned = [str(folder) for folder in inbox_folders if folder.exists()]
+    
+    # Fingerprint dispatch, parallel parsing, one transaction per file
+    outcomes = IngestionPipeline(db).run([(str(folder), folder) for folder in inbox_folders])
     
-    folders_scanned = []
-    files_found = 0
     files_processed = 0
     files_failed = 0
     results = []
     
-    for folder in inbox_folders:
-        if not folder.exists():
-            continue
-            
-        folders_scanned.append(str(folder))
-        module = _get_module_from_folder(folder)
-        
-        # Get all files (not hidden, not directories)
-        files = [f for f in folder.iterdir() if f.is_file() and not f.name.startswith('.')]
-        files_found += len(files)
-        
-        for file_path in files:
-            # Try each parser
-            parsed = False
-            ingestion_log = None
-            
-            for parser in parsers:
-                try:
-                    if parser.can_parse(file_path):
-                        # ============================================================
-                        # IDEMPOTENCY CHECK - Prevent duplicate processing
-                        # ============================================================
-                        file_hash = _compute_file_hash(file_path)
-                        
-                        from app.shared.models.ingestion import IngestionLog as IngestionLogModel
-                        existing_successful = db.query(IngestionLogModel).filter(
-                            IngestionLogModel.file_hash == file_hash,
-                            IngestionLogModel.status == "success"
-                        ).first()
-                        
-                        if existing_successful:
-                            logger.info(
-                                f"Skipping {file_path.name}: identical content already processed "
-                                f"as '{existing_successful.file_name}' (ingestion_id={existing_successful.id})"
-                            )
-                            processed_dir = settings.PROCESSED_DIR / folder.relative_to(settings.INBOX_DIR)
-                            processed_dir.mkdir(parents=True, exist_ok=True)
-                            dest_path = processed_dir / file_path.name
-                            if dest_path.exists():
-                                from datetime import datetime
-                                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                                dest_path = processed_dir / f"{file_path.stem}_{timestamp}{file_path.suffix}"
-                            shutil.move(str(file_path), str(dest_path))
-                            results.append({
-                                "file": file_path.name,
-                                "parser": parser.source_name,
-                                "status": "skipped_duplicate",
-                                "original_ingestion_id": existing_successful.id,
-                            })
-                            parsed = True
-                            break
-                        
-                        ingestion_log = create_ingestion_log(
-                            db=db,
-                            file_name=file_path.name,
-                            file_path=str(file_path),
-                            source=parser.source_name,
-                            module=module,
-                        )
-                        ingestion_log.file_hash = file_hash
-                        db.flush()
-                        
-                        result = parser.parse(file_path)
-                        ingestion_log.records_in_file = len(result.records) if result.records else 0
-                        
-                        if result.success and result.records:
-                            # ============================================================
-                            # FINANCIAL SYSTEM TRANSACTION HANDLING
-                            # ============================================================
-                            log_id = ingestion_log.id
-                            
-                            save_result = save_records(db, result.records, log_id)
-                            expected_created = save_result.get("created", 0)
-                            expected_updated = save_result.get("updated", 0)
-                            expected_skipped = save_result.get("skipped", 0)
-                            
-                            complete_ingestion_log(
-                                db=db,
-                                log=ingestion_log,
-                                status="success",
-                                records_created=expected_created,
-                                records_updated=expected_updated,
-                                records_skipped=expected_skipped,
-                            )
-                            
-                            try:
-                                db.commit()
-                            except Exception as commit_error:
-                                db.rollback()
-                                raise RuntimeError(f"Database commit failed: {commit_error}")
-                            
-                            # VERIFICATION - Confirm data persisted
-                            from app.core.database import SessionLocal
-                            verification_session = SessionLocal()
-                            try:
-                                verified_log = verification_session.query(IngestionLogModel).filter(
-                                    IngestionLogModel.id == log_id
-                                ).first()
-                                
-                                if not verified_log:
-                                    raise RuntimeError(
-                                        f"VERIFICATION FAILED: Ingestion log {log_id} not found after commit."
-                                    )
-                                
-                                verified_created = verified_log.records_created or 0
-                                verified_updated = verified_log.records_updated or 0
-                            finally:
-                                verification_session.close()
-                            
-                            # Move file ONLY after verification
-                            processed_dir = settings.PROCESSED_DIR / folder.relative_to(settings.INBOX_DIR)
-                            processed_dir.mkdir(parents=True, exist_ok=True)
-                            shutil.move(str(file_path), str(processed_dir / file_path.name))
-                            
-                            files_processed += 1
-                            results.append({
-                                "file": file_path.name,
-                                "parser": parser.source_name,
-                                "status": "success",
-                                "ingestion_id": log_id,
-                                "records": {
-                                    "created": verified_created,
-                                    "updated": verified_updated,
-                                    "skipped": expected_skipped
-                                }
-                            })
-                            logger.info(f"Processed {file_path.name}: created={verified_created}, skipped={expected_skipped}")
-                            parsed = True
-                            break
-                        elif result.errors:
-                            # Log parsing errors
-                            error_msg = "; ".join(result.errors[:5])  # First 5 errors
-                            complete_ingestion_log(
-                                db=db,
-                                log=ingestion_log,
-                                status="failed",
-                                error_message=error_msg,
-                            )
-                            db.commit()
-                            
-                            results.append({
-                                "file": file_path.name,
-                                "parser": parser.source_name,
-                                "status": "error",
-                                "ingestion_id": ingestion_log.id,
-                                "errors": result.errors
-                            })
-                            logger.warning(f"Parse errors for {file_path.name}: {error_msg}")
-                except Exception as e:
-                    # Log exception
-                    error_msg = str(e)
-                    if ingestion_log:
-                        complete_ingestion_log(
-                            db=db,
-                            log=ingestion_log,
-                            status="failed",
-                            error_message=error_msg,
-                        )
-                        db.commit()
-                    
-                    results.append({
-                        "file": file_path.name,
-                        "parser": parser.source_name if parser else "unknown",
-                        "status": "exception",
-                        "error": error_msg
-                    })
-                    logger.error(f"Exception processing {file_path.name}: {error_msg}")
-            
-            if not parsed:
-                files_failed += 1
+    for outcome in outcomes:
+        if outcome.status == "skipped_duplicate":
+            results.append({
+                "file": outcome.file_name,
+                "parser": outcome.parser,
+                "status": "skipped_duplicate",
+                "original_ingestion_id": outcome.original_ingestion_id,
+            })
+        elif outcome.status == "success":
+            files_processed += 1
+            results.append({
+                "file": outcome.file_name,
+                "parser": outcome.parser,
+                "status": "success",
+                "ingestion_id": outcome.ingestion_id,
+                "records": {
+                    "created": outcome.records_created,
+                    "updated": outcome.records_updated,
+                    "skipped": outcome.records_skipped
+                }
+            })
+        else:
+            files_failed += 1
+            if outcome.status == "error":
+                results.append({
+                    "file": outcome.file_name,
+                    "parser": outcome.parser,
+                    "status": "error",
+                    "ingestion_id": outcome.ingestion_id,
+                    "errors": outcome.errors
+                })
+            elif outcome.status == "exception":
+                results.append({
+                    "file": outcome.file_name,
+                    "parser": outcome.parser or "unknown",
+                    "status": "exception",
+                    "error": "; ".join(outcome.errors)
+                })
     
     return {
         "status": "scan_complete",
         "folders_scanned": folders_scanned,
-        "files_found": files_found,
+        "files_found": len(outcomes),
         "files_processed": files_processed,
         "files_failed": files_failed,
         "results": results
@@ -397,7 +255,7 @@ def process_all_inbox_files(db: Session = Depends(get_db)):
     Returns result in format expected by frontend.
     Creates ingestion logs for each file for tracking and debugging.
     """
-    parsers = get_all_parsers()
+    from app.ingestion.pipeline import IngestionPipeline
     
     # Define inbox folders to scan
     inbox_folders = [
@@ -411,245 +269,41 @@ def process_all_inbox_files(db: Session = Depends(get_db)):
         ("tax/returns", settings.INBOX_DIR / "tax" / "returns"),
     ]
     
+    # Fingerprint dispatch, parallel parsing, one transaction per file
+    outcomes = IngestionPipeline(db).run(inbox_folders)
+    
     files_processed = 0
     records_imported = 0
     errors = []
-    details = []
     ingestion_ids = []
-    
-    for folder_name, folder_path in inbox_folders:
-        if not folder_path.exists():
-            continue
-        
-        module = _get_module_from_folder(folder_path)
-        
-        # Get all files (not hidden, not directories)
-        files = [f for f in folder_path.iterdir() if f.is_file() and not f.name.startswith('.')]
-        
-        if not files:
-            continue
-        
-        folder_files = []
-        folder_records = 0
-        
-        for file_path in files:
-            # Try each parser
-            parsed = False
-            ingestion_log = None
-            
-            for parser in parsers:
-                try:
-                    if parser.can_parse(file_path):
-                        # ============================================================
-                        # IDEMPOTENCY CHECK - Prevent duplicate processing
-                        # ============================================================
-                        # Compute file hash FIRST to check if we've already processed
-                        # this exact file content (even under a different name)
-                        file_hash = _compute_file_hash(file_path)
-                        
-                        # Check if this file content was already successfully processed
-                        from app.shared.models.ingestion import IngestionLog as IngestionLogModel
-                        existing_successful = db.query(IngestionLogModel).filter(
-                            IngestionLogModel.file_hash == file_hash,
-                            IngestionLogModel.status == "success"
-                        ).first()
-                        
-                        if existing_successful:
-                            # File content already processed - move to processed and skip
-                            logger.info(
-                                f"Skipping {file_path.name}: identical content already processed "
-                                f"as '{existing_successful.file_name}' (ingestion_id={existing_successful.id})"
-                            )
-                            processed_dir = settings.PROCESSED_DIR / folder_path.relative_to(settings.INBOX_DIR)
-                            processed_dir.mkdir(parents=True, exist_ok=True)
-                            
-                            # Handle duplicate filename in processed folder
-                            dest_path = processed_dir / file_path.name
-                            if dest_path.exists():
-                                # Add timestamp to avoid overwriting
-                                from datetime import datetime
-                                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                                dest_path = processed_dir / f"{file_path.stem}_{timestamp}{file_path.suffix}"
-                            
-                            shutil.move(str(file_path), str(dest_path))
-                            parsed = True
-                            break
-                        
-                        # Create ingestion log for new file content
-                        ingestion_log = create_ingestion_log(
-                            db=db,
-                            file_name=file_path.name,
-                            file_path=str(file_path),
-                            source=parser.source_name,
-                            module=module,
-                        )
-                        ingestion_log.file_hash = file_hash
-                        db.flush()
-                        
-                        result = parser.parse(file_path)
-                        ingestion_log.records_in_file = len(result.records) if result.records else 0
-                        
-                        if result.success and result.records:
-                            # ============================================================
-                            # FINANCIAL SYSTEM TRANSACTION HANDLING
-                            # ============================================================
-                            # This follows banking-grade transaction principles:
-                            # 1. Execute within explicit transaction
-                            # 2. Commit and verify data was persisted
-                            # 3. Only perform side-effects after verification
-                            # 4. Fail-safe: if uncertain, report failure
-                            # ============================================================
-                            
-                            # Store the log ID before commit for verification
-                            log_id = ingestion_log.id
-                            
-                            # Phase 1: Save records to database with ingestion_id for provenance
-                            save_result = save_records(db, result.records, log_id)
-                            expected_created = save_result.get("created", 0)
-                            expected_updated = save_result.get("updated", 0)
-                            expected_skipped = save_result.get("skipped", 0)
-                            
-                            # Phase 2: Update ingestion log with results
-                            complete_ingestion_log(
-                                db=db,
-                                log=ingestion_log,
-                                status="success",
-                                records_created=expected_created,
-                                records_updated=expected_updated,
-                                records_skipped=expected_skipped,
-                            )
-                            
-                            # Phase 3: Commit using EXPLICIT new connection to bypass potential session issues
-                            # This is a workaround for possible FastAPI session management issues
-                            from app.core.database import SessionLocal, engine
-                            from app.shared.models.ingestion import IngestionLog as IngestionLogModel
-                            from app.modules.investments.models import InvestmentTransaction
-                            from sqlalchemy import text
-                            
-                            logger.info(f"Ingestion {log_id}: About to commit. Pending changes: new={len(db.new)}, dirty={len(db.dirty)}")
-                            
-                            try:
-                                # Commit the current session
-                                db.commit()
-                                logger.info(f"Ingestion {log_id}: Commit returned successfully")
-                            except Exception as commit_error:
-                                logger.error(f"Ingestion {log_id}: Commit FAILED with exception: {commit_error}")
-                                import traceback
-                                logger.error(traceback.format_exc())
-                                db.rollback()
-                                raise RuntimeError(f"Database commit failed: {commit_error}")
-                            
-                            # Phase 4: VERIFICATION using raw PostgreSQL connection
-                            logger.info(f"Ingestion {log_id}: Verifying with raw PostgreSQL connection...")
-                            
-                            import psycopg2
-                            pg_conn = psycopg2.connect(
-                                host='localhost',
-                                port=5432,
-                                database='agrawal_estate',
-                                user='agrawal_user',
-                                password='agrawal_secure_2024'
-                            )
-                            pg_cur = pg_conn.cursor()
-                            
-                            try:
-                                pg_cur.execute(f"SELECT id, file_name, status, records_created FROM ingestion_log WHERE id = {log_id}")
-                                raw_result = pg_cur.fetchone()
-                                logger.info(f"Ingestion {log_id}: Raw PostgreSQL query result: {raw_result}")
-                                
-                                if not raw_result:
-                                    # Data not in PostgreSQL - this is a serious issue
-                                    # Let's also check what the max ID is
-                                    pg_cur.execute("SELECT MAX(id) FROM ingestion_log")
-                                    max_id = pg_cur.fetchone()[0]
-                                    pg_cur.execute("SELECT last_value FROM ingestion_log_id_seq")
-                                    seq_val = pg_cur.fetchone()[0]
-                                    logger.error(f"Ingestion {log_id}: NOT FOUND. Max ID: {max_id}, Sequence: {seq_val}")
-                                    
-                                    raise RuntimeError(
-                                        f"VERIFICATION FAILED: Ingestion log {log_id} not found after commit. "
-                                        f"Max ID in table: {max_id}, Sequence: {seq_val}. "
-                                        f"Database transaction may have been rolled back silently. "
-                                        f"File NOT moved to processed."
-                                    )
-                                
-                                verified_created = raw_result[3] or 0
-                                verified_updated = 0  # We don't track this separately in raw query
-                                logger.info(f"Ingestion {log_id}: VERIFIED! records_created={verified_created}")
-                                
-                            finally:
-                                pg_cur.close()
-                                pg_conn.close()
-                            
-                            # Phase 5: Side-effects ONLY after verification passes
-                            # Move file to processed folder
-                            processed_dir = settings.PROCESSED_DIR / folder_path.relative_to(settings.INBOX_DIR)
-                            processed_dir.mkdir(parents=True, exist_ok=True)
-                            shutil.move(str(file_path), str(processed_dir / file_path.name))
-                            
-                            # Use VERIFIED counts in the response
-                            files_processed += 1
-                            folder_files.append(file_path.name)
-                            folder_records += verified_created + verified_updated
-                            records_imported += verified_created + verified_updated
-                            ingestion_ids.append(log_id)
-                            
-                            logger.info(
-                                f"Processed {file_path.name} (ingestion_id={ingestion_log.id}): "
-                                f"created={save_result.get('created', 0)}, "
-                                f"updated={save_result.get('updated', 0)}, "
-                                f"skipped={save_result.get('skipped', 0)}"
-                            )
-                            parsed = True
-                            break
-                        elif result.errors:
-                            # Log parsing errors
-                            error_msg = "; ".join(result.errors[:5])
-                            complete_ingestion_log(
-                                db=db,
-                                log=ingestion_log,
-                                status="failed",
-                                error_message=error_msg,
-                            )
-                            db.commit()
-                            
-                            errors.extend([f"{file_path.name}: {e}" for e in result.errors])
-                            ingestion_ids.append(ingestion_log.id)
-                            logger.warning(f"Parse errors for {file_path.name}: {error_msg}")
-                except Exception as e:
-                    error_msg = str(e)
-                    if ingestion_log:
-                        complete_ingestion_log(
-                            db=db,
-                            log=ingestion_log,
-                            status="failed",
-                            error_message=error_msg,
-                        )
-                        try:
-                            db.commit()
-                        except Exception:
-                            db.rollback()
-                        ingestion_ids.append(ingestion_log.id)
-                    
-                    errors.append(f"{file_path.name}: {error_msg}")
-                    logger.error(f"Exception processing {file_path.name}: {error_msg}", exc_info=True)
+    folder_details = {}
+    
+    for outcome in outcomes:
+        if outcome.status == "success":
+            records = outcome.records_created + outcome.records_updated
+            files_processed += 1
+            records_imported += records
+            ingestion_ids.append(outcome.ingestion_id)
             
-            if not parsed and not any(file_path.name in e for e in errors):
-                errors.append(f"{file_path.name}: No compatible parser found")
-        
-        if folder_files:
-            details.append({
-                "folder": folder_name,
-                "files": folder_files,
-                "records": folder_records
-            })
+            folder = folder_details.setdefault(
+                outcome.folder_name,
+                {"folder": outcome.folder_name, "files": [], "records": 0}
+            )
+            folder["files"].append(outcome.file_name)
+            folder["records"] += records
+        elif outcome.status in ("error", "exception"):
+            errors.extend([f"{outcome.file_name}: {e}" for e in outcome.errors])
+            if outcome.ingestion_id:
+                ingestion_ids.append(outcome.ingestion_id)
+        elif outcome.status == "unmatched":
+            errors.append(f"{outcome.file_name}: No compatible parser found")
     
     return {
         "success": True,
         "files_processed": files_processed,
         "records_imported": records_imported,
         "errors": errors,
-        "details": details,
+        "details": list(folder_details.values()),
         "ingestion_ids": ingestion_ids
     }
 
@@ -1178,9 +832,15 @@ async def merge_accounts(
     """
     Merge one account into another.
     - Moves all holdings from source to target (aggregating quantities)
-    - Moves all transactions from source to target
+    - Moves all transactions from source to target, with their income rollup
+      months, change-feed events and dedup hashes; a transaction the target
+      already has is dropped as a duplicate
     - Deletes the source account
     """
+    from app.core.service_registry import registry
+    from app.ingestion.bulk_writer import move_transaction
+    from app.modules.income.income_rollup import record_income_transaction
+    from app.modules.investments.dedup import transaction_dedup_hash
     from app.modules.investments.models import InvestmentHolding, InvestmentTransaction, InvestmentAccount
     
     # Verify both accounts exist
@@ -1220,19 +880,46 @@ async def merge_accounts(
             src_holding.account_id = target_account_id
         holdings_merged += 1
     
-    # Move transactions
-    transactions_moved = db.query(InvestmentTransaction).filter(
+    # Move transactions (in the same transaction as their rollup months and events)
+    target_hashes = {
+        row.dedup_hash for row in db.query(InvestmentTransaction.dedup_hash).filter(
+            InvestmentTransaction.account_id == target_account_id
+        )
+    }
+    source_transactions = db.query(InvestmentTransaction).filter(
         InvestmentTransaction.account_id == source_account_id
-    ).update({InvestmentTransaction.account_id: target_account_id})
+    ).all()
+    
+    transactions_moved = 0
+    duplicates_removed = 0
+    for txn in source_transactions:
+        moved_hash = transaction_dedup_hash(
+            txn.source, target_account_id, txn.transaction_date, txn.symbol,
+            txn.transaction_type, txn.quantity, txn.amount,
+        )
+        if moved_hash in target_hashes:
+            record_income_transaction(db, txn, sign=-1)
+            db.delete(txn)
+            duplicates_removed += 1
+        else:
+            move_transaction(db, txn, target_account_id)
+            target_hashes.add(moved_hash)
+            transactions_moved += 1
     
     # Delete source account
     db.delete(source_account)
     db.commit()
     
+    registry.invalidate_sources(
+        ("investment_transactions", "income_monthly_rollup", "investment_holdings", "investment_accounts"),
+        reload=True,
+    )
+    
     return {
         "success": True,
         "message": f"Merged '{source_account_id}' into '{target_account_id}'",
         "holdings_merged": holdings_merged,
-        "transactions_moved": transactions_moved
+        "transactions_moved": transactions_moved,
+        "duplicates_removed": duplicates_removed,
     }
 
@@ -54,25 +54,52 @@ def save_records(db: Session, records: list, ingestion_id: Optional[int] = None)
     """
     Save parsed records to the database.
     Returns dict with created, updated, skipped counts.
+    
+    Transaction and dividend records are written together by the batch
+    writer (see bulk_writer.py); other record types are saved one by one.
     """
-    from app.modules.investments.models import InvestmentTransaction, InvestmentHolding, InvestmentAccount
-    from app.modules.cash.models import CashTransaction, CashAccount
+    from app.ingestion.bulk_writer import save_investment_transactions
     
     created = 0
     updated = 0
     skipped = 0
     has_sto_transactions = False
     
+    transaction_records = [
+        record for record in records
+        if record.record_type in (RecordType.TRANSACTION, RecordType.DIVIDEND)
+    ]
+    if transaction_records:
+        # Check if there are STO transactions (for auto-update trigger)
+        has_sto_transactions = any(
+            record.record_type == RecordType.TRANSACTION and record.data.get("transaction_type") == "STO"
+            for record in transaction_records
+        )
+        try:
+            bulk_result = save_investment_transactions(db, transaction_records, ingestion_id)
+            created += bulk_result["created"]
+            updated += bulk_result["updated"]
+            skipped += bulk_result["skipped"]
+        except Exception as e:
+            # Fall back to the per-record path, which skips bad rows individually
+            print(f"Bulk transaction save failed ({e}), saving record by record")
+            for record in transaction_records:
+                try:
+                    result = save_investment_transaction(db, record, ingestion_id)
+                except Exception as record_error:
+                    print(f"Error saving record: {record_error}")
+                    result = "skipped"
+                if result == "created":
+                    created += 1
+                elif result == "updated":
+                    updated += 1
+                else:
+                    skipped += 1
+    
     for record in records:
         try:
-            if record.record_type == RecordType.TRANSACTION:
-                result = save_investment_transaction(db, record, ingestion_id)
-                # Check if this is an STO transaction (for auto-update trigger)
-                if record.data.get("transaction_type") == "STO":
-                    has_sto_transactions = True
-            elif record.record_type == RecordType.DIVIDEND:
-                # Dividends are also transactions, save them the same way
-                result = save_investment_transaction(db, record, ingestion_id)
+            if record.record_type in (RecordType.TRANSACTION, RecordType.DIVIDEND):
+                continue  # Saved above
             elif record.record_type == RecordType.HOLDING:
                 result = save_investment_holding(db, record, ingestion_id)
             elif record.record_type == RecordType.CASH_SNAPSHOT:
@@ -114,102 +141,6 @@ def save_records(db: Session, records: list, ingestion_id: Optional[int] = None)
     }
 
 
-def update_holding_from_transaction(
-    db: Session, 
-    account_id: str, 
-    source: str,
-    symbol: str, 
-    transaction_type: str, 
-    quantity: Optional[float],
-    price_per_share: Optional[float],
-    transaction_date
-) -> None:
-    """
-    Update holdings based on a transaction.
-    
-    - BUY: Increase quantity
-    - SELL: Decrease quantity
-    - OASGN (Option Assignment): Can result in buying/selling shares
-    - Other types (dividends, transfers, options premiums): Don't affect share count
-    
-    This keeps holdings in sync with transactions throughout the month.
-    End-of-month statements will serve as authoritative snapshots.
-    """
-    from app.modules.investments.models import InvestmentHolding, InvestmentAccount
-    
-    # Only process transactions that affect share holdings
-    # Skip if no symbol (cash transactions, IRA contributions, etc.)
-    if not symbol or symbol in ("", "CASH", "UNKNOWN"):
-        return
-    
-    # Skip options contracts (they have symbols like "HOOD 12/5/2025 Put $120.00")
-    if any(x in symbol for x in [" PUT ", " CALL ", "PUT $", "CALL $", "/"]):
-        return
-    
-    # Determine quantity change based on transaction type
-    quantity_change = 0.0
-    if quantity is not None:
-        if transaction_type == "BUY":
-            quantity_change = float(quantity)
-        elif transaction_type == "SELL":
-            quantity_change = -float(quantity)
-        elif transaction_type == "OASGN":
-            # Option assignment - usually results in buying shares (put assignment)
-            # The quantity in the transaction should reflect shares, not contracts
-            quantity_change = float(quantity) * 100  # 1 contract = 100 shares
-        elif transaction_type == "SPLIT":
-            # Stock splits change quantity but are handled differently
-            # For now, we'll skip and let statement snapshots handle it
-            return
-    
-    if quantity_change == 0:
-        return
-    
-    # Get or create the holding record
-    existing_holding = db.query(InvestmentHolding).filter(
-        InvestmentHolding.account_id == account_id,
-        InvestmentHolding.symbol == symbol,
-    ).first()
-    
-    if existing_holding:
-        # Update existing holding
-        old_quantity = float(existing_holding.quantity or 0)
-        new_quantity = old_quantity + quantity_change
-        
-        # Don't allow negative quantities (shouldn't happen, but safety check)
-        if new_quantity < 0:
-            new_quantity = 0
-        
-        existing_holding.quantity = new_quantity
-        
-        # Update price if we have it
-        if price_per_share:
-            existing_holding.current_price = float(price_per_share)
-            existing_holding.market_value = new_quantity * float(price_per_share)
-        
-        existing_holding.last_updated = transaction_date
-    else:
-        # Create new holding (only for buys, not sells)
-        if quantity_change > 0:
-            # Look up account to get source
-            account = db.query(InvestmentAccount).filter(
-                InvestmentAccount.account_id == account_id,
-            ).first()
-            
-            holding = InvestmentHolding(
-                source=source,
-                account_id=account_id,
-                symbol=symbol,
-                quantity=quantity_change,
-                current_price=float(price_per_share) if price_per_share else None,
-                market_value=quantity_change * float(price_per_share) if price_per_share else None,
-                last_updated=transaction_date,
-            )
-            db.add(holding)
-    
-    db.flush()
-
-
 # Account ID mapping: Maps various account ID formats to canonical account IDs
 # This ensures consistency and prevents duplicate accounts
 ACCOUNT_ID_MAPPING = {
@@ -240,6 +171,11 @@ ACCOUNT_ID_MAPPING = {
 }
 
 
+# Placeholder accounts used when an export carries no account information;
+# a later import with a specific account takes their transactions over
+GENERIC_ACCOUNT_IDS = ["robinhood_default", "schwab_default", "fidelity_default", "default"]
+
+
 def _normalize_account_id(account_id: str) -> str:
     """Normalize account_id using the mapping to ensure consistency."""
     account_id_lower = account_id.lower()
@@ -372,24 +308,30 @@ def _parse_owner_and_type_from_account_id(account_id: str) -> tuple[str, str]:
     return owner or 'unknown', account_type
 
 
-def save_investment_transaction(db: Session, record: ParsedRecord, ingestion_id: Optional[int] = None) -> str:
-    """Save an investment transaction record and update holdings."""
-    from app.modules.investments.models import InvestmentTransaction, InvestmentAccount
-    import hashlib
-    import json
-    
-    data = record.data
-    source = data.get("source", "unknown")
-    account_id_str = data.get("account_id", "default")
+def _ensure_investment_account(
+    db: Session,
+    source: str,
+    account_id_str: str,
+    data: dict,
+    source_accounts: Optional[list] = None,
+):
+    """
+    Find or create the InvestmentAccount for a transaction's account_id.
     
-    # Normalize account_id using mapping to ensure consistency
-    account_id_str = _normalize_account_id(account_id_str)
+    Falls back to an existing account with the same owner and account type
+    (e.g. alisha_brokerage vs alishasbrokerage). Batch writers pass the
+    source's accounts as `source_accounts` to avoid re-querying per record;
+    a newly created account is appended to that list.
+    """
+    from app.modules.investments.models import InvestmentAccount
     
-    # Ensure account exists (for reference, though not a foreign key)
-    account = db.query(InvestmentAccount).filter(
-        InvestmentAccount.account_id == account_id_str,
-        InvestmentAccount.source == source,
-    ).first()
+    if source_accounts is not None:
+        account = next((a for a in source_accounts if a.account_id == account_id_str), None)
+    else:
+        account = db.query(InvestmentAccount).filter(
+            InvestmentAccount.account_id == account_id_str,
+            InvestmentAccount.source == source,
+        ).first()
     
     if not account:
         # Try to find existing account with same owner and account_type
@@ -404,9 +346,11 @@ def save_investment_transaction(db: Session, record: ParsedRecord, ingestion_id:
         elif account_type == 'ira':
             account_type_variants.extend(['retirement', 'traditional_ira'])
         
-        existing_accounts = db.query(InvestmentAccount).filter(
-            InvestmentAccount.source == source,
-        ).all()
+        existing_accounts = source_accounts
+        if existing_accounts is None:
+            existing_accounts = db.query(InvestmentAccount).filter(
+                InvestmentAccount.source == source,
+            ).all()
         
         # Check if any existing account matches owner and account_type
         for existing in existing_accounts:
@@ -436,6 +380,31 @@ def save_investment_transaction(db: Session, record: ParsedRecord, ingestion_id:
             )
             db.add(account)
             db.flush()
+            if source_accounts is not None:
+                source_accounts.append(account)
+    
+    return account
+
+
+def save_investment_transaction(db: Session, record: ParsedRecord, ingestion_id: Optional[int] = None) -> str:
+    """Save an investment transaction record and update holdings."""
+    from app.modules.investments.models import InvestmentTransaction, InvestmentAccount
+    from app.modules.investments.change_feed import record_transaction_event
+    from app.ingestion.bulk_writer import move_transaction
+    from app.modules.income.income_rollup import record_income_transaction
+    from app.modules.investments.dedup import transaction_dedup_hash
+    import hashlib
+    import json
+    
+    data = record.data
+    source = data.get("source", "unknown")
+    account_id_str = data.get("account_id", "default")
+    
+    # Normalize account_id using mapping to ensure consistency
+    account_id_str = _normalize_account_id(account_id_str)
+    
+    # Ensure account exists (for reference, though not a foreign key)
+    _ensure_investment_account(db, source, account_id_str, data)
     
     # Transaction uses denormalized string account_id, not foreign key
     transaction_date = data.get("transaction_date")
@@ -480,10 +449,10 @@ def save_investment_transaction(db: Session, record: ParsedRecord, ingestion_id:
     if cross_account_existing:
         # If the existing transaction is in a generic account (like "robinhood_default")
         # and we now have a specific account (like "jaya_ira"), update it
-        generic_accounts = ["robinhood_default", "schwab_default", "fidelity_default", "default"]
-        if cross_account_existing.account_id in generic_accounts and account_id_str not in generic_accounts:
-            # Migrate to the specific account
-            cross_account_existing.account_id = account_id_str
+        if cross_account_existing.account_id in GENERIC_ACCOUNT_IDS and account_id_str not in GENERIC_ACCOUNT_IDS:
+            # Migrate to the specific account (with its income rollup month,
+            # change-feed event and dedup_hash)
+            move_transaction(db, cross_account_existing, account_id_str)
             db.flush()
             
             # NOTE: We intentionally DO NOT update holdings from transaction imports.
@@ -518,11 +487,20 @@ def save_investment_transaction(db: Session, record: ParsedRecord, ingestion_id:
             amount=amount,
             fees=data.get("fees", 0),
             record_hash=record_hash,
+            dedup_hash=transaction_dedup_hash(
+                source, account_id_str, transaction_date, symbol, transaction_type, quantity, amount
+            ),
             ingestion_id=ingestion_id,
         )
         db.add(transaction)
         db.flush()  # Flush immediately to catch unique constraint violations
         
+        # Close/expire/assign events feed the incremental outcome tracker
+        record_transaction_event(db, transaction)
+        
+        # Options/dividend/interest rows roll into income_monthly_rollup
+        record_income_transaction(db, transaction)
+        
         # Commit the savepoint (not the main transaction)
         savepoint.commit()
         
@@ -10,6 +10,7 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.core.scheduler import start_scheduler
+from app.core.service_registry import registry
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +30,8 @@ from app.modules.india_investments.router import router as india_investments_rou
 from app.modules.india_investments.mf_research_router import router as mf_research_router
 from app.modules.plaid.router import router as plaid_router
 from app.ingestion.router import router as ingestion_router
+# Registers the insights service (the dashboard router imports it lazily)
+import app.modules.dashboard.insight_store  # noqa: F401
 from app.core.auth_router import router as auth_router
 
 
@@ -86,6 +89,13 @@ def create_app() -> FastAPI:
         """API health check endpoint."""
         return {"status": "healthy"}
     
+    @app.get("/api/health/ready", tags=["Health"])
+    async def readiness_check():
+        """Readiness: 503 until the expensive service singletons have been warmed."""
+        from fastapi.responses import JSONResponse
+        status = registry.status()
+        return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+    
     @app.get("/api/cache/stats", tags=["Health"])
     async def cache_stats():
         """Get cache statistics for debugging."""
@@ -118,7 +128,10 @@ def create_app() -> FastAPI:
         # Start scheduler in background thread
         scheduler_thread = threading.Thread(target=delayed_scheduler_start, daemon=True)
         scheduler_thread.start()
-        logger.info("Application startup complete - scheduler will start in background")
+        
+        # Load the expensive service singletons before the first dashboard request needs them
+        registry.start_warm_up(delay=1)
+        logger.info("Application startup complete - scheduler and service warm-up will start in background")
     
     @app.on_event("shutdown")
     async def shutdown_event():
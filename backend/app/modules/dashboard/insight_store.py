@@ -0,0 +1,372 @@
+"""
+Materialized dashboard insights.
+
+/dashboard/insights ran every discovery pass of the InsightsEngine (income
+service scans, holdings summary, statistics) whenever the registry's copy
+expired, and kept archive status in data/insights_archive.json.
+
+The store keeps the scored insights in dashboard_insights instead, keyed by
+their stable ID with a validity window and archive status. Each discovery
+pass reads some data categories (options, dividends, interest transactions,
+accounts, holdings, or the calendar day); insight_passes records a
+fingerprint of those categories' watermarks - row count, max(id),
+max(updated_at), read for every category in one SELECT - per pass.
+refresh_insights() re-runs only the passes whose fingerprint changed and
+replaces their rows, so an ingestion of dividends re-runs the dividend and
+income total passes and leaves the rest. Dashboard loads are an indexed
+read of the active rows.
+
+Refreshes run after ingestion (the registry reloads "insights" when its
+tables change or the income service it reads is invalidated), nightly from the scheduler, and on a read once the stored
+insights are older than INSIGHTS_MAX_AGE.
+"""
+
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.service_registry import EXPENSIVE, ServiceSpec, registry
+from app.core.watermarks import source_watermarks
+from app.modules.dashboard.insights import Insight, InsightsEngine, _load_archived_ids
+from app.modules.dashboard.models import DashboardInsight, InsightPass
+from app.modules.income.income_rollup import INCOME_TRANSACTION_TYPES
+from app.modules.investments.models import InvestmentAccount, InvestmentHolding, InvestmentTransaction, PortfolioSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds before a read re-checks the stored insights against the data
+INSIGHTS_MAX_AGE = 3600
+
+# Data categories read from investment_transactions, by transaction type
+TRANSACTION_CATEGORIES: Dict[str, Tuple[str, ...]] = {
+    "options": ("STO", "BTC", "OEXP", "OASGN"),
+    "dividends": tuple(INCOME_TRANSACTION_TYPES["dividends"]),
+    "interest": tuple(INCOME_TRANSACTION_TYPES["interest"]),
+}
+
+# Data categories read from whole tables
+TABLE_CATEGORIES: Dict[str, Tuple[Any, ...]] = {
+    "accounts": (InvestmentAccount,),
+    "holdings": (InvestmentAccount, InvestmentHolding, PortfolioSnapshot),
+}
+
+# Changes every day; passes reading it are re-run daily and valid for the day
+CALENDAR = "calendar"
+
+# Tables any category is read from (ingestion refreshes when it writes one)
+INSIGHT_TABLES = ("investment_transactions", "investment_accounts", "investment_holdings", "portfolio_snapshots")
+
+# Pass index * SEQUENCE_STRIDE + position in the pass orders ties in priority
+SEQUENCE_STRIDE = 1000
+
+
+def category_watermarks(db: Session, today: date) -> Dict[str, Tuple[Any, ...]]:
+    """category -> watermarks of the rows it covers, in one SELECT."""
+    models = list(dict.fromkeys(model for group in TABLE_CATEGORIES.values() for model in group))
+    slices = {
+        name: (
+            InvestmentTransaction, InvestmentTransaction.id, InvestmentTransaction.updated_at,
+            InvestmentTransaction.transaction_type.in_(types),
+        )
+        for name, types in TRANSACTION_CATEGORIES.items()
+    }
+    watermarks = source_watermarks(db, [(model, model.id, model.updated_at) for model in models], slices)
+
+    marks = {name: watermarks[name] for name in TRANSACTION_CATEGORIES}
+    for name, group in TABLE_CATEGORIES.items():
+        marks[name] = tuple(watermarks[model.__tablename__] for model in group)
+    marks[CALENDAR] = (today.isoformat(),)
+    return marks
+
+
+def pass_fingerprint(categories: Sequence[str], marks: Mapping[str, Tuple[Any, ...]]) -> str:
+    """Hash of the watermarks of the categories a pass reads."""
+    parts = [f"{category}={marks[category]!r}" for category in categories]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+def stale_passes(
+    fingerprints: Mapping[str, str],
+    stored: Mapping[str, str],
+    force: bool = False,
+) -> List[str]:
+    """Passes (in run order) whose fingerprint differs from the stored one."""
+    return [
+        name for name, fingerprint in fingerprints.items()
+        if force or stored.get(name) != fingerprint
+    ]
+
+
+def _row_values(insight: Insight) -> Dict[str, Any]:
+    return {
+        "category": insight.category.value,
+        "sentiment": insight.sentiment.value,
+        "title": insight.title,
+        "description": insight.description,
+        "metric_name": insight.metric_name,
+        "metric_value": insight.metric_value,
+        "comparison_value": insight.comparison_value,
+        "change_percent": insight.change_percent,
+        "icon": insight.icon,
+        "priority": insight.priority,
+        "tags": list(insight.tags),
+    }
+
+
+def insight_to_dict(row: Any) -> Dict[str, Any]:
+    """A stored insight in the /dashboard/insights response shape."""
+    return {
+        "id": row.insight_id,
+        "category": row.category,
+        "sentiment": row.sentiment,
+        "title": row.title,
+        "description": row.description,
+        "metric_name": row.metric_name,
+        "metric_value": row.metric_value,
+        "comparison_value": row.comparison_value,
+        "change_percent": row.change_percent,
+        "icon": row.icon,
+        "priority": row.priority,
+        "tags": row.tags or [],
+        "timestamp": row.discovered_at.isoformat(),
+        "valid_from": row.valid_from.isoformat(),
+        "valid_until": row.valid_until.isoformat() if row.valid_until else None,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Materialization
+# ---------------------------------------------------------------------------
+
+@dataclass
+class InsightRefresh:
+    """Outcome of one refresh."""
+    refreshed_on: date
+    passes: List[str] = field(default_factory=list)
+    written: int = 0
+    retired: int = 0
+
+
+def _latest_by_id(results: Mapping[str, List[Insight]]) -> Dict[str, Tuple[str, int, Insight]]:
+    """insight id -> (pass, sequence, insight); a repeated id keeps the higher priority."""
+    order = list(InsightsEngine.PASSES)
+    latest: Dict[str, Tuple[str, int, Insight]] = {}
+    for name, insights in results.items():
+        for position, insight in enumerate(insights):
+            sequence = order.index(name) * SEQUENCE_STRIDE + position
+            current = latest.get(insight.id)
+            if current is None or insight.priority > current[2].priority:
+                latest[insight.id] = (name, sequence, insight)
+    return latest
+
+
+def materialize_insights(db: Session, today: Optional[date] = None, force: bool = False) -> InsightRefresh:
+    """Re-run the passes whose data changed and store their insights. Does not commit."""
+    today = today or date.today()
+    marks = category_watermarks(db, today)
+    fingerprints = {
+        name: pass_fingerprint(categories, marks)
+        for name, (_, categories) in InsightsEngine.PASSES.items()
+    }
+    stored = {row.pass_name: row for row in db.query(InsightPass).all()}
+    stale = stale_passes(fingerprints, {name: row.fingerprint for name, row in stored.items()}, force)
+
+    result = InsightRefresh(refreshed_on=today, passes=stale)
+    if not stale:
+        return result
+
+    results = InsightsEngine(db).discover_passes(stale)
+    latest = _latest_by_id(results)
+    now = datetime.utcnow()
+    yesterday = today - timedelta(days=1)
+
+    existing = {
+        row.insight_id: row
+        for row in db.query(DashboardInsight).filter(
+            or_(DashboardInsight.pass_name.in_(stale), DashboardInsight.insight_id.in_(list(latest)))
+        )
+    }
+    legacy_archived = _load_archived_ids() if latest.keys() - existing.keys() else set()
+
+    for insight_id, (name, sequence, insight) in latest.items():
+        row = existing.pop(insight_id, None)
+        if row is None:
+            row = DashboardInsight(insight_id=insight_id, valid_from=today, discovered_at=now)
+            if insight_id in legacy_archived:
+                row.is_archived = True
+                row.archived_at = now
+            else:
+                row.is_archived = False
+            db.add(row)
+        elif row.valid_until is not None and row.valid_until < today:
+            # Retired earlier and discovered again
+            row.valid_from = today
+            row.discovered_at = now
+        for key, value in _row_values(insight).items():
+            setattr(row, key, value)
+        row.pass_name = name
+        row.sequence = sequence
+        row.valid_until = today if CALENDAR in InsightsEngine.PASSES[name][1] else None
+        result.written += 1
+
+    # Insights the re-run passes no longer produce: archived ones are kept
+    # (closed yesterday) so their archive status survives a rediscovery
+    for row in existing.values():
+        if row.pass_name not in stale:
+            continue
+        if row.is_archived:
+            row.valid_until = min(row.valid_until or yesterday, yesterday)
+        else:
+            db.delete(row)
+        result.retired += 1
+
+    for name in stale:
+        source = stored.get(name)
+        if source is None:
+            source = InsightPass(pass_name=name)
+            db.add(source)
+        source.fingerprint = fingerprints[name]
+        source.insight_count = len(results.get(name, []))
+        source.refreshed_at = now
+
+    logger.info(
+        f"[INSIGHTS] {today}: re-ran {', '.join(stale)} "
+        f"({result.written} insights, {result.retired} retired)"
+    )
+    return result
+
+
+# Serializes refreshes from requests, the scheduler and ingestion
+_refresh_lock = threading.Lock()
+
+
+def refresh_insights(db: Session, today: Optional[date] = None, force: bool = False) -> InsightRefresh:
+    """materialize_insights() and commit."""
+    with _refresh_lock:
+        try:
+            result = materialize_insights(db, today=today, force=force)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return result
+
+
+def _load_insights() -> InsightRefresh:
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        return refresh_insights(db)
+    finally:
+        db.close()
+
+
+registry.register(ServiceSpec(
+    name="insights",
+    factory=_load_insights,
+    # The options, dividend and account passes read the income service, so a
+    # refresh must not run against an income instance older than its data
+    depends_on=("income",),
+    cost=EXPENSIVE,
+    data_sources=INSIGHT_TABLES,
+    # Re-checks the watermarks (and the day) at least this often
+    max_age=INSIGHTS_MAX_AGE,
+))
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+def stored_insights(
+    db: Session,
+    archived: Optional[bool] = False,
+    limit: Optional[int] = None,
+    today: Optional[date] = None,
+) -> List[Dict[str, Any]]:
+    """Insights valid today, highest priority first (archived=None for both)."""
+    today = today or date.today()
+    query = db.query(DashboardInsight).filter(
+        DashboardInsight.valid_from <= today,
+        or_(DashboardInsight.valid_until.is_(None), DashboardInsight.valid_until >= today),
+    )
+    if archived is not None:
+        query = query.filter(DashboardInsight.is_archived.is_(archived))
+    query = query.order_by(DashboardInsight.priority.desc(), DashboardInsight.sequence)
+    if limit is not None:
+        query = query.limit(limit)
+    return [insight_to_dict(row) for row in query]
+
+
+def get_daily_insights(db: Session, limit: int = 5) -> List[Dict]:
+    """
+    Get the daily insights for the dashboard.
+    This is the main entry point for the insights API.
+    Excludes archived insights.
+    """
+    registry.get("insights")
+    return stored_insights(db, archived=False, limit=limit)
+
+
+def get_insights_with_archive(db: Session) -> Dict:
+    """
+    Get all insights split by active/archived status.
+    Returns a dict with 'active' and 'archived' lists.
+    """
+    registry.get("insights")
+    active = stored_insights(db, archived=False)
+    archived = stored_insights(db, archived=True)
+    return {
+        "active": active,
+        "archived": archived,
+        "active_count": len(active),
+        "archived_count": len(archived),
+    }
+
+
+def _set_archived(db: Session, insight_ids: Iterable[str], archived: bool) -> int:
+    rows = db.query(DashboardInsight).filter(
+        DashboardInsight.insight_id.in_(list(insight_ids)),
+        DashboardInsight.is_archived.is_(not archived),
+    ).all()
+    for row in rows:
+        row.is_archived = archived
+        row.archived_at = datetime.utcnow() if archived else None
+    db.commit()
+    return len(rows)
+
+
+def archive_insight(db: Session, insight_id: str) -> bool:
+    """Archive an insight by its ID."""
+    _set_archived(db, [insight_id], True)
+    return db.query(DashboardInsight.insight_id).filter(DashboardInsight.insight_id == insight_id).first() is not None
+
+
+def unarchive_insight(db: Session, insight_id: str) -> bool:
+    """Remove an insight from the archive."""
+    _set_archived(db, [insight_id], False)
+    return True
+
+
+def clear_archive(db: Session) -> int:
+    """Clear all archived insights. Returns count of cleared items."""
+    archived_ids = [row.insight_id for row in db.query(DashboardInsight.insight_id).filter(DashboardInsight.is_archived.is_(True))]
+    return _set_archived(db, archived_ids, False)
+
+
+def get_archived_count(db: Session, today: Optional[date] = None) -> int:
+    """Get the count of archived insights shown in the archive."""
+    today = today or date.today()
+    return db.query(func.count(DashboardInsight.insight_id)).filter(
+        DashboardInsight.is_archived.is_(True),
+        DashboardInsight.valid_from <= today,
+        or_(DashboardInsight.valid_until.is_(None), DashboardInsight.valid_until >= today),
+    ).scalar() or 0
@@ -30,9 +30,14 @@ from app.modules.income.services import get_income_service
 from app.modules.investments.services import get_holdings_summary
 
 
-# Path for storing archived insight IDs
+# Archived insight IDs from before archive status was stored with the
+# insights; insight_store marks matching insights archived when it first
+# stores them
 ARCHIVE_FILE = Path(__file__).parent.parent.parent.parent / "data" / "insights_archive.json"
 
+# Data categories the income service reads
+INCOME_DATA_CATEGORIES = frozenset({"options", "dividends", "interest"})
+
 
 def _load_archived_ids() -> Set[str]:
     """Load the set of archived insight IDs from file."""
@@ -46,48 +51,6 @@ def _load_archived_ids() -> Set[str]:
     return set()
 
 
-def _save_archived_ids(archived_ids: Set[str]) -> None:
-    """Save the set of archived insight IDs to file."""
-    try:
-        ARCHIVE_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(ARCHIVE_FILE, 'w') as f:
-            json.dump({
-                'archived_ids': list(archived_ids),
-                'updated_at': datetime.now().isoformat()
-            }, f, indent=2)
-    except Exception as e:
-        print(f"Error saving archived insights: {e}")
-
-
-def archive_insight(insight_id: str) -> bool:
-    """Archive an insight by its ID."""
-    archived_ids = _load_archived_ids()
-    archived_ids.add(insight_id)
-    _save_archived_ids(archived_ids)
-    return True
-
-
-def unarchive_insight(insight_id: str) -> bool:
-    """Remove an insight from the archive."""
-    archived_ids = _load_archived_ids()
-    archived_ids.discard(insight_id)
-    _save_archived_ids(archived_ids)
-    return True
-
-
-def clear_archive() -> int:
-    """Clear all archived insights. Returns count of cleared items."""
-    archived_ids = _load_archived_ids()
-    count = len(archived_ids)
-    _save_archived_ids(set())
-    return count
-
-
-def get_archived_count() -> int:
-    """Get the count of archived insights."""
-    return len(_load_archived_ids())
-
-
 class InsightCategory(str, Enum):
     RECORD = "record"           # All-time highs/lows
     OUTLIER = "outlier"         # Statistically unusual values
@@ -145,91 +108,59 @@ class InsightsEngine:
     # Milestone thresholds (in dollars)
     MILESTONES = [1000, 5000, 10000, 25000, 50000, 100000, 250000, 500000, 1000000]
     
+    # Discovery passes in run order: name -> (method, data categories it reads).
+    # insight_store re-runs a pass only when one of its categories changed;
+    # "calendar" changes every day.
+    PASSES: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+        "options": ("_discover_options_insights", ("options",)),
+        "dividends": ("_discover_dividend_insights", ("dividends",)),
+        "portfolio": ("_discover_portfolio_insights", ("holdings",)),
+        "accounts": ("_discover_account_insights", ("options", "accounts")),
+        "symbols": ("_discover_symbol_insights", ("options",)),
+        "streaks": ("_discover_streak_insights", ("options",)),
+        "comparison": ("_discover_comparison_insights", ("options", "calendar")),
+        "income_totals": ("_discover_income_totals", ("options", "dividends", "interest")),
+        "top_performers": ("_discover_top_performers", ("options",)),
+        "monthly": ("_discover_monthly_insights", ("options",)),
+    }
+    
     def __init__(self, db: Session):
         self.db = db
         self.insights: List[Insight] = []
         
-    def discover_all_insights(self, include_archived: bool = False, limit: int = 5) -> List[Dict]:
-        """
-        Run all insight discovery algorithms and return combined results.
-        Returns insights sorted by priority (most important first).
-        
-        Args:
-            include_archived: If True, include archived insights. If False, exclude them.
-            limit: Maximum number of insights to return.
-        """
-        self.insights = []
-        
-        # Get income data
-        income_service = get_income_service()
-        
-        # Run discovery algorithms
-        self._discover_options_insights(income_service)
-        self._discover_dividend_insights(income_service)
-        self._discover_portfolio_insights()
-        self._discover_account_insights(income_service)
-        self._discover_symbol_insights(income_service)
-        self._discover_streak_insights(income_service)
-        self._discover_comparison_insights(income_service)
-        self._discover_income_totals(income_service)
-        self._discover_top_performers(income_service)
-        self._discover_monthly_insights(income_service)
+    def discover(self) -> List[Insight]:
+        """Run every discovery algorithm; returns all insights, highest priority first."""
+        self.insights = [
+            insight for insights in self.discover_passes().values() for insight in insights
+        ]
         
         # Sort by priority (highest first)
         self.insights.sort(key=lambda x: x.priority, reverse=True)
-        
-        # Load archived IDs
-        archived_ids = _load_archived_ids() if not include_archived else set()
-        
-        # Filter out archived insights unless requested
-        filtered_insights = [
-            i for i in self.insights 
-            if include_archived or i.id not in archived_ids
-        ]
-        
-        # Convert to dict for JSON serialization
-        return [self._insight_to_dict(i) for i in filtered_insights[:limit]]
+        return self.insights
     
-    def get_all_insights_with_status(self) -> Tuple[List[Dict], List[Dict]]:
+    def discover_passes(self, names: Optional[List[str]] = None) -> Dict[str, List[Insight]]:
         """
-        Get all insights split into active and archived.
-        Returns (active_insights, archived_insights).
+        Run the named discovery passes (default: all) in PASSES order.
+        Returns pass name -> insights in discovery order.
         """
-        self.insights = []
-        
-        # Get income data
-        income_service = get_income_service()
-        
-        # Run discovery algorithms
-        self._discover_options_insights(income_service)
-        self._discover_dividend_insights(income_service)
-        self._discover_portfolio_insights()
-        self._discover_account_insights(income_service)
-        self._discover_symbol_insights(income_service)
-        self._discover_streak_insights(income_service)
-        self._discover_comparison_insights(income_service)
-        self._discover_income_totals(income_service)
-        self._discover_top_performers(income_service)
-        self._discover_monthly_insights(income_service)
-        
-        # Sort by priority (highest first)
-        self.insights.sort(key=lambda x: x.priority, reverse=True)
-        
-        # Load archived IDs
-        archived_ids = _load_archived_ids()
-        
-        # Split into active and archived
-        active = []
-        archived = []
-        
-        for insight in self.insights:
-            insight_dict = self._insight_to_dict(insight)
-            if insight.id in archived_ids:
-                archived.append(insight_dict)
+        names = set(self.PASSES if names is None else names)
+        income_service = None
+        results = {}
+        
+        for name, (method_name, categories) in self.PASSES.items():
+            if name not in names:
+                continue
+            self.insights = []
+            if INCOME_DATA_CATEGORIES.intersection(categories):
+                # Income data is loaded only when a pass reads it
+                income_service = income_service or get_income_service()
+                getattr(self, method_name)(income_service)
             else:
-                active.append(insight_dict)
+                getattr(self, method_name)()
+            results[name] = self.insights
         
-        return active, archived
+        self.insights = []
+        return results
     
     def _insight_to_dict(self, insight: Insight) -> Dict:
         """Convert insight dataclass to dictionary."""
@@ -902,29 +833,3 @@ class InsightsEngine:
                 priority=46,
                 tags=["monthly", "record"],
             ))
-
-
-def get_daily_insights(db: Session, limit: int = 5) -> List[Dict]:
-    """
-    Get the daily insights for the dashboard.
-    This is the main entry point for the insights API.
-    Excludes archived insights.
-    """
-    engine = InsightsEngine(db)
-    return engine.discover_all_insights(include_archived=False, limit=limit)
-
-
-def get_insights_with_archive(db: Session) -> Dict:
-    """
-    Get all insights split by active/archived status.
-    Returns a dict with 'active' and 'archived' lists.
-    """
-    engine = InsightsEngine(db)
-    active, archived = engine.get_all_insights_with_status()
-    return {
-        "active": active,
-        "archived": archived,
-        "active_count": len(active),
-        "archived_count": len(archived),
-    }
-
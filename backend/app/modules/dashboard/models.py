@@ -0,0 +1,107 @@
+"""
+Dashboard module database models.
+
+Materialized net worth (see net_worth.py) and insights (see
+insight_store.py) for the dashboard.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, JSON, UniqueConstraint, Index, Boolean, Float, Text
+
+from app.core.database import Base
+
+
+class NetWorthSnapshot(Base):
+    """
+    Value of one account (investment account, property, company, ...) in one
+    asset class on one day.
+
+    Mortgages are stored as positive balances in the 'mortgage' class.
+    'daily' rows are written by the materializer; 'history' rows are
+    backfilled from property valuations and portfolio snapshots for the days
+    before daily rows begin.
+    """
+
+    __tablename__ = "net_worth_snapshots"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    snapshot_date = Column(Date, nullable=False)
+    asset_class = Column(String(30), nullable=False)  # public_equity, real_estate, mortgage, ...
+    account = Column(String(100), nullable=False)  # account id, property id, company id, ...
+    label = Column(String(255), nullable=True)
+    value = Column(Numeric(18, 2), nullable=False)
+    origin = Column(String(10), nullable=False, default='daily')  # 'daily' or 'history'
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint('snapshot_date', 'asset_class', 'account', name='uq_net_worth_snapshot'),
+        Index('idx_net_worth_class_date', 'asset_class', 'snapshot_date'),
+    )
+
+
+class NetWorthSource(Base):
+    """
+    Watermarks and dashboard summary of one materialized section (a group of
+    asset classes built from the same tables).
+
+    A refresh rebuilds a section only when the watermarks of its tables no
+    longer match the fingerprint stored here.
+    """
+
+    __tablename__ = "net_worth_sources"
+
+    section = Column(String(30), primary_key=True)  # e.g. 'real_estate'
+    fingerprint = Column(String(64), nullable=False)
+    watermarks = Column(JSON, nullable=True)  # table -> [count, max id, max updated_at]
+    summary = Column(JSON, nullable=True)  # breakdowns shown with the section's total
+    snapshot_date = Column(Date, nullable=False)  # latest day with rows for the section
+    refreshed_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # last rebuild
+
+
+class DashboardInsight(Base):
+    """
+    A discovered insight, materialized by insight_store.refresh_insights().
+
+    insight_id is the stable Insight.id, so archive status survives
+    regeneration. An insight is shown from valid_from through valid_until
+    (open-ended while its data is unchanged).
+    """
+
+    __tablename__ = "dashboard_insights"
+
+    insight_id = Column(String(12), primary_key=True)
+    pass_name = Column(String(30), nullable=False)  # discovery pass that produced it
+    sequence = Column(Integer, nullable=False, default=0)  # discovery order, for ties in priority
+    category = Column(String(20), nullable=False)
+    sentiment = Column(String(20), nullable=False)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=False)
+    metric_name = Column(String(50), nullable=False)
+    metric_value = Column(Float, nullable=True)
+    comparison_value = Column(Float, nullable=True)
+    change_percent = Column(Float, nullable=True)
+    icon = Column(String(30), nullable=True)
+    priority = Column(Integer, nullable=False, default=50)
+    tags = Column(JSON, nullable=True)
+    discovered_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    valid_from = Column(Date, nullable=False)
+    valid_until = Column(Date, nullable=True)
+    is_archived = Column(Boolean, nullable=False, default=False)
+    archived_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('idx_dashboard_insights_active', 'is_archived', 'priority'),
+        Index('idx_dashboard_insights_pass', 'pass_name'),
+    )
+
+
+class InsightPass(Base):
+    """Fingerprint of the data a discovery pass last ran on."""
+
+    __tablename__ = "insight_passes"
+
+    pass_name = Column(String(30), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    insight_count = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,683 @@
+"""
+Daily net-worth snapshots per (date, asset class, account).
+
+/dashboard/summary called the investments, real estate, equity, cash,
+India investments and income services on every cache miss, and
+/dashboard/wealth-history ran one valuation query per property and rebuilt
+the whole history on every request.
+
+The materializer stores them instead. Each section (asset classes built
+from the same tables) has a NetWorthSource row with a fingerprint of its
+tables' watermarks - row count, max(id), max(updated_at), read for every
+section in one SELECT - and the breakdowns the dashboard shows with its
+total. refresh_net_worth():
+
+1. Rebuilds only the sections whose fingerprint changed (sections valued as
+   of the day, like accruing fixed deposits, change every day): their rows
+   for the day are replaced, their history rows (property valuations and
+   portfolio statements before daily rows began) rewritten, and their
+   summary stored.
+2. Copies the latest rows of unchanged sections forward to the day, so
+   every day has a complete set of rows.
+
+The dashboard reads the latest day's rows and the section summaries, and
+the wealth history is one query for the last row of each account per year.
+Reads refresh first, which is one watermark query when nothing changed;
+the nightly job and ingestion runs refresh as well.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import Date, DateTime, String, and_, func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import clear_cache
+from app.core.watermarks import source_watermarks
+from app.ingestion.bulk_writer import CHUNK_SIZE
+from app.modules.cash.models import CashSnapshot
+from app.modules.dashboard.models import NetWorthSnapshot, NetWorthSource
+from app.modules.equity.models import EquityCompany, EquityGrant, EquityRSA, EquitySAFE, EquityShares
+from app.modules.income.income_aggregation import aggregate_income
+from app.modules.income.models import IncomeMonthlyRollup
+from app.modules.india_investments.models import (
+    ExchangeRate,
+    IndiaBankAccount,
+    IndiaFixedDeposit,
+    IndiaInvestmentAccount,
+    IndiaMutualFund,
+    IndiaStock,
+)
+from app.modules.india_investments.services import get_dashboard_india_investments
+from app.modules.investments.models import InvestmentAccount, InvestmentHolding, PortfolioSnapshot
+from app.modules.investments.services import get_all_holdings, get_holdings_summary
+from app.modules.real_estate.models import Mortgage, Property, PropertyValuation
+
+logger = logging.getLogger(__name__)
+
+
+# NetWorthSnapshot.origin
+DAILY = "daily"
+HISTORY = "history"
+
+# Neel's date of birth for accurate age calculation
+BIRTH_DATE = date(1980, 7, 21)
+
+# Wealth history start when there is no real estate history
+DEFAULT_START_YEAR = 2011
+
+INDIA_CATEGORIES = {
+    "cash": "India Cash",
+    "stocks": "India Stocks",
+    "mutual_funds": "India Mutual Funds",
+    "fixed_deposits": "India Fixed Deposits",
+}
+
+
+def get_real_estate_summary(db: Session) -> dict:
+    """Get real estate summary from the real estate service (database)."""
+    try:
+        from app.modules.real_estate.services import get_property_summary
+        return get_property_summary(db)
+    except Exception as e:
+        logger.warning(f"[NET_WORTH] Could not load real estate data: {e}")
+        return {"total_equity": 0, "total_value": 0, "properties": []}
+
+
+def get_startup_equity_summary(db: Session) -> dict:
+    """Get startup equity summary from the equity module."""
+    try:
+        from app.modules.equity.services import get_equity_summary
+        return get_equity_summary(db)
+    except Exception as e:
+        logger.warning(f"[NET_WORTH] Could not load equity data: {e}")
+        return {"total_estimated_value": 0, "holdings_by_company": []}
+
+
+def get_cash_summary(db: Session) -> dict:
+    """Get cash summary from the cash module."""
+    try:
+        from app.modules.cash.services import get_all_cash_balances
+        return get_all_cash_balances(db)
+    except Exception as e:
+        logger.warning(f"[NET_WORTH] Could not load cash data: {e}")
+        return {"total_cash": 0, "accounts": []}
+
+
+# ---------------------------------------------------------------------------
+# Sections
+# ---------------------------------------------------------------------------
+
+@dataclass
+class SectionData:
+    """What one section build produces."""
+    rows: List[Tuple[str, str, Optional[str], float]]  # (asset_class, account, label, value) for the day
+    summary: Dict[str, Any]
+    history: List[Tuple[date, str, str, Optional[str], float]] = field(default_factory=list)  # dated rows
+
+
+@dataclass(frozen=True)
+class Section:
+    """Asset classes materialized together from the same tables."""
+    name: str
+    models: Tuple[Any, ...]
+    asset_classes: Tuple[str, ...]
+    build: Callable[[Session, date], SectionData]
+    daily: bool = False  # values depend on the day itself
+
+
+def _build_public_equity(db: Session, as_of: date) -> SectionData:
+    accounts = get_all_holdings(db)
+    summary = get_holdings_summary(db, accounts)
+    statements = db.query(
+        PortfolioSnapshot.statement_date,
+        PortfolioSnapshot.account_id,
+        func.sum(PortfolioSnapshot.portfolio_value).label('total_value'),
+    ).filter(
+        PortfolioSnapshot.statement_date.isnot(None),
+        PortfolioSnapshot.account_id.isnot(None),
+    ).group_by(
+        PortfolioSnapshot.statement_date, PortfolioSnapshot.account_id
+    ).all()
+
+    return SectionData(
+        rows=[("public_equity", account['id'], account['name'], account['value']) for account in accounts],
+        summary={
+            "by_owner": summary.get('byOwner', {}),
+            "by_type": summary.get('byType', {}),
+            "account_count": summary.get('accountCount', 0),
+        },
+        history=[
+            (row.statement_date, "public_equity", row.account_id, None, float(row.total_value or 0))
+            for row in statements
+        ],
+    )
+
+
+def _build_real_estate(db: Session, as_of: date) -> SectionData:
+    summary = get_real_estate_summary(db)
+    properties = [
+        {
+            "id": p['id'],
+            "address": p['full_address'],
+            "value": p['value'],
+            "mortgage_balance": p['mortgage_balance'],
+            "equity": p['equity'],
+            "type": p['property_type']
+        }
+        for p in summary.get('properties', [])
+    ]
+    rows = []
+    for p in properties:
+        rows.append(("real_estate", str(p['id']), p['address'], p['value']))
+        rows.append(("mortgage", str(p['id']), p['address'], p['mortgage_balance']))
+
+    valuations = db.query(
+        PropertyValuation.valuation_date, PropertyValuation.property_id, PropertyValuation.value
+    ).join(
+        Property, Property.id == PropertyValuation.property_id
+    ).filter(
+        Property.is_active == 'Y'
+    ).order_by(PropertyValuation.valuation_date, PropertyValuation.id).all()
+
+    return SectionData(
+        rows=rows,
+        summary={"properties": properties},
+        history=[
+            (row.valuation_date, "real_estate", str(row.property_id), None, float(row.value or 0))
+            for row in valuations
+        ],
+    )
+
+
+def _build_startup_equity(db: Session, as_of: date) -> SectionData:
+    summary = get_startup_equity_summary(db)
+    companies = summary.get('holdings_by_company', [])
+    return SectionData(
+        rows=[("startup_equity", str(c['id']), c['name'], c['estimated_value']) for c in companies],
+        summary={"companies": companies, "num_companies": summary.get('num_companies', 0)},
+    )
+
+
+def _build_cash(db: Session, as_of: date) -> SectionData:
+    summary = get_cash_summary(db)
+    accounts = summary.get('accounts', [])
+    return SectionData(
+        rows=[
+            ("cash", f"{a['source']}:{a['account_id']}", a['account_name'], a['balance'])
+            for a in accounts
+        ],
+        summary={"accounts": accounts, "by_owner": summary.get('by_owner', {})},
+    )
+
+
+def _build_india_investments(db: Session, as_of: date) -> SectionData:
+    # Only Neel's accounts, converted to USD
+    try:
+        india_data = get_dashboard_india_investments(db)
+    except Exception as e:
+        logger.warning(f"[NET_WORTH] Could not load India investments data: {e}")
+        india_data = {}
+
+    rate = india_data.get('exchange_rate', 83.0)
+    breakdown = {
+        'cash': sum(acc['cash_balance'] for acc in india_data.get('bank_accounts', [])),
+        'stocks': sum(stock['current_value'] for stock in india_data.get('stocks', [])),
+        'mutual_funds': sum(mf['current_value'] for mf in india_data.get('mutual_funds', [])),
+        'fixed_deposits': sum(fd['current_value'] for fd in india_data.get('fixed_deposits', [])),
+    }
+    return SectionData(
+        rows=[
+            ("india_investments", category, INDIA_CATEGORIES[category], amount / rate if rate > 0 else 0)
+            for category, amount in breakdown.items()
+        ],
+        summary={
+            "value_inr": india_data.get('total_value_inr', 0),
+            "exchange_rate": rate,
+            "breakdown": breakdown,
+        },
+    )
+
+
+def _build_income(db: Session, as_of: date) -> SectionData:
+    # Same grouped query as the Income page
+    income_aggregate = aggregate_income(db)
+    return SectionData(
+        rows=[],
+        summary={
+            "total_investment_income": sum(
+                income_aggregate.total(category)
+                for category in ('options', 'dividends', 'interest', 'stock_lending')
+            ),
+            "options_income": income_aggregate.total('options'),
+            "dividend_income": income_aggregate.total('dividends'),
+            "interest_income": income_aggregate.total('interest'),
+            "stock_lending": income_aggregate.total('stock_lending'),
+        },
+    )
+
+
+SECTIONS: Tuple[Section, ...] = (
+    Section("public_equity", (InvestmentAccount, InvestmentHolding, PortfolioSnapshot),
+            ("public_equity",), _build_public_equity),
+    Section("real_estate", (Property, Mortgage, PropertyValuation),
+            ("real_estate", "mortgage"), _build_real_estate),
+    Section("startup_equity", (EquityCompany, EquityGrant, EquityShares, EquityRSA, EquitySAFE),
+            ("startup_equity",), _build_startup_equity),
+    Section("cash", (CashSnapshot,), ("cash",), _build_cash),
+    # Fixed deposits are valued with the interest accrued to the day
+    Section("india_investments",
+            (ExchangeRate, IndiaBankAccount, IndiaInvestmentAccount, IndiaStock, IndiaMutualFund, IndiaFixedDeposit),
+            ("india_investments",), _build_india_investments, daily=True),
+    Section("income", (InvestmentAccount, IncomeMonthlyRollup), (), _build_income),
+)
+
+# Tables any section is built from (ingestion refreshes when it writes one)
+NET_WORTH_TABLES = frozenset(model.__tablename__ for section in SECTIONS for model in section.models)
+
+
+def _watermark_sources(sections: Sequence[Section]) -> List[Tuple[Any, Any, Any]]:
+    models = dict.fromkeys(model for section in sections for model in section.models)
+    return [(model, model.id, model.updated_at) for model in models]
+
+
+def section_fingerprint(section: Section, watermarks: Mapping[str, Tuple[Any, ...]], as_of: date) -> str:
+    """Hash of the section's table watermarks (and the day, for daily sections)."""
+    parts = [f"{model.__tablename__}={watermarks[model.__tablename__]!r}" for model in section.models]
+    if section.daily:
+        parts.insert(0, as_of.isoformat())
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+def plan_refresh(
+    sections: Sequence[Section],
+    fingerprints: Mapping[str, str],
+    stored: Mapping[str, Any],
+    as_of: date,
+    force: bool = False,
+) -> Tuple[List[str], List[str]]:
+    """(sections to rebuild, sections whose latest rows are copied forward to `as_of`)."""
+    rebuild, copy_forward = [], []
+    for section in sections:
+        source = stored.get(section.name)
+        if force or source is None or source.fingerprint != fingerprints[section.name]:
+            rebuild.append(section.name)
+        elif source.snapshot_date < as_of:
+            copy_forward.append(section.name)
+    return rebuild, copy_forward
+
+
+# ---------------------------------------------------------------------------
+# Materialization
+# ---------------------------------------------------------------------------
+
+@dataclass
+class NetWorthRefresh:
+    """Outcome of one refresh."""
+    snapshot_date: date
+    rebuilt: List[str] = field(default_factory=list)
+    copied: List[str] = field(default_factory=list)
+    rows_written: int = 0
+    history_rows: int = 0
+
+
+def _insert_rows(db: Session, rows: List[Dict[str, Any]]) -> None:
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.execute(insert(NetWorthSnapshot), rows[start:start + CHUNK_SIZE])
+
+
+def _snapshot_rows(
+    rows: Sequence[Tuple[date, str, str, Optional[str], float]],
+    origin: str,
+    now: datetime,
+) -> List[Dict[str, Any]]:
+    """One insert row per (date, class, account); repeated keys are summed."""
+    merged: Dict[Tuple[date, str, str], Dict[str, Any]] = {}
+    for snapshot_date, asset_class, account, label, value in rows:
+        key = (snapshot_date, asset_class, str(account))
+        row = merged.get(key)
+        if row is None:
+            merged[key] = {
+                "snapshot_date": snapshot_date, "asset_class": asset_class, "account": str(account),
+                "label": label, "value": float(value or 0), "origin": origin, "created_at": now,
+            }
+        else:
+            row["value"] += float(value or 0)
+    for row in merged.values():
+        row["value"] = round(row["value"], 2)
+    return list(merged.values())
+
+
+def _rebuild_section(db: Session, section: Section, as_of: date, now: datetime) -> Tuple[SectionData, int, int]:
+    """Build a section and replace its rows for the day and its history rows."""
+    data = section.build(db, as_of)
+    classes = section.asset_classes
+    if not classes:
+        return data, 0, 0
+
+    db.query(NetWorthSnapshot).filter(
+        NetWorthSnapshot.snapshot_date == as_of,
+        NetWorthSnapshot.asset_class.in_(classes),
+    ).delete(synchronize_session=False)
+    daily_rows = _snapshot_rows([(as_of, *row) for row in data.rows], DAILY, now)
+    _insert_rows(db, daily_rows)
+
+    # History covers the days before daily rows began
+    db.query(NetWorthSnapshot).filter(
+        NetWorthSnapshot.asset_class.in_(classes),
+        NetWorthSnapshot.origin == HISTORY,
+    ).delete(synchronize_session=False)
+    first_daily = db.query(func.min(NetWorthSnapshot.snapshot_date)).filter(
+        NetWorthSnapshot.asset_class.in_(classes),
+        NetWorthSnapshot.origin == DAILY,
+    ).scalar() or as_of
+    # The last valuation/statement of a day wins
+    latest: Dict[Tuple[date, str, str], Tuple[date, str, str, Optional[str], float]] = {}
+    for row in data.history:
+        if row[0] < first_daily:
+            latest[row[:3]] = row
+    history_rows = _snapshot_rows(list(latest.values()), HISTORY, now)
+    _insert_rows(db, history_rows)
+
+    return data, len(daily_rows), len(history_rows)
+
+
+def _copy_forward(db: Session, section: Section, from_date: date, as_of: date, now: datetime) -> int:
+    """Copy a section's rows of `from_date` to `as_of` in one INSERT ... SELECT."""
+    classes = section.asset_classes
+    if not classes:
+        return 0
+    db.query(NetWorthSnapshot).filter(
+        NetWorthSnapshot.snapshot_date == as_of,
+        NetWorthSnapshot.asset_class.in_(classes),
+    ).delete(synchronize_session=False)
+    rows = select(
+        literal(as_of, Date), NetWorthSnapshot.asset_class, NetWorthSnapshot.account,
+        NetWorthSnapshot.label, NetWorthSnapshot.value, literal(DAILY, String), literal(now, DateTime),
+    ).where(
+        NetWorthSnapshot.snapshot_date == from_date,
+        NetWorthSnapshot.asset_class.in_(classes),
+    )
+    result = db.execute(insert(NetWorthSnapshot).from_select(
+        ["snapshot_date", "asset_class", "account", "label", "value", "origin", "created_at"], rows,
+    ))
+    return result.rowcount or 0
+
+
+def _json_watermarks(section: Section, watermarks: Mapping[str, Tuple[Any, ...]]) -> Dict[str, List[Any]]:
+    return {
+        model.__tablename__: [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in watermarks[model.__tablename__]
+        ]
+        for model in section.models
+    }
+
+
+def materialize_net_worth(db: Session, as_of: Optional[date] = None, force: bool = False) -> NetWorthRefresh:
+    """Bring the snapshot of `as_of` (default today) up to date. Does not commit."""
+    as_of = as_of or date.today()
+    watermarks = source_watermarks(db, _watermark_sources(SECTIONS))
+    fingerprints = {section.name: section_fingerprint(section, watermarks, as_of) for section in SECTIONS}
+    stored = {source.section: source for source in db.query(NetWorthSource).all()}
+    rebuild, copy_forward = plan_refresh(SECTIONS, fingerprints, stored, as_of, force)
+
+    result = NetWorthRefresh(snapshot_date=as_of, rebuilt=rebuild, copied=copy_forward)
+    now = datetime.utcnow()
+    for section in SECTIONS:
+        source = stored.get(section.name)
+        if section.name in rebuild:
+            data, written, backfilled = _rebuild_section(db, section, as_of, now)
+            result.rows_written += written
+            result.history_rows += backfilled
+            if source is None:
+                source = NetWorthSource(section=section.name)
+                db.add(source)
+            source.fingerprint = fingerprints[section.name]
+            source.watermarks = _json_watermarks(section, watermarks)
+            source.summary = data.summary
+            source.snapshot_date = as_of
+            source.refreshed_at = now
+        elif section.name in copy_forward:
+            result.rows_written += _copy_forward(db, section, source.snapshot_date, as_of, now)
+            source.snapshot_date = as_of
+
+    if rebuild or copy_forward:
+        logger.info(
+            f"[NET_WORTH] {as_of}: rebuilt {', '.join(rebuild) or 'none'}; "
+            f"copied {', '.join(copy_forward) or 'none'} ({result.rows_written} rows, "
+            f"{result.history_rows} history rows)"
+        )
+    return result
+
+
+# Serializes refreshes from requests, the scheduler and ingestion
+_refresh_lock = threading.Lock()
+
+
+def refresh_net_worth(db: Session, as_of: Optional[date] = None, force: bool = False) -> NetWorthRefresh:
+    """materialize_net_worth() and commit; drops cached dashboard responses after a rebuild."""
+    with _refresh_lock:
+        try:
+            result = materialize_net_worth(db, as_of=as_of, force=force)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    if result.rebuilt:
+        clear_cache("dashboard:")
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+def latest_totals(db: Session) -> Dict[str, float]:
+    """asset class -> total of the latest day's rows."""
+    latest_date = select(func.max(NetWorthSnapshot.snapshot_date)).where(
+        NetWorthSnapshot.origin == DAILY
+    ).scalar_subquery()
+    rows = db.query(
+        NetWorthSnapshot.asset_class, func.sum(NetWorthSnapshot.value)
+    ).filter(
+        NetWorthSnapshot.snapshot_date == latest_date,
+        NetWorthSnapshot.origin == DAILY,
+    ).group_by(NetWorthSnapshot.asset_class).all()
+    return {asset_class: float(total or 0) for asset_class, total in rows}
+
+
+def assemble_summary(
+    totals: Mapping[str, float],
+    summaries: Mapping[str, Dict[str, Any]],
+    last_updated: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """The /dashboard/summary response from class totals and section summaries."""
+    investment_value = totals.get("public_equity", 0)
+    real_estate_value = totals.get("real_estate", 0)
+    real_estate_mortgage = totals.get("mortgage", 0)
+    startup_equity_value = totals.get("startup_equity", 0)
+    cash_value = totals.get("cash", 0)
+    india_investments_value_usd = totals.get("india_investments", 0)
+
+    public_equity = summaries.get("public_equity", {})
+    real_estate = summaries.get("real_estate", {})
+    startup_equity = summaries.get("startup_equity", {})
+    cash = summaries.get("cash", {})
+    india = summaries.get("india_investments", {})
+    income = summaries.get("income", {})
+
+    # Calculate totals (including all asset types)
+    total_assets = investment_value + real_estate_value + startup_equity_value + cash_value + india_investments_value_usd
+    total_liabilities = real_estate_mortgage  # Currently just mortgages
+    total_net_worth = total_assets - total_liabilities
+
+    return {
+        "total_net_worth": total_net_worth,
+        "total_assets": total_assets,
+        "total_liabilities": total_liabilities,
+
+        "assets": {
+            "public_equity": {
+                "label": "Public Equity",
+                "description": "Robinhood, Schwab Brokerage",
+                "value": investment_value,
+                "by_owner": public_equity.get("by_owner", {}),
+                "by_type": public_equity.get("by_type", {}),
+                "account_count": public_equity.get("account_count", 0),
+            },
+            "real_estate": {
+                "label": "Real Estate",
+                "description": "Properties & Home Equity",
+                "value": real_estate_value - real_estate_mortgage,
+                "properties": real_estate.get("properties", []),
+            },
+            "startup_equity": {
+                "label": "Startup Equity",
+                "description": "Stock Options & Private Company Shares",
+                "value": startup_equity_value,
+                "companies": startup_equity.get("companies", []),
+                "num_companies": startup_equity.get("num_companies", 0),
+            },
+            "cash": {
+                "label": "Cash & Savings",
+                "description": "Bank Accounts & Brokerage Cash",
+                "value": cash_value,
+                "accounts": cash.get("accounts", []),
+                "by_owner": cash.get("by_owner", {}),
+            },
+            "india_investments": {
+                "label": "India Investments",
+                "description": "Indian Stocks, Mutual Funds, FDs & Cash",
+                "value": india_investments_value_usd,
+                "value_inr": india.get("value_inr", 0),
+                "exchange_rate": india.get("exchange_rate", 83.0),
+                "breakdown": india.get("breakdown", {}),
+            },
+        },
+
+        "liabilities": {
+            "mortgages": {
+                "label": "Mortgages",
+                "description": "Home Loans Outstanding",
+                "value": real_estate_mortgage,
+            },
+            "other_loans": {
+                "label": "Other Loans",
+                "description": "Auto, Personal, Credit Lines",
+                "value": 0,
+            },
+        },
+
+        "income": {
+            "total_investment_income": income.get("total_investment_income", 0),
+            "options_income": income.get("options_income", 0),
+            "dividend_income": income.get("dividend_income", 0),
+            "interest_income": income.get("interest_income", 0),
+            "stock_lending": income.get("stock_lending", 0),
+        },
+
+        "last_updated": (last_updated or datetime.utcnow()).isoformat(),
+    }
+
+
+def net_worth_summary(db: Session) -> Dict[str, Any]:
+    """The wealth summary from the latest snapshot."""
+    sources = db.query(NetWorthSource).all()
+    return assemble_summary(
+        latest_totals(db),
+        {source.section: source.summary or {} for source in sources},
+        max((source.refreshed_at for source in sources), default=None),
+    )
+
+
+def _age(on: date) -> int:
+    age = on.year - BIRTH_DATE.year
+    if (on.month, on.day) < (BIRTH_DATE.month, BIRTH_DATE.day):
+        age -= 1
+    return age
+
+
+def build_wealth_history(
+    year_end: Mapping[int, Mapping[str, Mapping[str, float]]],
+    latest: Mapping[str, float],
+    today: date,
+) -> Dict[str, Any]:
+    """
+    The wealth journey from each account's last value per year
+    (year -> asset class -> account -> value) and the latest totals.
+
+    Property values carry forward to years without a valuation. Past years
+    show gross property values; the current year shows home equity.
+    """
+    real_estate_years = [year for year, values in year_end.items() if values.get("real_estate")]
+    start_year = min(real_estate_years) if real_estate_years else DEFAULT_START_YEAR
+    current_year = today.year
+
+    property_values: Dict[str, float] = {}
+    wealth_history = []
+    for year in range(start_year, current_year + 1):
+        values = year_end.get(year, {})
+        property_values.update(values.get("real_estate", {}))
+
+        if year == current_year:
+            inv_value = latest.get("public_equity", 0)
+            startup_value = latest.get("startup_equity", 0)
+            cash_value = latest.get("cash", 0)
+            re_value = latest.get("real_estate", 0) - latest.get("mortgage", 0)
+        else:
+            inv_value = sum(values.get("public_equity", {}).values())
+            startup_value = sum(values.get("startup_equity", {}).values())
+            cash_value = sum(values.get("cash", {}).values())
+            re_value = sum(property_values.values())
+
+        wealth_history.append({
+            "year": year,
+            "age": _age(date(year, 12, 31)),
+            "netWorth": re_value + inv_value + startup_value + cash_value,
+            "realEstate": re_value,
+            "investments": inv_value,
+            "startupEquity": startup_value,
+            "cash": cash_value,
+        })
+
+    return {
+        "history": wealth_history,
+        "current_age": _age(today),
+        "start_year": start_year,
+        "birth_date": BIRTH_DATE.isoformat(),
+    }
+
+
+def wealth_history(db: Session, today: Optional[date] = None) -> Dict[str, Any]:
+    """The wealth journey chart data from the snapshot series."""
+    year = func.extract('year', NetWorthSnapshot.snapshot_date)
+    last = db.query(
+        NetWorthSnapshot.asset_class,
+        NetWorthSnapshot.account,
+        func.max(NetWorthSnapshot.snapshot_date).label('last_date'),
+    ).filter(
+        NetWorthSnapshot.asset_class.in_(("public_equity", "real_estate", "startup_equity", "cash"))
+    ).group_by(
+        NetWorthSnapshot.asset_class, NetWorthSnapshot.account, year
+    ).subquery()
+    rows = db.query(
+        NetWorthSnapshot.asset_class, NetWorthSnapshot.account, NetWorthSnapshot.snapshot_date, NetWorthSnapshot.value
+    ).join(
+        last,
+        and_(
+            NetWorthSnapshot.asset_class == last.c.asset_class,
+            NetWorthSnapshot.account == last.c.account,
+            NetWorthSnapshot.snapshot_date == last.c.last_date,
+        ),
+    ).all()
+
+    year_end: Dict[int, Dict[str, Dict[str, float]]] = defaultdict(lambda: defaultdict(dict))
+    for row in rows:
+        year_end[row.snapshot_date.year][row.asset_class][row.account] = float(row.value)
+    return build_wealth_history(year_end, latest_totals(db), today or date.today())
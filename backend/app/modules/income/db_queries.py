@@ -7,13 +7,100 @@ All calculations happen at the database level for consistency.
 PRINCIPLE: The database is the SINGLE SOURCE OF TRUTH.
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import date
 from decimal import Decimal
 from sqlalchemy import func, extract, case, and_, or_
 from sqlalchemy.orm import Session
 
+from app.modules.investments.account_types import non_taxable_account_type
 from app.modules.investments.models import InvestmentTransaction, InvestmentAccount
+from app.modules.investments.transaction_query import TransactionFilter, TransactionPage, paginate
+from app.modules.income.models import IncomeMonthlyRollup
+from app.modules.income.income_rollup import INCOME_TRANSACTION_TYPES
+from app.modules.income.income_aggregation import IncomeAggregate, aggregate_income
+
+
+# =============================================================================
+# MONTHLY ROLLUP READERS
+# =============================================================================
+# Options/dividend/interest totals read income_monthly_rollup (maintained on
+# write, see income_rollup.py) instead of aggregating transactions per request.
+
+def _month_key(year: int, month: int) -> str:
+    """'YYYY-MM' key used by the monthly breakdowns."""
+    return f"{year:04d}-{month:02d}"
+
+
+def _rollup_query(db: Session, *columns):
+    """Rollup query joined to investment_accounts on (account_id, source)."""
+    return db.query(*columns).join(
+        InvestmentAccount,
+        and_(
+            IncomeMonthlyRollup.account_id == InvestmentAccount.account_id,
+            IncomeMonthlyRollup.source == InvestmentAccount.source
+        )
+    )
+
+
+def _rollup_summary(
+    db: Session,
+    income_type: str,
+    year: Optional[int] = None,
+    account_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Total amount and transaction count for one income type."""
+    query = _rollup_query(
+        db,
+        func.sum(IncomeMonthlyRollup.total_amount).label('total'),
+        func.sum(IncomeMonthlyRollup.transaction_count).label('count')
+    ).filter(
+        IncomeMonthlyRollup.income_type == income_type
+    )
+
+    if year:
+        query = query.filter(IncomeMonthlyRollup.year == year)
+    if account_id:
+        query = query.filter(IncomeMonthlyRollup.account_id == account_id)
+
+    result = query.first()
+    return {
+        'total_income': float(result.total or 0),
+        'transaction_count': int(result.count or 0)
+    }
+
+
+def _rollup_monthly(
+    db: Session,
+    income_type: str,
+    year: Optional[int] = None,
+    account_id: Optional[str] = None,
+    taxable_only: bool = False
+) -> Dict[str, float]:
+    """Monthly totals ('YYYY-MM' -> amount) for one income type."""
+    query = _rollup_query(
+        db,
+        IncomeMonthlyRollup.year,
+        IncomeMonthlyRollup.month,
+        func.sum(IncomeMonthlyRollup.total_amount).label('total')
+    ).filter(
+        IncomeMonthlyRollup.income_type == income_type
+    )
+
+    if year:
+        query = query.filter(IncomeMonthlyRollup.year == year)
+    if account_id:
+        query = query.filter(IncomeMonthlyRollup.account_id == account_id)
+    if taxable_only:
+        query = query.filter(~non_taxable_account_type(InvestmentAccount.account_type))
+
+    query = query.group_by(
+        IncomeMonthlyRollup.year, IncomeMonthlyRollup.month
+    ).having(
+        func.sum(IncomeMonthlyRollup.transaction_count) > 0
+    ).order_by(IncomeMonthlyRollup.year, IncomeMonthlyRollup.month)
+
+    return {_month_key(row.year, row.month): float(row.total or 0) for row in query.all()}
 
 
 def get_options_income_summary(
@@ -33,38 +120,7 @@ def get_options_income_summary(
     Returns:
         Dict with total_income, transaction_count, and monthly breakdown
     """
-    # Base query for STO/BTC transactions
-    query = db.query(
-        func.sum(InvestmentTransaction.amount).label('total'),
-        func.count(InvestmentTransaction.id).label('count')
-    ).join(
-        InvestmentAccount,
-        and_(
-            InvestmentTransaction.account_id == InvestmentAccount.account_id,
-            InvestmentTransaction.source == InvestmentAccount.source
-        )
-    ).filter(
-        InvestmentTransaction.transaction_type.in_(['STO', 'BTC']),
-    )
-    
-    # Apply filters
-    if year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) == year)
-    if account_id:
-        query = query.filter(InvestmentTransaction.account_id == account_id)
-    
-    result = query.first()
-    total = float(result.total or 0)
-    count = result.count or 0
-    
-    return {
-        'total_income': total,
-        'transaction_count': count
-    }
-
-
-# Account types that are tax-advantaged (not taxable)
-TAX_ADVANTAGED_ACCOUNT_TYPES = ['ira', 'roth_ira', 'retirement']
+    return _rollup_summary(db, 'options', year=year, account_id=account_id)
 
 
 def get_options_income_monthly(
@@ -82,29 +138,7 @@ def get_options_income_monthly(
     Returns:
         Dict mapping 'YYYY-MM' to total amount
     """
-    query = db.query(
-        func.to_char(InvestmentTransaction.transaction_date, 'YYYY-MM').label('month'),
-        func.sum(InvestmentTransaction.amount).label('total')
-    ).join(
-        InvestmentAccount,
-        and_(
-            InvestmentTransaction.account_id == InvestmentAccount.account_id,
-            InvestmentTransaction.source == InvestmentAccount.source
-        )
-    ).filter(
-        InvestmentTransaction.transaction_type.in_(['STO', 'BTC']),
-    )
-
-    if year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) == year)
-    if account_id:
-        query = query.filter(InvestmentTransaction.account_id == account_id)
-    if taxable_only:
-        query = query.filter(~InvestmentAccount.account_type.in_(TAX_ADVANTAGED_ACCOUNT_TYPES))
-
-    query = query.group_by('month').order_by('month')
-
-    return {row.month: float(row.total or 0) for row in query.all()}
+    return _rollup_monthly(db, 'options', year=year, account_id=account_id, taxable_only=taxable_only)
 
 
 def get_options_income_by_account(
@@ -155,42 +189,7 @@ def get_options_transactions(
     Returns a list of transaction dicts with date, symbol, description, 
     trans_code, quantity, amount, and account fields.
     """
-    query = db.query(
-        InvestmentTransaction.transaction_date,
-        InvestmentTransaction.symbol,
-        InvestmentTransaction.description,
-        InvestmentTransaction.transaction_type,
-        InvestmentTransaction.quantity,
-        InvestmentTransaction.amount,
-        InvestmentAccount.account_name
-    ).join(
-        InvestmentAccount,
-        and_(
-            InvestmentTransaction.account_id == InvestmentAccount.account_id,
-            InvestmentTransaction.source == InvestmentAccount.source
-        )
-    ).filter(
-        InvestmentTransaction.transaction_type.in_(['STO', 'BTC', 'OEXP'])
-    )
-    
-    if year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) == year)
-    
-    query = query.order_by(InvestmentTransaction.transaction_date.desc()).limit(limit)
-    
-    results = []
-    for row in query.all():
-        results.append({
-            'date': row.transaction_date.isoformat() if row.transaction_date else None,
-            'symbol': row.symbol or '',
-            'description': row.description or '',
-            'trans_code': row.transaction_type or '',
-            'quantity': int(row.quantity) if row.quantity else 0,
-            'amount': float(row.amount) if row.amount else 0,
-            'account': row.account_name or ''
-        })
-    
-    return results
+    return get_income_transactions_page(db, 'options', TransactionFilter.build(year=year), limit=limit).items
 
 
 def get_dividend_income_summary(
@@ -199,30 +198,7 @@ def get_dividend_income_summary(
     account_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """Get dividend income summary from database."""
-    query = db.query(
-        func.sum(InvestmentTransaction.amount).label('total'),
-        func.count(InvestmentTransaction.id).label('count')
-    ).join(
-        InvestmentAccount,
-        and_(
-            InvestmentTransaction.account_id == InvestmentAccount.account_id,
-            InvestmentTransaction.source == InvestmentAccount.source
-        )
-    ).filter(
-        InvestmentTransaction.transaction_type.in_(['DIVIDEND', 'CDIV', 'QUAL DIV REINVEST', 'REINVEST DIVIDEND', 'CASH DIVIDEND', 'QUALIFIED DIVIDEND']),
-    )
-    
-    if year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) == year)
-    if account_id:
-        query = query.filter(InvestmentTransaction.account_id == account_id)
-    
-    result = query.first()
-    
-    return {
-        'total_income': float(result.total or 0),
-        'transaction_count': result.count or 0
-    }
+    return _rollup_summary(db, 'dividends', year=year, account_id=account_id)
 
 
 def get_dividend_income_monthly(
@@ -236,29 +212,7 @@ def get_dividend_income_monthly(
     Args:
         taxable_only: If True, exclude IRA, Roth IRA, and retirement accounts
     """
-    query = db.query(
-        func.to_char(InvestmentTransaction.transaction_date, 'YYYY-MM').label('month'),
-        func.sum(InvestmentTransaction.amount).label('total')
-    ).join(
-        InvestmentAccount,
-        and_(
-            InvestmentTransaction.account_id == InvestmentAccount.account_id,
-            InvestmentTransaction.source == InvestmentAccount.source
-        )
-    ).filter(
-        InvestmentTransaction.transaction_type.in_(['DIVIDEND', 'CDIV', 'QUAL DIV REINVEST', 'REINVEST DIVIDEND', 'CASH DIVIDEND', 'QUALIFIED DIVIDEND']),
-    )
-
-    if year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) == year)
-    if account_id:
-        query = query.filter(InvestmentTransaction.account_id == account_id)
-    if taxable_only:
-        query = query.filter(~InvestmentAccount.account_type.in_(TAX_ADVANTAGED_ACCOUNT_TYPES))
-
-    query = query.group_by('month').order_by('month')
-
-    return {row.month: float(row.total or 0) for row in query.all()}
+    return _rollup_monthly(db, 'dividends', year=year, account_id=account_id, taxable_only=taxable_only)
 
 
 def get_dividend_income_by_account(
@@ -296,30 +250,7 @@ def get_interest_income_summary(
     account_id: Optional[str] = None
 ) -> Dict[str, Any]:
     """Get interest income summary from database."""
-    query = db.query(
-        func.sum(InvestmentTransaction.amount).label('total'),
-        func.count(InvestmentTransaction.id).label('count')
-    ).join(
-        InvestmentAccount,
-        and_(
-            InvestmentTransaction.account_id == InvestmentAccount.account_id,
-            InvestmentTransaction.source == InvestmentAccount.source
-        )
-    ).filter(
-        InvestmentTransaction.transaction_type.in_(['INTEREST', 'INT', 'BANK INTEREST', 'BOND INTEREST']),
-    )
-    
-    if year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) == year)
-    if account_id:
-        query = query.filter(InvestmentTransaction.account_id == account_id)
-    
-    result = query.first()
-    
-    return {
-        'total_income': float(result.total or 0),
-        'transaction_count': result.count or 0
-    }
+    return _rollup_summary(db, 'interest', year=year, account_id=account_id)
 
 
 def get_interest_income_monthly(
@@ -333,29 +264,7 @@ def get_interest_income_monthly(
     Args:
         taxable_only: If True, exclude IRA, Roth IRA, and retirement accounts
     """
-    query = db.query(
-        func.to_char(InvestmentTransaction.transaction_date, 'YYYY-MM').label('month'),
-        func.sum(InvestmentTransaction.amount).label('total')
-    ).join(
-        InvestmentAccount,
-        and_(
-            InvestmentTransaction.account_id == InvestmentAccount.account_id,
-            InvestmentTransaction.source == InvestmentAccount.source
-        )
-    ).filter(
-        InvestmentTransaction.transaction_type.in_(['INTEREST', 'INT', 'BANK INTEREST', 'BOND INTEREST']),
-    )
-
-    if year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) == year)
-    if account_id:
-        query = query.filter(InvestmentTransaction.account_id == account_id)
-    if taxable_only:
-        query = query.filter(~InvestmentAccount.account_type.in_(TAX_ADVANTAGED_ACCOUNT_TYPES))
-
-    query = query.group_by('month').order_by('month')
-
-    return {row.month: float(row.total or 0) for row in query.all()}
+    return _rollup_monthly(db, 'interest', year=year, account_id=account_id, taxable_only=taxable_only)
 
 
 def get_interest_income_by_account(
@@ -395,36 +304,7 @@ def get_dividend_transactions(
     """
     Get dividend transactions ordered by date descending.
     """
-    query = db.query(
-        InvestmentTransaction.transaction_date,
-        InvestmentTransaction.symbol,
-        InvestmentTransaction.amount,
-        InvestmentAccount.account_name
-    ).join(
-        InvestmentAccount,
-        and_(
-            InvestmentTransaction.account_id == InvestmentAccount.account_id,
-            InvestmentTransaction.source == InvestmentAccount.source
-        )
-    ).filter(
-        InvestmentTransaction.transaction_type.in_(['DIVIDEND', 'CDIV', 'QUAL DIV REINVEST', 'REINVEST DIVIDEND', 'CASH DIVIDEND', 'QUALIFIED DIVIDEND']),
-    )
-    
-    if year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) == year)
-    
-    query = query.order_by(InvestmentTransaction.transaction_date.desc()).limit(limit)
-    
-    results = []
-    for row in query.all():
-        results.append({
-            'date': row.transaction_date.isoformat() if row.transaction_date else None,
-            'symbol': row.symbol or '',
-            'amount': float(row.amount) if row.amount else 0,
-            'account': row.account_name or ''
-        })
-    
-    return results
+    return get_income_transactions_page(db, 'dividends', TransactionFilter.build(year=year), limit=limit).items
 
 
 def get_dividend_by_symbol(
@@ -444,7 +324,7 @@ def get_dividend_by_symbol(
             InvestmentTransaction.source == InvestmentAccount.source
         )
     ).filter(
-        InvestmentTransaction.transaction_type.in_(['DIVIDEND', 'CDIV', 'QUAL DIV REINVEST', 'REINVEST DIVIDEND', 'CASH DIVIDEND', 'QUALIFIED DIVIDEND']),
+        InvestmentTransaction.transaction_type.in_(INCOME_TRANSACTION_TYPES['dividends']),
         InvestmentTransaction.symbol.isnot(None),
     )
     
@@ -464,9 +344,84 @@ def get_interest_transactions(
     """
     Get interest transactions ordered by date descending.
     """
+    return get_income_transactions_page(db, 'interest', TransactionFilter.build(year=year), limit=limit).items
+
+
+# =============================================================================
+# PAGINATED TRANSACTION LISTS
+# =============================================================================
+# The options/dividend/interest lists page through transactions with keyset
+# cursors on (transaction_date, id) (see investments/transaction_query.py).
+
+# Transaction types listed as options transactions
+OPTIONS_LIST_TYPES = ['STO', 'BTC', 'OEXP']
+
+
+def _options_row(row) -> Dict[str, Any]:
+    return {
+        'id': row.id,
+        'date': row.transaction_date.isoformat() if row.transaction_date else None,
+        'symbol': row.symbol or '',
+        'description': row.description or '',
+        'trans_code': row.transaction_type or '',
+        'quantity': int(row.quantity) if row.quantity else 0,
+        'amount': float(row.amount) if row.amount else 0,
+        'account': row.account_name or ''
+    }
+
+
+def _dividend_row(row) -> Dict[str, Any]:
+    return {
+        'id': row.id,
+        'date': row.transaction_date.isoformat() if row.transaction_date else None,
+        'symbol': row.symbol or '',
+        'amount': float(row.amount) if row.amount else 0,
+        'account': row.account_name or ''
+    }
+
+
+def _interest_row(row) -> Dict[str, Any]:
+    return {
+        'id': row.id,
+        'date': row.transaction_date.isoformat() if row.transaction_date else None,
+        'description': row.description or 'Interest',
+        'amount': float(row.amount) if row.amount else 0,
+        'account': row.account_name or '',
+        'source': row.source or ''
+    }
+
+
+# income type -> (transaction types listed, row serializer)
+TRANSACTION_LISTS = {
+    'options': (OPTIONS_LIST_TYPES, _options_row),
+    'dividends': (INCOME_TRANSACTION_TYPES['dividends'], _dividend_row),
+    'interest': (INCOME_TRANSACTION_TYPES['interest'], _interest_row),
+}
+
+
+def get_income_transactions_page(
+    db: Session,
+    income_type: str,
+    spec: Optional[TransactionFilter] = None,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    include_total: bool = False
+) -> TransactionPage:
+    """
+    One page of options, dividend or interest transactions, newest first.
+    
+    `spec` may narrow accounts, symbols, types (within the income type's
+    types) and dates. Raises ValueError for a malformed cursor.
+    """
+    types, serialize = TRANSACTION_LISTS[income_type]
+    spec = (spec or TransactionFilter()).restrict_types(types)
     query = db.query(
+        InvestmentTransaction.id,
         InvestmentTransaction.transaction_date,
+        InvestmentTransaction.symbol,
         InvestmentTransaction.description,
+        InvestmentTransaction.transaction_type,
+        InvestmentTransaction.quantity,
         InvestmentTransaction.amount,
         InvestmentAccount.account_name,
         InvestmentAccount.source
@@ -476,42 +431,29 @@ def get_interest_transactions(
             InvestmentTransaction.account_id == InvestmentAccount.account_id,
             InvestmentTransaction.source == InvestmentAccount.source
         )
-    ).filter(
-        InvestmentTransaction.transaction_type.in_(['INTEREST', 'INT', 'BANK INTEREST', 'BOND INTEREST']),
     )
-    
-    if year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) == year)
-    
-    query = query.order_by(InvestmentTransaction.transaction_date.desc()).limit(limit)
-    
-    results = []
-    for row in query.all():
-        results.append({
-            'date': row.transaction_date.isoformat() if row.transaction_date else None,
-            'description': row.description or 'Interest',
-            'amount': float(row.amount) if row.amount else 0,
-            'account': row.account_name or '',
-            'source': row.source or ''
-        })
-    
-    return results
+    if not spec.transaction_types:
+        # Only types outside this income type were asked for
+        return TransactionPage(total=0 if include_total else None)
+    return paginate(query, spec, serialize, cursor=cursor, limit=limit, include_total=include_total)
 
 
 def get_income_summary(
     db: Session,
-    year: Optional[int] = None
+    year: Optional[int] = None,
+    aggregate: Optional[IncomeAggregate] = None
 ) -> Dict[str, Any]:
     """
     Get complete income summary across all types.
 
-    This is the SINGLE source of truth for income totals.
+    This is the SINGLE source of truth for income totals. All accounts and
+    categories come from one grouped query (see income_aggregation.py);
+    pass `aggregate` to reuse one the caller already has.
     """
     from app.modules.income.rental_service import get_rental_service
 
-    options = get_options_income_summary(db, year=year)
-    dividends = get_dividend_income_summary(db, year=year)
-    interest = get_interest_income_summary(db, year=year)
+    if aggregate is None:
+        aggregate = aggregate_income(db, year=year)
 
     # Get rental income from rental service
     rental_income = 0.0
@@ -525,40 +467,32 @@ def get_income_summary(
     except Exception as e:
         print(f"Error loading rental income: {e}")
 
-    # Get account-level breakdown
-    accounts = db.query(InvestmentAccount).filter(
-        InvestmentAccount.is_active == 'Y'
-    ).all()
-
+    # Account-level breakdown (active accounts only)
     account_summaries = []
-    for account in accounts:
-        acc_options = get_options_income_summary(db, year=year, account_id=account.account_id)
-        acc_dividends = get_dividend_income_summary(db, year=year, account_id=account.account_id)
-        acc_interest = get_interest_income_summary(db, year=year, account_id=account.account_id)
-
-        # Derive owner from account_name
-        owner = account.account_name.split("'")[0] if account.account_name and "'" in account.account_name else 'Unknown'
-
+    for account in aggregate.by_account(active_only=True):
         account_summaries.append({
             'name': account.account_name,
             'account_id': account.account_id,
-            'owner': owner,
+            'owner': account.owner,
             'account_type': account.account_type or 'unknown',
-            'options_income': acc_options['total_income'],
-            'dividend_income': acc_dividends['total_income'],
-            'interest_income': acc_interest['total_income'],
-            'total': acc_options['total_income'] + acc_dividends['total_income'] + acc_interest['total_income']
+            'options_income': account.options_income,
+            'dividend_income': account.dividend_income,
+            'interest_income': account.interest_income,
+            'total': account.investment_income
         })
 
     # Sort by total descending
     account_summaries.sort(key=lambda x: x['total'], reverse=True)
 
-    total_income = options['total_income'] + dividends['total_income'] + interest['total_income'] + rental_income
+    options_income = aggregate.total('options')
+    dividend_income = aggregate.total('dividends')
+    interest_income = aggregate.total('interest')
+    total_income = options_income + dividend_income + interest_income + rental_income
 
     return {
-        'options_income': options['total_income'],
-        'dividend_income': dividends['total_income'],
-        'interest_income': interest['total_income'],
+        'options_income': options_income,
+        'dividend_income': dividend_income,
+        'interest_income': interest_income,
         'rental_income': rental_income,
         'total_income': total_income,
         'accounts': account_summaries
@@ -582,41 +516,37 @@ def get_monthly_chart_data(
     Returns:
         List of {month: 'YYYY-MM', value: float, year: int, formatted: str}
     """
-    type_map = {
-        'options': ['STO', 'BTC'],
-        'dividends': ['DIVIDEND', 'CDIV', 'QUAL DIV REINVEST', 'REINVEST DIVIDEND', 'CASH DIVIDEND', 'QUALIFIED DIVIDEND'],
-        'interest': ['INTEREST', 'INT', 'BANK INTEREST', 'BOND INTEREST']
-    }
-    
-    transaction_types = type_map.get(income_type, [])
-    if not transaction_types:
+    if income_type not in INCOME_TRANSACTION_TYPES:
         return []
     
     query = db.query(
-        func.to_char(InvestmentTransaction.transaction_date, 'YYYY-MM').label('month'),
-        func.sum(InvestmentTransaction.amount).label('total')
+        IncomeMonthlyRollup.year,
+        IncomeMonthlyRollup.month,
+        func.sum(IncomeMonthlyRollup.total_amount).label('total')
     ).filter(
-        InvestmentTransaction.transaction_type.in_(transaction_types)
+        IncomeMonthlyRollup.income_type == income_type
     )
     
     if start_year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) >= start_year)
+        query = query.filter(IncomeMonthlyRollup.year >= start_year)
     if end_year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) <= end_year)
+        query = query.filter(IncomeMonthlyRollup.year <= end_year)
     
-    query = query.group_by('month').order_by('month')
+    query = query.group_by(
+        IncomeMonthlyRollup.year, IncomeMonthlyRollup.month
+    ).having(
+        func.sum(IncomeMonthlyRollup.transaction_count) > 0
+    ).order_by(IncomeMonthlyRollup.year, IncomeMonthlyRollup.month)
     
+    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
     result = []
     for row in query.all():
-        year = int(row.month.split('-')[0])
-        month_num = int(row.month.split('-')[1])
-        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
-        formatted = f"{month_names[month_num - 1]} {year}"
+        formatted = f"{month_names[row.month - 1]} {row.year}"
         
         result.append({
-            'month': row.month,
+            'month': _month_key(row.year, row.month),
             'value': float(row.total or 0),
-            'year': year,
+            'year': row.year,
             'formatted': formatted
         })
     
@@ -630,8 +560,17 @@ def get_monthly_chart_data(
 # tax-advantaged accounts (IRA, Roth IRA, 401k, HSA, retirement accounts)
 # which are either tax-deferred or tax-free.
 
-# Account types that are NOT taxable in the current year
-NON_TAXABLE_ACCOUNT_TYPES = ['ira', 'roth_ira', 'traditional_ira', '401k', 'hsa', 'retirement']
+# Account types that are NOT taxable in the current year: NON_TAXABLE_ACCOUNT_TYPES
+# (investments/account_types.py). Each function below is one grouped rollup
+# query; use get_taxable_income_summary() when more than one total is needed.
+
+
+def _taxable_totals(aggregate: IncomeAggregate, category: str) -> Tuple[float, int]:
+    """Total and count for a category over active taxable accounts."""
+    return (
+        aggregate.total(category, taxable_only=True, active_only=True),
+        aggregate.count(category, taxable_only=True, active_only=True),
+    )
 
 
 def get_taxable_options_income(
@@ -650,30 +589,8 @@ def get_taxable_options_income(
     Returns:
         Dict with total_income and transaction_count
     """
-    query = db.query(
-        func.sum(InvestmentTransaction.amount).label('total'),
-        func.count(InvestmentTransaction.id).label('count')
-    ).join(
-        InvestmentAccount,
-        and_(
-            InvestmentTransaction.account_id == InvestmentAccount.account_id,
-            InvestmentTransaction.source == InvestmentAccount.source
-        )
-    ).filter(
-        InvestmentTransaction.transaction_type.in_(['STO', 'BTC']),
-        InvestmentAccount.is_active == 'Y',
-        ~InvestmentAccount.account_type.in_(NON_TAXABLE_ACCOUNT_TYPES)
-    )
-    
-    if year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) == year)
-    
-    result = query.first()
-    
-    return {
-        'total_income': float(result.total or 0),
-        'transaction_count': result.count or 0
-    }
+    total, count = _taxable_totals(aggregate_income(db, year=year), 'options')
+    return {'total_income': total, 'transaction_count': count}
 
 
 def get_taxable_dividend_income(
@@ -685,30 +602,8 @@ def get_taxable_dividend_income(
     
     Used for tax forecasting - retirement account income is tax-deferred or tax-free.
     """
-    query = db.query(
-        func.sum(InvestmentTransaction.amount).label('total'),
-        func.count(InvestmentTransaction.id).label('count')
-    ).join(
-        InvestmentAccount,
-        and_(
-            InvestmentTransaction.account_id == InvestmentAccount.account_id,
-            InvestmentTransaction.source == InvestmentAccount.source
-        )
-    ).filter(
-        InvestmentTransaction.transaction_type.in_(['DIVIDEND', 'CDIV', 'QUAL DIV REINVEST', 'REINVEST DIVIDEND', 'CASH DIVIDEND', 'QUALIFIED DIVIDEND']),
-        InvestmentAccount.is_active == 'Y',
-        ~InvestmentAccount.account_type.in_(NON_TAXABLE_ACCOUNT_TYPES)
-    )
-    
-    if year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) == year)
-    
-    result = query.first()
-    
-    return {
-        'total_income': float(result.total or 0),
-        'transaction_count': result.count or 0
-    }
+    total, count = _taxable_totals(aggregate_income(db, year=year), 'dividends')
+    return {'total_income': total, 'transaction_count': count}
 
 
 def get_taxable_interest_income(
@@ -720,30 +615,8 @@ def get_taxable_interest_income(
     
     Used for tax forecasting - retirement account income is tax-deferred or tax-free.
     """
-    query = db.query(
-        func.sum(InvestmentTransaction.amount).label('total'),
-        func.count(InvestmentTransaction.id).label('count')
-    ).join(
-        InvestmentAccount,
-        and_(
-            InvestmentTransaction.account_id == InvestmentAccount.account_id,
-            InvestmentTransaction.source == InvestmentAccount.source
-        )
-    ).filter(
-        InvestmentTransaction.transaction_type.in_(['INTEREST', 'INT', 'BANK INTEREST', 'BOND INTEREST']),
-        InvestmentAccount.is_active == 'Y',
-        ~InvestmentAccount.account_type.in_(NON_TAXABLE_ACCOUNT_TYPES)
-    )
-    
-    if year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) == year)
-    
-    result = query.first()
-    
-    return {
-        'total_income': float(result.total or 0),
-        'transaction_count': result.count or 0
-    }
+    total, count = _taxable_totals(aggregate_income(db, year=year), 'interest')
+    return {'total_income': total, 'transaction_count': count}
 
 
 def get_taxable_stock_sales(
@@ -756,59 +629,37 @@ def get_taxable_stock_sales(
     Used for capital gains calculation in tax forecasting.
     Sales in retirement accounts don't generate taxable capital gains.
     """
-    query = db.query(
-        func.sum(InvestmentTransaction.amount).label('total'),
-        func.count(InvestmentTransaction.id).label('count')
-    ).join(
-        InvestmentAccount,
-        and_(
-            InvestmentTransaction.account_id == InvestmentAccount.account_id,
-            InvestmentTransaction.source == InvestmentAccount.source
-        )
-    ).filter(
-        InvestmentTransaction.transaction_type.in_(['SELL', 'SOLD']),
-        InvestmentAccount.is_active == 'Y',
-        ~InvestmentAccount.account_type.in_(NON_TAXABLE_ACCOUNT_TYPES)
-    )
-    
-    if year:
-        query = query.filter(extract('year', InvestmentTransaction.transaction_date) == year)
-    
-    result = query.first()
-    
-    return {
-        'total_proceeds': float(result.total or 0),
-        'transaction_count': result.count or 0
-    }
+    total, count = _taxable_totals(aggregate_income(db, year=year), 'stock_sales')
+    return {'total_proceeds': total, 'transaction_count': count}
 
 
 def get_taxable_income_summary(
     db: Session,
-    year: Optional[int] = None
+    year: Optional[int] = None,
+    aggregate: Optional[IncomeAggregate] = None
 ) -> Dict[str, Any]:
     """
     Get complete TAXABLE income summary for tax forecasting.
     
     Only includes income from taxable brokerage accounts.
     Excludes all retirement accounts (IRA, Roth IRA, 401k, HSA).
+    Pass `aggregate` to reuse a grouped query the caller already ran.
     
     Returns:
         Dict with options_income, dividend_income, interest_income, stock_proceeds
     """
-    options = get_taxable_options_income(db, year=year)
-    dividends = get_taxable_dividend_income(db, year=year)
-    interest = get_taxable_interest_income(db, year=year)
-    sales = get_taxable_stock_sales(db, year=year)
+    if aggregate is None:
+        aggregate = aggregate_income(db, year=year)
+
+    options, _ = _taxable_totals(aggregate, 'options')
+    dividends, _ = _taxable_totals(aggregate, 'dividends')
+    interest, _ = _taxable_totals(aggregate, 'interest')
+    proceeds, _ = _taxable_totals(aggregate, 'stock_sales')
     
     return {
-        'options_income': options['total_income'],
-        'dividend_income': dividends['total_income'],
-        'interest_income': interest['total_income'],
-        'stock_proceeds': sales['total_proceeds'],
-        'total_investment_income': (
-            options['total_income'] + 
-            dividends['total_income'] + 
-            interest['total_income']
-        )
+        'options_income': options,
+        'dividend_income': dividends,
+        'interest_income': interest,
+        'stock_proceeds': proceeds,
+        'total_investment_income': options + dividends + interest
     }
-
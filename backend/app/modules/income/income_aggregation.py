@@ -0,0 +1,201 @@
+"""
+Grouped Income Aggregation
+
+One query over income_monthly_rollup computes every income category for
+every investment account:
+
+    SELECT account..., SUM(CASE WHEN income_type = ... THEN total_amount END) ...
+    FROM investment_accounts
+    LEFT JOIN income_monthly_rollup
+      ON (account_id, source) AND year = :year
+    GROUP BY account...
+
+The income summary used to issue three queries per account and the taxable
+summary four more (plus three per account for the tax forecast breakdown),
+each aggregating investment_transactions with extract('year').
+
+aggregate_income() returns an IncomeAggregate that the income, dashboard,
+tax and buy-borrow-die endpoints slice in Python (all accounts, active,
+taxable, per month) instead of re-querying.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import Session
+
+from app.modules.income.income_rollup import ROLLUP_TRANSACTION_TYPES
+from app.modules.income.models import IncomeMonthlyRollup
+from app.modules.investments.account_types import is_taxable_account_type
+from app.modules.investments.models import InvestmentAccount
+
+
+# category -> transaction_type codes; every category is an income_type of the rollup
+INCOME_CATEGORIES: Dict[str, List[str]] = ROLLUP_TRANSACTION_TYPES
+
+
+@dataclass
+class AccountIncome:
+    """Income totals for one account (and month, when aggregated by month)."""
+    account_id: str
+    source: str
+    account_name: Optional[str]
+    account_type: Optional[str]
+    is_active: bool
+    month: Optional[str] = None  # 'YYYY-MM' when aggregated by month
+    amounts: Dict[str, float] = field(default_factory=dict)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def owner(self) -> str:
+        """Owner derived from account_name, e.g. "Neel's Brokerage" -> "Neel"."""
+        if self.account_name and "'" in self.account_name:
+            return self.account_name.split("'")[0]
+        return 'Unknown'
+
+    @property
+    def is_taxable(self) -> bool:
+        return is_taxable_account_type(self.account_type)
+
+    def amount(self, category: str) -> float:
+        return self.amounts.get(category, 0.0)
+
+    @property
+    def options_income(self) -> float:
+        return self.amount('options')
+
+    @property
+    def dividend_income(self) -> float:
+        return self.amount('dividends')
+
+    @property
+    def interest_income(self) -> float:
+        return self.amount('interest')
+
+    @property
+    def stock_lending(self) -> float:
+        return self.amount('stock_lending')
+
+    @property
+    def stock_proceeds(self) -> float:
+        return self.amount('stock_sales')
+
+    @property
+    def investment_income(self) -> float:
+        """Options + dividends + interest."""
+        return self.options_income + self.dividend_income + self.interest_income
+
+
+@dataclass
+class IncomeAggregate:
+    """Result of aggregate_income(); filter with taxable_only / active_only."""
+    year: Optional[int]
+    rows: List[AccountIncome]
+
+    def select(self, taxable_only: bool = False, active_only: bool = False) -> List[AccountIncome]:
+        return [
+            row for row in self.rows
+            if (not taxable_only or row.is_taxable) and (not active_only or row.is_active)
+        ]
+
+    def total(self, category: str, taxable_only: bool = False, active_only: bool = False) -> float:
+        return sum(row.amount(category) for row in self.select(taxable_only, active_only))
+
+    def count(self, category: str, taxable_only: bool = False, active_only: bool = False) -> int:
+        return sum(row.counts.get(category, 0) for row in self.select(taxable_only, active_only))
+
+    def by_account(self, taxable_only: bool = False, active_only: bool = False) -> List[AccountIncome]:
+        """One row per account, summing months when aggregated by month."""
+        merged: Dict[Tuple[str, str], AccountIncome] = {}
+        for row in self.select(taxable_only, active_only):
+            key = (row.source, row.account_id)
+            account = merged.get(key)
+            if account is None:
+                account = merged[key] = AccountIncome(
+                    account_id=row.account_id,
+                    source=row.source,
+                    account_name=row.account_name,
+                    account_type=row.account_type,
+                    is_active=row.is_active,
+                )
+            for category, value in row.amounts.items():
+                account.amounts[category] = account.amounts.get(category, 0.0) + value
+            for category, value in row.counts.items():
+                account.counts[category] = account.counts.get(category, 0) + value
+        return list(merged.values())
+
+    def monthly(self, category: str, taxable_only: bool = False, active_only: bool = False) -> Dict[str, float]:
+        """'YYYY-MM' -> amount; requires aggregate_income(..., by_month=True)."""
+        result: Dict[str, float] = {}
+        for row in self.select(taxable_only, active_only):
+            if row.month and row.counts.get(category):
+                result[row.month] = result.get(row.month, 0.0) + row.amount(category)
+        return dict(sorted(result.items()))
+
+
+def aggregate_income(
+    db: Session,
+    year: Optional[int] = None,
+    by_month: bool = False
+) -> IncomeAggregate:
+    """
+    Aggregate all income categories for all investment accounts in one query.
+
+    Args:
+        db: Database session
+        year: Optional year filter (None = all years)
+        by_month: Also group by rollup month
+
+    Returns:
+        IncomeAggregate with one row per account (per month if by_month).
+        Accounts without rollup rows are included with zero totals.
+    """
+    rollup = IncomeMonthlyRollup
+
+    join_on = [
+        rollup.account_id == InvestmentAccount.account_id,
+        rollup.source == InvestmentAccount.source,
+    ]
+    if year:
+        join_on.append(rollup.year == year)
+
+    group_columns = [
+        InvestmentAccount.account_id,
+        InvestmentAccount.source,
+        InvestmentAccount.account_name,
+        InvestmentAccount.account_type,
+        InvestmentAccount.is_active,
+    ]
+    if by_month:
+        group_columns += [rollup.year, rollup.month]
+
+    aggregates = []
+    for category in INCOME_CATEGORIES:
+        in_category = rollup.income_type == category
+        aggregates.append(func.sum(case((in_category, rollup.total_amount))).label(f'{category}_amount'))
+        aggregates.append(func.sum(case((in_category, rollup.transaction_count))).label(f'{category}_count'))
+
+    query = db.query(*group_columns, *aggregates).select_from(
+        InvestmentAccount
+    ).outerjoin(
+        rollup, and_(*join_on)
+    ).group_by(*group_columns)
+
+    rows = []
+    for row in query.all():
+        month = None
+        if by_month and row.year is not None:
+            month = f"{row.year:04d}-{row.month:02d}"
+        rows.append(AccountIncome(
+            account_id=row.account_id,
+            source=row.source,
+            account_name=row.account_name,
+            account_type=row.account_type,
+            is_active=row.is_active == 'Y',
+            month=month,
+            amounts={c: float(getattr(row, f'{c}_amount') or 0) for c in INCOME_CATEGORIES},
+            counts={c: int(getattr(row, f'{c}_count') or 0) for c in INCOME_CATEGORIES},
+        ))
+
+    return IncomeAggregate(year=year, rows=rows)
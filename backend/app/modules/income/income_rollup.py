@@ -0,0 +1,197 @@
+"""
+Income Monthly Rollup
+
+Maintains the `income_monthly_rollup` fact table: total amount and
+transaction count per (source, account_id, income_type, year, month) for
+options, dividend and interest transactions, plus stock lending and stock
+sale proceeds for the taxable-income summaries.
+
+The income summaries used to aggregate investment_transactions with
+extract('year') / to_char('YYYY-MM') on every request, which cannot use an
+index and grows with history. They now sum a few rollup rows instead.
+
+Writers call:
+- record_income_transaction() right after adding an InvestmentTransaction
+  (same transaction; other types are ignored)
+- record_income_transaction(..., sign=-1) before moving or deleting one
+- record_income_transactions() once for a bulk-inserted batch
+
+rebuild_income_rollup() is the backfill/repair path: it recomputes the whole
+table from investment_transactions with a single INSERT ... SELECT.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from sqlalchemy import case, extract, func, select, Integer, cast
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from app.modules.income.models import IncomeMonthlyRollup
+from app.modules.investments.models import InvestmentTransaction
+
+logger = logging.getLogger(__name__)
+
+
+# income_type -> transaction_type codes, as matched by the income queries
+INCOME_TRANSACTION_TYPES: Dict[str, List[str]] = {
+    'options': ['STO', 'BTC'],
+    'dividends': ['DIVIDEND', 'CDIV', 'QUAL DIV REINVEST', 'REINVEST DIVIDEND', 'CASH DIVIDEND', 'QUALIFIED DIVIDEND'],
+    'interest': ['INTEREST', 'INT', 'BANK INTEREST', 'BOND INTEREST'],
+}
+
+# Every rolled-up income_type; the last two are not part of total income
+ROLLUP_TRANSACTION_TYPES: Dict[str, List[str]] = {
+    **INCOME_TRANSACTION_TYPES,
+    'stock_lending': ['SLIP'],
+    'stock_sales': ['SELL', 'SOLD'],
+}
+
+_INCOME_TYPE_BY_CODE: Dict[str, str] = {
+    code: income_type
+    for income_type, codes in ROLLUP_TRANSACTION_TYPES.items()
+    for code in codes
+}
+
+
+def income_type_for(transaction_type: Optional[str]) -> Optional[str]:
+    """Rollup income_type of a transaction type, or None if it is not rolled up."""
+    return _INCOME_TYPE_BY_CODE.get(transaction_type or '')
+
+
+def record_income_transaction(db: Session, txn: InvestmentTransaction, sign: int = 1) -> bool:
+    """
+    Add `txn` to (sign=1) or remove it from (sign=-1) its rollup month.
+
+    Upserts with an additive conflict clause so concurrent writers never lose
+    an update. Does not commit - the caller's transaction covers both the
+    transaction write and this update. Returns False for types that are not rolled up.
+    """
+    income_type = income_type_for(txn.transaction_type)
+    if not income_type or txn.transaction_date is None:
+        return False
+
+    amount = Decimal(str(txn.amount or 0)) * sign
+    insert_stmt = insert(IncomeMonthlyRollup).values(
+        source=txn.source,
+        account_id=txn.account_id,
+        income_type=income_type,
+        year=txn.transaction_date.year,
+        month=txn.transaction_date.month,
+        total_amount=amount,
+        transaction_count=sign,
+        updated_at=datetime.utcnow(),
+    )
+    table = IncomeMonthlyRollup.__table__
+    stmt = insert_stmt.on_conflict_do_update(
+        index_elements=['source', 'account_id', 'income_type', 'year', 'month'],
+        set_={
+            "total_amount": table.c.total_amount + insert_stmt.excluded.total_amount,
+            "transaction_count": table.c.transaction_count + insert_stmt.excluded.transaction_count,
+            "updated_at": insert_stmt.excluded.updated_at,
+        },
+    )
+    db.execute(stmt)
+    return True
+
+
+def record_income_transactions(db: Session, txns: Iterable[Any], sign: int = 1) -> int:
+    """
+    Batch form of record_income_transaction() for bulk writers.
+
+    Sums the transactions per rollup month first and applies one multi-row
+    additive upsert. `txns` only need the attributes used for the key and
+    amount (ORM rows or RETURNING rows). Returns the number of income rows.
+    """
+    deltas: Dict[Tuple[str, str, str, int, int], List[Decimal]] = {}
+    for txn in txns:
+        income_type = income_type_for(txn.transaction_type)
+        if not income_type or txn.transaction_date is None:
+            continue
+        key = (txn.source, txn.account_id, income_type, txn.transaction_date.year, txn.transaction_date.month)
+        total = deltas.setdefault(key, [Decimal('0'), 0])
+        total[0] += Decimal(str(txn.amount or 0)) * sign
+        total[1] += sign
+
+    if not deltas:
+        return 0
+
+    now = datetime.utcnow()
+    insert_stmt = insert(IncomeMonthlyRollup).values([
+        {
+            "source": source,
+            "account_id": account_id,
+            "income_type": income_type,
+            "year": year,
+            "month": month,
+            "total_amount": amount,
+            "transaction_count": count,
+            "updated_at": now,
+        }
+        for (source, account_id, income_type, year, month), (amount, count) in deltas.items()
+    ])
+    table = IncomeMonthlyRollup.__table__
+    db.execute(insert_stmt.on_conflict_do_update(
+        index_elements=['source', 'account_id', 'income_type', 'year', 'month'],
+        set_={
+            "total_amount": table.c.total_amount + insert_stmt.excluded.total_amount,
+            "transaction_count": table.c.transaction_count + insert_stmt.excluded.transaction_count,
+            "updated_at": insert_stmt.excluded.updated_at,
+        },
+    ))
+    return sum(abs(count) for _amount, count in deltas.values())
+
+
+def rebuild_income_rollup(db: Session) -> Dict[str, Any]:
+    """
+    Recompute income_monthly_rollup from investment_transactions and commit.
+
+    Returns the number of rollup rows and transactions covered.
+    """
+    txn = InvestmentTransaction
+    income_type = case(
+        *[
+            (txn.transaction_type.in_(codes), income_type)
+            for income_type, codes in ROLLUP_TRANSACTION_TYPES.items()
+        ]
+    ).label('income_type')
+    year = cast(extract('year', txn.transaction_date), Integer).label('year')
+    month = cast(extract('month', txn.transaction_date), Integer).label('month')
+
+    source_query = select(
+        txn.source,
+        txn.account_id,
+        income_type,
+        year,
+        month,
+        func.sum(txn.amount),
+        func.count(txn.id),
+        func.now(),
+    ).where(
+        txn.transaction_type.in_(list(_INCOME_TYPE_BY_CODE))
+    ).group_by(
+        txn.source, txn.account_id, income_type, year, month
+    )
+
+    try:
+        db.query(IncomeMonthlyRollup).delete(synchronize_session=False)
+        db.execute(
+            IncomeMonthlyRollup.__table__.insert().from_select(
+                ['source', 'account_id', 'income_type', 'year', 'month',
+                 'total_amount', 'transaction_count', 'updated_at'],
+                source_query
+            )
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    rows, transactions = db.query(
+        func.count(IncomeMonthlyRollup.id),
+        func.coalesce(func.sum(IncomeMonthlyRollup.transaction_count), 0)
+    ).one()
+    logger.info(f"[INCOME_ROLLUP] Rebuilt {rows} rows covering {transactions} transactions")
+    return {"rows": rows, "transactions": int(transactions)}
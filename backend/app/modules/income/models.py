@@ -2,9 +2,12 @@
 Income module database models.
 """
 
-from sqlalchemy import Column, Integer, String, Numeric, Date, Text, UniqueConstraint, ForeignKey, Index, JSON
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, Text, UniqueConstraint, ForeignKey, Index, JSON
 from sqlalchemy.orm import relationship
 
+from app.core.database import Base
 from app.shared.models.base import BaseModel
 
 
@@ -264,3 +267,37 @@ class RetirementContribution(BaseModel):
         Index('idx_retirement_contributions_year', 'tax_year'),
     )
 
+
+class IncomeMonthlyRollup(Base):
+    """
+    Monthly investment income per account and income type.
+    
+    Fact table over investment_transactions for the options, dividend,
+    interest, stock lending and stock sale transaction types (see
+    income_rollup.ROLLUP_TRANSACTION_TYPES).
+    Writers update it in the same transaction as the transaction insert;
+    scripts/rebuild_income_rollup.py recomputes it from scratch.
+    
+    source is part of the key because transactions join to
+    investment_accounts on (account_id, source).
+    """
+    
+    __tablename__ = "income_monthly_rollup"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    source = Column(String(50), nullable=False)
+    account_id = Column(String(100), nullable=False)
+    income_type = Column(String(20), nullable=False)  # 'options', 'dividends', 'interest', 'stock_lending', 'stock_sales'
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)  # 1-12
+    
+    total_amount = Column(Numeric(18, 2), nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('source', 'account_id', 'income_type', 'year', 'month', name='uq_income_monthly_rollup'),
+        Index('idx_imr_type_year_month', 'income_type', 'year', 'month'),
+    )
@@ -0,0 +1,205 @@
+"""
+Single-pass Robinhood activity CSV parser with columnar output.
+
+IncomeService used to read each export twice (once to find the header line,
+again through csv.DictReader) and hand every row to the classifier as a
+dict of strings. Restarts reparsed every file from scratch.
+
+parse_activity_csv() streams the file once through csv.reader: preamble
+rows are skipped until the "Activity Date" header, then each row is parsed
+and appended to typed column buffers (array('i') dates, array('d') amounts
+and prices, an index into the transaction-code table). Rows without a
+transaction code or a parseable date are dropped while streaming.
+
+load_activity() stores the result in a ParseCache entry keyed by the file's
+SHA-256, so a restart loads a compact array dump instead of reparsing; a
+changed export has a new hash and is parsed again.
+
+The columns speed up parsing and restarts; they do not shrink resident
+memory. IncomeService still builds its per-transaction objects from rows(),
+though rows(codes) selects on the code column first, so rows the service
+does not classify (buys, transfers, fees) never become objects.
+"""
+
+import csv
+import math
+import re
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from app.shared.services.parse_cache import MISS, ParseCache, file_sha256
+
+
+# Bump when the parsed layout or parsing rules change
+PARSER_VERSION = '1'
+
+DATE_FORMATS = ('%m/%d/%Y', '%m/%d/%y', '%Y-%m-%d')
+
+_AMOUNT_JUNK = re.compile(r'[$(),]')
+
+_cache: Optional[ParseCache] = None
+
+
+def parse_amount(amount_str: Optional[str]) -> float:
+    """Parse amount string like '$123.45' or '($123.45)' to float."""
+    if not amount_str or amount_str.strip() == '':
+        return 0.0
+
+    amount_str = amount_str.strip()
+
+    # Parentheses mean negative
+    is_negative = '(' in amount_str and ')' in amount_str
+    cleaned = _AMOUNT_JUNK.sub('', amount_str)
+
+    try:
+        value = float(cleaned)
+        return -value if is_negative else value
+    except ValueError:
+        return 0.0
+
+
+def parse_date(date_str: Optional[str]) -> Optional[datetime]:
+    """Parse an activity date (11/21/2025, 11/21/25 or 2025-11-21)."""
+    if not date_str or date_str.strip() == '':
+        return None
+
+    date_str = date_str.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+class ActivityRow(NamedTuple):
+    """One parsed activity row."""
+    date: datetime
+    trans_code: str
+    symbol: str
+    description: str
+    quantity: str  # as exported; callers convert (int for income, Decimal for import)
+    price: Optional[float]
+    amount: float
+
+
+@dataclass
+class ParsedActivity:
+    """A Robinhood activity export as typed column buffers."""
+    codes: List[str] = field(default_factory=list)  # transaction-code table
+    code_index: array = field(default_factory=lambda: array('H'))
+    ordinals: array = field(default_factory=lambda: array('i'))  # date.toordinal()
+    amounts: array = field(default_factory=lambda: array('d'))
+    prices: array = field(default_factory=lambda: array('d'))  # NaN = no price
+    quantities: List[str] = field(default_factory=list)
+    symbols: List[str] = field(default_factory=list)
+    descriptions: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def append(self, date: datetime, trans_code: str, symbol: str, description: str,
+               quantity: str, price: Optional[float], amount: float) -> None:
+        try:
+            code_id = self.codes.index(trans_code)  # a couple of dozen codes at most
+        except ValueError:
+            code_id = len(self.codes)
+            self.codes.append(trans_code)
+        self.code_index.append(code_id)
+        self.ordinals.append(date.toordinal())
+        self.amounts.append(amount)
+        self.prices.append(math.nan if price is None else price)
+        self.quantities.append(quantity)
+        self.symbols.append(symbol)
+        self.descriptions.append(description)
+
+    def rows(self, codes: Optional[Iterable[str]] = None) -> Iterator[ActivityRow]:
+        """Iterate the rows in file order, optionally only those with one of `codes`."""
+        code_ids = None
+        if codes is not None:
+            wanted = set(codes)
+            code_ids = {i for i, code in enumerate(self.codes) if code in wanted}
+            if not code_ids:
+                return
+        codes = self.codes
+        for i in range(len(self.ordinals)):
+            if code_ids is not None and self.code_index[i] not in code_ids:
+                continue
+            price = self.prices[i]
+            yield ActivityRow(
+                date=datetime.fromordinal(self.ordinals[i]),
+                trans_code=codes[self.code_index[i]],
+                symbol=self.symbols[i],
+                description=self.descriptions[i],
+                quantity=self.quantities[i],
+                price=None if math.isnan(price) else price,
+                amount=self.amounts[i],
+            )
+
+
+def _column(header: List[str], name: str) -> Optional[int]:
+    try:
+        return header.index(name)
+    except ValueError:
+        return None
+
+
+def parse_activity_csv(filepath: Union[str, Path]) -> ParsedActivity:
+    """Stream one Robinhood activity CSV into a ParsedActivity."""
+    activity = ParsedActivity()
+
+    with open(filepath, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+
+        header = None
+        for row in reader:
+            if any('activity date' in cell.lower() for cell in row):
+                header = [cell.strip() for cell in row]
+                break
+        if header is None:
+            return activity
+
+        date_col = _column(header, 'Activity Date')
+        code_col = _column(header, 'Trans Code')
+        columns = [_column(header, name) for name in ('Instrument', 'Description', 'Quantity', 'Price', 'Amount')]
+
+        def cell(row: List[str], index: Optional[int]) -> str:
+            return row[index].strip() if index is not None and index < len(row) else ''
+
+        for row in reader:
+            trans_code = cell(row, code_col).upper()
+            if not trans_code:
+                continue
+            date = parse_date(cell(row, date_col))
+            if not date:
+                continue  # blank, disclaimer or unparseable
+
+            symbol, description, quantity, price_str, amount_str = (cell(row, i) for i in columns)
+            activity.append(
+                date, trans_code, symbol, description, quantity,
+                parse_amount(price_str) if price_str else None,
+                parse_amount(amount_str),
+            )
+
+    return activity
+
+
+def _activity_cache() -> ParseCache:
+    global _cache
+    if _cache is None:
+        _cache = ParseCache('robinhood_activity', version=PARSER_VERSION)
+    return _cache
+
+
+def load_activity(filepath: Union[str, Path], cache: Optional[ParseCache] = None) -> ParsedActivity:
+    """ParsedActivity for a file, from the content-hash cache when possible."""
+    cache = cache or _activity_cache()
+    digest = file_sha256(filepath)
+    activity = cache.get(digest)
+    if activity is MISS:
+        activity = parse_activity_csv(filepath)
+        cache.put(digest, activity)
+    return activity
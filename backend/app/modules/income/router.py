@@ -6,19 +6,51 @@ ARCHITECTURE: All endpoints query the database directly.
 The database is the SINGLE SOURCE OF TRUTH.
 """
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
 from datetime import date
 
 from app.core.database import get_db
 from app.modules.income.rental_service import get_rental_service
 from app.modules.income.salary_service import get_salary_service, reset_salary_service
 from app.modules.income import db_queries
+from app.modules.investments.transaction_query import MAX_PAGE_SIZE, TransactionFilter
 
 router = APIRouter()
 
 
+def _transactions_page(
+    db: Session,
+    income_type: str,
+    account_id: Optional[List[str]],
+    symbol: Optional[List[str]],
+    transaction_type: Optional[List[str]],
+    start_date: Optional[date],
+    end_date: Optional[date],
+    year: Optional[int],
+    cursor: Optional[str],
+    limit: int,
+    include_total: bool,
+) -> dict:
+    """One page of an income type's transactions, with its next_cursor."""
+    spec = TransactionFilter.build(
+        account_ids=account_id,
+        symbols=symbol,
+        transaction_types=transaction_type,
+        start_date=start_date,
+        end_date=end_date,
+        year=year,
+    )
+    try:
+        page = db_queries.get_income_transactions_page(
+            db, income_type, spec, cursor=cursor, limit=limit, include_total=include_total
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return page.to_dict()
+
+
 # =============================================================================
 # INCOME SUMMARY - Single source of truth for all income totals
 # =============================================================================
@@ -77,6 +109,29 @@ async def get_options_chart_data(
     }
 
 
+@router.get("/options/transactions")
+async def get_options_transactions(
+    account_id: Optional[List[str]] = Query(default=None),
+    symbol: Optional[List[str]] = Query(default=None),
+    transaction_type: Optional[List[str]] = Query(default=None),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    year: Optional[int] = Query(default=None, description="Filter by year"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    include_total: bool = Query(default=False, description="Also count all matching transactions"),
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """
+    Page through options transactions, newest first, filtered on the server.
+    Pass the returned next_cursor to get the following page.
+    """
+    return _transactions_page(
+        db, 'options', account_id, symbol, transaction_type, start_date, end_date, year,
+        cursor, limit, include_total
+    )
+
+
 # =============================================================================
 # DIVIDEND INCOME - Direct database queries
 # =============================================================================
@@ -119,6 +174,29 @@ async def get_dividend_chart_data(
     }
 
 
+@router.get("/dividends/transactions")
+async def get_dividends_transactions(
+    account_id: Optional[List[str]] = Query(default=None),
+    symbol: Optional[List[str]] = Query(default=None),
+    transaction_type: Optional[List[str]] = Query(default=None),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    year: Optional[int] = Query(default=None, description="Filter by year"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    include_total: bool = Query(default=False, description="Also count all matching transactions"),
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """
+    Page through dividend transactions, newest first, filtered on the server.
+    Pass the returned next_cursor to get the following page.
+    """
+    return _transactions_page(
+        db, 'dividends', account_id, symbol, transaction_type, start_date, end_date, year,
+        cursor, limit, include_total
+    )
+
+
 # =============================================================================
 # INTEREST INCOME - Direct database queries
 # =============================================================================
@@ -159,6 +237,29 @@ async def get_interest_chart_data(
     }
 
 
+@router.get("/interest/transactions")
+async def get_interest_transactions(
+    account_id: Optional[List[str]] = Query(default=None),
+    symbol: Optional[List[str]] = Query(default=None),
+    transaction_type: Optional[List[str]] = Query(default=None),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    year: Optional[int] = Query(default=None, description="Filter by year"),
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    include_total: bool = Query(default=False, description="Also count all matching transactions"),
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """
+    Page through interest transactions, newest first, filtered on the server.
+    Pass the returned next_cursor to get the following page.
+    """
+    return _transactions_page(
+        db, 'interest', account_id, symbol, transaction_type, start_date, end_date, year,
+        cursor, limit, include_total
+    )
+
+
 # =============================================================================
 # STOCK SALES & LENDING - These need database query implementations
 # For now, return empty data (TODO: implement if needed)
@@ -1,10 +1,17 @@
 """
 Salary Income Service - Parse salary payslips and W-2 forms (PDF).
 Persists W-2 data to database for efficient lookups.
+
+Parsed PDFs are cached by content hash + parser version (see
+app/shared/services/parse_cache.py), so rebuilding the service only parses
+new or changed files; those are parsed in parallel worker processes.
 """
 
+import hashlib
+import multiprocessing
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -14,12 +21,20 @@ from decimal import Decimal
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 
+from app.core.service_registry import EXPENSIVE, ServiceSpec, registry
+from app.shared.services.parse_cache import ParseCache, MISS, file_sha256
+
 try:
     import pdfplumber
 except ImportError:
     pdfplumber = None
 
 
+# Bump when _parse_cisco_payslip / _parse_w2 output changes so cached parses are discarded
+PAYSLIP_PARSER_VERSION = "1"
+W2_PARSER_VERSION = "1"
+
+
 @dataclass
 class W2Income:
     """Represents W-2 wage and tax statement data."""
@@ -98,7 +113,7 @@ class SalaryIncome:
 class SalaryService:
     """Service to parse and aggregate salary income from payslips and W-2 forms."""
 
-    def __init__(self, data_dir: str = None, db: Session = None):
+    def __init__(self, data_dir: str = None, db: Session = None, workers: Optional[int] = None):
         """Initialize the service with the data directory and optional db session."""
         if data_dir is None:
             base_dir = Path(__file__).parent.parent.parent.parent.parent
@@ -109,6 +124,11 @@ class SalaryService:
         self.salaries: Dict[str, SalaryIncome] = {}
         self.w2_data: Dict[str, List[W2Income]] = {}  # Keyed by normalized employee name
         self.db = db
+        self.workers = workers if workers is not None else min(4, os.cpu_count() or 1)
+        self._parse_caches = {
+            'payslip': ParseCache('payslips', version=PAYSLIP_PARSER_VERSION),
+            'w2': ParseCache('w2', version=W2_PARSER_VERSION),
+        }
 
     def _parse_amount(self, text: str) -> float:
         """Parse a dollar amount from text."""
@@ -531,6 +551,79 @@ class SalaryService:
             print(f"Error parsing payslip {filepath}: {e}")
             return None
 
+    def _parse_pdfs(self, kind: str, files: List[Path]) -> List[Tuple[Path, object]]:
+        """
+        Parse `files` with the payslip or W-2 parser, reusing cached results.
+
+        Only files whose content hash (plus parser version) is not cached are
+        parsed, in worker processes when there is more than one. Returns
+        (file, result) pairs in input order; result is None for files the
+        parser rejected. Those are not cached, so they are retried on the
+        next load.
+        """
+        cache = self._parse_caches[kind]
+        results: Dict[Path, object] = {}
+        pending: List[Tuple[Path, str]] = []
+
+        for pdf_file in files:
+            try:
+                key = self._parse_cache_key(kind, pdf_file, file_sha256(pdf_file))
+            except OSError as e:
+                print(f"Error reading {pdf_file}: {e}")
+                continue
+            cached = cache.get(key)
+            if cached is MISS:
+                pending.append((pdf_file, key))
+            else:
+                results[pdf_file] = cached
+
+        if pending:
+            parsed = self._parse_uncached(kind, [pdf_file for pdf_file, _ in pending])
+            for (pdf_file, key), result in zip(pending, parsed):
+                if result is None:
+                    print(f"Could not parse {kind} {pdf_file.name}; will retry on next load")
+                else:
+                    cache.put(key, result)
+                results[pdf_file] = result
+
+        return [(pdf_file, results[pdf_file]) for pdf_file in files if pdf_file in results]
+
+    def _parse_cache_key(self, kind: str, filepath: Path, digest: str) -> str:
+        """
+        Content hash, plus the path for W-2s: _parse_w2 reads the employee
+        from the file name and the tax year from the directory parts.
+        """
+        if kind == 'w2':
+            path_hash = hashlib.sha256(filepath.as_posix().encode()).hexdigest()[:12]
+            return f"{digest}-{path_hash}"
+        return digest
+
+    def _parse_uncached(self, kind: str, files: List[Path]) -> List[object]:
+        """Run the parser over `files`, in a process pool when worthwhile."""
+        if self.workers > 1 and len(files) > 1:
+            try:
+                # Spawned, not forked: loads run in the registry's warm-up thread,
+                # and forking a threaded process can deadlock the workers
+                with ProcessPoolExecutor(
+                    max_workers=min(self.workers, len(files)),
+                    mp_context=multiprocessing.get_context("spawn"),
+                ) as pool:
+                    return list(pool.map(_parse_pdf_worker, [kind] * len(files), [str(f) for f in files]))
+            except Exception as e:
+                print(f"Parallel PDF parsing unavailable ({e}), parsing sequentially")
+        parse = self._parse_cisco_payslip if kind == 'payslip' else self._parse_w2
+        return [parse(pdf_file) for pdf_file in files]
+
+    def _find_w2_files(self) -> List[Path]:
+        """All W-2 PDFs under the tax returns directory."""
+        w2_patterns = ['**/W-2*.pdf', '**/w-2*.pdf', '**/W2*.pdf', '**/w2*.pdf', '**/*W-2*.pdf', '**/*w2*.pdf', '**/*W2.pdf', '**/*w2.pdf']
+        w2_files = []
+        for pattern in w2_patterns:
+            w2_files.extend(self.tax_returns_dir.glob(pattern))
+        
+        # Remove duplicates
+        return sorted(set(w2_files))
+
     def _normalize_name(self, name: str) -> str:
         """Normalize employee name for matching."""
         # Convert to lowercase and remove extra spaces
@@ -552,8 +645,7 @@ class SalaryService:
         if self.data_dir.exists():
             pdf_files = list(self.data_dir.glob('*.pdf'))
             
-            for pdf_file in pdf_files:
-                payslip = self._parse_cisco_payslip(pdf_file)
+            for pdf_file, payslip in self._parse_pdfs('payslip', pdf_files):
                 if payslip:
                     name = self._normalize_name(payslip.employee_name)
                     
@@ -591,16 +683,9 @@ class SalaryService:
             return
         
         # Find all W-2 PDFs recursively
-        w2_patterns = ['**/W-2*.pdf', '**/w-2*.pdf', '**/W2*.pdf', '**/w2*.pdf', '**/*W-2*.pdf', '**/*w2*.pdf', '**/*W2.pdf', '**/*w2.pdf']
-        w2_files = []
-        for pattern in w2_patterns:
-            w2_files.extend(self.tax_returns_dir.glob(pattern))
-        
-        # Remove duplicates
-        w2_files = list(set(w2_files))
+        w2_files = self._find_w2_files()
         
-        for w2_file in w2_files:
-            w2 = self._parse_w2(w2_file)
+        for w2_file, w2 in self._parse_pdfs('w2', w2_files):
             if w2 and w2.wages > 0:
                 name = self._normalize_name(w2.employee_name)
                 
@@ -709,21 +794,14 @@ class SalaryService:
             return {"error": f"Tax returns directory not found: {self.tax_returns_dir}"}
         
         # Find all W-2 PDFs recursively
-        w2_patterns = ['**/W-2*.pdf', '**/w-2*.pdf', '**/W2*.pdf', '**/w2*.pdf', '**/*W-2*.pdf', '**/*w2*.pdf', '**/*W2.pdf', '**/*w2.pdf']
-        w2_files = []
-        for pattern in w2_patterns:
-            w2_files.extend(self.tax_returns_dir.glob(pattern))
-        
-        # Remove duplicates
-        w2_files = list(set(w2_files))
+        w2_files = self._find_w2_files()
         
         imported = 0
         skipped = 0
         errors = []
         
-        for w2_file in w2_files:
+        for w2_file, w2 in self._parse_pdfs('w2', w2_files):
             try:
-                w2 = self._parse_w2(w2_file)
                 if w2 and w2.wages > 0:
                     # Check if already exists - first by exact employer match
                     existing = self.db.query(W2Record).filter(
@@ -784,6 +862,8 @@ class SalaryService:
                 errors.append(f"Error processing {w2_file}: {str(e)}")
         
         self.db.commit()
+        # Cached salary data reads w2_records
+        registry.invalidate_sources(("w2_records",))
         
         return {
             "status": "success",
@@ -863,24 +943,45 @@ class SalaryService:
         }
 
 
-# Singleton instance
-_salary_service: Optional[SalaryService] = None
+def _parse_pdf_worker(kind: str, path: str):
+    """Parse one payslip/W-2 PDF in a worker process (module-level so it pickles)."""
+    service = SalaryService(workers=1)
+    if kind == 'payslip':
+        return service._parse_cisco_payslip(Path(path))
+    return service._parse_w2(Path(path))
+
+
+def _load_salary_service() -> SalaryService:
+    """Load payslips and W-2s with a session of its own (the load may run in the warm-up thread)."""
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        service = SalaryService(db=db)
+        service.load_all_payslips()
+    finally:
+        db.close()
+    service.db = None
+    return service
+
+
+registry.register(ServiceSpec(
+    name="salary",
+    factory=_load_salary_service,
+    cost=EXPENSIVE,
+    data_sources=("w2_records",),
+))
 
 
 def get_salary_service(db: Session = None) -> SalaryService:
     """Get or create the salary service singleton."""
-    global _salary_service
-    if _salary_service is None:
-        _salary_service = SalaryService(db=db)
-        _salary_service.load_all_payslips()
-    elif db is not None and _salary_service.db is None:
+    service = registry.get("salary")
+    if db is not None and service.db is None:
         # Update db session if provided and not already set
-        _salary_service.db = db
-    return _salary_service
+        service.db = db
+    return service
 
 
 def reset_salary_service() -> None:
     """Reset the salary service singleton to force reload."""
-    global _salary_service
-    _salary_service = None
-
+    registry.invalidate("salary")
@@ -2,7 +2,6 @@
 Income Services - Parse Robinhood transaction files for options and dividend income.
 """
 
-import csv
 import os
 import re
 from datetime import datetime
@@ -12,6 +11,15 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from collections import defaultdict
 
+from app.core.service_registry import EXPENSIVE, ServiceSpec, registry
+from app.modules.income.robinhood_activity import (
+    ActivityRow,
+    ParsedActivity,
+    load_activity,
+    parse_amount,
+    parse_date,
+)
+
 
 @dataclass
 class OptionsTransaction:
@@ -114,6 +122,9 @@ class IncomeService:
     # Stock buy/sell transactions (uppercase to match .upper() transformation)
     STOCK_BUY_CODES = {'BUY'}
     STOCK_SELL_CODES = {'SELL'}
+    
+    # Codes _process_transaction records; other rows are never materialized
+    PROCESSED_CODES = OPTIONS_CODES | DIVIDEND_CODES | INTEREST_CODES | STOCK_LENDING_CODES | STOCK_SELL_CODES
 
     def __init__(self, data_dir: str = None):
         """Initialize the service with the data directory."""
@@ -126,45 +137,11 @@ class IncomeService:
 
     def _parse_amount(self, amount_str: str) -> float:
         """Parse amount string like '$123.45' or '($123.45)' to float."""
-        if not amount_str or amount_str.strip() == '':
-            return 0.0
-        
-        # Remove whitespace
-        amount_str = amount_str.strip()
-        
-        # Check for negative (parentheses)
-        is_negative = '(' in amount_str and ')' in amount_str
-        
-        # Remove currency symbols and parentheses
-        cleaned = re.sub(r'[$(),]', '', amount_str)
-        
-        try:
-            value = float(cleaned)
-            return -value if is_negative else value
-        except ValueError:
-            return 0.0
+        return parse_amount(amount_str)
 
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse date string to datetime."""
-        if not date_str or date_str.strip() == '':
-            return None
-        
-        date_str = date_str.strip()
-        
-        # Try different formats
-        formats = [
-            '%m/%d/%Y',  # 11/21/2025
-            '%m/%d/%y',  # 11/21/25
-            '%Y-%m-%d',  # 2025-11-21
-        ]
-        
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
-        
-        return None
+        return parse_date(date_str)
 
     def _parse_option_description(self, description: str) -> Tuple[Optional[str], Optional[str], Optional[float]]:
         """
@@ -235,77 +212,31 @@ class IncomeService:
         
         return owner, account_name, account_type
 
-    def _parse_csv_file(self, filepath: Path) -> List[dict]:
-        """Parse a single CSV file and return list of transactions."""
-        transactions = []
-        
+    def _parse_csv_file(self, filepath: Path) -> ParsedActivity:
+        """Parse a single CSV file (single pass, cached by content hash)."""
         try:
-            # First pass: find the header line
-            header_idx = 0
-            with open(filepath, 'r', encoding='utf-8-sig') as f:
-                for i, line in enumerate(f):
-                    if 'Activity Date' in line or 'activity date' in line.lower():
-                        header_idx = i
-                        break
-            
-            # Second pass: read CSV from header using DictReader
-            # Use newline='' to let csv module handle line endings properly for multi-line fields
-            with open(filepath, 'r', encoding='utf-8-sig', newline='') as f:
-                # Skip lines before header
-                for _ in range(header_idx):
-                    next(f)
-                
-                reader = csv.DictReader(f)
-                
-                for row in reader:
-                    # Skip empty rows or disclaimer rows
-                    activity_date = row.get('Activity Date', '')
-                    if not activity_date or activity_date.strip() == '':
-                        continue
-                    if 'data provided' in activity_date.lower():
-                        continue
-                    
-                    transactions.append(row)
-                    
+            return load_activity(filepath)
         except Exception as e:
             print(f"Error parsing {filepath}: {e}")
-        
-        return transactions
+            return ParsedActivity()
 
-    def _process_transaction(self, row: dict, account_name: str, owner: str, account_type: str):
-        """Process a single transaction row."""
-        trans_code = row.get('Trans Code', '').strip().upper()
-        
-        if not trans_code:
-            return
-        
-        # Get or create account
-        if account_name not in self.accounts:
-            self.accounts[account_name] = AccountIncome(
-                account_name=account_name,
-                owner=owner,
-                account_type=account_type
-            )
-        
+    def _process_transaction(self, row: ActivityRow, account_name: str, owner: str, account_type: str):
+        """Process a single parsed activity row."""
+        trans_code = row.trans_code
         account = self.accounts[account_name]
         
-        # Parse common fields
-        date = self._parse_date(row.get('Activity Date', ''))
-        if not date:
-            return
-        
-        amount = self._parse_amount(row.get('Amount', ''))
-        symbol = row.get('Instrument', '').strip()
-        description = row.get('Description', '').strip()
-        quantity_str = row.get('Quantity', '').strip()
-        price_str = row.get('Price', '').strip()
+        # Common fields (the parser only yields rows with a code and a date)
+        date = row.date
+        amount = row.amount
+        symbol = row.symbol
+        description = row.description
         
         try:
-            quantity = int(float(quantity_str)) if quantity_str else 0
+            quantity = int(float(row.quantity)) if row.quantity else 0
         except (ValueError, TypeError):
             quantity = 0
         
-        price = self._parse_amount(price_str)
+        price = row.price or 0.0
         
         month_key = date.strftime('%Y-%m')
         
@@ -425,10 +356,18 @@ class IncomeService:
             owner, account_name, account_type = self._determine_account_info(csv_file.name)
             
             # Parse the CSV
-            transactions = self._parse_csv_file(csv_file)
+            activity = self._parse_csv_file(csv_file)
             
-            # Process each transaction
-            for row in transactions:
+            # Register the account even if none of its activity is income
+            if len(activity) and account_name not in self.accounts:
+                self.accounts[account_name] = AccountIncome(
+                    account_name=account_name,
+                    owner=owner,
+                    account_type=account_type
+                )
+            
+            # Process each transaction the service classifies
+            for row in activity.rows(self.PROCESSED_CODES):
                 self._process_transaction(row, account_name, owner, account_type)
         
         return self.accounts
@@ -1380,6 +1319,9 @@ class IncomeService:
         from decimal import Decimal
         from app.core.database import SessionLocal
         from app.modules.investments.models import InvestmentTransaction
+        from app.modules.investments.change_feed import record_transaction_event
+        from app.modules.income.income_rollup import record_income_transaction
+        from app.modules.investments.dedup import transaction_dedup_hash
         
         if not self.data_dir.exists():
             return {"error": f"Data directory not found: {self.data_dir}", "imported": 0}
@@ -1423,31 +1365,22 @@ class IncomeService:
                 account_id = canonical_account_map.get(raw_account_id, raw_account_id)
                 
                 # Parse the CSV
-                transactions = self._parse_csv_file(csv_file)
+                activity = self._parse_csv_file(csv_file)
                 
-                for row in transactions:
+                for row in activity.rows():
                     try:
-                        trans_code = row.get('Trans Code', '').strip().upper()
-                        if not trans_code:
-                            continue
-                        
-                        # Parse common fields
-                        date = self._parse_date(row.get('Activity Date', ''))
-                        if not date:
-                            continue
-                        
-                        amount = self._parse_amount(row.get('Amount', ''))
-                        symbol = row.get('Instrument', '').strip().upper() or 'UNKNOWN'
-                        description = row.get('Description', '').strip()
-                        quantity_str = row.get('Quantity', '').strip()
-                        price_str = row.get('Price', '').strip()
+                        trans_code = row.trans_code
+                        date = row.date
+                        amount = row.amount
+                        symbol = row.symbol.upper() or 'UNKNOWN'
+                        description = row.description
                         
                         try:
-                            quantity = Decimal(quantity_str) if quantity_str else None
+                            quantity = Decimal(row.quantity) if row.quantity else None
                         except (ValueError, TypeError, Exception):
                             quantity = None
                         
-                        price = Decimal(str(self._parse_amount(price_str))) if price_str else None
+                        price = Decimal(str(row.price)) if row.price is not None else None
                         amount_decimal = Decimal(str(amount))
                         
                         txn_date = date.date() if hasattr(date, 'date') else date
@@ -1498,8 +1431,13 @@ class IncomeService:
                             price_per_share=price,
                             description=description,
                             record_hash=record_hash,
+                            dedup_hash=transaction_dedup_hash(
+                                'robinhood', account_id, txn_date, symbol, trans_code, quantity, amount_decimal
+                            ),
                         )
                         db.add(txn)
+                        record_transaction_event(db, txn)
+                        record_income_transaction(db, txn)
                         stats['records_imported'] += 1
                         
                     except Exception as e:
@@ -1508,6 +1446,8 @@ class IncomeService:
                 # Commit after each file to avoid batch conflicts
                 db.commit()
             
+            if stats['records_imported']:
+                registry.invalidate_sources(("investment_transactions",), reload=True)
             return stats
             
         except Exception as e:
@@ -1518,25 +1458,29 @@ class IncomeService:
             db.close()
 
 
-# Singleton instance
-_income_service: Optional[IncomeService] = None
+def _load_income_service() -> IncomeService:
+    service = IncomeService()
+    # Try loading from database first
+    loaded_from_db = service.load_from_database()
+    if not loaded_from_db:
+        # Fall back to loading from CSV files
+        service.load_all_transactions()
+    return service
+
+
+registry.register(ServiceSpec(
+    name="income",
+    factory=_load_income_service,
+    cost=EXPENSIVE,
+    data_sources=("investment_transactions", "investment_accounts"),
+))
 
 
 def get_income_service() -> IncomeService:
     """Get or create the income service singleton."""
-    global _income_service
-    if _income_service is None:
-        _income_service = IncomeService()
-        # Try loading from database first
-        loaded_from_db = _income_service.load_from_database()
-        if not loaded_from_db:
-            # Fall back to loading from CSV files
-            _income_service.load_all_transactions()
-    return _income_service
+    return registry.get("income")
 
 
 def reset_income_service() -> None:
-    """Reset the income service singleton to force reload of data."""
-    global _income_service
-    _income_service = None
-
+    """Reset the income service singleton (and its dependents) to force reload of data."""
+    registry.invalidate("income")
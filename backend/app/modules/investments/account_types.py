@@ -0,0 +1,23 @@
+"""
+Investment account type classification.
+
+account_type is free text from the importers ('brokerage', 'IRA', 'roth_ira',
+'401k', ...), so every comparison here is case-insensitive. Income, lot and
+wash-sale code decide what is taxable from this one list.
+"""
+
+from sqlalchemy import func
+
+
+# Account types whose income and sales are not taxable in the current year
+NON_TAXABLE_ACCOUNT_TYPES = ('ira', 'roth_ira', 'traditional_ira', '401k', 'hsa', 'retirement')
+
+
+def is_taxable_account_type(account_type: str) -> bool:
+    """True unless `account_type` is tax-deferred or tax-free (None counts as taxable)."""
+    return (account_type or '').lower() not in NON_TAXABLE_ACCOUNT_TYPES
+
+
+def non_taxable_account_type(column):
+    """SQL predicate: the account_type `column` is a non-taxable type; negate for taxable."""
+    return func.lower(func.coalesce(column, '')).in_(NON_TAXABLE_ACCOUNT_TYPES)
@@ -0,0 +1,61 @@
+"""
+Transaction change feed.
+
+Writers call record_transaction_event() right after adding an
+InvestmentTransaction. Close/expire/assign transactions append a
+TransactionChangeEvent in the same database transaction; everything else is
+ignored. Consumers (see strategies/outcome_tracker.py) read the feed past
+their ChangeFeedCursor instead of rescanning transaction history.
+"""
+
+from typing import Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from app.modules.investments.models import InvestmentTransaction, TransactionChangeEvent
+
+
+# transaction_type -> event_type
+CLOSING_EVENT_TYPES: Dict[str, str] = {
+    'BTC': 'close',
+    'OEXP': 'expire',
+    'OASGN': 'assign',
+}
+
+
+def underlying_symbol(symbol: Optional[str], description: Optional[str] = None) -> Optional[str]:
+    """Underlying ticker of an option symbol/description, e.g. 'AAPL 1/16/2026 Call $250' -> 'AAPL'."""
+    for text in (symbol, description):
+        if text and text.strip():
+            return text.split()[0].upper()
+    return None
+
+
+def record_transaction_event(db: Session, txn: InvestmentTransaction) -> Optional[TransactionChangeEvent]:
+    """
+    Append a change-feed event for a newly written closing transaction.
+
+    Flushes to obtain the transaction id if needed. The caller commits.
+    Returns the event, or None if the transaction type is not tracked.
+    """
+    event_type = CLOSING_EVENT_TYPES.get((txn.transaction_type or '').upper())
+    if not event_type:
+        return None
+
+    underlying = underlying_symbol(txn.symbol, txn.description)
+    if not underlying:
+        return None
+
+    if txn.id is None:
+        db.flush()
+
+    event = TransactionChangeEvent(
+        transaction_id=txn.id,
+        event_type=event_type,
+        transaction_type=txn.transaction_type.upper(),
+        account_id=txn.account_id,
+        underlying=underlying,
+        transaction_date=txn.transaction_date,
+    )
+    db.add(event)
+    return event
@@ -0,0 +1,69 @@
+"""
+Deterministic natural-key hash for investment transactions.
+
+InvestmentTransaction.dedup_hash carries a unique index, so bulk writers can
+insert with ON CONFLICT (dedup_hash) DO NOTHING instead of querying for each
+row first. The key is
+
+    source | account_id | transaction_date | symbol | transaction_type | quantity | amount
+
+with quantity and amount rendered at their column scale (8 and 2 places),
+exactly as PostgreSQL prints the stored numeric values, so the
+add_transaction_dedup_hash migration can backfill with the same formula in SQL:
+
+    encode(sha256(convert_to(concat_ws('|', source, account_id,
+        transaction_date::text, symbol, transaction_type,
+        coalesce(quantity::text, ''), amount::text), 'UTF8')), 'hex')
+"""
+
+import hashlib
+from datetime import date, datetime
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Optional
+
+_QUANTITY_SCALE = Decimal('0.00000001')  # Numeric(18, 8)
+_AMOUNT_SCALE = Decimal('0.01')  # Numeric(18, 2)
+
+
+def _numeric_text(value: Any, scale: Decimal) -> str:
+    if value is None or value == '':
+        return ''
+    return format(Decimal(str(value)).quantize(scale, rounding=ROUND_HALF_UP), 'f')
+
+
+def _date_text(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value or '')
+
+
+def transaction_dedup_hash(
+    source: str,
+    account_id: str,
+    transaction_date: Any,
+    symbol: Optional[str],
+    transaction_type: str,
+    quantity: Any,
+    amount: Any,
+) -> str:
+    """Hex SHA-256 of a transaction's canonical natural key."""
+    key = '|'.join([
+        source or '',
+        account_id or '',
+        _date_text(transaction_date),
+        symbol or '',
+        transaction_type or '',
+        _numeric_text(quantity, _QUANTITY_SCALE),
+        _numeric_text(amount, _AMOUNT_SCALE),
+    ])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+def dedup_hash_of(txn: Any) -> str:
+    """transaction_dedup_hash() of an InvestmentTransaction's current fields."""
+    return transaction_dedup_hash(
+        txn.source, txn.account_id, txn.transaction_date, txn.symbol,
+        txn.transaction_type, txn.quantity, txn.amount,
+    )
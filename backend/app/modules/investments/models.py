@@ -2,9 +2,10 @@
 Investment module database models.
 """
 
-from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, Text, UniqueConstraint, Index
+from sqlalchemy import Column, Integer, BigInteger, String, Numeric, Date, DateTime, Text, UniqueConstraint, Index, ForeignKey
 from datetime import datetime
 
+from app.core.database import Base
 from app.shared.models.base import BaseModel
 
 
@@ -47,6 +48,9 @@ class InvestmentTransaction(BaseModel):
     
     # Deduplication hash
     record_hash = Column(String(64), nullable=False, index=True)
+    # SHA-256 of the canonical natural key (see investments/dedup.py);
+    # bulk imports insert with ON CONFLICT (dedup_hash) DO NOTHING
+    dedup_hash = Column(String(64), nullable=True)
     
     # Provenance
     ingestion_id = Column(Integer, nullable=True)
@@ -59,9 +63,58 @@ class InvestmentTransaction(BaseModel):
         ),
         Index('idx_transaction_date', 'transaction_date'),
         Index('idx_transaction_symbol', 'symbol'),
+        Index('idx_transaction_type_date', 'transaction_type', 'transaction_date'),
+        # Keyset pagination order (see transaction_query.py)
+        Index('idx_transaction_date_id', 'transaction_date', 'id'),
+        Index('idx_transaction_account_date_id', 'account_id', 'transaction_date', 'id'),
+        Index('uq_investment_transaction_dedup_hash', 'dedup_hash', unique=True),
     )
 
 
+
+class TransactionChangeEvent(Base):
+    """
+    Append-only change feed of position-closing transactions.
+    
+    One row per new close (BTC), expire (OEXP) or assign (OASGN)
+    InvestmentTransaction, written in the same transaction as the insert.
+    Consumers read events with id greater than their ChangeFeedCursor.
+    """
+    
+    __tablename__ = "transaction_change_feed"
+    
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    transaction_id = Column(Integer, ForeignKey('investment_transactions.id', ondelete='CASCADE'), nullable=False)
+    event_type = Column(String(20), nullable=False)  # 'close', 'expire', 'assign'
+    transaction_type = Column(String(20), nullable=False)  # BTC, OEXP, OASGN
+    account_id = Column(String(100), nullable=False)
+    underlying = Column(String(20), nullable=False)
+    transaction_date = Column(Date, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('transaction_id', name='uq_tcf_transaction'),
+        Index('idx_tcf_account_underlying_date', 'account_id', 'underlying', 'transaction_date'),
+    )
+
+
+class ChangeFeedCursor(Base):
+    """
+    High-water marks for a transaction_change_feed consumer.
+    
+    Advanced in the same commit as the consumer's writes, so re-running a
+    consumer never reprocesses an event.
+    """
+    
+    __tablename__ = "change_feed_cursors"
+    
+    consumer = Column(String(50), primary_key=True)  # e.g. 'position_outcomes'
+    last_event_id = Column(BigInteger, nullable=False, default=0)
+    last_match_id = Column(Integer, nullable=False, default=0)
+    last_expiration_date = Column(Date, nullable=True)
+    events_processed = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
 class InvestmentHolding(BaseModel):
     """Current holdings/positions - updated with each import."""
     
@@ -134,3 +187,65 @@ class PortfolioSnapshot(BaseModel):
         Index('idx_snapshot_owner', 'owner'),
     )
 
+
+
+class DailyClose(Base):
+    """Daily closing price of a symbol, kept locally for the valuation engine."""
+    
+    __tablename__ = "daily_closes"
+    
+    symbol = Column(String(20), primary_key=True)
+    price_date = Column(Date, primary_key=True)
+    close = Column(Numeric(18, 4), nullable=False)
+    source = Column(String(20), nullable=False, default='yahoo')
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class PositionValuation(Base):
+    """Quantity and value of one share position on one day (see valuation_engine.py)."""
+    
+    __tablename__ = "position_valuations"
+    
+    source = Column(String(50), primary_key=True)
+    account_id = Column(String(100), primary_key=True)
+    valuation_date = Column(Date, primary_key=True)
+    symbol = Column(String(20), primary_key=True)
+    quantity = Column(Numeric(18, 8), nullable=False)
+    close = Column(Numeric(18, 4), nullable=True)  # null when the position has no price yet
+    value = Column(Numeric(18, 2), nullable=False)
+    
+    __table_args__ = (
+        Index('idx_position_valuation_date', 'valuation_date'),
+    )
+
+
+class AccountValuation(Base):
+    """
+    Securities value of one account on one day, with the day's external
+    cash flow into the securities (buys less sells, less dividends paid out).
+    """
+    
+    __tablename__ = "account_valuations"
+    
+    source = Column(String(50), primary_key=True)
+    account_id = Column(String(100), primary_key=True)
+    valuation_date = Column(Date, primary_key=True)
+    value = Column(Numeric(18, 2), nullable=False)
+    net_flow = Column(Numeric(18, 2), nullable=False, default=0)
+    
+    __table_args__ = (
+        Index('idx_account_valuation_date', 'valuation_date'),
+    )
+
+
+class ValuationSource(Base):
+    """Transaction watermarks and valued date range of one account's valuation."""
+    
+    __tablename__ = "valuation_sources"
+    
+    source = Column(String(50), primary_key=True)
+    account_id = Column(String(100), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    valued_from = Column(Date, nullable=False)
+    valued_through = Column(Date, nullable=False)
+    refreshed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,296 @@
+"""
+Position ledger: batched holding updates from transactions.
+
+update_holding_from_transaction() adjusted InvestmentHolding after every
+saved transaction - a lookup, an update and a flush per row, so a historical
+import touched the same holding hundreds of times.
+
+PositionLedger collects share-affecting transactions (BUY, SELL, OASGN) per
+(source, account_id, symbol) for a whole batch. apply() loads the touched
+holdings with one query, replays each key's transactions in date order and
+writes every result with one INSERT ... ON CONFLICT (source, account_id,
+symbol) DO UPDATE. It does not commit, so holdings change in the same
+transaction as the batch that produced them - or not at all.
+
+Replay keeps the old per-transaction rules: option and cash symbols are
+ignored, a sell never takes a quantity below zero, a sell of an unknown
+holding is dropped, and the latest trade price sets current_price and
+market_value. Cost basis uses the weighted-average method of
+calculate_cost_basis_from_transactions().
+
+Transaction imports still do not write holdings (the Robinhood paste is the
+authoritative position source); rebuild_account_holdings() is the explicit
+path that recomputes one account's holdings from its transactions. It skips
+symbols whose history does not cover the position (a sell of shares the
+replay never bought, e.g. transferred in or bought before the first import).
+"""
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from app.modules.investments.models import InvestmentHolding, InvestmentTransaction
+
+logger = logging.getLogger(__name__)
+
+
+# Transaction types that change a share position
+SHARE_TRANSACTION_TYPES = ('BUY', 'SELL', 'OASGN')
+
+# Option contract symbols look like "HOOD 12/5/2025 Put $120.00"
+OPTION_SYMBOL_MARKERS = (" PUT ", " CALL ", "PUT $", "CALL $", "/")
+
+# (source, account_id, symbol)
+PositionKey = Tuple[str, str, str]
+
+
+def is_share_symbol(symbol: Optional[str]) -> bool:
+    """Whether a transaction symbol names a share position (not cash or an option)."""
+    if not symbol or symbol in ("CASH", "UNKNOWN"):
+        return False
+    return not any(marker in symbol for marker in OPTION_SYMBOL_MARKERS)
+
+
+def quantity_change(transaction_type: str, quantity: Any) -> Decimal:
+    """Signed share change of a transaction; 0 if it does not move shares."""
+    if quantity is None:
+        return Decimal('0')
+    quantity = Decimal(str(quantity))
+    if transaction_type == "BUY":
+        return quantity
+    if transaction_type == "SELL":
+        return -quantity
+    if transaction_type == "OASGN":
+        # Option assignment quantity is in contracts; 1 contract = 100 shares
+        return quantity * 100
+    return Decimal('0')
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime) or value is None:
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def _decimal(value: Any) -> Optional[Decimal]:
+    return None if value is None else Decimal(str(value))
+
+
+@dataclass
+class LedgerEntry:
+    """One share-affecting transaction."""
+    transaction_date: datetime
+    change: Decimal
+    price: Optional[Decimal]
+    cost: Optional[Decimal]  # cash paid for a buy, including fees
+
+
+@dataclass
+class Position:
+    """A holding's state while transactions are replayed onto it."""
+    quantity: Decimal = Decimal('0')
+    cost_basis: Optional[Decimal] = Decimal('0')
+    current_price: Optional[Decimal] = None
+    market_value: Optional[Decimal] = None
+    last_updated: Optional[datetime] = None
+    exists: bool = False
+    incomplete: bool = False  # a sell needed shares the replay never had
+
+    def apply(self, entry: LedgerEntry) -> None:
+        if not self.exists:
+            # Only a buy opens a position
+            if entry.change <= 0:
+                self.incomplete = True
+                return
+            self.exists = True
+
+        old_quantity = self.quantity
+        if old_quantity + entry.change < 0:
+            self.incomplete = True
+        self.quantity = max(Decimal('0'), old_quantity + entry.change)
+
+        if self.cost_basis is not None:
+            if entry.change > 0:
+                self.cost_basis = None if entry.cost is None else self.cost_basis + entry.cost
+            elif old_quantity > 0:
+                # Weighted average: a sell keeps the average cost per share
+                self.cost_basis = self.cost_basis * self.quantity / old_quantity
+
+        if entry.price:
+            self.current_price = entry.price
+            self.market_value = self.quantity * entry.price
+        self.last_updated = entry.transaction_date
+
+
+@dataclass
+class PositionLedger:
+    """Share-position changes collected across a batch of transactions."""
+    entries: Dict[PositionKey, List[LedgerEntry]] = field(default_factory=dict)
+    skipped: List[PositionKey] = field(default_factory=list)  # by the last apply(rebuild=True)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self.entries.values())
+
+    def add(
+        self,
+        source: str,
+        account_id: str,
+        symbol: Optional[str],
+        transaction_type: str,
+        quantity: Any,
+        price_per_share: Any,
+        transaction_date: Any,
+        amount: Any = None,
+        fees: Any = None,
+    ) -> bool:
+        """Record a transaction; returns False if it does not affect holdings."""
+        if not is_share_symbol(symbol) or transaction_date is None:
+            return False
+        change = quantity_change(transaction_type, quantity)
+        if change == 0:
+            return False
+
+        price = _decimal(price_per_share)
+        cost = None
+        if change > 0:
+            if amount:
+                cost = abs(Decimal(str(amount))) + (_decimal(fees) or Decimal('0'))
+            elif price is not None:
+                cost = change * price
+
+        self.entries.setdefault((source, account_id, symbol), []).append(LedgerEntry(
+            transaction_date=_as_datetime(transaction_date),
+            change=change,
+            price=price,
+            cost=cost,
+        ))
+        return True
+
+    def add_transaction(self, txn: Any) -> bool:
+        """add() for an InvestmentTransaction (or a row with the same attributes)."""
+        return self.add(
+            txn.source, txn.account_id, txn.symbol, txn.transaction_type, txn.quantity,
+            txn.price_per_share, txn.transaction_date, txn.amount, getattr(txn, 'fees', None),
+        )
+
+    def replay(self, starting: Dict[PositionKey, Position]) -> Dict[PositionKey, Position]:
+        """Resulting position per key, replaying entries in date order onto `starting`."""
+        positions = {}
+        for key, entries in self.entries.items():
+            position = starting.get(key) or Position()
+            for entry in sorted(entries, key=lambda e: e.transaction_date):
+                position.apply(entry)
+            if position.exists:
+                positions[key] = position
+        return positions
+
+    def _load_positions(self, db: Session) -> Dict[PositionKey, Position]:
+        """Current holdings for every key in the ledger, in one query."""
+        holding = InvestmentHolding
+        rows = db.query(holding).filter(
+            tuple_(holding.source, holding.account_id, holding.symbol).in_(list(self.entries))
+        ).all()
+        return {
+            (row.source, row.account_id, row.symbol): Position(
+                quantity=Decimal(str(row.quantity or 0)),
+                cost_basis=_decimal(row.cost_basis),
+                current_price=_decimal(row.current_price),
+                market_value=_decimal(row.market_value),
+                last_updated=row.last_updated,
+                exists=True,
+            )
+            for row in rows
+        }
+
+    def apply(self, db: Session, rebuild: bool = False) -> int:
+        """
+        Write the batch's holdings with one upsert. Does not commit.
+
+        With rebuild=True the existing holdings are ignored and each touched
+        holding is replaced by the replay of the ledger alone, except where
+        the replay has no opening position for a sell; those keys keep their
+        stored holding and are listed in `skipped`. Returns the number of
+        holdings written.
+        """
+        self.skipped = []
+        if not self.entries:
+            return 0
+
+        positions = self.replay({} if rebuild else self._load_positions(db))
+        if rebuild:
+            self.skipped = [key for key in self.entries if key not in positions or positions[key].incomplete]
+            for key in self.skipped:
+                positions.pop(key, None)
+            if self.skipped:
+                logger.warning(
+                    f"[POSITION_LEDGER] Kept stored holdings for {len(self.skipped)} symbols with partial history: "
+                    f"{', '.join(symbol for _source, _account, symbol in self.skipped)}"
+                )
+        if not positions:
+            return 0
+
+        now = datetime.utcnow()
+        insert_stmt = insert(InvestmentHolding).values([
+            {
+                "source": source,
+                "account_id": account_id,
+                "symbol": symbol,
+                "quantity": position.quantity,
+                "cost_basis": position.cost_basis,
+                "current_price": position.current_price,
+                "market_value": position.market_value,
+                "last_updated": position.last_updated,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for (source, account_id, symbol), position in positions.items()
+        ])
+        db.execute(insert_stmt.on_conflict_do_update(
+            index_elements=['source', 'account_id', 'symbol'],
+            set_={
+                column: insert_stmt.excluded[column]
+                for column in ('quantity', 'cost_basis', 'current_price', 'market_value', 'last_updated', 'updated_at')
+            },
+        ))
+        self.entries.clear()
+        return len(positions)
+
+
+def rebuild_account_holdings(db: Session, account_id: str, source: Optional[str] = None) -> Dict[str, int]:
+    """
+    Recompute one account's holdings from its BUY/SELL/OASGN history and commit.
+
+    Holdings for symbols without share transactions, or whose history does
+    not cover the position (see PositionLedger.apply), are left alone.
+    Returns the number of holdings written, transactions replayed and
+    symbols skipped.
+    """
+    query = db.query(InvestmentTransaction).filter(
+        InvestmentTransaction.account_id == account_id,
+        InvestmentTransaction.transaction_type.in_(SHARE_TRANSACTION_TYPES),
+    )
+    if source:
+        query = query.filter(InvestmentTransaction.source == source)
+
+    ledger = PositionLedger()
+    for txn in query.order_by(InvestmentTransaction.transaction_date, InvestmentTransaction.id):
+        ledger.add_transaction(txn)
+    transactions = len(ledger)
+
+    try:
+        holdings = ledger.apply(db, rebuild=True)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(f"[POSITION_LEDGER] Rebuilt {holdings} holdings for {account_id} from {transactions} transactions")
+    return {"holdings": holdings, "transactions": transactions, "skipped": len(ledger.skipped)}
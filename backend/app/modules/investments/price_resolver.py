@@ -0,0 +1,296 @@
+"""
+Price resolution across quote providers.
+
+get_prices_schwab_first() read quote["lastPrice"], but
+get_stock_quotes_batch_schwab() returns the price as "currentPrice", so
+every symbol fell through to Yahoo - one chart request per symbol, one
+after another. A /holdings/live refresh of 60 symbols took tens of seconds.
+
+resolve_prices() asks a chain of providers for the symbols the previous
+ones did not answer and records which provider answered each:
+
+1. schwab       - one batch quote request
+2. yahoo_quote  - Yahoo's multi-symbol quote endpoint, YAHOO_BATCH_SIZE
+                  symbols per request
+3. yahoo_chart  - the per-symbol chart endpoint, at most
+                  YAHOO_MAX_CONCURRENCY requests in flight
+
+Quotes are normalized through quote_price(), which accepts the price field
+names each provider uses. Resolved quotes are cached per symbol for
+_get_price_cache_ttl() seconds (longer outside market hours).
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import pytz
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+# Price field names, in order of preference, across provider quote formats
+QUOTE_PRICE_FIELDS = ("currentPrice", "lastPrice", "regularMarketPrice", "mark")
+
+# Symbols per Yahoo multi-symbol quote request
+YAHOO_BATCH_SIZE = 50
+
+# Concurrent Yahoo chart requests
+YAHOO_MAX_CONCURRENCY = 8
+
+# Seconds to skip the Yahoo quote endpoint after it refuses a request
+# (it intermittently requires a session cookie)
+YAHOO_QUOTE_BACKOFF_SECONDS = 1800
+
+YAHOO_HEADERS = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'}
+YAHOO_TIMEOUT = 5
+
+# Price of the CASH pseudo-symbol
+CASH_SYMBOL = 'CASH'
+
+
+@dataclass
+class PriceQuote:
+    """The price of one symbol and the provider that answered."""
+    symbol: str
+    price: float
+    provider: str  # 'schwab', 'yahoo_quote', 'yahoo_chart' or 'fixed'
+    fetched_at: datetime = field(default_factory=datetime.now)
+
+    @property
+    def source(self) -> str:
+        """Provider family ('schwab', 'yahoo', 'fixed')."""
+        return self.provider.split('_')[0]
+
+
+def quote_price(quote: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """The price of a provider quote, whichever field name it uses; None if absent."""
+    if not quote:
+        return None
+    for name in QUOTE_PRICE_FIELDS:
+        value = quote.get(name)
+        try:
+            price = float(value) if value is not None else 0.0
+        except (TypeError, ValueError):
+            continue
+        if price > 0:
+            return price
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Providers: symbols -> {symbol: price} for the symbols they could price
+# ---------------------------------------------------------------------------
+
+def _schwab_prices(symbols: Sequence[str]) -> Dict[str, float]:
+    try:
+        from app.modules.strategies.schwab_service import get_stock_quotes_batch_schwab, is_schwab_configured
+    except ImportError:
+        logger.warning("Schwab service not available, using Yahoo for all symbols")
+        return {}
+
+    if not is_schwab_configured():
+        logger.warning("Schwab not configured, using Yahoo for all symbols")
+        return {}
+
+    logger.info(f"Fetching prices from Schwab for {len(symbols)} symbols...")
+    quotes = get_stock_quotes_batch_schwab(list(symbols))
+    prices = {}
+    for symbol in symbols:
+        price = quote_price(quotes.get(symbol))
+        if price:
+            prices[symbol] = price
+    return prices
+
+
+_yahoo_quote_disabled_until: Optional[datetime] = None
+
+
+def _yahoo_quote_prices(symbols: Sequence[str]) -> Dict[str, float]:
+    global _yahoo_quote_disabled_until
+    if _yahoo_quote_disabled_until and datetime.now() < _yahoo_quote_disabled_until:
+        return {}
+
+    prices = {}
+    for start in range(0, len(symbols), YAHOO_BATCH_SIZE):
+        chunk = symbols[start:start + YAHOO_BATCH_SIZE]
+        resp = requests.get(
+            "https://query1.finance.yahoo.com/v7/finance/quote",
+            params={"symbols": ",".join(chunk)},
+            headers=YAHOO_HEADERS,
+            timeout=YAHOO_TIMEOUT,
+        )
+        if resp.status_code in (401, 403, 429):
+            logger.info(f"Yahoo quote endpoint refused (HTTP {resp.status_code}); using chart requests")
+            _yahoo_quote_disabled_until = datetime.now() + timedelta(seconds=YAHOO_QUOTE_BACKOFF_SECONDS)
+            break
+        if resp.status_code != 200:
+            logger.warning(f"Yahoo quote request failed: HTTP {resp.status_code}")
+            continue
+        for quote in resp.json().get("quoteResponse", {}).get("result") or []:
+            price = quote_price(quote)
+            if price and quote.get("symbol") in chunk:
+                prices[quote["symbol"]] = price
+    return prices
+
+
+def _yahoo_chart_price(symbol: str) -> Optional[float]:
+    try:
+        resp = requests.get(
+            f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=1d",
+            headers=YAHOO_HEADERS,
+            timeout=YAHOO_TIMEOUT,
+        )
+        if resp.status_code != 200:
+            logger.warning(f"Failed to fetch price for {symbol}: HTTP {resp.status_code}")
+            return None
+        return quote_price(resp.json()['chart']['result'][0]['meta'])
+    except Exception as e:
+        logger.warning(f"Error fetching price for {symbol}: {e}")
+        return None
+
+
+def _yahoo_chart_prices(symbols: Sequence[str]) -> Dict[str, float]:
+    if not symbols:
+        return {}
+    # The pool size bounds the requests in flight
+    with ThreadPoolExecutor(max_workers=min(YAHOO_MAX_CONCURRENCY, len(symbols))) as pool:
+        fetched = pool.map(_yahoo_chart_price, symbols)
+    return {symbol: price for symbol, price in zip(symbols, fetched) if price}
+
+
+PROVIDERS: Dict[str, Callable[[Sequence[str]], Dict[str, float]]] = {
+    "schwab": _schwab_prices,
+    "yahoo_quote": _yahoo_quote_prices,
+    "yahoo_chart": _yahoo_chart_prices,
+}
+
+# Provider chains
+SCHWAB_FIRST = ("schwab", "yahoo_quote", "yahoo_chart")
+YAHOO_ONLY = ("yahoo_quote", "yahoo_chart")
+
+
+# ---------------------------------------------------------------------------
+# Cache
+# ---------------------------------------------------------------------------
+
+_quote_cache: Dict[str, PriceQuote] = {}
+_cache_lock = threading.Lock()
+
+
+def _get_price_cache_ttl() -> int:
+    """
+    Get cache TTL based on market hours.
+
+    During market hours (6:30 AM - 1:00 PM PT, Mon-Fri): 60 seconds
+    Outside market hours: 30 minutes (prices don't change)
+    """
+    try:
+        PT = pytz.timezone('America/Los_Angeles')
+        now = datetime.now(PT)
+        hour = now.hour
+        minute = now.minute
+        weekday = now.weekday()
+
+        # Weekend - use long cache
+        if weekday >= 5:
+            return 1800  # 30 minutes
+
+        # Convert to minutes since midnight
+        current_time = hour * 60 + minute
+        market_open = 6 * 60 + 30   # 6:30 AM PT
+        market_close = 13 * 60      # 1:00 PM PT
+
+        # During market hours
+        if market_open <= current_time <= market_close:
+            return 60  # 1 minute
+
+        # Outside market hours
+        return 1800  # 30 minutes
+    except Exception:
+        return 60  # Default to 1 minute if timezone fails
+
+
+def _cached_quotes(symbols: Iterable[str], now: datetime) -> Dict[str, PriceQuote]:
+    ttl = _get_price_cache_ttl()
+    with _cache_lock:
+        return {
+            symbol: _quote_cache[symbol]
+            for symbol in symbols
+            if symbol in _quote_cache and (now - _quote_cache[symbol].fetched_at).total_seconds() < ttl
+        }
+
+
+def clear_price_cache() -> None:
+    """Drop all cached quotes."""
+    with _cache_lock:
+        _quote_cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# Resolution
+# ---------------------------------------------------------------------------
+
+def resolve_with_providers(
+    symbols: Sequence[str],
+    providers: Sequence[Tuple[str, Callable[[Sequence[str]], Dict[str, float]]]],
+    now: Optional[datetime] = None,
+) -> Dict[str, PriceQuote]:
+    """Ask each provider for the symbols still unpriced; a failing provider is skipped."""
+    now = now or datetime.now()
+    quotes: Dict[str, PriceQuote] = {}
+    for name, fetch in providers:
+        missing = [symbol for symbol in symbols if symbol not in quotes]
+        if not missing:
+            break
+        try:
+            prices = fetch(missing)
+        except Exception as e:
+            logger.warning(f"{name} price provider error: {e}")
+            continue
+        for symbol in missing:
+            if prices.get(symbol):
+                quotes[symbol] = PriceQuote(symbol, float(prices[symbol]), name, now)
+        logger.info(f"Price provider {name}: {len(prices)}/{len(missing)} symbols")
+    return quotes
+
+
+def resolve_prices(
+    symbols: Iterable[str],
+    chain: Sequence[str] = SCHWAB_FIRST,
+    use_cache: bool = True,
+) -> Dict[str, PriceQuote]:
+    """
+    symbol -> PriceQuote for every symbol some provider in `chain` could
+    price. CASH is always 1.0.
+    """
+    symbols = list(dict.fromkeys(s for s in symbols if s))
+    now = datetime.now()
+    quotes: Dict[str, PriceQuote] = {}
+    if CASH_SYMBOL in symbols:
+        quotes[CASH_SYMBOL] = PriceQuote(CASH_SYMBOL, 1.0, "fixed", now)
+    if use_cache:
+        quotes.update(_cached_quotes((s for s in symbols if s not in quotes), now))
+
+    missing = [symbol for symbol in symbols if symbol not in quotes]
+    if missing:
+        fetched = resolve_with_providers(missing, [(name, PROVIDERS[name]) for name in chain], now)
+        with _cache_lock:
+            _quote_cache.update(fetched)
+        quotes.update(fetched)
+        unpriced = [symbol for symbol in missing if symbol not in fetched]
+        if unpriced:
+            logger.warning(f"No price for {len(unpriced)} symbols: {unpriced}")
+    return quotes
+
+
+def provider_counts(quotes: Mapping[str, PriceQuote]) -> Dict[str, int]:
+    """provider -> number of symbols it answered."""
+    counts: Dict[str, int] = {}
+    for quote in quotes.values():
+        counts[quote.provider] = counts.get(quote.provider, 0) + 1
+    return counts
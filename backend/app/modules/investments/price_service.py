@@ -4,13 +4,17 @@ Uses Schwab API as primary source, yfinance/Yahoo Finance API as fallback.
 """
 
 import yfinance as yf
-import requests
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional
 from functools import lru_cache
 import logging
-import time
-import pytz
+
+from app.modules.investments.price_resolver import (
+    SCHWAB_FIRST,
+    YAHOO_ONLY,
+    provider_counts,
+    resolve_prices,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -18,93 +22,23 @@ logger = logging.getLogger(__name__)
 def get_prices_schwab_first(symbols: List[str]) -> Dict[str, dict]:
     """
     Get current prices for symbols, using Schwab as primary source.
-    Falls back to Yahoo Finance if Schwab fails.
-    
-    Returns dict with symbol -> {"current_price": float, "source": str}
-    """
-    results = {}
-    symbols_needing_fallback = []
-    
-    if not symbols:
-        return results
-    
-    # Try Schwab first (batch request for efficiency)
-    try:
-        from app.modules.strategies.schwab_service import get_stock_quotes_batch_schwab, is_schwab_configured
-        
-        if is_schwab_configured():
-            logger.info(f"Fetching prices from Schwab for {len(symbols)} symbols...")
-            quotes = get_stock_quotes_batch_schwab(symbols)
-            
-            for symbol in symbols:
-                quote = quotes.get(symbol)
-                if quote and quote.get("lastPrice"):
-                    results[symbol] = {
-                        "current_price": round(float(quote["lastPrice"]), 2),
-                        "source": "schwab"
-                    }
-                    logger.debug(f"Got price for {symbol} from Schwab: ${quote['lastPrice']}")
-                else:
-                    symbols_needing_fallback.append(symbol)
-        else:
-            logger.warning("Schwab not configured, using Yahoo for all symbols")
-            symbols_needing_fallback = symbols
-    except ImportError:
-        logger.warning("Schwab service not available, using Yahoo for all symbols")
-        symbols_needing_fallback = symbols
-    except Exception as e:
-        logger.warning(f"Schwab service error: {e}, falling back to Yahoo")
-        symbols_needing_fallback = [s for s in symbols if s not in results]
+    Falls back to Yahoo Finance (batched, then concurrent per-symbol
+    requests) for the symbols Schwab did not price.
     
-    # Fall back to Yahoo for any remaining symbols
-    if symbols_needing_fallback:
-        logger.info(f"Falling back to Yahoo for {len(symbols_needing_fallback)} symbols")
-        yahoo_prices = get_live_prices_fast(symbols_needing_fallback)
-        for symbol, price in yahoo_prices.items():
-            if price and symbol not in results:
-                results[symbol] = {
-                    "current_price": round(float(price), 2),
-                    "source": "yahoo"
-                }
-    
-    return results
-
-# Cache for live prices (symbol -> (price, timestamp))
-_price_cache: Dict[str, Tuple[float, datetime]] = {}
-CACHE_TTL_SECONDS = 60  # Cache prices for 60 seconds (default)
-
-
-def _get_price_cache_ttl() -> int:
-    """
-    Get cache TTL based on market hours.
-    
-    During market hours (6:30 AM - 1:00 PM PT, Mon-Fri): 60 seconds
-    Outside market hours: 30 minutes (prices don't change)
+    Returns dict with symbol -> {"current_price": float, "source": str, "provider": str}
+    where source is 'schwab' or 'yahoo' and provider the endpoint that answered.
     """
-    try:
-        PT = pytz.timezone('America/Los_Angeles')
-        now = datetime.now(PT)
-        hour = now.hour
-        minute = now.minute
-        weekday = now.weekday()
-        
-        # Weekend - use long cache
-        if weekday >= 5:
-            return 1800  # 30 minutes
-        
-        # Convert to minutes since midnight
-        current_time = hour * 60 + minute
-        market_open = 6 * 60 + 30   # 6:30 AM PT
-        market_close = 13 * 60      # 1:00 PM PT
-        
-        # During market hours
-        if market_open <= current_time <= market_close:
-            return 60  # 1 minute
-        
-        # Outside market hours
-        return 1800  # 30 minutes
-    except Exception:
-        return 60  # Default to 1 minute if timezone fails
+    quotes = resolve_prices(symbols, chain=SCHWAB_FIRST)
+    if quotes:
+        logger.info(f"Price providers: {provider_counts(quotes)}")
+    return {
+        symbol: {
+            "current_price": round(quote.price, 2),
+            "source": quote.source,
+            "provider": quote.provider,
+        }
+        for symbol, quote in quotes.items()
+    }
 
 
 def get_live_prices_fast(symbols: List[str]) -> Dict[str, float]:
@@ -114,63 +48,16 @@ def get_live_prices_fast(symbols: List[str]) -> Dict[str, float]:
     Returns dict of symbol -> current price.
     Uses caching to avoid excessive API calls.
     """
-    if not symbols:
-        return {}
-    
-    results = {}
-    symbols_to_fetch = []
-    now = datetime.now()
-    
-    # Check cache first with dynamic TTL based on market hours
-    cache_ttl = _get_price_cache_ttl()
-    
-    for symbol in symbols:
-        if symbol == 'CASH':
-            results[symbol] = 1.0
-            continue
-            
-        if symbol in _price_cache:
-            cached_price, cached_time = _price_cache[symbol]
-            if (now - cached_time).total_seconds() < cache_ttl:
-                results[symbol] = cached_price
-                continue
-        
-        symbols_to_fetch.append(symbol)
-    
-    # Fetch uncached symbols
-    if symbols_to_fetch:
-        logger.info(f"Fetching live prices for {len(symbols_to_fetch)} symbols: {symbols_to_fetch}")
-        
-        for symbol in symbols_to_fetch:
-            try:
-                url = f"https://query1.finance.yahoo.com/v8/finance/chart/{symbol}?interval=1d&range=1d"
-                headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)'}
-                resp = requests.get(url, headers=headers, timeout=5)
-                
-                if resp.status_code == 200:
-                    data = resp.json()
-                    price = data['chart']['result'][0]['meta']['regularMarketPrice']
-                    results[symbol] = round(price, 2)
-                    _price_cache[symbol] = (price, now)
-                else:
-                    logger.warning(f"Failed to fetch price for {symbol}: HTTP {resp.status_code}")
-                    
-            except Exception as e:
-                logger.warning(f"Error fetching price for {symbol}: {e}")
-        
-        # Small delay to avoid rate limiting
-        if len(symbols_to_fetch) > 5:
-            time.sleep(0.1)
-    
-    return results
+    quotes = resolve_prices(symbols, chain=YAHOO_ONLY)
+    return {symbol: round(quote.price, 2) for symbol, quote in quotes.items()}
 
 
 def get_holdings_with_live_prices(db) -> Dict[str, any]:
     """
-    Get all holdings with live prices from Yahoo Finance.
+    Get all holdings with live prices (Schwab first, Yahoo fallback).
     
     Returns holdings grouped by account with:
-    - Live prices from Yahoo Finance
+    - Live prices and the provider that answered for each symbol
     - Calculated market values (shares × live price)
     - Cash balances from portfolio snapshots
     - Price update timestamp
@@ -195,7 +82,8 @@ def get_holdings_with_live_prices(db) -> Dict[str, any]:
     ))
     
     # Fetch live prices
-    live_prices = get_live_prices_fast(symbols)
+    quotes = resolve_prices(symbols, chain=SCHWAB_FIRST)
+    live_prices = {symbol: round(quote.price, 2) for symbol, quote in quotes.items()}
     price_fetch_time = datetime.utcnow().isoformat() + 'Z'
     
     # Group holdings by account
@@ -236,10 +124,12 @@ def get_holdings_with_live_prices(db) -> Dict[str, any]:
                 live_price = live_prices[symbol]
                 market_value = qty * live_price
                 price_source = 'live'
+                price_provider = quotes[symbol].provider
             else:
                 live_price = float(h.current_price) if h.current_price else 0
                 market_value = float(h.market_value) if h.market_value else qty * live_price
                 price_source = 'cached'
+                price_provider = None
             
             securities_value += market_value
             
@@ -250,6 +140,7 @@ def get_holdings_with_live_prices(db) -> Dict[str, any]:
                 'currentPrice': round(live_price, 2),
                 'totalValue': round(market_value, 2),
                 'priceSource': price_source,
+                'priceProvider': price_provider,
                 'costBasis': float(h.cost_basis) if h.cost_basis else None,
             })
         
@@ -312,10 +203,21 @@ def get_holdings_with_live_prices(db) -> Dict[str, any]:
         'accounts': result,
         'totalValue': round(grand_total, 2),
         'pricesUpdatedAt': price_fetch_time,
-        'priceSource': 'yahoo_finance',
+        'priceSource': _summary_source(quotes),
+        'priceProviders': provider_counts(quotes),
     }
 
 
+def _summary_source(quotes) -> str:
+    """'schwab' or 'yahoo_finance' when one provider family priced everything, else 'mixed'."""
+    sources = {quote.source for quote in quotes.values() if quote.source != 'fixed'}
+    if sources == {'schwab'}:
+        return 'schwab'
+    if sources == {'yahoo'} or not sources:
+        return 'yahoo_finance'
+    return 'mixed'
+
+
 def get_price_changes(symbols: List[str]) -> Dict[str, dict]:
     """
     Get price changes for a list of stock symbols.
@@ -28,6 +28,9 @@ from app.modules.investments.models import (
     InvestmentTransaction,
     PortfolioSnapshot,
 )
+from app.modules.investments.position_ledger import rebuild_account_holdings
+from app.modules.investments.transaction_query import MAX_PAGE_SIZE, TransactionFilter, paginate
+from app.modules.investments.valuation_engine import performance_report, refresh_valuations, valuation_history
 from app.modules.investments.price_service import (
     get_price_changes, 
     update_holdings_with_live_prices,
@@ -194,10 +197,10 @@ async def list_all_holdings(
 @router.get("/holdings/live")
 async def get_holdings_live(db: Session = Depends(get_db)):
     """
-    Get all holdings with LIVE prices from Yahoo Finance.
+    Get all holdings with LIVE prices (Schwab first, Yahoo Finance fallback).
     
     This endpoint:
-    - Fetches current prices from Yahoo Finance API
+    - Fetches current prices in batches, recording the provider per symbol
     - Calculates market values using: shares × live_price
     - Includes cash balances from portfolio snapshots
     - Returns price source indicator (live vs cached)
@@ -313,48 +316,55 @@ async def remove_holding(
 @router.get("/transactions")
 async def list_transactions(
     db: Session = Depends(get_db),
-    account_id: Optional[str] = None,
-    symbol: Optional[str] = None,
-    transaction_type: Optional[str] = None,
+    account_id: Optional[List[str]] = Query(default=None),
+    symbol: Optional[List[str]] = Query(default=None),
+    transaction_type: Optional[List[str]] = Query(default=None),
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
-    limit: int = Query(default=100, le=500)
+    cursor: Optional[str] = Query(default=None, description="next_cursor of the previous page"),
+    include_total: bool = Query(default=False, description="Also count all matching transactions"),
+    limit: int = Query(default=100, ge=1, le=MAX_PAGE_SIZE)
 ):
     """
-    List investment transactions with filters.
+    List investment transactions with filters, newest first.
     Transaction types: BUY, SELL, DIV, TRANSFER, SPLIT
-    """
-    query = db.query(InvestmentTransaction)
     
-    if account_id:
-        query = query.filter(InvestmentTransaction.account_id == account_id)
-    if symbol:
-        query = query.filter(InvestmentTransaction.symbol == symbol.upper())
-    if transaction_type:
-        query = query.filter(InvestmentTransaction.transaction_type == transaction_type.upper())
-    if start_date:
-        query = query.filter(InvestmentTransaction.transaction_date >= start_date)
-    if end_date:
-        query = query.filter(InvestmentTransaction.transaction_date <= end_date)
-    
-    transactions = query.order_by(
-        InvestmentTransaction.transaction_date.desc()
-    ).limit(limit).all()
+    account_id, symbol and transaction_type may be repeated. Pass the
+    returned next_cursor to get the following page. "total" is the number
+    of rows returned unless include_total asks for the full count.
+    """
+    spec = TransactionFilter.build(
+        account_ids=account_id,
+        symbols=symbol,
+        transaction_types=transaction_type,
+        start_date=start_date,
+        end_date=end_date,
+    )
+    try:
+        page = paginate(
+            db.query(InvestmentTransaction),
+            spec,
+            _transaction_to_dict,
+            cursor=cursor,
+            limit=limit,
+            include_total=include_total,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
+    return page.to_dict()
+
+
+def _transaction_to_dict(t: InvestmentTransaction) -> dict:
     return {
-        "transactions": [
-            {
-                "id": t.id,
-                "date": t.transaction_date.isoformat() if t.transaction_date else None,
-                "type": t.transaction_type,
-                "symbol": t.symbol,
-                "quantity": float(t.quantity) if t.quantity else None,
-                "amount": float(t.amount) if t.amount else None,
-                "price_per_share": float(t.price_per_share) if t.price_per_share else None,
-            }
-            for t in transactions
-        ],
-        "total": len(transactions)
+        "id": t.id,
+        "date": t.transaction_date.isoformat() if t.transaction_date else None,
+        "account_id": t.account_id,
+        "type": t.transaction_type,
+        "symbol": t.symbol,
+        "quantity": float(t.quantity) if t.quantity else None,
+        "amount": float(t.amount) if t.amount else None,
+        "price_per_share": float(t.price_per_share) if t.price_per_share else None,
     }
 
 
@@ -363,14 +373,24 @@ async def get_portfolio_history(
     db: Session = Depends(get_db),
     owner: Optional[str] = None,
     account_id: Optional[str] = None,
+    daily: bool = False,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
 ):
     """
     Get historical portfolio values from statement snapshots.
     Returns monthly data points for the chart.
     Can filter by owner (all accounts for that person) or account_id (specific account).
+    
+    With daily=true, returns the gap-free daily securities value and net flow
+    from the valuation engine instead (optionally between start_date and end_date).
     """
     from sqlalchemy import func
     
+    if daily:
+        history = valuation_history(db, account_id=account_id, owner=owner, start=start_date, end=end_date)
+        return {"history": history, "total_days": len(history), "source": "valuations"}
+    
     query = db.query(
         PortfolioSnapshot.statement_date,
         func.sum(PortfolioSnapshot.portfolio_value).label('total_value')
@@ -413,9 +433,23 @@ async def get_portfolio_history(
 @router.get("/performance")
 async def get_portfolio_performance(
     db: Session = Depends(get_db),
-    period: str = Query(default="1Y", pattern="^(1M|3M|6M|1Y|3Y|5Y|ALL)$")
+    period: str = Query(default="1Y", pattern="^(1M|3M|6M|1Y|3Y|5Y|ALL)$"),
+    owner: Optional[str] = None,
+    account_id: Optional[str] = None,
 ):
-    """Get portfolio performance over specified period."""
+    """
+    Get portfolio performance over specified period.
+    
+    From the daily valuations when they exist: time- and money-weighted
+    returns, drawdowns and a comparison with the benchmark, with gain_loss
+    net of deposits and withdrawals. Falls back to the statement snapshots.
+    """
+    report = performance_report(db, period=period, account_id=account_id, owner=owner)
+    if report is not None:
+        report["gain_loss_percent"] = round(report["twr"] * 100, 2)
+        report["source"] = "valuations"
+        return report
+    
     summary = get_holdings_summary(db)
     
     # Get history for performance calculation
@@ -441,7 +475,30 @@ async def get_portfolio_performance(
         "end_value": end_value,
         "gain_loss": gain_loss,
         "gain_loss_percent": round(gain_loss_percent, 2),
-        "history": history
+        "history": history,
+        "source": "snapshots",
+    }
+
+
+@router.post("/valuations/refresh")
+async def refresh_portfolio_valuations(
+    db: Session = Depends(get_db),
+    force: bool = False,
+):
+    """
+    Bring the daily portfolio valuations up to today.
+    
+    Fetches missing daily closes, rewrites accounts whose transactions changed
+    and extends the others. force=true rewrites every account.
+    """
+    result = refresh_valuations(db, force=force)
+    return {
+        "success": True,
+        "valued_through": result.valued_through.isoformat(),
+        "rewritten": result.rewritten,
+        "extended": result.extended,
+        "closes_written": result.closes_written,
+        "rows_written": result.rows_written,
     }
 
 
@@ -709,6 +766,33 @@ async def get_price_update_preview(db: Session = Depends(get_db)):
     }
 
 
+@router.post("/holdings/rebuild")
+async def rebuild_holdings(
+    account_id: str,
+    db: Session = Depends(get_db),
+    source: Optional[str] = None,
+):
+    """
+    Rebuild an account's holdings from its BUY/SELL/OASGN transactions.
+    
+    Replays the account's share transactions through the position ledger and
+    writes every resulting holding with one upsert. Holdings for symbols
+    without share transactions, or whose transactions don't cover the
+    position (shares transferred in or bought before the first import),
+    are left untouched.
+    
+    Args:
+        account_id: Account to rebuild (e.g., 'neel_brokerage')
+        source: Optional - Only replay transactions from this source
+    """
+    result = rebuild_account_holdings(db, account_id=account_id, source=source)
+    return {
+        "success": True,
+        "message": f"Rebuilt {result['holdings']} holdings for {account_id} ({result['skipped']} kept, partial history)",
+        **result,
+    }
+
+
 @router.post("/holdings/recalculate-cost-basis")
 async def recalculate_cost_basis(
     db: Session = Depends(get_db),
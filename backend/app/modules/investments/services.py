@@ -292,9 +292,10 @@ def get_holdings_by_owner(db: Session, owner: str) -> List[Dict[str, Any]]:
     return [h for h in all_holdings if h['owner'].lower() == owner.lower()]
 
 
-def get_holdings_summary(db: Session) -> Dict[str, Any]:
-    """Get a summary of all holdings."""
-    all_holdings = get_all_holdings(db)
+def get_holdings_summary(db: Session, all_holdings: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """Get a summary of all holdings (of `all_holdings` when already loaded)."""
+    if all_holdings is None:
+        all_holdings = get_all_holdings(db)
     
     total_value = sum(acc['value'] for acc in all_holdings)
     
@@ -0,0 +1,200 @@
+"""
+Keyset-paginated transaction queries.
+
+The transaction lists (/investments/transactions and the options, dividend
+and interest lists of /income) returned the newest N rows with no way to
+page further, so long histories were only reachable by pulling everything
+and filtering in the browser.
+
+A TransactionFilter (accounts, symbols, transaction types, date range or
+year) compiles into predicates on indexed columns - a year becomes a date
+range rather than extract('year'), so idx_transaction_date and the
+(account|symbol|type, transaction_date) indexes apply. Pages are ordered by
+(transaction_date, id) descending and continue from an opaque cursor that
+encodes the last row's key:
+
+    WHERE (transaction_date, id) < (:date, :id) ORDER BY transaction_date DESC, id DESC LIMIT :n
+
+so page 100 costs the same as page 1. Totals are a separate COUNT over the
+same predicates and only run when asked for.
+"""
+
+import base64
+import binascii
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Query
+
+from app.modules.investments.models import InvestmentTransaction
+
+
+# Largest page a caller can ask for
+MAX_PAGE_SIZE = 500
+
+
+def _normalized(values: Optional[Iterable[str]], upper: bool = False) -> Tuple[str, ...]:
+    """Non-empty, stripped (optionally upper-cased) values, in order, without repeats."""
+    result = []
+    for value in values or ():
+        value = (value or '').strip()
+        if value:
+            result.append(value.upper() if upper else value)
+    return tuple(dict.fromkeys(result))
+
+
+@dataclass(frozen=True)
+class TransactionFilter:
+    """Which investment transactions a query returns."""
+    account_ids: Tuple[str, ...] = ()
+    symbols: Tuple[str, ...] = ()
+    transaction_types: Tuple[str, ...] = ()
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    @classmethod
+    def build(
+        cls,
+        account_ids: Optional[Iterable[str]] = None,
+        symbols: Optional[Iterable[str]] = None,
+        transaction_types: Optional[Iterable[str]] = None,
+        start_date: Optional[date] = None,
+        end_date: Optional[date] = None,
+        year: Optional[int] = None,
+    ) -> "TransactionFilter":
+        """
+        Filter from request parameters. Symbols and types are upper-cased;
+        a year narrows the date range to that calendar year.
+        """
+        if year:
+            start_date = max(start_date or date(year, 1, 1), date(year, 1, 1))
+            end_date = min(end_date or date(year, 12, 31), date(year, 12, 31))
+        return cls(
+            account_ids=_normalized(account_ids),
+            symbols=_normalized(symbols, upper=True),
+            transaction_types=_normalized(transaction_types, upper=True),
+            start_date=start_date,
+            end_date=end_date,
+        )
+
+    def restrict_types(self, allowed: Sequence[str]) -> "TransactionFilter":
+        """This filter limited to `allowed` types (all of them if no types were asked for)."""
+        if not self.transaction_types:
+            types = tuple(allowed)
+        else:
+            types = tuple(t for t in self.transaction_types if t in allowed)
+        return TransactionFilter(
+            account_ids=self.account_ids,
+            symbols=self.symbols,
+            transaction_types=types,
+            start_date=self.start_date,
+            end_date=self.end_date,
+        )
+
+    def predicates(self) -> List[Any]:
+        """SQL predicates on investment_transactions."""
+        txn = InvestmentTransaction
+        predicates = []
+        if self.account_ids:
+            predicates.append(_in_or_equal(txn.account_id, self.account_ids))
+        if self.symbols:
+            predicates.append(_in_or_equal(txn.symbol, self.symbols))
+        if self.transaction_types:
+            predicates.append(_in_or_equal(txn.transaction_type, self.transaction_types))
+        if self.start_date:
+            predicates.append(txn.transaction_date >= self.start_date)
+        if self.end_date:
+            predicates.append(txn.transaction_date <= self.end_date)
+        return predicates
+
+
+def _in_or_equal(column, values: Tuple[str, ...]):
+    return column == values[0] if len(values) == 1 else column.in_(values)
+
+
+# ---------------------------------------------------------------------------
+# Cursors
+# ---------------------------------------------------------------------------
+
+def encode_cursor(transaction_date: date, transaction_id: int) -> str:
+    """Opaque cursor for the page after the row (transaction_date, id)."""
+    raw = f"{transaction_date.isoformat()}:{transaction_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """(transaction_date, id) of a cursor; ValueError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        day, transaction_id = raw.split(":")
+        return date.fromisoformat(day), int(transaction_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _after_cursor(cursor: str):
+    """Rows after the cursor in (transaction_date DESC, id DESC) order."""
+    last_date, last_id = decode_cursor(cursor)
+    txn = InvestmentTransaction
+    return or_(
+        txn.transaction_date < last_date,
+        and_(txn.transaction_date == last_date, txn.id < last_id),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Pages
+# ---------------------------------------------------------------------------
+
+@dataclass
+class TransactionPage:
+    """One page of a keyset-paginated transaction query."""
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None  # all matching rows; only counted with include_total
+
+    def to_dict(self, key: str = "transactions") -> Dict[str, Any]:
+        # "total" was the number of rows returned before pagination; it stays
+        # that unless the full count was asked for
+        return {
+            key: self.items,
+            "count": len(self.items),
+            "next_cursor": self.next_cursor,
+            "has_more": self.next_cursor is not None,
+            "total": self.total if self.total is not None else len(self.items),
+            "total_is_exact": self.total is not None,
+        }
+
+
+def paginate(
+    query: Query,
+    spec: TransactionFilter,
+    serialize: Callable[[Any], Dict[str, Any]],
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    include_total: bool = False,
+) -> TransactionPage:
+    """
+    One page of `query` (which must select InvestmentTransaction.id and
+    transaction_date) filtered by `spec`, newest first.
+
+    Raises ValueError for a malformed cursor.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    txn = InvestmentTransaction
+    filtered = query.filter(*spec.predicates())
+
+    page_query = filtered
+    if cursor:
+        page_query = page_query.filter(_after_cursor(cursor))
+    rows = page_query.order_by(txn.transaction_date.desc(), txn.id.desc()).limit(limit + 1).all()
+
+    page = TransactionPage(items=[serialize(row) for row in rows[:limit]])
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        page.next_cursor = encode_cursor(last.transaction_date, last.id)
+    if include_total:
+        page.total = filtered.with_entities(func.count(txn.id)).order_by(None).scalar() or 0
+    return page
@@ -0,0 +1,773 @@
+"""
+Daily portfolio valuation and returns.
+
+/investments/portfolio-history and /performance summed PortfolioSnapshot
+rows, which exist only for imported statements - months are missing, the
+performance period was ignored, and the "return" was the change in value,
+deposits included.
+
+The engine values every account on every calendar day instead:
+
+1. Closing prices are kept locally in daily_closes; a refresh fetches only
+   the days a symbol is missing - before its earliest stored close and
+   after its latest - plus the last RECHECK_DAYS stored closes again (one
+   yfinance download per date range), including the BENCHMARK_SYMBOL.
+   Today's close is fetched only once the session has ended.
+2. Share transactions (BUY, SELL, OASGN) are replayed per (account, symbol)
+   with the position ledger's rules (a sell never goes below zero or opens
+   a position) into a (day x symbol) quantity matrix, valued against the
+   forward-filled closes (the last trade price before a symbol's first
+   close). The result is position_valuations (date, account, symbol,
+   quantity, value) and account_valuations (date, account, value, net
+   flow), with accounts keyed by (source, account_id) like
+   investment_accounts.
+3. The net flow is the cash that moved into the securities: buys less
+   sells, less dividends paid out. Returns are computed on the securities;
+   cash balances are not tracked.
+
+Refresh is incremental. Each account keeps a fingerprint of its valuation
+transactions (count, max(id), max(updated_at)) in valuation_sources; an
+account whose transactions changed is rewritten, the others only get the
+days after valued_through (plus the last RECHECK_DAYS, whose closes may have
+arrived late).
+
+Returns math runs on the stored daily series as array operations:
+time-weighted return (daily returns chained; trades settle at the close, so
+a day's flow is taken out at the end of the day),
+money-weighted return (XIRR of the flows), drawdowns, and a comparison with
+the benchmark (return, excess, beta, correlation, tracking error).
+
+Stock splits are not replayed (like the position ledger), so a position
+valued across a split uses split-adjusted closes with unadjusted quantities
+before the split date.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+# (source, account_id), as investment_accounts is keyed
+AccountKey = Tuple[str, str]
+
+import numpy as np
+import pytz
+from sqlalchemy import and_, func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.ingestion.bulk_writer import CHUNK_SIZE
+from app.modules.income.income_rollup import INCOME_TRANSACTION_TYPES
+from app.modules.investments.models import (
+    AccountValuation,
+    DailyClose,
+    InvestmentAccount,
+    InvestmentTransaction,
+    PositionValuation,
+    ValuationSource,
+)
+from app.modules.investments.position_ledger import SHARE_TRANSACTION_TYPES, is_share_symbol, quantity_change
+
+logger = logging.getLogger(__name__)
+
+
+# Benchmark the portfolio is compared with
+BENCHMARK_SYMBOL = "SPY"
+
+# Days before valued_through rewritten on an incremental refresh, and
+# stored closes fetched again (a close may be revised after the day)
+RECHECK_DAYS = 5
+
+# A day's close is final after the regular session ends (1:00 PM PT)
+MARKET_TZ = pytz.timezone('America/Los_Angeles')
+SESSION_CLOSE = time(13, 0)
+
+# Transaction types that pay cash out of the securities
+DIVIDEND_TYPES = tuple(INCOME_TRANSACTION_TYPES['dividends'])
+
+# Transaction types the valuation reads
+VALUATION_TYPES = SHARE_TRANSACTION_TYPES + DIVIDEND_TYPES
+
+# Performance periods in days (None = since the first valuation)
+PERIOD_DAYS = {"1M": 30, "3M": 91, "6M": 182, "1Y": 365, "3Y": 1095, "5Y": 1826, "ALL": None}
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+# ---------------------------------------------------------------------------
+# Daily closes
+# ---------------------------------------------------------------------------
+
+def _yahoo_symbol(symbol: str) -> str:
+    # Class shares: BRK.B is BRK-B on Yahoo
+    return symbol.replace('.', '-')
+
+
+def _download_closes(symbols: Sequence[str], start: date, end: date) -> Dict[str, Dict[date, float]]:
+    """symbol -> {day: close} from yfinance for start..end (inclusive)."""
+    import pandas as pd
+    import yfinance as yf
+
+    by_yahoo = {_yahoo_symbol(symbol): symbol for symbol in symbols}
+    try:
+        data = yf.download(
+            list(by_yahoo), start=start.isoformat(), end=(end + timedelta(days=1)).isoformat(),
+            auto_adjust=False, progress=False, threads=True,
+        )
+    except Exception as e:
+        logger.warning(f"[VALUATION] Close download failed for {len(symbols)} symbols: {e}")
+        return {}
+    if data is None or data.empty or 'Close' not in data:
+        return {}
+
+    closes = data['Close']
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(next(iter(by_yahoo)))
+    result = {}
+    for column in closes.columns:
+        series = closes[column].dropna()
+        if column in by_yahoo and not series.empty:
+            result[by_yahoo[column]] = {index.date(): float(value) for index, value in series.items()}
+    return result
+
+
+def last_closed_day(now: Optional[datetime] = None) -> date:
+    """The latest day whose session has ended (today only after the close)."""
+    now = now or datetime.now(MARKET_TZ)
+    if now.time() >= SESSION_CLOSE:
+        return now.date()
+    return now.date() - timedelta(days=1)
+
+
+def close_ranges(
+    first_dates: Mapping[str, date],
+    stored: Mapping[str, Tuple[date, date]],
+    through: date,
+) -> Dict[Tuple[date, date], List[str]]:
+    """
+    (start, end) -> symbols whose closes to fetch for that range.
+
+    A symbol with stored closes (earliest, latest) gets the days before the
+    earliest it now needs, and the last RECHECK_DAYS through `through`.
+    """
+    ranges: Dict[Tuple[date, date], List[str]] = defaultdict(list)
+    for symbol, first in first_dates.items():
+        if symbol not in stored:
+            if first <= through:
+                ranges[(first, through)].append(symbol)
+            continue
+        earliest, latest = stored[symbol]
+        if first < earliest:
+            ranges[(first, min(earliest - timedelta(days=1), through))].append(symbol)
+        start = max(first, latest - timedelta(days=RECHECK_DAYS - 1))
+        if start <= through:
+            ranges[(start, through)].append(symbol)
+    return ranges
+
+
+def update_closes(
+    db: Session,
+    first_dates: Mapping[str, date],
+    through: date,
+    now: Optional[datetime] = None,
+) -> int:
+    """
+    Fetch the closes each symbol is missing from its first needed date
+    through `through` (see close_ranges()), never past the last closed
+    session. Re-fetched closes replace the stored ones. Does not commit.
+    """
+    through = min(through, last_closed_day(now))
+    stored = {
+        symbol: (earliest, latest)
+        for symbol, earliest, latest in db.query(
+            DailyClose.symbol, func.min(DailyClose.price_date), func.max(DailyClose.price_date),
+        ).filter(DailyClose.symbol.in_(list(first_dates))).group_by(DailyClose.symbol).all()
+    }
+    ranges = close_ranges(first_dates, stored, through)
+
+    now_utc = datetime.utcnow()
+    written = 0
+    for (start, end), symbols in sorted(ranges.items()):
+        rows = [
+            {"symbol": symbol, "price_date": day, "close": round(close, 4), "source": "yahoo", "created_at": now_utc}
+            for symbol, closes in _download_closes(symbols, start, end).items()
+            for day, close in closes.items()
+            if start <= day <= end
+        ]
+        for offset in range(0, len(rows), CHUNK_SIZE):
+            stmt = pg_insert(DailyClose).values(rows[offset:offset + CHUNK_SIZE])
+            db.execute(stmt.on_conflict_do_update(
+                index_elements=['symbol', 'price_date'],
+                set_={"close": stmt.excluded.close, "source": stmt.excluded.source, "created_at": stmt.excluded.created_at},
+            ))
+        written += len(rows)
+    if written:
+        fetched = {symbol for symbols in ranges.values() for symbol in symbols}
+        logger.info(f"[VALUATION] Stored {written} closes for {len(fetched)} symbols")
+    return written
+
+
+def load_closes(db: Session, symbols: Iterable[str], start: date, end: date) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """symbol -> (days as datetime64[D], closes), ascending, start..end."""
+    rows = db.query(DailyClose.symbol, DailyClose.price_date, DailyClose.close).filter(
+        DailyClose.symbol.in_(list(symbols)),
+        DailyClose.price_date >= start,
+        DailyClose.price_date <= end,
+    ).order_by(DailyClose.symbol, DailyClose.price_date).all()
+
+    grouped: Dict[str, Tuple[List[date], List[float]]] = defaultdict(lambda: ([], []))
+    for symbol, day, close in rows:
+        grouped[symbol][0].append(day)
+        grouped[symbol][1].append(float(close))
+    return {
+        symbol: (np.array(days, dtype='datetime64[D]'), np.array(closes, dtype=float))
+        for symbol, (days, closes) in grouped.items()
+    }
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Trade:
+    """One valuation transaction of an account."""
+    day: date
+    symbol: str
+    change: float  # signed share change (0 for a dividend)
+    cash: Optional[float]  # cash into the securities; None when unknown
+    price: Optional[float] = None
+
+
+def trade_from_row(row: Any) -> Optional[Trade]:
+    """The Trade of an investment transaction row, or None if valuation ignores it."""
+    amount = abs(float(row.amount)) if row.amount is not None else None
+    if row.transaction_type in DIVIDEND_TYPES:
+        return Trade(row.transaction_date, row.symbol, 0.0, -(amount or 0.0)) if amount else None
+    if not is_share_symbol(row.symbol):
+        return None
+    change = float(quantity_change(row.transaction_type, row.quantity))
+    if change == 0:
+        return None
+    price = float(row.price_per_share) if row.price_per_share else None
+    if amount:
+        cash = amount + (float(row.fees or 0) if change > 0 else -float(row.fees or 0))
+    elif price:
+        cash = abs(change) * price
+    else:
+        cash = None
+    return Trade(row.transaction_date, row.symbol, change, None if cash is None else (cash if change > 0 else -cash), price)
+
+
+def day_range(start: date, end: date) -> np.ndarray:
+    """Every calendar day start..end as datetime64[D]."""
+    return np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+
+
+def _forward_fill(days: np.ndarray, points: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """The value of the latest point on or before each day (nan before the first)."""
+    if len(points) == 0:
+        return np.full(len(days), np.nan)
+    index = np.searchsorted(points, days, side='right') - 1
+    filled = values[np.clip(index, 0, None)]
+    return np.where(index >= 0, filled, np.nan)
+
+
+@dataclass
+class AccountSeries:
+    """An account's daily positions, values and flows."""
+    days: np.ndarray  # datetime64[D]
+    symbols: List[str]
+    quantities: np.ndarray  # days x symbols
+    prices: np.ndarray  # days x symbols, nan where unpriced
+    values: np.ndarray  # days
+    flows: np.ndarray  # days
+
+
+def value_account(
+    trades: Sequence[Trade],
+    closes: Mapping[str, Tuple[np.ndarray, np.ndarray]],
+    start: date,
+    end: date,
+) -> AccountSeries:
+    """Replay an account's trades onto days start..end and value them."""
+    days = day_range(start, end)
+    by_symbol: Dict[str, List[Trade]] = defaultdict(list)
+    for trade in sorted(trades, key=lambda t: t.day):
+        by_symbol[trade.symbol].append(trade)
+    symbols = sorted(s for s, ts in by_symbol.items() if any(t.change for t in ts))
+    column = {symbol: i for i, symbol in enumerate(symbols)}
+
+    quantities = np.zeros((len(days), len(symbols)))
+    prices = np.full((len(days), len(symbols)), np.nan)
+    flows = np.zeros(len(days))
+    neutral: List[Tuple[int, int, float]] = []  # (day, column, shares) flows valued at the day's price
+
+    for symbol, symbol_trades in by_symbol.items():
+        quantity, opened = 0.0, False
+        steps, trade_days, trade_prices = [], [], []
+        for trade in symbol_trades:
+            at = int((np.datetime64(trade.day, 'D') - days[0]).astype(int))
+            if at < 0 or at >= len(days):
+                continue
+            if trade.change == 0:
+                flows[at] += trade.cash or 0.0
+                continue
+            if not opened and trade.change <= 0:
+                # A sell does not open a position
+                continue
+            opened = True
+            new_quantity = max(0.0, quantity + trade.change)
+            applied = new_quantity - quantity
+            quantity = new_quantity
+            steps.append((at, quantity))
+            if trade.cash is not None:
+                flows[at] += trade.cash * (applied / trade.change)
+            else:
+                neutral.append((at, column[symbol], applied))
+            if trade.price:
+                trade_days.append(days[at])
+                trade_prices.append(trade.price)
+        if symbol not in column:
+            continue
+        j = column[symbol]
+        for at, value in steps:
+            quantities[at:, j] = value
+        close_days, close_values = closes.get(symbol, (np.array([], dtype='datetime64[D]'), np.array([])))
+        price = _forward_fill(days, close_days, close_values)
+        fallback = _forward_fill(days, np.array(trade_days, dtype='datetime64[D]'), np.array(trade_prices))
+        prices[:, j] = np.where(np.isnan(price), fallback, price)
+
+    for at, j, shares in neutral:
+        if not np.isnan(prices[at, j]):
+            flows[at] += shares * prices[at, j]
+
+    values = np.nansum(quantities * np.nan_to_num(prices), axis=1) if symbols else np.zeros(len(days))
+    return AccountSeries(days, symbols, quantities, prices, values, flows)
+
+
+# ---------------------------------------------------------------------------
+# Returns math
+# ---------------------------------------------------------------------------
+
+def daily_returns(values: np.ndarray, flows: np.ndarray, opening_value: float = 0.0) -> np.ndarray:
+    """
+    Daily returns with each day's flow at the end of the day:
+    r_t = (V_t - F_t) / V_t-1 - 1, and 0 where nothing was invested the day before.
+    """
+    previous = np.concatenate(([opening_value], values[:-1]))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.where(previous > 0, (values - flows) / previous - 1, 0.0)
+    return returns
+
+
+def time_weighted_return(returns: np.ndarray) -> float:
+    """Chained return of a daily return series."""
+    return float(np.prod(1 + returns) - 1) if len(returns) else 0.0
+
+
+def annualized(total_return: float, days: int) -> Optional[float]:
+    """Annualized return; None for periods shorter than a year."""
+    if days < 365 or total_return <= -1:
+        return None
+    return float((1 + total_return) ** (365.0 / days) - 1)
+
+
+def money_weighted_return(
+    values: np.ndarray,
+    flows: np.ndarray,
+    opening_value: float = 0.0,
+    tolerance: float = 1e-7,
+) -> Optional[float]:
+    """
+    Annual internal rate of return (XIRR) of the investor's cash flows: the
+    opening value at day 0, each day's flow at the end of that day and the
+    closing value at the end. Solved by bisection; None when the flows do
+    not change sign.
+    """
+    if not len(values):
+        return None
+    amounts = np.concatenate(([-opening_value], -flows))
+    amounts[-1] += values[-1]
+    years = np.arange(len(amounts)) / 365.0
+    if not (amounts > 0).any() or not (amounts < 0).any():
+        return None
+
+    def npv(rate: float) -> float:
+        return float(np.sum(amounts / (1 + rate) ** years))
+
+    # Short windows annualize to large rates
+    low, high = -0.99, 1e6
+    if npv(low) * npv(high) > 0:
+        return None
+    while high - low > tolerance:
+        mid = (low + high) / 2
+        if npv(low) * npv(mid) <= 0:
+            high = mid
+        else:
+            low = mid
+    return float((low + high) / 2)
+
+
+def drawdown_stats(returns: np.ndarray, days: np.ndarray) -> Dict[str, Any]:
+    """Maximum drawdown (with its peak, trough and recovery days) and the current drawdown."""
+    result = {"max_drawdown": 0.0, "current_drawdown": 0.0, "peak": None, "trough": None, "recovered": None}
+    if not len(returns):
+        return result
+    wealth = np.cumprod(1 + returns)
+    drawdowns = wealth / np.maximum.accumulate(wealth) - 1
+    result["current_drawdown"] = float(drawdowns[-1])
+    trough = int(np.argmin(drawdowns))
+    if drawdowns[trough] >= 0:
+        return result
+    peak = int(np.argmax(wealth[:trough + 1]))
+    recovered = np.nonzero(wealth[trough:] >= wealth[peak])[0]
+    result.update({
+        "max_drawdown": float(drawdowns[trough]),
+        "peak": str(days[peak]),
+        "trough": str(days[trough]),
+        "recovered": str(days[trough + int(recovered[0])]) if len(recovered) else None,
+    })
+    return result
+
+
+def benchmark_stats(returns: np.ndarray, benchmark_prices: np.ndarray) -> Optional[Dict[str, Any]]:
+    """
+    The portfolio's daily returns against a benchmark's prices: the opening
+    price followed by one forward-filled price per day of `returns`. Beta,
+    correlation and tracking error use the days the benchmark traded.
+    """
+    if len(benchmark_prices) != len(returns) + 1 or np.isnan(benchmark_prices).all():
+        return None
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bench = np.nan_to_num(benchmark_prices[1:] / benchmark_prices[:-1] - 1)
+    portfolio_total = time_weighted_return(returns)
+    benchmark_total = time_weighted_return(bench)
+
+    result = {
+        "symbol": BENCHMARK_SYMBOL,
+        "benchmark_return": benchmark_total,
+        "excess_return": portfolio_total - benchmark_total,
+        "beta": None,
+        "correlation": None,
+        "tracking_error": None,
+    }
+    trading = bench != 0
+    if trading.sum() >= 20:
+        p, b = returns[trading], bench[trading]
+        variance = np.var(b)
+        if variance > 0:
+            result["beta"] = float(np.cov(p, b, bias=True)[0, 1] / variance)
+        if np.std(p) > 0:
+            result["correlation"] = float(np.corrcoef(p, b)[0, 1])
+        result["tracking_error"] = float(np.std(p - b) * np.sqrt(TRADING_DAYS_PER_YEAR))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Materialization
+# ---------------------------------------------------------------------------
+
+@dataclass
+class ValuationRefresh:
+    """Outcome of one refresh."""
+    valued_through: date
+    rewritten: List[str] = field(default_factory=list)  # "source/account_id"
+    extended: List[str] = field(default_factory=list)
+    closes_written: int = 0
+    rows_written: int = 0
+
+
+def account_fingerprints(db: Session) -> Dict[AccountKey, str]:
+    """(source, account_id) -> hash of its valuation transactions' watermarks, in one grouped query."""
+    txn = InvestmentTransaction
+    rows = db.query(
+        txn.source, txn.account_id, func.count(txn.id), func.max(txn.id), func.max(txn.updated_at),
+    ).filter(txn.transaction_type.in_(VALUATION_TYPES)).group_by(txn.source, txn.account_id).all()
+    return {
+        (source, account_id): hashlib.sha256(f"{count}|{max_id}|{updated!r}".encode()).hexdigest()
+        for source, account_id, count, max_id, updated in rows
+    }
+
+
+def _load_trades(db: Session) -> Dict[AccountKey, List[Trade]]:
+    txn = InvestmentTransaction
+    rows = db.query(
+        txn.source, txn.account_id, txn.symbol, txn.transaction_type, txn.transaction_date,
+        txn.quantity, txn.price_per_share, txn.amount, txn.fees,
+    ).filter(txn.transaction_type.in_(VALUATION_TYPES)).order_by(txn.transaction_date, txn.id).all()
+    trades: Dict[AccountKey, List[Trade]] = defaultdict(list)
+    for row in rows:
+        trade = trade_from_row(row)
+        if trade is not None:
+            trades[(row.source, row.account_id)].append(trade)
+    return trades
+
+
+def _label(key: AccountKey) -> str:
+    return f"{key[0]}/{key[1]}"
+
+
+def plan_accounts(
+    fingerprints: Mapping[Any, str],
+    stored: Mapping[Any, Any],
+    through: date,
+    force: bool = False,
+) -> Tuple[List[Any], List[Any]]:
+    """(accounts to rewrite, accounts whose valuation is extended to `through`)."""
+    rewrite, extend = [], []
+    for account_id in sorted(fingerprints):
+        source = stored.get(account_id)
+        if force or source is None or source.fingerprint != fingerprints[account_id]:
+            rewrite.append(account_id)
+        elif source.valued_through < through:
+            extend.append(account_id)
+    return rewrite, extend
+
+
+def _valuation_rows(key: AccountKey, series: AccountSeries, write_from: date) -> Tuple[List[Dict], List[Dict]]:
+    source, account_id = key
+    first = int((np.datetime64(write_from, 'D') - series.days[0]).astype(int))
+    first = max(first, 0)
+    account_rows, position_rows = [], []
+    for i in range(first, len(series.days)):
+        day = series.days[i].astype(date)
+        account_rows.append({
+            "source": source, "account_id": account_id, "valuation_date": day,
+            "value": round(float(series.values[i]), 2), "net_flow": round(float(series.flows[i]), 2),
+        })
+        for j in np.nonzero(series.quantities[i] > 0)[0]:
+            price = series.prices[i, j]
+            position_rows.append({
+                "source": source, "account_id": account_id, "valuation_date": day, "symbol": series.symbols[j],
+                "quantity": float(series.quantities[i, j]),
+                "close": None if np.isnan(price) else round(float(price), 4),
+                "value": 0.0 if np.isnan(price) else round(float(series.quantities[i, j] * price), 2),
+            })
+    return account_rows, position_rows
+
+
+def _insert(db: Session, model: Any, rows: List[Dict[str, Any]]) -> None:
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.execute(insert(model), rows[start:start + CHUNK_SIZE])
+
+
+def _delete_from(db: Session, key: AccountKey, from_date: Optional[date] = None) -> None:
+    source, account_id = key
+    for model in (AccountValuation, PositionValuation):
+        query = db.query(model).filter(model.source == source, model.account_id == account_id)
+        if from_date is not None:
+            query = query.filter(model.valuation_date >= from_date)
+        query.delete(synchronize_session=False)
+
+
+def materialize_valuations(
+    db: Session,
+    through: Optional[date] = None,
+    force: bool = False,
+    fetch_closes: bool = True,
+) -> ValuationRefresh:
+    """Bring every account's daily valuation up to `through` (default today). Does not commit."""
+    through = through or date.today()
+    fingerprints = account_fingerprints(db)
+    stored = {(row.source, row.account_id): row for row in db.query(ValuationSource).all()}
+    rewrite, extend = plan_accounts(fingerprints, stored, through, force)
+    result = ValuationRefresh(
+        valued_through=through,
+        rewritten=[_label(key) for key in rewrite],
+        extended=[_label(key) for key in extend],
+    )
+
+    # Accounts without valuation transactions any more
+    for key in set(stored) - set(fingerprints):
+        _delete_from(db, key)
+        db.delete(stored.pop(key))
+
+    if not rewrite and not extend:
+        return result
+
+    trades = _load_trades(db)
+    first_dates: Dict[str, date] = {}
+    for account_trades in trades.values():
+        for trade in account_trades:
+            if trade.change and trade.day < first_dates.get(trade.symbol, date.max):
+                first_dates[trade.symbol] = trade.day
+    if first_dates:
+        first_dates[BENCHMARK_SYMBOL] = min(first_dates.values())
+    if fetch_closes and first_dates:
+        result.closes_written = update_closes(db, first_dates, through)
+
+    start = min((t.day for ts in trades.values() for t in ts), default=through)
+    closes = load_closes(db, list(first_dates), start, through)
+
+    now = datetime.utcnow()
+    for key in rewrite + extend:
+        account_trades = trades.get(key, [])
+        if not account_trades:
+            continue
+        account_start = min(t.day for t in account_trades)
+        series = value_account(account_trades, closes, account_start, through)
+        source = stored.get(key)
+        if key in rewrite:
+            write_from = account_start
+            _delete_from(db, key)
+        else:
+            write_from = max(account_start, source.valued_through - timedelta(days=RECHECK_DAYS - 1))
+            _delete_from(db, key, write_from)
+        account_rows, position_rows = _valuation_rows(key, series, write_from)
+        _insert(db, AccountValuation, account_rows)
+        _insert(db, PositionValuation, position_rows)
+        result.rows_written += len(account_rows) + len(position_rows)
+
+        if source is None:
+            source = ValuationSource(source=key[0], account_id=key[1])
+            db.add(source)
+        source.fingerprint = fingerprints[key]
+        source.valued_from = account_start
+        source.valued_through = through
+        source.refreshed_at = now
+
+    logger.info(
+        f"[VALUATION] Through {through}: rewrote {', '.join(result.rewritten) or 'none'}; "
+        f"extended {', '.join(result.extended) or 'none'} ({result.rows_written} rows, {result.closes_written} closes)"
+    )
+    return result
+
+
+# Serializes refreshes from requests and the scheduler
+_refresh_lock = threading.Lock()
+
+
+def refresh_valuations(db: Session, through: Optional[date] = None, force: bool = False) -> ValuationRefresh:
+    """materialize_valuations() and commit."""
+    with _refresh_lock:
+        try:
+            result = materialize_valuations(db, through=through, force=force)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+def _account_filter(query, account_id: Optional[str], owner: Optional[str]):
+    if account_id:
+        return query.filter(AccountValuation.account_id == account_id)
+    if owner:
+        # Accounts are named for their owner ("Neel's Brokerage"), whatever
+        # the shape of the account id
+        return query.join(InvestmentAccount, and_(
+            InvestmentAccount.source == AccountValuation.source,
+            InvestmentAccount.account_id == AccountValuation.account_id,
+        )).filter(func.lower(InvestmentAccount.account_name).startswith(f"{owner.lower()}'s ", autoescape=True))
+    return query
+
+
+def load_series(
+    db: Session,
+    account_id: Optional[str] = None,
+    owner: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(days, values, flows) summed over the selected accounts, ascending."""
+    query = db.query(
+        AccountValuation.valuation_date,
+        func.sum(AccountValuation.value),
+        func.sum(AccountValuation.net_flow),
+    )
+    query = _account_filter(query, account_id, owner)
+    if start:
+        query = query.filter(AccountValuation.valuation_date >= start)
+    if end:
+        query = query.filter(AccountValuation.valuation_date <= end)
+    rows = query.group_by(AccountValuation.valuation_date).order_by(AccountValuation.valuation_date).all()
+    return (
+        np.array([row[0] for row in rows], dtype='datetime64[D]'),
+        np.array([float(row[1] or 0) for row in rows]),
+        np.array([float(row[2] or 0) for row in rows]),
+    )
+
+
+def valuation_history(
+    db: Session,
+    account_id: Optional[str] = None,
+    owner: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> List[Dict[str, Any]]:
+    """Daily securities value and net flow of the selected accounts."""
+    days, values, flows = load_series(db, account_id, owner, start, end)
+    return [
+        {"date": str(day), "value": round(float(value), 2), "net_flow": round(float(flow), 2)}
+        for day, value, flow in zip(days, values, flows)
+    ]
+
+
+def build_performance(
+    days: np.ndarray,
+    values: np.ndarray,
+    flows: np.ndarray,
+    period: str,
+    benchmark: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> Dict[str, Any]:
+    """Returns, drawdowns and benchmark comparison of a daily series over `period`."""
+    if not len(days):
+        return {"period": period, "history": []}
+    period_days = PERIOD_DAYS[period]
+    first = 0
+    if period_days is not None:
+        first = int(np.searchsorted(days, days[-1] - np.timedelta64(period_days, 'D')))
+    opening = float(values[first - 1]) if first > 0 else 0.0
+    window_days, window_values, window_flows = days[first:], values[first:], flows[first:]
+
+    returns = daily_returns(window_values, window_flows, opening)
+    total = time_weighted_return(returns)
+    span = int((window_days[-1] - window_days[0]).astype(int)) + 1
+
+    result = {
+        "period": period,
+        "start_date": str(window_days[0]),
+        "end_date": str(window_days[-1]),
+        "start_value": round(opening, 2),
+        "end_value": round(float(window_values[-1]), 2),
+        "net_flows": round(float(window_flows.sum()), 2),
+        "twr": total,
+        "twr_annualized": annualized(total, span),
+        "mwr": money_weighted_return(window_values, window_flows, opening),
+        "drawdown": drawdown_stats(returns, window_days),
+        "benchmark": None,
+        "history": [
+            {"date": str(day), "value": round(float(value), 2)}
+            for day, value in zip(window_days, window_values)
+        ],
+    }
+    result["gain_loss"] = round(result["end_value"] - result["start_value"] - result["net_flows"], 2)
+    if benchmark is not None:
+        bench_days, bench_closes = benchmark
+        start_day = days[first - 1] if first > 0 else window_days[0]
+        prices = _forward_fill(np.concatenate(([start_day], window_days)), bench_days, bench_closes)
+        result["benchmark"] = benchmark_stats(returns, prices)
+    return result
+
+
+def performance_report(
+    db: Session,
+    period: str = "1Y",
+    account_id: Optional[str] = None,
+    owner: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """Performance of the stored valuations over `period`; None if nothing is valued yet."""
+    days, values, flows = load_series(db, account_id, owner)
+    if not len(days):
+        return None
+    start = days[0].astype(date)
+    benchmark = load_closes(db, [BENCHMARK_SYMBOL], start - timedelta(days=7), days[-1].astype(date))
+    return build_performance(days, values, flows, period, benchmark.get(BENCHMARK_SYMBOL))
@@ -34,6 +34,9 @@ class PlaidItem(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_synced_at = Column(DateTime, nullable=True)
     
+    # Investment transaction sync watermark (ISO date history is complete up to)
+    transactions_cursor = Column(String(100), nullable=True)
+    
     # Relationships
     accounts = relationship("PlaidAccount", back_populates="item", cascade="all, delete-orphan")
 
@@ -67,6 +67,8 @@ class SyncResponse(BaseModel):
     success: bool
     new_transactions: int
     message: str
+    modified_transactions: int = 0
+    removed_transactions: int = 0
 
 
 # Routes
@@ -236,12 +238,14 @@ async def get_item_transactions(
 @router.post("/items/{item_id}/sync", response_model=SyncResponse)
 async def sync_item_transactions(
     item_id: int,
-    days: int = Query(30, description="Number of days to sync"),
+    days: Optional[int] = Query(None, description="Re-sync this many days instead of resuming from the item's cursor"),
     db: Session = Depends(get_db),
     current_user: str = Depends(get_current_user),
 ):
     """
     Sync investment transactions from Plaid to the local database.
+    
+    Resumes from the item's sync cursor (full history on the first sync).
     """
     service = get_plaid_service()
     item = service.get_item_by_id(item_id, db)
@@ -250,13 +254,15 @@ async def sync_item_transactions(
         raise HTTPException(status_code=404, detail="Item not found")
     
     try:
-        start_date = datetime.now() - timedelta(days=days)
-        new_count = service.sync_transactions_to_db(item, db, start_date)
+        start_date = datetime.now() - timedelta(days=days) if days else None
+        result = service.sync_transactions_to_db(item, db, start_date)
         
         return SyncResponse(
             success=True,
-            new_transactions=new_count,
-            message=f"Synced {new_count} new transactions"
+            new_transactions=result.added,
+            modified_transactions=result.modified,
+            removed_transactions=result.removed,
+            message=f"Synced {result.added} new transactions"
         )
     except Exception as e:
         logger.error(f"Failed to sync transactions: {e}")
@@ -361,7 +367,7 @@ async def get_all_transactions(
 
 @router.post("/sync-all", response_model=SyncResponse)
 async def sync_all_items(
-    days: int = Query(30, description="Number of days to sync"),
+    days: Optional[int] = Query(None, description="Re-sync this many days instead of resuming from each item's cursor"),
     db: Session = Depends(get_db),
     current_user: str = Depends(get_current_user),
 ):
@@ -373,18 +379,24 @@ async def sync_all_items(
         items = service.get_all_items(db)
         
         total_new = 0
-        start_date = datetime.now() - timedelta(days=days)
+        total_modified = 0
+        total_removed = 0
+        start_date = datetime.now() - timedelta(days=days) if days else None
         
         for item in items:
             try:
-                new_count = service.sync_transactions_to_db(item, db, start_date)
-                total_new += new_count
+                result = service.sync_transactions_to_db(item, db, start_date)
+                total_new += result.added
+                total_modified += result.modified
+                total_removed += result.removed
             except Exception as e:
                 logger.error(f"Failed to sync item {item.id}: {e}")
         
         return SyncResponse(
             success=True,
             new_transactions=total_new,
+            modified_transactions=total_modified,
+            removed_transactions=total_removed,
             message=f"Synced {total_new} new transactions from {len(items)} accounts"
         )
     except ValueError:
@@ -9,6 +9,7 @@ from plaid.model.link_token_create_request_user import LinkTokenCreateRequestUse
 from plaid.model.item_public_token_exchange_request import ItemPublicTokenExchangeRequest
 from plaid.model.investments_holdings_get_request import InvestmentsHoldingsGetRequest
 from plaid.model.investments_transactions_get_request import InvestmentsTransactionsGetRequest
+from plaid.model.investments_transactions_get_request_options import InvestmentsTransactionsGetRequestOptions
 from plaid.model.investments_refresh_request import InvestmentsRefreshRequest
 from plaid.model.accounts_get_request import AccountsGetRequest
 from plaid.model.item_get_request import ItemGetRequest
@@ -16,13 +17,14 @@ from plaid.model.item_remove_request import ItemRemoveRequest
 from plaid.model.products import Products
 from plaid.model.country_code import CountryCode
 
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from datetime import date, datetime, timedelta
+from typing import Optional, List, Dict, Any, Iterator
 from sqlalchemy.orm import Session
 import logging
 
 from app.core.config import settings
 from app.modules.plaid.models import PlaidItem, PlaidAccount, PlaidInvestmentTransaction, PlaidHolding
+from app.modules.plaid import sync
 
 logger = logging.getLogger(__name__)
 
@@ -42,7 +44,7 @@ class PlaidService:
             "development": plaid.Environment.Sandbox,  # Development uses Sandbox
             "production": plaid.Environment.Production,
         }
-        plaid_env = env_map.get(settings.PLAID_ENV.lower(), plaid.Environment.Sandbox)
+        plaid_env = settings.PLAID_HOST or env_map.get(settings.PLAID_ENV.lower(), plaid.Environment.Sandbox)
         
         configuration = plaid.Configuration(
             host=plaid_env,
@@ -237,6 +239,79 @@ class PlaidService:
             "securities_count": len(response.securities),
         }
     
+    def _transaction_info(self, txn, securities_map: Dict[str, Any]) -> Dict[str, Any]:
+        """Flatten a Plaid investment transaction and its security into a dict."""
+        security = securities_map.get(txn.security_id) if txn.security_id else None
+        
+        txn_info = {
+            "investment_transaction_id": txn.investment_transaction_id,
+            "account_id": txn.account_id,
+            "security_id": txn.security_id,
+            "date": str(txn.date),
+            "name": txn.name,
+            "type": txn.type.value if txn.type else None,
+            "subtype": txn.subtype.value if txn.subtype else None,
+            "quantity": float(txn.quantity) if txn.quantity else None,
+            "price": float(txn.price) if txn.price else None,
+            "amount": float(txn.amount) if txn.amount else None,
+            "fees": float(txn.fees) if txn.fees else None,
+            "iso_currency_code": txn.iso_currency_code,
+        }
+        
+        if security:
+            txn_info.update({
+                "ticker_symbol": security.ticker_symbol,
+                "security_name": security.name,
+                "security_type": security.type,
+            })
+            
+            # Check for option contract
+            if hasattr(security, "option_contract") and security.option_contract:
+                opt = security.option_contract
+                txn_info.update({
+                    "option_type": opt.contract_type if hasattr(opt, "contract_type") else None,
+                    "strike_price": float(opt.strike_price) if hasattr(opt, "strike_price") and opt.strike_price else None,
+                    "expiration_date": str(opt.expiration_date) if hasattr(opt, "expiration_date") and opt.expiration_date else None,
+                    "underlying_symbol": opt.underlying_security_ticker if hasattr(opt, "underlying_security_ticker") else None,
+                })
+        
+        return txn_info
+    
+    def iter_investment_transaction_pages(
+        self,
+        access_token: str,
+        start_date: date,
+        end_date: date,
+        page_size: int = sync.PAGE_SIZE,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield every page of investment transactions in a date range.
+        
+        Each page is a dict with the page's transactions, the total count and
+        the item's investment account ids.
+        """
+        offset = 0
+        while True:
+            request = InvestmentsTransactionsGetRequest(
+                access_token=access_token,
+                start_date=start_date,
+                end_date=end_date,
+                options=InvestmentsTransactionsGetRequestOptions(count=page_size, offset=offset),
+            )
+            response = self.client.investments_transactions_get(request)
+            
+            securities_map = {s.security_id: s for s in response.securities}
+            transactions = [self._transaction_info(txn, securities_map) for txn in response.investment_transactions]
+            yield {
+                "transactions": transactions,
+                "total_transactions": response.total_investment_transactions,
+                "accounts": [a.account_id for a in response.accounts],
+            }
+            
+            offset += len(transactions)
+            if not transactions or offset >= response.total_investment_transactions:
+                break
+    
     def get_investment_transactions(
         self, 
         access_token: str, 
@@ -244,7 +319,7 @@ class PlaidService:
         end_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
-        Get investment transactions for an item.
+        Get investment transactions for an item (all pages).
         
         Args:
             access_token: Plaid access token
@@ -259,56 +334,18 @@ class PlaidService:
         if not end_date:
             end_date = datetime.now()
         
-        request = InvestmentsTransactionsGetRequest(
-            access_token=access_token,
-            start_date=start_date.date(),
-            end_date=end_date.date(),
-        )
-        response = self.client.investments_transactions_get(request)
-        
-        # Build securities lookup
-        securities_map = {s.security_id: s for s in response.securities}
-        
         transactions_data = []
-        for txn in response.investment_transactions:
-            security = securities_map.get(txn.security_id) if txn.security_id else None
-            
-            txn_info = {
-                "investment_transaction_id": txn.investment_transaction_id,
-                "account_id": txn.account_id,
-                "date": str(txn.date),
-                "name": txn.name,
-                "type": txn.type.value if txn.type else None,
-                "subtype": txn.subtype.value if txn.subtype else None,
-                "quantity": float(txn.quantity) if txn.quantity else None,
-                "price": float(txn.price) if txn.price else None,
-                "amount": float(txn.amount) if txn.amount else None,
-                "fees": float(txn.fees) if txn.fees else None,
-            }
-            
-            if security:
-                txn_info.update({
-                    "ticker_symbol": security.ticker_symbol,
-                    "security_name": security.name,
-                    "security_type": security.type,
-                })
-                
-                # Check for option contract
-                if hasattr(security, "option_contract") and security.option_contract:
-                    opt = security.option_contract
-                    txn_info.update({
-                        "option_type": opt.contract_type if hasattr(opt, "contract_type") else None,
-                        "strike_price": float(opt.strike_price) if hasattr(opt, "strike_price") and opt.strike_price else None,
-                        "expiration_date": str(opt.expiration_date) if hasattr(opt, "expiration_date") and opt.expiration_date else None,
-                        "underlying_symbol": opt.underlying_security_ticker if hasattr(opt, "underlying_security_ticker") else None,
-                    })
-            
-            transactions_data.append(txn_info)
+        total = 0
+        accounts = []
+        for page in self.iter_investment_transaction_pages(access_token, start_date.date(), end_date.date()):
+            transactions_data.extend(page["transactions"])
+            total = page["total_transactions"]
+            accounts = page["accounts"]
         
         return {
             "transactions": transactions_data,
-            "total_transactions": response.total_investment_transactions,
-            "accounts": [a.account_id for a in response.accounts],
+            "total_transactions": total,
+            "accounts": accounts,
         }
     
     def refresh_investments(self, access_token: str) -> bool:
@@ -335,71 +372,79 @@ class PlaidService:
         db: Session,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None
-    ) -> int:
+    ) -> sync.SyncResult:
         """
-        Fetch and store investment transactions to database.
+        Sync investment transactions from the item's cursor to today.
+        
+        Fetches every page of the window, applies the added/modified/removed
+        diff with bulk statements, advances the cursor and commits.
         
         Args:
             plaid_item: PlaidItem to sync
             db: Database session
-            start_date: Start date (default: 30 days ago)
+            start_date: Optional - re-sync from this date instead of the cursor
             end_date: End date (default: today)
             
         Returns:
-            Number of new transactions stored
+            SyncResult with added/modified/removed counts
         """
-        data = self.get_investment_transactions(
-            plaid_item.access_token,
-            start_date,
-            end_date
+        today = (end_date or datetime.now()).date()
+        window_start, window_end = sync.sync_window(
+            plaid_item.transactions_cursor, today, start_date.date() if start_date else None
         )
         
-        new_count = 0
-        for txn in data["transactions"]:
-            # Check if transaction already exists
-            existing = db.query(PlaidInvestmentTransaction).filter(
-                PlaidInvestmentTransaction.investment_transaction_id == txn["investment_transaction_id"]
-            ).first()
-            
-            if existing:
-                continue
-            
-            # Parse expiration date if present
-            exp_date = None
-            if txn.get("expiration_date"):
-                try:
-                    exp_date = datetime.strptime(txn["expiration_date"], "%Y-%m-%d")
-                except:
-                    pass
-            
-            new_txn = PlaidInvestmentTransaction(
-                account_id=txn["account_id"],
-                investment_transaction_id=txn["investment_transaction_id"],
-                date=datetime.strptime(txn["date"], "%Y-%m-%d"),
-                name=txn["name"],
-                type=txn["type"] or "unknown",
-                subtype=txn.get("subtype"),
-                ticker_symbol=txn.get("ticker_symbol"),
-                security_name=txn.get("security_name"),
-                security_type=txn.get("security_type"),
-                option_type=txn.get("option_type"),
-                strike_price=str(txn["strike_price"]) if txn.get("strike_price") else None,
-                expiration_date=exp_date,
-                underlying_symbol=txn.get("underlying_symbol"),
-                quantity=str(txn["quantity"]) if txn.get("quantity") else None,
-                price=str(txn["price"]) if txn.get("price") else None,
-                amount=str(txn["amount"]) if txn.get("amount") else None,
-                fees=str(txn["fees"]) if txn.get("fees") else None,
-                raw_data=txn,
+        fetched = []
+        totals = []
+        accounts = {
+            account.account_id for account in
+            db.query(PlaidAccount.account_id).filter(PlaidAccount.item_id == plaid_item.id).all()
+        }
+        for page in self.iter_investment_transaction_pages(plaid_item.access_token, window_start, window_end):
+            fetched.extend(sync.transaction_values(txn) for txn in page["transactions"])
+            totals.append(page["total_transactions"])
+            accounts.update(page["accounts"])
+        
+        complete = sync.listing_complete(totals, fetched)
+        if not complete:
+            logger.warning(
+                f"[PLAID_SYNC] Item {plaid_item.id}: pages did not add up to the reported total; "
+                f"skipping removals this sync"
             )
-            db.add(new_txn)
-            new_count += 1
         
-        if new_count > 0:
+        try:
+            stored = sync.load_stored(
+                db, [row["investment_transaction_id"] for row in fetched], accounts, window_start, window_end
+            )
+            diff = sync.diff_transactions(
+                fetched, stored, accounts, window_start, window_end,
+                seeding=not plaid_item.transactions_cursor, complete=complete,
+            )
+            sync.apply_diff(db, diff)
+            
+            # Only move the cursor forward; an explicit older re-sync keeps it
+            if not plaid_item.transactions_cursor or plaid_item.transactions_cursor < window_end.isoformat():
+                plaid_item.transactions_cursor = window_end.isoformat()
             plaid_item.last_synced_at = datetime.utcnow()
             db.commit()
+        except Exception:
+            db.rollback()
+            raise
         
-        return new_count
+        result = sync.SyncResult(
+            added=len(diff.added),
+            modified=len(diff.modified),
+            removed=len(diff.removed),
+            seeded=len(diff.seeded),
+            fetched=len(fetched),
+            start_date=window_start,
+            end_date=window_end,
+            cursor=plaid_item.transactions_cursor,
+        )
+        logger.info(
+            f"[PLAID_SYNC] Item {plaid_item.id} {window_start}..{window_end}: fetched={result.fetched}, "
+            f"added={result.added}, modified={result.modified}, removed={result.removed}, seeded={result.seeded}"
+        )
+        return result
     
     def remove_item(self, plaid_item: PlaidItem, db: Session) -> bool:
         """
@@ -0,0 +1,211 @@
+"""
+Cursor-based sync of Plaid investment transactions.
+
+sync_transactions_to_db() used to fetch one page of a fixed 30-day window
+and run an existence query before each insert: history past the first page
+(Plaid returns at most 500 per call) was never stored, and edits or
+cancellations Plaid made to already-stored rows were ignored.
+
+Plaid's /transactions/sync cursor API does not cover investment
+transactions, so the same model is built on /investments/transactions/get:
+
+- Each item stores a cursor: the date its history is complete up to.
+- A sync reads every page (count/offset) from the cursor minus
+  OVERLAP_DAYS to today, or INITIAL_HISTORY_DAYS back on the first sync.
+- The window is diffed against the stored rows into added, modified and
+  removed sets. The first sync of an item seeds from the rows stored before
+  cursors existed: they are rewritten in the current format but not
+  reported as modified.
+- Added/modified rows are written with chunked INSERT ... ON CONFLICT
+  (investment_transaction_id) DO UPDATE; removed rows with one DELETE by
+  investment_transaction_id. Removal needs a complete listing: if the total
+  changed between pages or the pages do not add up to it (offsets shifted
+  mid-sync), nothing is removed on that sync.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.postgresql import insert
+
+from app.ingestion.bulk_writer import CHUNK_SIZE
+from app.modules.plaid.models import PlaidInvestmentTransaction
+
+
+# Plaid keeps up to 24 months of investment history
+INITIAL_HISTORY_DAYS = 730
+
+# Re-read this much before the cursor; Plaid revises recent transactions
+OVERLAP_DAYS = 14
+
+# Max count per /investments/transactions/get call
+PAGE_SIZE = 500
+
+# Columns compared to detect a modified transaction
+SYNCED_COLUMNS = (
+    "account_id", "date", "name", "type", "subtype", "security_id", "ticker_symbol",
+    "security_name", "security_type", "option_type", "strike_price", "expiration_date",
+    "underlying_symbol", "quantity", "price", "amount", "fees", "iso_currency_code",
+)
+
+
+@dataclass
+class SyncResult:
+    """Outcome of one item's sync."""
+    added: int = 0
+    modified: int = 0
+    removed: int = 0
+    seeded: int = 0
+    fetched: int = 0
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    cursor: Optional[str] = None
+
+
+@dataclass
+class TransactionDiff:
+    added: List[Dict[str, Any]] = field(default_factory=list)
+    modified: List[Dict[str, Any]] = field(default_factory=list)
+    # Rows stored before the item's first cursor sync, rewritten silently
+    seeded: List[Dict[str, Any]] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)  # investment_transaction_ids
+
+
+def sync_window(cursor: Optional[str], today: date, start_date: Optional[date] = None) -> Tuple[date, date]:
+    """Date range to fetch: explicit start, else cursor minus overlap, else initial history."""
+    if start_date is None:
+        if cursor:
+            start_date = date.fromisoformat(cursor) - timedelta(days=OVERLAP_DAYS)
+        else:
+            start_date = today - timedelta(days=INITIAL_HISTORY_DAYS)
+    return start_date, today
+
+
+def _optional_str(value: Any) -> Optional[str]:
+    return str(value) if value else None
+
+
+def transaction_values(txn: Dict[str, Any]) -> Dict[str, Any]:
+    """plaid_investment_transactions column values for a transaction dict from PlaidService."""
+    expiration_date = None
+    if txn.get("expiration_date"):
+        try:
+            expiration_date = datetime.strptime(txn["expiration_date"], "%Y-%m-%d")
+        except ValueError:
+            pass
+
+    return {
+        "account_id": txn["account_id"],
+        "investment_transaction_id": txn["investment_transaction_id"],
+        "date": datetime.strptime(txn["date"], "%Y-%m-%d"),
+        "name": txn["name"],
+        "type": txn["type"] or "unknown",
+        "subtype": txn.get("subtype"),
+        "security_id": txn.get("security_id"),
+        "ticker_symbol": txn.get("ticker_symbol"),
+        "security_name": txn.get("security_name"),
+        "security_type": txn.get("security_type"),
+        "option_type": txn.get("option_type"),
+        "strike_price": _optional_str(txn.get("strike_price")),
+        "expiration_date": expiration_date,
+        "underlying_symbol": txn.get("underlying_symbol"),
+        "quantity": _optional_str(txn.get("quantity")),
+        "price": _optional_str(txn.get("price")),
+        "amount": _optional_str(txn.get("amount")),
+        "fees": _optional_str(txn.get("fees")),
+        "iso_currency_code": txn.get("iso_currency_code") or "USD",
+        "raw_data": txn,
+    }
+
+
+def diff_transactions(
+    fetched: Iterable[Dict[str, Any]],
+    stored: Iterable[Any],
+    window_accounts: Set[str],
+    start_date: date,
+    end_date: date,
+    seeding: bool = False,
+    complete: bool = True,
+) -> TransactionDiff:
+    """
+    Split a fetched window into added / modified / removed.
+
+    `stored` are existing rows (anything with investment_transaction_id and
+    SYNCED_COLUMNS) that share an id with `fetched` or fall in the window.
+    A stored row in the window and one of `window_accounts` that Plaid no
+    longer returns is removed - only when `complete` (the fetch is known to
+    hold every transaction of the window). When `seeding`, changed stored
+    rows are rewritten as seeded rather than modified.
+    """
+    stored_by_id = {row.investment_transaction_id: row for row in stored}
+    diff = TransactionDiff()
+    seen = set()
+    for values in fetched:
+        txn_id = values["investment_transaction_id"]
+        if txn_id in seen:
+            continue
+        seen.add(txn_id)
+        row = stored_by_id.get(txn_id)
+        if row is None:
+            diff.added.append(values)
+        elif any(getattr(row, column) != values[column] for column in SYNCED_COLUMNS):
+            (diff.seeded if seeding else diff.modified).append(values)
+
+    if not complete:
+        return diff
+    for txn_id, row in stored_by_id.items():
+        if txn_id in seen or row.account_id not in window_accounts:
+            continue
+        if start_date <= row.date.date() <= end_date:
+            diff.removed.append(txn_id)
+    return diff
+
+
+def listing_complete(totals: Iterable[int], fetched: Iterable[Dict[str, Any]]) -> bool:
+    """
+    Whether count/offset pages returned a whole window: every page reported
+    the same total and the distinct transactions add up to it.
+    """
+    totals = set(totals)
+    if len(totals) != 1:
+        return False
+    return len({values["investment_transaction_id"] for values in fetched}) == totals.pop()
+
+
+def load_stored(db: Session, txn_ids: List[str], accounts: Set[str], start_date: date, end_date: date) -> List[Any]:
+    """Stored rows that can match the fetched window, in one query."""
+    txn = PlaidInvestmentTransaction
+    window = and_(
+        txn.account_id.in_(accounts),
+        txn.date >= datetime.combine(start_date, datetime.min.time()),
+        txn.date < datetime.combine(end_date + timedelta(days=1), datetime.min.time()),
+    )
+    condition = or_(txn.investment_transaction_id.in_(txn_ids), window) if txn_ids else window
+    return db.query(
+        txn.investment_transaction_id, *[getattr(txn, column) for column in SYNCED_COLUMNS]
+    ).filter(condition).all()
+
+
+def upsert_transactions(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """INSERT ... ON CONFLICT (investment_transaction_id) DO UPDATE, in chunks."""
+    now = datetime.utcnow()
+    for start in range(0, len(rows), CHUNK_SIZE):
+        insert_stmt = insert(PlaidInvestmentTransaction).values([
+            {**row, "created_at": now} for row in rows[start:start + CHUNK_SIZE]
+        ])
+        db.execute(insert_stmt.on_conflict_do_update(
+            index_elements=['investment_transaction_id'],
+            set_={column: insert_stmt.excluded[column] for column in SYNCED_COLUMNS + ("raw_data",)},
+        ))
+
+
+def apply_diff(db: Session, diff: TransactionDiff) -> None:
+    """Write a diff. Does not commit."""
+    upsert_transactions(db, diff.added + diff.modified + diff.seeded)
+    if diff.removed:
+        db.query(PlaidInvestmentTransaction).filter(
+            PlaidInvestmentTransaction.investment_transaction_id.in_(diff.removed)
+        ).delete(synchronize_session=False)
@@ -0,0 +1,370 @@
+"""
+Learning Analytics - precomputed RLHF cohort aggregates
+
+The weekly summary and the learning analytics endpoints used to load every
+match in their window and count in Python on each call. This module keeps
+RlhfCohortAggregate rows instead:
+
+    (year, week) x (strategy, symbol, DTE bucket, delta bucket, algorithm_version)
+        -> match-type counts, modification sums, rejection premiums, outcome P&L
+
+refresh_weeks() recomputes only the ISO weeks touched by a reconciliation or
+outcome-tracking run (one week of matches at a time); readers sum the small
+aggregate table with GROUP BY instead of replaying matches.
+
+Aggregates are weekly, so date-windowed readers start at the Monday of the
+week containing start_date.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.modules.strategies.learning_models import (
+    RecommendationExecutionMatch,
+    PositionOutcome,
+    RlhfCohortAggregate,
+)
+
+logger = logging.getLogger(__name__)
+
+
+CohortKey = Tuple[str, str, str, str, str]  # strategy, symbol, dte_bucket, delta_bucket, algorithm_version
+
+# (upper bound inclusive, label)
+DTE_BUCKETS = [(7, '0-7'), (14, '8-14'), (30, '15-30'), (60, '31-60')]
+DELTA_BUCKETS = [(0.15, '<0.15'), (0.30, '0.15-0.30'), (0.50, '0.30-0.50')]
+
+COUNTER_FIELDS = (
+    'total_matches', 'recommendation_count', 'execution_count',
+    'consent_count', 'modify_count', 'reject_count', 'independent_count', 'no_action_count',
+    'modify_with_details_count',
+    'dte_diff_count', 'dte_diff_sum', 'strike_diff_count', 'strike_diff_sum',
+    'premium_diff_count', 'premium_diff_sum',
+    'reject_with_context_count', 'rejected_premium_count', 'rejected_premium_sum',
+    'outcome_count', 'outcome_pnl_sum',
+    'consent_outcome_count', 'consent_pnl_sum', 'consent_win_count',
+    'diverge_outcome_count', 'diverge_pnl_sum', 'diverge_win_count',
+)
+
+MATCH_TYPES = ('consent', 'modify', 'reject', 'independent', 'no_action')
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def dte_bucket(days: Optional[float]) -> str:
+    """Bucket label for days to expiration."""
+    if days is None or days < 0:
+        return 'unknown'
+    for upper, label in DTE_BUCKETS:
+        if days <= upper:
+            return label
+    return '60+'
+
+
+def delta_bucket(delta: Optional[float]) -> str:
+    """Bucket label for absolute option delta."""
+    if delta is None:
+        return 'unknown'
+    delta = abs(delta)
+    for upper, label in DELTA_BUCKETS:
+        if delta < upper:
+            return label
+    return '0.50+'
+
+
+def cohort_key(match: Any) -> CohortKey:
+    """Cohort of a RecommendationExecutionMatch (or any object with its columns)."""
+    context = match.recommendation_context or {}
+
+    symbol = match.recommended_symbol
+    if not symbol and match.execution_symbol:
+        symbol = match.execution_symbol.split()[0]
+
+    days = _number(context.get('days_to_expiration') or context.get('dte'))
+    if days is None and match.recommended_expiration and match.recommendation_date:
+        days = (match.recommended_expiration - match.recommendation_date).days
+    if days is None and match.execution_expiration and match.execution_date:
+        days = (match.execution_expiration - match.execution_date).days
+
+    delta = _number(context.get('delta') or context.get('target_delta'))
+
+    return (
+        (match.recommendation_type or '')[:50],
+        (symbol or '').upper()[:20],
+        dte_bucket(days),
+        delta_bucket(delta),
+        (match.algorithm_version or '')[:20],
+    )
+
+
+def aggregate_matches(
+    matches: Iterable[Any],
+    net_profit_by_match: Dict[int, Optional[Decimal]]
+) -> Dict[CohortKey, Dict[str, float]]:
+    """
+    Fold one week's matches (and their outcome P&L) into per-cohort counters.
+
+    Counting rules mirror the per-request loops they replace.
+    """
+    cohorts: Dict[CohortKey, Dict[str, float]] = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+
+    for match in matches:
+        c = cohorts[cohort_key(match)]
+        match_type = match.match_type
+
+        c['total_matches'] += 1
+        if match.recommendation_id is not None:
+            c['recommendation_count'] += 1
+        if match.execution_id is not None:
+            c['execution_count'] += 1
+        if match_type in MATCH_TYPES:
+            c[f'{match_type}_count'] += 1
+
+        details = match.modification_details
+        if match_type == 'modify' and details:
+            c['modify_with_details_count'] += 1
+            for key, field_prefix in (('expiration_diff_days', 'dte'), ('strike_diff', 'strike'), ('premium_diff', 'premium')):
+                value = _number(details.get(key))
+                if key in details and value is not None:
+                    c[f'{field_prefix}_diff_count'] += 1
+                    c[f'{field_prefix}_diff_sum'] += value
+
+        if match_type == 'reject' and match.recommendation_context:
+            c['reject_with_context_count'] += 1
+            premium = _number(match.recommendation_context.get('premium'))
+            if premium:
+                c['rejected_premium_count'] += 1
+                c['rejected_premium_sum'] += premium
+
+        if match.id in net_profit_by_match:
+            profit = float(net_profit_by_match[match.id] or 0)
+            c['outcome_count'] += 1
+            c['outcome_pnl_sum'] += profit
+            if match_type == 'consent':
+                prefix = 'consent'
+            elif match_type in ('modify', 'reject'):
+                prefix = 'diverge'
+            else:
+                prefix = None
+            if prefix:
+                c[f'{prefix}_outcome_count'] += 1
+                c[f'{prefix}_pnl_sum'] += profit
+                if profit > 0:
+                    c[f'{prefix}_win_count'] += 1
+
+    return cohorts
+
+
+def week_of(day: date) -> Tuple[int, int]:
+    """ISO (year, week) for a date."""
+    iso = day.isocalendar()
+    return iso[0], iso[1]
+
+
+class LearningAnalytics:
+    """
+    Maintains and reads RlhfCohortAggregate.
+
+    Usage:
+        analytics = LearningAnalytics(db)
+        analytics.refresh_weeks({(2026, 3)})
+        totals = analytics.totals(start_date)
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # =========================================================================
+    # MAINTENANCE
+    # =========================================================================
+
+    def refresh_weeks(self, weeks: Iterable[Tuple[int, int]]) -> int:
+        """Recompute aggregates for the given ISO (year, week) pairs. Returns rows written."""
+        written = 0
+        for year, week_number in sorted(set(weeks)):
+            written += self._refresh_week(year, week_number)
+        self.db.commit()
+        return written
+
+    def refresh_for_matches(self, match_ids: Iterable[int]) -> int:
+        """Recompute the weeks containing the given matches."""
+        match_ids = list(set(match_ids))
+        if not match_ids:
+            return 0
+        weeks = self.db.query(
+            RecommendationExecutionMatch.year, RecommendationExecutionMatch.week_number
+        ).filter(
+            RecommendationExecutionMatch.id.in_(match_ids),
+            RecommendationExecutionMatch.year.isnot(None),
+            RecommendationExecutionMatch.week_number.isnot(None),
+        ).distinct().all()
+        return self.refresh_weeks((y, w) for y, w in weeks)
+
+    def rebuild(self, start_date: Optional[date] = None) -> Dict[str, int]:
+        """Recompute every week that has matches (optionally from start_date on)."""
+        query = self.db.query(
+            RecommendationExecutionMatch.year, RecommendationExecutionMatch.week_number
+        ).filter(
+            RecommendationExecutionMatch.year.isnot(None),
+            RecommendationExecutionMatch.week_number.isnot(None),
+        )
+        if start_date:
+            query = query.filter(RecommendationExecutionMatch.recommendation_date >= start_date)
+        weeks = {(y, w) for y, w in query.distinct().all()}
+
+        stale = self.db.query(RlhfCohortAggregate)
+        if start_date:
+            stale = stale.filter(RlhfCohortAggregate.week_start >= start_date - timedelta(days=start_date.weekday()))
+        stale.delete(synchronize_session=False)
+
+        rows = self.refresh_weeks(weeks)
+        return {"weeks": len(weeks), "rows": rows}
+
+    def _refresh_week(self, year: int, week_number: int) -> int:
+        matches = self.db.query(
+            RecommendationExecutionMatch.id,
+            RecommendationExecutionMatch.recommendation_id,
+            RecommendationExecutionMatch.execution_id,
+            RecommendationExecutionMatch.recommendation_date,
+            RecommendationExecutionMatch.recommendation_type,
+            RecommendationExecutionMatch.recommended_symbol,
+            RecommendationExecutionMatch.recommended_expiration,
+            RecommendationExecutionMatch.recommendation_context,
+            RecommendationExecutionMatch.execution_symbol,
+            RecommendationExecutionMatch.execution_date,
+            RecommendationExecutionMatch.execution_expiration,
+            RecommendationExecutionMatch.match_type,
+            RecommendationExecutionMatch.modification_details,
+            RecommendationExecutionMatch.algorithm_version,
+        ).filter(
+            RecommendationExecutionMatch.year == year,
+            RecommendationExecutionMatch.week_number == week_number,
+        ).all()
+
+        net_profit_by_match = dict(self.db.query(
+            PositionOutcome.match_id, PositionOutcome.net_profit
+        ).join(
+            RecommendationExecutionMatch, PositionOutcome.match_id == RecommendationExecutionMatch.id
+        ).filter(
+            RecommendationExecutionMatch.year == year,
+            RecommendationExecutionMatch.week_number == week_number,
+        ).all())
+
+        cohorts = aggregate_matches(matches, net_profit_by_match)
+
+        self.db.query(RlhfCohortAggregate).filter(
+            RlhfCohortAggregate.year == year,
+            RlhfCohortAggregate.week_number == week_number,
+        ).delete(synchronize_session=False)
+
+        week_start = date.fromisocalendar(year, week_number, 1)
+        now = datetime.utcnow()
+        rows = [
+            {
+                "year": year,
+                "week_number": week_number,
+                "week_start": week_start,
+                "strategy": key[0],
+                "symbol": key[1],
+                "dte_bucket": key[2],
+                "delta_bucket": key[3],
+                "algorithm_version": key[4],
+                "updated_at": now,
+                **counters,
+            }
+            for key, counters in cohorts.items()
+        ]
+        if rows:
+            self.db.bulk_insert_mappings(RlhfCohortAggregate, rows)
+        return len(rows)
+
+    # =========================================================================
+    # READERS
+    # =========================================================================
+
+    def _sums(self, *filters, group_by: Tuple = ()) -> List[Dict[str, Any]]:
+        columns = [func.coalesce(func.sum(getattr(RlhfCohortAggregate, f)), 0).label(f) for f in COUNTER_FIELDS]
+        rows = self.db.query(*group_by, *columns).filter(*filters)
+        if group_by:
+            rows = rows.group_by(*group_by).order_by(*group_by)
+        result = []
+        for row in rows.all():
+            data = row._asdict()
+            for f in COUNTER_FIELDS:
+                data[f] = float(data[f]) if f.endswith('_sum') else int(data[f])
+            result.append(data)
+        return result
+
+    @staticmethod
+    def _since(start_date: Optional[date]) -> List:
+        if not start_date:
+            return []
+        return [RlhfCohortAggregate.week_start >= start_date - timedelta(days=start_date.weekday())]
+
+    def totals(self, start_date: Optional[date] = None) -> Dict[str, Any]:
+        """All counters summed over weeks from start_date's week on."""
+        return self._sums(*self._since(start_date))[0]
+
+    def week_totals(self, year: int, week_number: int) -> Dict[str, Any]:
+        """All counters summed for one ISO week."""
+        return self._sums(
+            RlhfCohortAggregate.year == year,
+            RlhfCohortAggregate.week_number == week_number,
+        )[0]
+
+    def by_week(self, start_date: Optional[date] = None) -> List[Dict[str, Any]]:
+        """Counters per ISO week, oldest first."""
+        return self._sums(
+            *self._since(start_date),
+            group_by=(RlhfCohortAggregate.year, RlhfCohortAggregate.week_number),
+        )
+
+    def strategy_counts(self, year: int, week_number: int) -> Dict[str, int]:
+        """Match counts per strategy (recommendation_type) for one week."""
+        rows = self._sums(
+            RlhfCohortAggregate.year == year,
+            RlhfCohortAggregate.week_number == week_number,
+            group_by=(RlhfCohortAggregate.strategy,),
+        )
+        return {r['strategy']: r['total_matches'] for r in rows if r['strategy']}
+
+    def cohorts(
+        self,
+        start_date: Optional[date] = None,
+        algorithm_version: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Counters per cohort (all weeks from start_date on collapsed)."""
+        filters = self._since(start_date)
+        if algorithm_version:
+            filters.append(RlhfCohortAggregate.algorithm_version == algorithm_version)
+        return self._sums(
+            *filters,
+            group_by=(
+                RlhfCohortAggregate.strategy,
+                RlhfCohortAggregate.symbol,
+                RlhfCohortAggregate.dte_bucket,
+                RlhfCohortAggregate.delta_bucket,
+                RlhfCohortAggregate.algorithm_version,
+            ),
+        )
+
+    @staticmethod
+    def effective_start(start_date: date) -> date:
+        """Monday of the week containing start_date (aggregate granularity)."""
+        return start_date - timedelta(days=start_date.weekday())
+
+
+def get_learning_analytics(db: Session) -> LearningAnalytics:
+    """Get a LearningAnalytics instance."""
+    return LearningAnalytics(db)
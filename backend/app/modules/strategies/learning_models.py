@@ -457,3 +457,112 @@ class AlgorithmChange(Base):
         Index('idx_ac_to_version', 'to_version'),
     )
 
+
+
+class ReconciliationCheckpoint(Base):
+    """
+    Progress marker for a multi-day reconciliation run.
+    
+    One row per (start, end, accounts) run. The range reconciler commits each
+    day's matches together with last_completed_date, so an interrupted
+    backfill resumes from the day after the last one written.
+    """
+    __tablename__ = 'reconciliation_checkpoints'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    # ===== RUN IDENTIFICATION =====
+    run_key = Column(String(200), nullable=False, unique=True)  # e.g., '2026-01-01:2026-01-31:all'
+    start_date = Column(Date, nullable=False)
+    end_date = Column(Date, nullable=False)
+    accounts = Column(JSON, nullable=True)  # Account names, null = all accounts
+    
+    # ===== PROGRESS =====
+    status = Column(String(20), nullable=False, default='running')  # 'running', 'completed', 'failed'
+    last_completed_date = Column(Date, nullable=True)
+    days_completed = Column(Integer, nullable=False, default=0)
+    matches_saved = Column(Integer, nullable=False, default=0)
+    independent_saved = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    
+    # ===== METADATA =====
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    completed_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index('idx_rc_status', 'status'),
+    )
+
+
+class RlhfCohortAggregate(Base):
+    """
+    Pre-aggregated RLHF counters per cohort and ISO week.
+    
+    Cohort = (strategy, symbol, DTE bucket, delta bucket, algorithm_version).
+    Maintained by LearningAnalytics.refresh_weeks() after reconciliation and
+    outcome tracking; read by the weekly summary and learning analytics API
+    so neither replays individual matches.
+    
+    Empty-string / 'unknown' values stand for missing dimensions so the
+    unique key never contains NULLs.
+    """
+    __tablename__ = 'rlhf_cohort_aggregates'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    
+    # ===== COHORT KEY =====
+    year = Column(Integer, nullable=False)
+    week_number = Column(Integer, nullable=False)  # ISO week number
+    week_start = Column(Date, nullable=False)
+    strategy = Column(String(50), nullable=False, default='')  # recommendation_type, '' for independent
+    symbol = Column(String(20), nullable=False, default='')
+    dte_bucket = Column(String(10), nullable=False, default='unknown')  # '0-7', '8-14', '15-30', '31-60', '60+'
+    delta_bucket = Column(String(10), nullable=False, default='unknown')  # '<0.15', '0.15-0.30', '0.30-0.50', '0.50+'
+    algorithm_version = Column(String(20), nullable=False, default='')
+    
+    # ===== MATCH COUNTS =====
+    total_matches = Column(Integer, nullable=False, default=0)
+    recommendation_count = Column(Integer, nullable=False, default=0)  # Matches with a recommendation
+    execution_count = Column(Integer, nullable=False, default=0)  # Matches with an execution
+    consent_count = Column(Integer, nullable=False, default=0)
+    modify_count = Column(Integer, nullable=False, default=0)
+    reject_count = Column(Integer, nullable=False, default=0)
+    independent_count = Column(Integer, nullable=False, default=0)
+    no_action_count = Column(Integer, nullable=False, default=0)
+    
+    # ===== MODIFICATIONS =====
+    modify_with_details_count = Column(Integer, nullable=False, default=0)
+    dte_diff_count = Column(Integer, nullable=False, default=0)
+    dte_diff_sum = Column(Numeric(14, 2), nullable=False, default=0)
+    strike_diff_count = Column(Integer, nullable=False, default=0)
+    strike_diff_sum = Column(Numeric(14, 2), nullable=False, default=0)
+    premium_diff_count = Column(Integer, nullable=False, default=0)
+    premium_diff_sum = Column(Numeric(14, 4), nullable=False, default=0)
+    
+    # ===== REJECTIONS =====
+    reject_with_context_count = Column(Integer, nullable=False, default=0)
+    rejected_premium_count = Column(Integer, nullable=False, default=0)
+    rejected_premium_sum = Column(Numeric(14, 4), nullable=False, default=0)
+    
+    # ===== OUTCOMES =====
+    outcome_count = Column(Integer, nullable=False, default=0)
+    outcome_pnl_sum = Column(Numeric(14, 2), nullable=False, default=0)
+    consent_outcome_count = Column(Integer, nullable=False, default=0)
+    consent_pnl_sum = Column(Numeric(14, 2), nullable=False, default=0)
+    consent_win_count = Column(Integer, nullable=False, default=0)
+    diverge_outcome_count = Column(Integer, nullable=False, default=0)  # modify + reject
+    diverge_pnl_sum = Column(Numeric(14, 2), nullable=False, default=0)
+    diverge_win_count = Column(Integer, nullable=False, default=0)
+    
+    # ===== METADATA =====
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        Index(
+            'idx_rca_cohort_week',
+            'year', 'week_number', 'strategy', 'symbol', 'dte_bucket', 'delta_bucket', 'algorithm_version',
+            unique=True
+        ),
+        Index('idx_rca_week_start', 'week_start'),
+    )
@@ -31,6 +31,9 @@ from app.modules.strategies.reconciliation_service import (
     ReconciliationService,
     get_reconciliation_service,
 )
+from app.modules.strategies.reconciliation_backfill import RangeReconciler
+from app.modules.strategies.outcome_tracker import get_outcome_tracker
+from app.modules.strategies.learning_analytics import get_learning_analytics
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/learning", tags=["Learning & RLHF"])
@@ -43,7 +46,7 @@ router = APIRouter(prefix="/learning", tags=["Learning & RLHF"])
 @router.post("/reconcile")
 async def trigger_reconciliation(
     target_date: Optional[date] = Query(default=None, description="Date to reconcile (defaults to yesterday)"),
-    days_back: Optional[int] = Query(default=None, description="Number of days to reconcile (alternative to target_date)"),
+    days_back: Optional[int] = Query(default=None, ge=1, description="Number of days to reconcile (alternative to target_date)"),
     db: Session = Depends(get_db),
     user=Depends(get_current_user)
 ):
@@ -57,21 +60,19 @@ async def trigger_reconciliation(
     service = get_reconciliation_service(db)
     
     if days_back is not None:
-        # Reconcile a range of days
-        results = []
-        total_matches = 0
-        for i in range(days_back, 0, -1):
-            day = date.today() - timedelta(days=i)
-            result = service.reconcile_day(day)
-            results.append({"date": day.isoformat(), **result})
-            total_matches += result.get("matches_saved", 0)
+        # Reconcile a range of days: two range queries + bulk writes.
+        # Matching stays in-process here; use scripts/reconcile_date_range.py
+        # with --workers for large backfills.
+        start_date = date.today() - timedelta(days=days_back)
+        end_date = date.today() - timedelta(days=1)
+        summary = RangeReconciler(db, workers=1).run(start_date, end_date, resume=False)
         
         return {
             "status": "success",
             "message": f"Reconciliation completed for {days_back} days",
-            "total_matches_saved": total_matches,
-            "days_reconciled": len(results),
-            "results": results
+            "total_matches_saved": summary["total_matches_saved"],
+            "days_reconciled": summary["days_completed"],
+            "results": summary["results"]
         }
     else:
         # Single day reconciliation
@@ -393,19 +394,25 @@ async def get_epoch_config(
 @router.post("/track-outcomes")
 async def trigger_outcome_tracking(
     as_of_date: Optional[date] = Query(default=None, description="Track outcomes as of this date"),
+    full_rescan: bool = Query(default=False, description="Re-scan every match without an outcome instead of consuming the change feed"),
     db: Session = Depends(get_db),
     user=Depends(get_current_user)
 ):
     """
     Trigger position outcome tracking.
     
-    Checks completed positions and records their outcomes.
+    By default consumes new close/expire/assign events from the transaction
+    change feed and checks newly due matches. full_rescan=true runs the
+    original full scan of completed positions.
     """
     if as_of_date is None:
         as_of_date = date.today()
     
-    service = get_reconciliation_service(db)
-    result = service.track_position_outcomes(as_of_date)
+    if full_rescan:
+        service = get_reconciliation_service(db)
+        result = service.track_position_outcomes(as_of_date)
+    else:
+        result = get_outcome_tracker(db).run(as_of_date)
     
     return {
         "status": "success",
@@ -1085,12 +1092,11 @@ async def get_divergence_rate(
     if respect_epoch and rlhf_config["min_valid_date"] > start_date:
         start_date = rlhf_config["min_valid_date"]
     
-    # Get all matches in the period
-    all_matches = db.query(RecommendationExecutionMatch).filter(
-        RecommendationExecutionMatch.recommendation_date >= start_date
-    ).all()
+    # Sum the precomputed weekly cohort aggregates for the period
+    analytics = get_learning_analytics(db)
+    totals = analytics.totals(start_date)
     
-    if not all_matches:
+    if not totals["total_matches"]:
         return {
             "divergence_rate": 0, 
             "sample_size": 0,
@@ -1098,33 +1104,31 @@ async def get_divergence_rate(
             "algorithm_version": rlhf_config["algorithm_version"]
         }
     
-    # Count each type
-    consent = sum(1 for m in all_matches if m.match_type == 'consent')
-    modify = sum(1 for m in all_matches if m.match_type == 'modify')
-    reject = sum(1 for m in all_matches if m.match_type == 'reject')
-    independent = sum(1 for m in all_matches if m.match_type == 'independent')
+    consent = totals["consent_count"]
+    modify = totals["modify_count"]
+    reject = totals["reject_count"]
+    independent = totals["independent_count"]
     
     # Total recommendations (excludes independent actions since those had no recommendation)
-    rec_matches = [m for m in all_matches if m.recommendation_id is not None]
-    total_with_rec = len(rec_matches)
+    total_with_rec = totals["recommendation_count"]
     
     divergence = (modify + reject) / total_with_rec * 100 if total_with_rec > 0 else 0
     consent_rate = consent / total_with_rec * 100 if total_with_rec > 0 else 0
     
     return {
         "period_days": days,
-        "effective_start_date": start_date.isoformat(),
+        "effective_start_date": analytics.effective_start(start_date).isoformat(),
         "epoch_start": rlhf_config["min_valid_date"].isoformat() if respect_epoch else None,
         "algorithm_version": rlhf_config["algorithm_version"],
         "total_recommendations": total_with_rec,
-        "total_matches": len(all_matches),  # Total including independent
+        "total_matches": totals["total_matches"],  # Total including independent
         "consent": consent,
         "modify": modify,
         "reject": reject,
         "independent": independent,
         "divergence_rate": round(divergence, 1),
         "consent_rate": round(consent_rate, 1),
-        "by_week": _group_by_week(all_matches)
+        "by_week": _group_by_week(analytics.by_week(start_date))
     }
 
 
@@ -1141,45 +1145,31 @@ async def get_algorithm_accuracy(
     """
     start_date = date.today() - timedelta(days=days)
     
-    # Get matches with outcomes
-    matches = db.query(RecommendationExecutionMatch).join(
-        PositionOutcome
-    ).filter(
-        RecommendationExecutionMatch.recommendation_date >= start_date
-    ).all()
+    totals = get_learning_analytics(db).totals(start_date)
     
-    if not matches:
+    if not totals["outcome_count"]:
         return {"message": "No completed outcomes in period", "sample_size": 0}
     
-    consent_outcomes = []
-    diverge_outcomes = []
-    
-    for match in matches:
-        if match.outcome:
-            profit = float(match.outcome.net_profit or 0)
-            if match.match_type == 'consent':
-                consent_outcomes.append(profit)
-            elif match.match_type in ['modify', 'reject']:
-                diverge_outcomes.append(profit)
+    consent_count = totals["consent_outcome_count"]
+    diverge_count = totals["diverge_outcome_count"]
+    consent_pnl = totals["consent_pnl_sum"]
+    diverge_pnl = totals["diverge_pnl_sum"]
     
-    consent_pnl = sum(consent_outcomes)
-    diverge_pnl = sum(diverge_outcomes)
-    
-    consent_win_rate = sum(1 for p in consent_outcomes if p > 0) / max(len(consent_outcomes), 1) * 100
-    diverge_win_rate = sum(1 for p in diverge_outcomes if p > 0) / max(len(diverge_outcomes), 1) * 100
+    consent_win_rate = totals["consent_win_count"] / max(consent_count, 1) * 100
+    diverge_win_rate = totals["diverge_win_count"] / max(diverge_count, 1) * 100
     
     return {
         "period_days": days,
         "when_followed": {
-            "count": len(consent_outcomes),
+            "count": consent_count,
             "total_pnl": consent_pnl,
-            "avg_pnl": consent_pnl / max(len(consent_outcomes), 1),
+            "avg_pnl": consent_pnl / max(consent_count, 1),
             "win_rate": round(consent_win_rate, 1)
         },
         "when_diverged": {
-            "count": len(diverge_outcomes),
+            "count": diverge_count,
             "total_pnl": diverge_pnl,
-            "avg_pnl": diverge_pnl / max(len(diverge_outcomes), 1),
+            "avg_pnl": diverge_pnl / max(diverge_count, 1),
             "win_rate": round(diverge_win_rate, 1)
         },
         "delta": consent_pnl - diverge_pnl,
@@ -1200,75 +1190,118 @@ async def get_top_modifications(
     """
     start_date = date.today() - timedelta(days=days)
     
-    # Get modification matches
-    mods = db.query(RecommendationExecutionMatch).filter(
-        RecommendationExecutionMatch.recommendation_date >= start_date,
-        RecommendationExecutionMatch.match_type == 'modify',
-        RecommendationExecutionMatch.modification_details != None
-    ).all()
+    totals = get_learning_analytics(db).totals(start_date)
     
-    # Analyze modifications
-    dte_diffs = []
-    strike_diffs = []
-    premium_diffs = []
-    
-    for mod in mods:
-        details = mod.modification_details or {}
-        if 'expiration_diff_days' in details:
-            dte_diffs.append(details['expiration_diff_days'])
-        if 'strike_diff' in details:
-            strike_diffs.append(details['strike_diff'])
-        if 'premium_diff' in details:
-            premium_diffs.append(details['premium_diff'])
+    dte_count = totals["dte_diff_count"]
+    strike_count = totals["strike_diff_count"]
+    premium_count = totals["premium_diff_count"]
+    dte_sum = totals["dte_diff_sum"]
+    strike_sum = totals["strike_diff_sum"]
     
     return {
         "period_days": days,
-        "total_modifications": len(mods),
+        "total_modifications": totals["modify_with_details_count"],
         "dte_modifications": {
-            "count": len(dte_diffs),
-            "avg_change": sum(dte_diffs) / max(len(dte_diffs), 1),
-            "direction": "longer" if sum(dte_diffs) > 0 else "shorter"
-        } if dte_diffs else None,
+            "count": dte_count,
+            "avg_change": dte_sum / dte_count,
+            "direction": "longer" if dte_sum > 0 else "shorter"
+        } if dte_count else None,
         "strike_modifications": {
-            "count": len(strike_diffs),
-            "avg_change": sum(strike_diffs) / max(len(strike_diffs), 1),
-            "direction": "higher" if sum(strike_diffs) > 0 else "lower"
-        } if strike_diffs else None,
+            "count": strike_count,
+            "avg_change": strike_sum / strike_count,
+            "direction": "higher" if strike_sum > 0 else "lower"
+        } if strike_count else None,
         "premium_modifications": {
-            "count": len(premium_diffs),
-            "avg_change": sum(premium_diffs) / max(len(premium_diffs), 1),
-        } if premium_diffs else None,
-        "recommendations": _generate_mod_recommendations(dte_diffs, strike_diffs)
+            "count": premium_count,
+            "avg_change": totals["premium_diff_sum"] / premium_count,
+        } if premium_count else None,
+        "recommendations": _generate_mod_recommendations(
+            dte_sum / dte_count if dte_count else None, dte_count,
+            strike_sum / strike_count if strike_count else None, strike_count,
+        )
     }
 
 
-def _group_by_week(matches: List[RecommendationExecutionMatch]) -> List[dict]:
-    """Group matches by week for trend analysis."""
-    weeks = {}
-    for m in matches:
-        key = f"{m.year}-W{m.week_number}" if m.year and m.week_number else "unknown"
-        if key not in weeks:
-            weeks[key] = {"consent": 0, "modify": 0, "reject": 0}
-        weeks[key][m.match_type] = weeks[key].get(m.match_type, 0) + 1
+@router.get("/analytics/cohorts")
+async def get_cohorts(
+    days: int = Query(default=90, le=365),
+    algorithm_version: Optional[str] = Query(default=None, description="Only this algorithm version"),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user)
+):
+    """
+    RLHF aggregates per cohort: (strategy, symbol, DTE bucket, delta bucket, algorithm_version).
+    
+    Read from the precomputed weekly cohort table.
+    """
+    start_date = date.today() - timedelta(days=days)
+    analytics = get_learning_analytics(db)
+    cohorts = analytics.cohorts(start_date, algorithm_version=algorithm_version)
     
-    return [{"week": k, **v} for k, v in sorted(weeks.items())]
+    for cohort in cohorts:
+        with_rec = cohort["recommendation_count"]
+        cohort["divergence_rate"] = round(
+            (cohort["modify_count"] + cohort["reject_count"]) / with_rec * 100, 1
+        ) if with_rec else None
+    
+    return {
+        "status": "success",
+        "period_days": days,
+        "effective_start_date": analytics.effective_start(start_date).isoformat(),
+        "count": len(cohorts),
+        "cohorts": cohorts
+    }
 
 
-def _generate_mod_recommendations(dte_diffs: list, strike_diffs: list) -> List[str]:
+@router.post("/analytics/cohorts/rebuild")
+async def rebuild_cohorts(
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user)
+):
+    """Recompute every week's RLHF cohort aggregates from the match table."""
+    result = get_learning_analytics(db).rebuild()
+    return {
+        "status": "success",
+        "message": f"Rebuilt {result['rows']} cohort rows across {result['weeks']} weeks",
+        **result
+    }
+
+
+def _group_by_week(weeks: List[dict]) -> List[dict]:
+    """Shape per-week aggregate totals for trend analysis."""
+    result = []
+    for w in weeks:
+        entry = {
+            "week": f"{w['year']}-W{w['week_number']}",
+            "consent": w["consent_count"],
+            "modify": w["modify_count"],
+            "reject": w["reject_count"],
+        }
+        for match_type in ("independent", "no_action"):
+            if w[f"{match_type}_count"]:
+                entry[match_type] = w[f"{match_type}_count"]
+        result.append(entry)
+    return result
+
+
+def _generate_mod_recommendations(
+    avg_dte_diff: Optional[float],
+    dte_count: int,
+    avg_strike_diff: Optional[float],
+    strike_count: int
+) -> List[str]:
     """Generate recommendations based on modification patterns."""
     recs = []
     
-    if dte_diffs and len(dte_diffs) >= 5:
-        avg = sum(dte_diffs) / len(dte_diffs)
-        if avg > 5:
-            recs.append(f"Consider increasing default DTE by {avg:.0f} days")
-        elif avg < -5:
-            recs.append(f"Consider decreasing default DTE by {abs(avg):.0f} days")
+    if avg_dte_diff is not None and dte_count >= 5:
+        if avg_dte_diff > 5:
+            recs.append(f"Consider increasing default DTE by {avg_dte_diff:.0f} days")
+        elif avg_dte_diff < -5:
+            recs.append(f"Consider decreasing default DTE by {abs(avg_dte_diff):.0f} days")
     
-    if strike_diffs and len(strike_diffs) >= 5:
-        avg = sum(strike_diffs) / len(strike_diffs)
-        if abs(avg) > 3:
-            recs.append(f"Consider adjusting strike selection by ${avg:.0f}")
+    if avg_strike_diff is not None and strike_count >= 5:
+        if abs(avg_strike_diff) > 3:
+            recs.append(f"Consider adjusting strike selection by ${avg_strike_diff:.0f}")
     
     return recs if recs else ["No strong patterns detected yet"]
 
@@ -1292,10 +1325,8 @@ async def get_v2_recommendations(
     
     Returns recommendations with their snapshot history.
     """
-    from app.modules.strategies.recommendation_models import (
-        PositionRecommendation,
-        RecommendationSnapshot
-    )
+    from app.modules.strategies.recommendation_models import PositionRecommendation
+    from app.modules.strategies.recommendation_projection import get_latest_snapshots
     
     query = db.query(PositionRecommendation)
     
@@ -1312,12 +1343,12 @@ async def get_v2_recommendations(
         desc(PositionRecommendation.last_snapshot_at)
     ).offset(offset).limit(limit).all()
     
+    # Latest snapshots for the whole page in one query
+    latest_by_rec = get_latest_snapshots(db, [rec.id for rec in recommendations])
+    
     result = []
     for rec in recommendations:
-        # Get latest snapshot
-        latest_snapshot = db.query(RecommendationSnapshot).filter(
-            RecommendationSnapshot.recommendation_id == rec.id
-        ).order_by(desc(RecommendationSnapshot.snapshot_number)).first()
+        latest_snapshot = latest_by_rec.get(rec.id)
         
         result.append({
             "id": rec.id,
@@ -1486,9 +1517,11 @@ async def get_snapshot_timeline(
         RecommendationSnapshot.recommendation_id.in_(rec_ids)
     ).order_by(RecommendationSnapshot.evaluated_at).all()
     
+    recs_by_id = {r.id: r for r in recs}
+    
     timeline = []
     for s in snapshots:
-        rec = next((r for r in recs if r.id == s.recommendation_id), None)
+        rec = recs_by_id.get(s.recommendation_id)
         timeline.append({
             "timestamp": format_datetime_for_api(s.evaluated_at),
             "recommendation_id": rec.recommendation_id if rec else None,
@@ -1537,6 +1570,28 @@ async def trigger_v2_reconciliation(
     }
 
 
+@router.post("/v2/latest-snapshots/rebuild")
+async def rebuild_v2_latest_snapshots(
+    dry_run: bool = Query(default=False, description="Only report drift, do not rewrite"),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user)
+):
+    """
+    Backfill/repair the latest-snapshot-per-recommendation projection.
+    
+    Reports missing, stale and orphaned projection rows, then (unless
+    dry_run) rebuilds the projection from recommendation_snapshots.
+    """
+    from app.modules.strategies.recommendation_projection import rebuild_latest_snapshots
+    
+    result = rebuild_latest_snapshots(db, dry_run=dry_run)
+    
+    return {
+        "status": "success",
+        "result": result
+    }
+
+
 @router.post("/v2/recommendations/{recommendation_id}/act")
 async def mark_recommendation_acted(
     recommendation_id: int,
@@ -0,0 +1,365 @@
+"""
+Incremental Position Outcome Tracker
+
+track_position_outcomes() re-scans every match without an outcome and runs a
+closing-transaction query per match. OutcomeTracker keeps PositionOutcome
+current from the transaction change feed instead:
+
+1. Consume close/expire/assign events past the cursor's last_event_id and
+   attach each to the open STO match it closes (same account, underlying,
+   strike/expiration when parseable), creating or correcting its outcome.
+2. Check only matches that are new since the last run (id > last_match_id),
+   whose expiration passed since the last run, or whose expiration is not
+   stored yet. Those that expired with no closing event are recorded as
+   expired worthless; an expiration parsed from the option symbol is
+   persisted so later runs find the match through the expiry window.
+3. Advance the cursor in the same commit as the outcome writes, so re-running
+   is a no-op, then refresh the RLHF cohort aggregates of affected weeks.
+
+Nightly cost scales with the day's events and expirations, not history.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import Session
+
+from app.modules.strategies.learning_models import (
+    RecommendationExecutionMatch,
+    PositionOutcome,
+)
+from app.modules.strategies.reconciliation_service import ReconciliationService
+from app.modules.strategies.learning_analytics import LearningAnalytics
+from app.modules.investments.models import (
+    InvestmentTransaction,
+    TransactionChangeEvent,
+    ChangeFeedCursor,
+)
+from app.modules.investments.change_feed import underlying_symbol
+
+logger = logging.getLogger(__name__)
+
+
+# Assignments can post a few days after the option's expiration date
+ASSIGNMENT_GRACE_DAYS = 3
+
+
+@dataclass
+class ClosingEvent:
+    """A change-feed event joined with the closing transaction's details."""
+    event_id: int
+    account_id: str
+    underlying: str
+    transaction_date: date
+    transaction_type: str
+    amount: Optional[Decimal]
+    strike: Optional[Decimal]
+    expiration: Optional[date]
+
+
+def event_closes_match(event: ClosingEvent, match: Any) -> bool:
+    """True if `event` can be the closing transaction of the STO in `match`."""
+    if event.account_id != match.execution_account:
+        return False
+    if underlying_symbol(match.execution_symbol) != event.underlying:
+        return False
+    if match.execution_date and event.transaction_date < match.execution_date:
+        return False
+
+    expiration = match.execution_expiration
+    if expiration and event.transaction_date > expiration + timedelta(days=ASSIGNMENT_GRACE_DAYS):
+        return False
+
+    # When both sides carry option details they must agree
+    if event.strike is not None and match.execution_strike is not None:
+        if Decimal(str(event.strike)) != Decimal(str(match.execution_strike)):
+            return False
+    if event.expiration is not None and expiration is not None and event.expiration != expiration:
+        return False
+    return True
+
+
+def pair_events_to_matches(
+    events: Iterable[ClosingEvent],
+    matches: List[Any]
+) -> List[Tuple[ClosingEvent, Any]]:
+    """
+    Pair each event with the oldest compatible match not already paired.
+
+    Events are taken in feed order; each match is closed at most once.
+    """
+    by_key: Dict[Tuple[str, str], List[Any]] = {}
+    for match in sorted(matches, key=lambda m: (m.execution_date or date.min, m.id)):
+        key = (match.execution_account, underlying_symbol(match.execution_symbol))
+        by_key.setdefault(key, []).append(match)
+
+    pairs = []
+    used = set()
+    for event in events:
+        for match in by_key.get((event.account_id, event.underlying), []):
+            if match.id in used or not event_closes_match(event, match):
+                continue
+            used.add(match.id)
+            pairs.append((event, match))
+            break
+    return pairs
+
+
+class OutcomeTracker:
+    """
+    Change-feed driven maintenance of PositionOutcome rows.
+
+    Usage:
+        result = OutcomeTracker(db).run(date.today())
+    """
+
+    CONSUMER = 'position_outcomes'
+    BATCH_SIZE = 1000
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.service = ReconciliationService(db)
+        self.touched_match_ids: Set[int] = set()
+
+    def run(self, as_of_date: Optional[date] = None) -> Dict[str, Any]:
+        """Process unconsumed events and newly due matches. Idempotent."""
+        if as_of_date is None:
+            as_of_date = date.today()
+
+        cursor = self._get_cursor()
+        max_match_id = self.db.query(func.max(RecommendationExecutionMatch.id)).scalar() or 0
+
+        result = {
+            "date": as_of_date.isoformat(),
+            "events_processed": 0,
+            "outcomes_created": 0,
+            "outcomes_updated": 0,
+            "pending_checked": 0,
+            "outcomes_tracked": 0,
+        }
+
+        try:
+            # 1. Consume the feed in id order, committing the cursor with each batch
+            while True:
+                events = self._load_events(cursor.last_event_id)
+                if not events:
+                    break
+                created, updated = self._apply_events(events)
+                result["events_processed"] += len(events)
+                result["outcomes_created"] += created
+                result["outcomes_updated"] += updated
+
+                cursor.last_event_id = events[-1].event_id
+                cursor.events_processed += len(events)
+                self.db.commit()
+
+            # 2. New matches and matches that expired since the last run
+            pending = self._pending_matches(cursor, max_match_id, as_of_date)
+            result["pending_checked"] = len(pending)
+            created = self._resolve_pending(pending, cursor.last_event_id, as_of_date)
+            result["outcomes_created"] += created
+
+            cursor.last_match_id = max(cursor.last_match_id, max_match_id)
+            if cursor.last_expiration_date is None or as_of_date > cursor.last_expiration_date:
+                cursor.last_expiration_date = as_of_date
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        # Outcome P&L feeds the cohort aggregates of the affected weeks
+        if self.touched_match_ids:
+            try:
+                LearningAnalytics(self.db).refresh_for_matches(self.touched_match_ids)
+            except Exception as e:
+                self.db.rollback()
+                logger.error(f"[OUTCOME_TRACKER] Error refreshing learning analytics: {e}")
+
+        result["outcomes_tracked"] = result["outcomes_created"] + result["outcomes_updated"]
+        logger.info(f"[OUTCOME_TRACKER] {result}")
+        return result
+
+    def _get_cursor(self) -> ChangeFeedCursor:
+        cursor = self.db.query(ChangeFeedCursor).filter(
+            ChangeFeedCursor.consumer == self.CONSUMER
+        ).first()
+        if cursor is None:
+            cursor = ChangeFeedCursor(
+                consumer=self.CONSUMER,
+                last_event_id=0,
+                last_match_id=0,
+                events_processed=0,
+            )
+            self.db.add(cursor)
+            self.db.flush()
+        return cursor
+
+    def _event_query(self):
+        return self.db.query(
+            TransactionChangeEvent,
+            InvestmentTransaction.amount,
+            InvestmentTransaction.symbol,
+            InvestmentTransaction.description,
+        ).join(
+            InvestmentTransaction,
+            TransactionChangeEvent.transaction_id == InvestmentTransaction.id
+        )
+
+    def _to_closing_events(self, rows) -> List[ClosingEvent]:
+        events = []
+        for event, amount, symbol, description in rows:
+            strike, expiration = self.service._parse_option_from_symbol(symbol, description)
+            events.append(ClosingEvent(
+                event_id=event.id,
+                account_id=event.account_id,
+                underlying=event.underlying,
+                transaction_date=event.transaction_date,
+                transaction_type=event.transaction_type,
+                amount=amount,
+                strike=strike,
+                expiration=expiration,
+            ))
+        return events
+
+    def _load_events(self, after_event_id: int) -> List[ClosingEvent]:
+        rows = self._event_query().filter(
+            TransactionChangeEvent.id > after_event_id
+        ).order_by(TransactionChangeEvent.id).limit(self.BATCH_SIZE).all()
+        return self._to_closing_events(rows)
+
+    def _apply_events(self, events: List[ClosingEvent]) -> Tuple[int, int]:
+        """Attach a batch of events to the open positions they close."""
+        accounts = {e.account_id for e in events}
+        earliest = min(e.transaction_date for e in events)
+        latest = max(e.transaction_date for e in events)
+
+        # Open STO matches in the batch's accounts, plus ones whose outcome was
+        # only assumed from expiry (an assignment can post after expiration)
+        candidates = self.db.query(RecommendationExecutionMatch).outerjoin(
+            PositionOutcome
+        ).filter(
+            RecommendationExecutionMatch.execution_action == 'STO',
+            RecommendationExecutionMatch.execution_account.in_(accounts),
+            RecommendationExecutionMatch.execution_date <= latest,
+            or_(
+                RecommendationExecutionMatch.execution_expiration.is_(None),
+                RecommendationExecutionMatch.execution_expiration >= earliest - timedelta(days=ASSIGNMENT_GRACE_DAYS),
+            ),
+            or_(
+                PositionOutcome.id.is_(None),
+                and_(PositionOutcome.final_status == 'expired_worthless', PositionOutcome.closed_at.is_(None)),
+            ),
+        ).all()
+
+        created = updated = 0
+        for event, match in pair_events_to_matches(events, candidates):
+            values = self.service._position_outcome_values(
+                match,
+                closing_type=event.transaction_type,
+                closing_amount=event.amount,
+                closed_on=event.transaction_date,
+            )
+            if match.outcome:
+                for key, value in values.items():
+                    if key != 'tracked_at':
+                        setattr(match.outcome, key, value)
+                updated += 1
+                self.touched_match_ids.add(match.id)
+            else:
+                self.db.add(PositionOutcome(match_id=match.id, **values))
+                created += 1
+                self.touched_match_ids.add(match.id)
+
+        self.db.flush()
+        return created, updated
+
+    def _pending_matches(
+        self,
+        cursor: ChangeFeedCursor,
+        max_match_id: int,
+        as_of_date: date
+    ) -> List[RecommendationExecutionMatch]:
+        """Matches without an outcome that are new or newly expired."""
+        due = [and_(
+            RecommendationExecutionMatch.id > cursor.last_match_id,
+            RecommendationExecutionMatch.id <= max_match_id,
+        )]
+        if cursor.last_expiration_date is not None:
+            due.append(and_(
+                RecommendationExecutionMatch.execution_expiration > cursor.last_expiration_date,
+                RecommendationExecutionMatch.execution_expiration <= as_of_date,
+            ))
+        # Expiration only parseable from the option symbol
+        due.append(and_(
+            RecommendationExecutionMatch.execution_expiration.is_(None),
+            RecommendationExecutionMatch.execution_symbol.isnot(None),
+        ))
+
+        return self.db.query(RecommendationExecutionMatch).outerjoin(
+            PositionOutcome
+        ).filter(
+            PositionOutcome.id.is_(None),
+            RecommendationExecutionMatch.execution_id.isnot(None),
+            or_(*due),
+        ).all()
+
+    def _resolve_pending(
+        self,
+        pending: List[RecommendationExecutionMatch],
+        up_to_event_id: int,
+        as_of_date: date
+    ) -> int:
+        """Close pending matches from already-consumed events, else by expiry."""
+        if not pending:
+            return 0
+
+        # Events consumed before these matches were reconciled
+        accounts = {m.execution_account for m in pending if m.execution_account}
+        earliest = min((m.execution_date for m in pending if m.execution_date), default=None)
+        events: List[ClosingEvent] = []
+        if accounts and earliest:
+            rows = self._event_query().filter(
+                TransactionChangeEvent.id <= up_to_event_id,
+                TransactionChangeEvent.account_id.in_(accounts),
+                TransactionChangeEvent.transaction_date >= earliest,
+            ).order_by(TransactionChangeEvent.id).all()
+            events = self._to_closing_events(rows)
+
+        sto_matches = [m for m in pending if m.execution_action == 'STO']
+        closed = {match.id: event for event, match in pair_events_to_matches(events, sto_matches)}
+
+        created = 0
+        for match in pending:
+            event = closed.get(match.id)
+            if event:
+                values = self.service._position_outcome_values(
+                    match,
+                    closing_type=event.transaction_type,
+                    closing_amount=event.amount,
+                    closed_on=event.transaction_date,
+                )
+            else:
+                if not match.execution_symbol:
+                    continue
+                _strike, expiration = self.service._match_option_details(match)
+                if expiration and match.execution_expiration is None:
+                    match.execution_expiration = expiration
+                if not expiration or expiration > as_of_date:
+                    continue  # Still open; a future event or expiry will close it
+                values = self.service._position_outcome_values(match, closing_type=None, closing_amount=None)
+
+            self.db.add(PositionOutcome(match_id=match.id, **values))
+            created += 1
+            self.touched_match_ids.add(match.id)
+
+        self.db.flush()
+        return created
+
+
+def get_outcome_tracker(db: Session) -> OutcomeTracker:
+    """Get an OutcomeTracker instance."""
+    return OutcomeTracker(db)
@@ -5,13 +5,14 @@ This module defines the SQLAlchemy models for the V2 recommendation system:
 - PositionRecommendation: Core identity (one per position)
 - RecommendationSnapshot: Point-in-time captures
 - RecommendationExecution: Links to user actions
+- RecommendationLatestSnapshot: Projection of the newest snapshot per recommendation
 """
 
 from datetime import datetime, date
 from typing import Optional
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, Date, Boolean, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Numeric, DateTime, Date, Boolean, Text, ForeignKey, UniqueConstraint, Index, text
 from sqlalchemy.dialects.postgresql import JSONB
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, object_session
 import hashlib
 
 from app.core.database import Base
@@ -107,6 +108,22 @@ class PositionRecommendation(Base):
     # Relationships
     snapshots = relationship("RecommendationSnapshot", back_populates="recommendation", cascade="all, delete-orphan")
     executions = relationship("RecommendationExecution", back_populates="recommendation", cascade="all, delete-orphan")
+    latest_entry = relationship(
+        "RecommendationLatestSnapshot",
+        back_populates="recommendation",
+        uselist=False,
+        cascade="all, delete-orphan",
+        passive_deletes=True
+    )
+    
+    def get_latest_snapshot(self) -> Optional["RecommendationSnapshot"]:
+        """Return the newest snapshot for this recommendation (via the latest-snapshot projection)."""
+        from app.modules.strategies.recommendation_projection import get_latest_snapshot
+        
+        db = object_session(self)
+        if db is None or self.id is None:
+            return None
+        return get_latest_snapshot(db, self.id)
 
 
 class RecommendationSnapshot(Base):
@@ -203,6 +220,9 @@ class RecommendationSnapshot(Base):
     # Ensure unique snapshot numbers per recommendation
     __table_args__ = (
         UniqueConstraint('recommendation_id', 'snapshot_number', name='uq_rec_snapshot'),
+        # Reconciliation reads "snapshots notified in [day, next day)"
+        Index('idx_recsnap_notified_at', 'notification_sent_at', 'recommendation_id',
+              postgresql_where=text('notification_sent_at IS NOT NULL')),
     )
 
 
@@ -262,3 +282,53 @@ class RecommendationExecution(Base):
     # Relationships
     recommendation = relationship("PositionRecommendation", back_populates="executions")
     snapshot = relationship("RecommendationSnapshot", back_populates="executions")
+
+
+class RecommendationLatestSnapshot(Base):
+    """
+    Materialized "latest snapshot per recommendation" projection.
+    
+    One row per PositionRecommendation pointing at its newest snapshot, with
+    the recommendation's status/account/symbol denormalized so that the
+    notification service, V2 timeline endpoints and recommendation views can
+    read "current state" with a single indexed scan instead of a per-row
+    max(snapshot_number) lookup.
+    
+    Maintained in the same transaction as snapshot inserts and recommendation
+    status changes (see recommendation_projection.py). Can be rebuilt from
+    recommendation_snapshots at any time with rebuild_latest_snapshots().
+    """
+    __tablename__ = 'recommendation_latest_snapshot'
+    
+    recommendation_id = Column(
+        Integer,
+        ForeignKey('position_recommendations.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    snapshot_id = Column(
+        Integer,
+        ForeignKey('recommendation_snapshots.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    snapshot_number = Column(Integer, nullable=False)
+    evaluated_at = Column(DateTime, nullable=False)
+    
+    # Denormalized from PositionRecommendation for indexed filtering
+    status = Column(String(30), nullable=False)
+    account_name = Column(String(200), nullable=False)
+    symbol = Column(String(20), nullable=False)
+    
+    # Denormalized from the snapshot for cheap list views
+    recommended_action = Column(String(50), nullable=True)
+    priority = Column(String(20), nullable=True)
+    
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Relationships
+    recommendation = relationship("PositionRecommendation", back_populates="latest_entry")
+    snapshot = relationship("RecommendationSnapshot")
+    
+    __table_args__ = (
+        Index('idx_rls_status_account_symbol', 'status', 'account_name', 'symbol'),
+        Index('idx_rls_snapshot', 'snapshot_id'),
+    )
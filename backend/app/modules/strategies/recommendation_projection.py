@@ -0,0 +1,243 @@
+"""
+Latest Snapshot Projection (V2 Architecture)
+
+Maintains the `recommendation_latest_snapshot` table: one row per
+PositionRecommendation pointing at its newest RecommendationSnapshot.
+
+Writers call:
+- record_latest_snapshot() right after adding a snapshot (same transaction)
+- sync_latest_snapshot_status() after changing a recommendation's status
+
+Readers call:
+- get_latest_snapshot() for a single recommendation
+- get_latest_snapshots() for a batch of recommendation ids (one query)
+- get_latest_snapshot_pairs() for filtered (recommendation, snapshot) lists
+
+rebuild_latest_snapshots() is the backfill/repair path: it recomputes the
+projection from recommendation_snapshots with a single INSERT ... SELECT.
+"""
+
+from datetime import datetime
+from typing import Optional, Dict, Any, List, Tuple, Iterable
+from sqlalchemy.orm import Session
+from sqlalchemy import desc, or_, text
+from sqlalchemy.dialects.postgresql import insert
+import logging
+
+from app.modules.strategies.recommendation_models import (
+    PositionRecommendation,
+    RecommendationSnapshot,
+    RecommendationLatestSnapshot,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def record_latest_snapshot(
+    db: Session,
+    recommendation: PositionRecommendation,
+    snapshot: RecommendationSnapshot
+) -> None:
+    """
+    Point the projection row for `recommendation` at `snapshot`.
+
+    Flushes so the snapshot has an id, then upserts. The conflict clause only
+    moves the pointer forward (by snapshot_number), so out-of-order writers
+    can never regress the projection. Does not commit - the caller's
+    transaction covers both the snapshot insert and this update.
+    """
+    db.flush()
+
+    values = {
+        "recommendation_id": recommendation.id,
+        "snapshot_id": snapshot.id,
+        "snapshot_number": snapshot.snapshot_number,
+        "evaluated_at": snapshot.evaluated_at or datetime.utcnow(),
+        "status": recommendation.status or 'active',
+        "account_name": recommendation.account_name,
+        "symbol": recommendation.symbol,
+        "recommended_action": snapshot.recommended_action,
+        "priority": snapshot.priority,
+        "updated_at": datetime.utcnow(),
+    }
+
+    insert_stmt = insert(RecommendationLatestSnapshot).values(**values)
+    table = RecommendationLatestSnapshot.__table__
+    stmt = insert_stmt.on_conflict_do_update(
+        index_elements=['recommendation_id'],
+        set_={
+            "snapshot_id": insert_stmt.excluded.snapshot_id,
+            "snapshot_number": insert_stmt.excluded.snapshot_number,
+            "evaluated_at": insert_stmt.excluded.evaluated_at,
+            "status": insert_stmt.excluded.status,
+            "account_name": insert_stmt.excluded.account_name,
+            "symbol": insert_stmt.excluded.symbol,
+            "recommended_action": insert_stmt.excluded.recommended_action,
+            "priority": insert_stmt.excluded.priority,
+            "updated_at": insert_stmt.excluded.updated_at,
+        },
+        where=table.c.snapshot_number <= insert_stmt.excluded.snapshot_number
+    )
+    db.execute(stmt)
+
+
+def sync_latest_snapshot_status(db: Session, recommendation: PositionRecommendation) -> None:
+    """
+    Copy the recommendation's current status into its projection row.
+
+    Call after changing PositionRecommendation.status (resolve, supersede,
+    expire) so status-filtered reads stay correct. Does not commit.
+    """
+    db.query(RecommendationLatestSnapshot).filter(
+        RecommendationLatestSnapshot.recommendation_id == recommendation.id
+    ).update(
+        {
+            RecommendationLatestSnapshot.status: recommendation.status,
+            RecommendationLatestSnapshot.updated_at: datetime.utcnow(),
+        },
+        synchronize_session=False
+    )
+
+
+def get_latest_snapshot(db: Session, recommendation_id: int) -> Optional[RecommendationSnapshot]:
+    """
+    Get the newest snapshot for one recommendation.
+
+    Reads through the projection; falls back to the max(snapshot_number)
+    lookup for recommendations that have not been backfilled yet.
+    """
+    snapshot = db.query(RecommendationSnapshot).join(
+        RecommendationLatestSnapshot,
+        RecommendationLatestSnapshot.snapshot_id == RecommendationSnapshot.id
+    ).filter(
+        RecommendationLatestSnapshot.recommendation_id == recommendation_id
+    ).first()
+
+    if snapshot is not None:
+        return snapshot
+
+    return db.query(RecommendationSnapshot).filter(
+        RecommendationSnapshot.recommendation_id == recommendation_id
+    ).order_by(desc(RecommendationSnapshot.snapshot_number)).first()
+
+
+def get_latest_snapshots(
+    db: Session,
+    recommendation_ids: Iterable[int]
+) -> Dict[int, RecommendationSnapshot]:
+    """Get the newest snapshot for each of `recommendation_ids` in one query."""
+    rec_ids = list(set(recommendation_ids))
+    if not rec_ids:
+        return {}
+
+    rows = db.query(RecommendationSnapshot).join(
+        RecommendationLatestSnapshot,
+        RecommendationLatestSnapshot.snapshot_id == RecommendationSnapshot.id
+    ).filter(
+        RecommendationLatestSnapshot.recommendation_id.in_(rec_ids)
+    ).all()
+
+    return {s.recommendation_id: s for s in rows}
+
+
+def get_latest_snapshot_pairs(
+    db: Session,
+    status: Optional[str] = 'active',
+    account_name: Optional[str] = None,
+    symbol: Optional[str] = None,
+    exclude_actions: Optional[Iterable[str]] = None
+) -> List[Tuple[PositionRecommendation, RecommendationSnapshot]]:
+    """
+    Get (recommendation, latest snapshot) pairs with one indexed scan.
+
+    Filters use exact matches so they hit idx_rls_status_account_symbol.
+    """
+    query = db.query(PositionRecommendation, RecommendationSnapshot).join(
+        RecommendationLatestSnapshot,
+        RecommendationLatestSnapshot.recommendation_id == PositionRecommendation.id
+    ).join(
+        RecommendationSnapshot,
+        RecommendationSnapshot.id == RecommendationLatestSnapshot.snapshot_id
+    )
+
+    if status:
+        query = query.filter(RecommendationLatestSnapshot.status == status)
+    if account_name:
+        query = query.filter(RecommendationLatestSnapshot.account_name == account_name)
+    if symbol:
+        query = query.filter(RecommendationLatestSnapshot.symbol == symbol)
+    if exclude_actions:
+        # NOT IN is never true for NULL; snapshots without an action stay in
+        action = RecommendationLatestSnapshot.recommended_action
+        query = query.filter(or_(action.is_(None), ~action.in_(list(exclude_actions))))
+
+    return query.all()
+
+
+def rebuild_latest_snapshots(db: Session, dry_run: bool = False) -> Dict[str, Any]:
+    """
+    Backfill/repair the projection from recommendation_snapshots.
+
+    Reports how many projection rows are missing, stale (pointing at an older
+    snapshot or carrying an outdated status) or orphaned, then (unless
+    dry_run) rewrites the table in a single transaction.
+    """
+    drift = db.execute(text("""
+        WITH latest AS (
+            SELECT DISTINCT ON (s.recommendation_id)
+                s.recommendation_id, s.id AS snapshot_id, r.status
+            FROM recommendation_snapshots s
+            JOIN position_recommendations r ON r.id = s.recommendation_id
+            ORDER BY s.recommendation_id, s.snapshot_number DESC
+        )
+        SELECT
+            (SELECT COUNT(*) FROM latest) AS expected,
+            (SELECT COUNT(*) FROM latest l
+                LEFT JOIN recommendation_latest_snapshot p ON p.recommendation_id = l.recommendation_id
+                WHERE p.recommendation_id IS NULL) AS missing,
+            (SELECT COUNT(*) FROM latest l
+                JOIN recommendation_latest_snapshot p ON p.recommendation_id = l.recommendation_id
+                WHERE p.snapshot_id <> l.snapshot_id OR p.status <> l.status) AS stale,
+            (SELECT COUNT(*) FROM recommendation_latest_snapshot p
+                LEFT JOIN latest l ON l.recommendation_id = p.recommendation_id
+                WHERE l.recommendation_id IS NULL) AS orphaned
+    """)).fetchone()
+
+    result = {
+        "expected": drift.expected,
+        "missing": drift.missing,
+        "stale": drift.stale,
+        "orphaned": drift.orphaned,
+        "rebuilt": 0,
+        "dry_run": dry_run,
+    }
+
+    if dry_run:
+        return result
+
+    try:
+        db.execute(text("DELETE FROM recommendation_latest_snapshot"))
+        inserted = db.execute(text("""
+            INSERT INTO recommendation_latest_snapshot (
+                recommendation_id, snapshot_id, snapshot_number, evaluated_at,
+                status, account_name, symbol, recommended_action, priority, updated_at
+            )
+            SELECT DISTINCT ON (s.recommendation_id)
+                s.recommendation_id, s.id, s.snapshot_number, s.evaluated_at,
+                r.status, r.account_name, r.symbol, s.recommended_action, s.priority, NOW()
+            FROM recommendation_snapshots s
+            JOIN position_recommendations r ON r.id = s.recommendation_id
+            ORDER BY s.recommendation_id, s.snapshot_number DESC
+        """))
+        db.commit()
+        result["rebuilt"] = inserted.rowcount
+    except Exception as e:
+        logger.error(f"[LATEST_SNAPSHOT] Rebuild failed: {e}")
+        db.rollback()
+        raise
+
+    logger.info(
+        f"[LATEST_SNAPSHOT] Rebuilt projection: {result['rebuilt']} rows "
+        f"(missing={result['missing']}, stale={result['stale']}, orphaned={result['orphaned']})"
+    )
+    return result
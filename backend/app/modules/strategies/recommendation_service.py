@@ -24,6 +24,10 @@ from app.modules.strategies.recommendation_models import (
     RecommendationExecution,
     generate_recommendation_id
 )
+from app.modules.strategies.recommendation_projection import (
+    record_latest_snapshot,
+    sync_latest_snapshot_status
+)
 from app.modules.strategies.position_evaluator import EvaluationResult
 
 logger = logging.getLogger(__name__)
@@ -120,6 +124,9 @@ class RecommendationService:
         recommendation.last_snapshot_at = snapshot.evaluated_at
         recommendation.updated_at = datetime.utcnow()
         
+        # Keep the latest-snapshot projection in the same transaction
+        record_latest_snapshot(self.db, recommendation, snapshot)
+        
         # Commit changes
         try:
             self.db.commit()
@@ -552,6 +559,7 @@ class RecommendationService:
             days = (datetime.utcnow() - recommendation.first_detected_at).days
             recommendation.days_active = days
         
+        sync_latest_snapshot_status(self.db, recommendation)
         self.db.commit()
         logger.info(
             f"[REC_SERVICE] Resolved recommendation {recommendation.recommendation_id} "
@@ -736,6 +736,10 @@ class OptionsStrategyRecommendationService:
                 RecommendationSnapshot,
                 generate_recommendation_id
             )
+            from app.modules.strategies.recommendation_projection import (
+                get_latest_snapshot,
+                record_latest_snapshot
+            )
             from datetime import datetime, date
             from decimal import Decimal
             
@@ -831,9 +835,7 @@ class OptionsStrategyRecommendationService:
             # Get previous snapshot for change detection
             prev_snapshot = None
             if recommendation.id:
-                prev_snapshot = self.db.query(RecommendationSnapshot).filter(
-                    RecommendationSnapshot.recommendation_id == recommendation.id
-                ).order_by(RecommendationSnapshot.snapshot_number.desc()).first()
+                prev_snapshot = get_latest_snapshot(self.db, recommendation.id)
             
             # Determine action from recommendation type
             action = rec.action_type.upper() if rec.action_type else 'UNKNOWN'
@@ -911,6 +913,9 @@ class OptionsStrategyRecommendationService:
             recommendation.last_snapshot_at = snapshot.evaluated_at
             recommendation.updated_at = datetime.utcnow()
             
+            # Keep the latest-snapshot projection in the same transaction
+            record_latest_snapshot(self.db, recommendation, snapshot)
+            
             logger.info(f"[DUAL_WRITE] ✅ Created snapshot #{snapshot_number} for {rec_id}")
             
             # Determine if should notify
@@ -0,0 +1,469 @@
+"""
+Range Reconciler - multi-day reconciliation backfill
+
+ReconciliationService.reconcile_day() issues two queries per day plus one
+existence check per match row. Reconciling a month that way is ~30 x (2 + N)
+round trips. RangeReconciler does the same work for (start, end, accounts):
+
+1. Loads every notified snapshot in [start, end + 1 day) and every option
+   execution in [start, end + 1] in two queries, then buckets them by day.
+2. Runs the per-day matching (pure CPU, no DB) in worker processes on plain
+   picklable rows, reusing ReconciliationService's matcher and row builder.
+3. Loads the existing match rows for the range once and writes each day with
+   bulk update/insert mappings instead of per-row queries.
+4. Commits each day together with a ReconciliationCheckpoint, so an
+   interrupted backfill resumes from the day after the last one written.
+
+Matching semantics are identical to reconcile_day(): a day sees the
+executions dated that day and the next.
+"""
+
+import logging
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, date, timedelta, time
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, contains_eager
+
+from app.modules.strategies.learning_models import (
+    RecommendationExecutionMatch,
+    ReconciliationCheckpoint,
+)
+from app.modules.strategies.recommendation_models import (
+    RecommendationSnapshot,
+    PositionRecommendation,
+)
+from app.modules.strategies.reconciliation_service import (
+    MatchType,
+    ReconciliationService,
+    V2SnapshotAdapter,
+)
+from app.modules.strategies.algorithm_config import get_rlhf_config
+from app.modules.strategies.learning_analytics import week_of
+from app.modules.investments.models import InvestmentTransaction, InvestmentAccount
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RecommendationRow:
+    """Picklable stand-in for V2SnapshotAdapter with the fields matching reads."""
+    id: int
+    recommendation_id: str
+    symbol: Optional[str]
+    account_name: Optional[str]
+    action_type: Optional[str]
+    recommendation_type: Optional[str]
+    option_type: Optional[str]
+    priority: Optional[str]
+    notification_sent_at: Optional[datetime]
+    created_at: Optional[datetime]
+    context_snapshot: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_adapter(cls, rec: V2SnapshotAdapter) -> 'RecommendationRow':
+        return cls(
+            id=rec.id,
+            recommendation_id=rec.recommendation_id,
+            symbol=rec.symbol,
+            account_name=rec.account_name,
+            action_type=rec.action_type,
+            recommendation_type=rec.recommendation_type,
+            option_type=rec.option_type,
+            priority=rec.priority,
+            notification_sent_at=rec.notification_sent_at,
+            created_at=rec.created_at,
+            context_snapshot=rec.context_snapshot,
+        )
+
+
+@dataclass
+class ExecutionRow:
+    """Picklable stand-in for InvestmentTransaction with the fields matching reads."""
+    id: int
+    account_id: Optional[str]
+    transaction_date: date
+    transaction_type: str
+    symbol: str
+    description: Optional[str]
+    amount: Optional[Decimal]
+    quantity: Optional[Decimal]
+
+    @classmethod
+    def from_transaction(cls, txn: InvestmentTransaction) -> 'ExecutionRow':
+        return cls(
+            id=txn.id,
+            account_id=txn.account_id,
+            transaction_date=txn.transaction_date,
+            transaction_type=txn.transaction_type,
+            symbol=txn.symbol,
+            description=txn.description,
+            amount=txn.amount,
+            quantity=txn.quantity,
+        )
+
+
+@dataclass
+class DayResult:
+    """Column values produced for one day, ready to be written."""
+    day: date
+    recommendations_count: int
+    executions_count: int
+    match_values: List[Dict[str, Any]]
+    independent_values: List[Dict[str, Any]]
+    by_type: Dict[str, int]
+
+
+def match_day(
+    day: date,
+    recommendations: List[RecommendationRow],
+    executions: List[ExecutionRow]
+) -> DayResult:
+    """
+    Match one day's recommendations to executions and build the row values.
+
+    Module-level so it can run in a worker process; touches no database.
+    """
+    service = ReconciliationService(None)
+    matches = service._match_recommendations_to_executions(recommendations, executions)
+
+    matched_execution_ids = {m.execution.id for m in matches if m.execution}
+    independent = [e for e in executions if e.id not in matched_execution_ids]
+
+    return DayResult(
+        day=day,
+        recommendations_count=len(recommendations),
+        executions_count=len(executions),
+        match_values=[service._build_match_values(m, day) for m in matches],
+        independent_values=[service._build_independent_values(e, day) for e in independent],
+        by_type={
+            "consent": sum(1 for m in matches if m.match_type == MatchType.CONSENT),
+            "modify": sum(1 for m in matches if m.match_type == MatchType.MODIFY),
+            "reject": sum(1 for m in matches if m.match_type == MatchType.REJECT),
+            "no_action": sum(1 for m in matches if m.match_type == MatchType.NO_ACTION),
+        },
+    )
+
+
+def _match_day_args(args: Tuple[date, List[RecommendationRow], List[ExecutionRow]]) -> DayResult:
+    return match_day(*args)
+
+
+def split_by_day(
+    start_date: date,
+    end_date: date,
+    recommendations: List[RecommendationRow],
+    executions: List[ExecutionRow]
+) -> List[Tuple[date, List[RecommendationRow], List[ExecutionRow]]]:
+    """
+    Partition range-loaded rows into per-day work items.
+
+    Each day gets the recommendations notified that day and the executions
+    dated that day or the next (same window as reconcile_day).
+    """
+    recs_by_day: Dict[date, List[RecommendationRow]] = defaultdict(list)
+    for rec in recommendations:
+        sent_at = rec.notification_sent_at or rec.created_at
+        recs_by_day[sent_at.date()].append(rec)
+
+    execs_by_day: Dict[date, List[ExecutionRow]] = defaultdict(list)
+    for execution in executions:
+        execs_by_day[execution.transaction_date].append(execution)
+
+    days = []
+    day = start_date
+    while day <= end_date:
+        day_execs = execs_by_day.get(day, []) + execs_by_day.get(day + timedelta(days=1), [])
+        days.append((day, recs_by_day.get(day, []), day_execs))
+        day += timedelta(days=1)
+    return days
+
+
+def make_run_key(start_date: date, end_date: date, accounts: Optional[List[str]]) -> str:
+    """Stable checkpoint key for a (start, end, accounts) run."""
+    account_part = ','.join(sorted(accounts)) if accounts else 'all'
+    return f"{start_date.isoformat()}:{end_date.isoformat()}:{account_part}"[:200]
+
+
+class RangeReconciler:
+    """
+    Reconciles a date range with range queries, parallel matching and bulk writes.
+
+    Usage:
+        reconciler = RangeReconciler(db, workers=4)
+        summary = reconciler.run(date(2026, 1, 1), date(2026, 1, 31))
+    """
+
+    def __init__(self, db: Session, workers: Optional[int] = None):
+        self.db = db
+        self.workers = workers if workers is not None else min(4, os.cpu_count() or 1)
+        self.service = ReconciliationService(db)
+
+    def run(
+        self,
+        start_date: date,
+        end_date: date,
+        accounts: Optional[List[str]] = None,
+        resume: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Reconcile every day in [start_date, end_date].
+
+        Args:
+            accounts: Account names or source account ids to restrict to
+                      (None = all accounts).
+            resume: Continue from the checkpoint of a previous run with the
+                    same (start, end, accounts) instead of starting over.
+
+        Returns summary with per-day results and totals.
+        """
+        if end_date < start_date:
+            raise ValueError(f"end_date {end_date} is before start_date {start_date}")
+
+        checkpoint = self._get_checkpoint(start_date, end_date, accounts, resume)
+        first_day = start_date
+        if checkpoint.last_completed_date:
+            first_day = checkpoint.last_completed_date + timedelta(days=1)
+
+        if first_day > end_date:
+            logger.info(f"[RANGE_REC] {checkpoint.run_key} already complete")
+            return self._summary(checkpoint, [])
+
+        logger.info(f"[RANGE_REC] Reconciling {first_day} to {end_date} (accounts={accounts or 'all'}, workers={self.workers})")
+
+        account_names, account_ids = self._resolve_accounts(accounts)
+        recommendations = self._load_recommendations(first_day, end_date, account_names)
+        executions = self._load_executions(first_day, end_date, account_ids)
+        logger.info(f"[RANGE_REC] Loaded {len(recommendations)} recommendations, {len(executions)} executions")
+
+        work = split_by_day(first_day, end_date, recommendations, executions)
+        existing = self._load_existing_matches(first_day, end_date)
+
+        results = []
+        try:
+            for result in self._match_days(work):
+                matches_saved, independent_saved = self._write_day(result, existing)
+
+                checkpoint.last_completed_date = result.day
+                checkpoint.days_completed += 1
+                checkpoint.matches_saved += matches_saved
+                checkpoint.independent_saved += independent_saved
+                self.db.commit()
+
+                results.append({
+                    "date": result.day.isoformat(),
+                    "recommendations_count": result.recommendations_count,
+                    "executions_count": result.executions_count,
+                    "matches_saved": matches_saved,
+                    "independent_actions": independent_saved,
+                    "by_type": result.by_type,
+                })
+        except Exception as e:
+            self.db.rollback()
+            checkpoint.status = 'failed'
+            checkpoint.error = str(e)[:2000]
+            self.db.commit()
+            logger.error(f"[RANGE_REC] {checkpoint.run_key} failed after {checkpoint.last_completed_date}: {e}")
+            raise
+
+        # Weeks of the whole range, so days written by an interrupted attempt are covered too
+        self.service.refresh_learning_analytics(sorted({
+            week_of(start_date + timedelta(days=i)) for i in range((end_date - start_date).days + 1)
+        }))
+
+        checkpoint.status = 'completed'
+        checkpoint.error = None
+        checkpoint.completed_at = datetime.utcnow()
+        self.db.commit()
+
+        logger.info(f"[RANGE_REC] {checkpoint.run_key} complete: {checkpoint.matches_saved} matches, {checkpoint.independent_saved} independent")
+        return self._summary(checkpoint, results)
+
+    def _get_checkpoint(
+        self,
+        start_date: date,
+        end_date: date,
+        accounts: Optional[List[str]],
+        resume: bool
+    ) -> ReconciliationCheckpoint:
+        run_key = make_run_key(start_date, end_date, accounts)
+        checkpoint = self.db.query(ReconciliationCheckpoint).filter(
+            ReconciliationCheckpoint.run_key == run_key
+        ).first()
+
+        if checkpoint is None:
+            checkpoint = ReconciliationCheckpoint(
+                run_key=run_key,
+                start_date=start_date,
+                end_date=end_date,
+                accounts=sorted(accounts) if accounts else None,
+                days_completed=0,
+                matches_saved=0,
+                independent_saved=0,
+            )
+            self.db.add(checkpoint)
+        elif not resume:
+            checkpoint.last_completed_date = None
+            checkpoint.days_completed = 0
+            checkpoint.matches_saved = 0
+            checkpoint.independent_saved = 0
+            checkpoint.started_at = datetime.utcnow()
+            checkpoint.completed_at = None
+
+        checkpoint.status = 'running'
+        checkpoint.error = None
+        self.db.commit()
+        return checkpoint
+
+    def _resolve_accounts(self, accounts: Optional[List[str]]) -> Tuple[Optional[set], Optional[set]]:
+        """Map requested accounts to (account names, source account ids)."""
+        if not accounts:
+            return None, None
+
+        rows = self.db.query(InvestmentAccount.account_id, InvestmentAccount.account_name).filter(
+            (InvestmentAccount.account_name.in_(accounts)) | (InvestmentAccount.account_id.in_(accounts))
+        ).all()
+
+        names = {name for _id, name in rows if name} | set(accounts)
+        ids = {account_id for account_id, _name in rows} | set(accounts)
+        return names, ids
+
+    def _load_recommendations(
+        self,
+        start_date: date,
+        end_date: date,
+        account_names: Optional[set]
+    ) -> List[RecommendationRow]:
+        """All notified snapshots in [start_date, end_date + 1 day) in one query."""
+        range_start = datetime.combine(start_date, time.min)
+        range_end = datetime.combine(end_date + timedelta(days=1), time.min)
+
+        query = self.db.query(RecommendationSnapshot).join(
+            PositionRecommendation,
+            RecommendationSnapshot.recommendation_id == PositionRecommendation.id
+        ).options(
+            contains_eager(RecommendationSnapshot.recommendation)
+        ).filter(
+            RecommendationSnapshot.notification_sent_at >= range_start,
+            RecommendationSnapshot.notification_sent_at < range_end,
+        )
+        if account_names is not None:
+            query = query.filter(PositionRecommendation.account_name.in_(account_names))
+
+        return [
+            RecommendationRow.from_adapter(V2SnapshotAdapter(snapshot=snapshot, position=snapshot.recommendation))
+            for snapshot in query.all()
+        ]
+
+    def _load_executions(
+        self,
+        start_date: date,
+        end_date: date,
+        account_ids: Optional[set]
+    ) -> List[ExecutionRow]:
+        """All option executions in [start_date, end_date + 1] in one query."""
+        query = self.db.query(InvestmentTransaction).filter(
+            InvestmentTransaction.transaction_date >= start_date,
+            InvestmentTransaction.transaction_date <= end_date + timedelta(days=1),
+            InvestmentTransaction.transaction_type.in_(['STO', 'BTC', 'OEXP'])
+        )
+        if account_ids is not None:
+            query = query.filter(InvestmentTransaction.account_id.in_(account_ids))
+
+        return [ExecutionRow.from_transaction(txn) for txn in query.all()]
+
+    def _load_existing_matches(self, start_date: date, end_date: date) -> Dict[Tuple, int]:
+        """
+        Existing match row ids for the range, keyed the way _save_matches looks them up:
+        - ('exec', record_id, execution_id, date) for recommendation + execution
+        - ('rec', record_id, date) for recommendation without execution
+        - ('independent', execution_id, date) for independent executions
+        """
+        rows = self.db.query(
+            RecommendationExecutionMatch.id,
+            RecommendationExecutionMatch.recommendation_record_id,
+            RecommendationExecutionMatch.execution_id,
+            RecommendationExecutionMatch.recommendation_date,
+            RecommendationExecutionMatch.match_type,
+        ).filter(
+            RecommendationExecutionMatch.recommendation_date >= start_date,
+            RecommendationExecutionMatch.recommendation_date <= end_date,
+        ).order_by(RecommendationExecutionMatch.id).all()
+
+        existing: Dict[Tuple, int] = {}
+        for match_id, record_id, execution_id, rec_date, match_type in rows:
+            if match_type == MatchType.INDEPENDENT.value and execution_id is not None:
+                existing.setdefault(('independent', execution_id, rec_date), match_id)
+            if record_id is not None and execution_id is not None:
+                existing.setdefault(('exec', record_id, execution_id, rec_date), match_id)
+            elif record_id is not None:
+                existing.setdefault(('rec', record_id, rec_date), match_id)
+        return existing
+
+    def _match_days(self, work: List[Tuple[date, List[RecommendationRow], List[ExecutionRow]]]):
+        """Yield DayResults in date order, matching days in parallel when worthwhile."""
+        if self.workers <= 1 or len(work) <= 1:
+            for item in work:
+                yield match_day(*item)
+            return
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(work))) as pool:
+            # map() yields in submission order, so checkpoints stay monotonic
+            yield from pool.map(_match_day_args, work)
+
+    def _write_day(self, result: DayResult, existing: Dict[Tuple, int]) -> Tuple[int, int]:
+        """Bulk update/insert one day's match rows. Caller commits."""
+        algorithm_version = get_rlhf_config()["algorithm_version"]
+        inserts: List[Dict[str, Any]] = []
+        updates: List[Dict[str, Any]] = []
+
+        for values in result.match_values:
+            record_id = values["recommendation_record_id"]
+            execution_id = values["execution_id"]
+            if record_id is None:
+                key = None
+            elif execution_id is not None:
+                key = ('exec', record_id, execution_id, result.day)
+            else:
+                key = ('rec', record_id, result.day)
+
+            match_id = existing.get(key) if key else None
+            if match_id:
+                updates.append({"id": match_id, **self.service._match_update_values(values)})
+            else:
+                inserts.append({**values, "algorithm_version": algorithm_version})
+
+        for values in result.independent_values:
+            match_id = existing.get(('independent', values["execution_id"], result.day))
+            if match_id:
+                updates.append({"id": match_id, **self.service._independent_update_values(values)})
+            else:
+                inserts.append({**values, "algorithm_version": algorithm_version})
+
+        if updates:
+            self.db.bulk_update_mappings(RecommendationExecutionMatch, updates)
+        if inserts:
+            self.db.bulk_insert_mappings(RecommendationExecutionMatch, inserts)
+
+        return len(result.match_values), len(result.independent_values)
+
+    def _summary(self, checkpoint: ReconciliationCheckpoint, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "run_key": checkpoint.run_key,
+            "start_date": checkpoint.start_date.isoformat(),
+            "end_date": checkpoint.end_date.isoformat(),
+            "status": checkpoint.status,
+            "days_completed": checkpoint.days_completed,
+            "total_matches_saved": checkpoint.matches_saved,
+            "total_independent": checkpoint.independent_saved,
+            "results": results,
+        }
+
+
+def get_range_reconciler(db: Session, workers: Optional[int] = None) -> RangeReconciler:
+    """Get a RangeReconciler instance."""
+    return RangeReconciler(db, workers=workers)
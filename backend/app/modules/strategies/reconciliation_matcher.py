@@ -0,0 +1,244 @@
+"""
+Reconciliation Matcher - indexed candidate lookup + best-score assignment
+
+Used by ReconciliationService to pair the day's recommendations with option
+executions without scanning every execution for every recommendation.
+
+1. ExecutionIndex parses each execution once (underlying, call/put, strike,
+   expiration) and buckets it by underlying -> (option_type, expiration).
+   Candidate lookup for a recommendation is a dict hit on its symbol.
+2. ReconciliationMatcher scores only same-symbol, type-compatible pairs and
+   solves each symbol group as a maximum-weight bipartite assignment
+   (Hungarian algorithm) instead of greedy first-fit, so an early
+   recommendation can no longer "steal" the execution that fits a later
+   one better.
+
+Cost is O(sum over symbols of R_s x E_s) scoring plus a small cubic solve per
+symbol group, instead of O(R x E) over the whole day.
+"""
+
+import re
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.modules.investments.models import InvestmentTransaction
+
+
+_OPTION_TYPE_PATTERN = re.compile(r'\b(call|put)s?\b', re.IGNORECASE)
+
+
+@dataclass
+class ParsedExecution:
+    """An execution with its option details parsed once up front."""
+    execution: InvestmentTransaction
+    underlying: str
+    option_type: Optional[str]  # 'call', 'put' or None if unknown
+    strike: Optional[Decimal]
+    expiration: Optional[date]
+
+
+def parse_option_type(*texts: Optional[str]) -> Optional[str]:
+    """Extract 'call'/'put' from an option symbol or description."""
+    for text in texts:
+        if not text:
+            continue
+        found = _OPTION_TYPE_PATTERN.search(text)
+        if found:
+            return found.group(1).lower()
+    return None
+
+
+class ExecutionIndex:
+    """
+    Hash index of executions keyed by underlying -> (option_type, expiration).
+
+    Built once per reconciliation run; candidate lookups are O(1) on symbol.
+    """
+
+    def __init__(
+        self,
+        executions: List[InvestmentTransaction],
+        parse_option: Callable[[str, Optional[str]], Tuple[Optional[Decimal], Optional[date]]]
+    ):
+        self._buckets: Dict[str, Dict[Tuple[Optional[str], Optional[date]], List[ParsedExecution]]] = {}
+        self.size = 0
+
+        for execution in executions:
+            if not execution.symbol:
+                continue
+            underlying = execution.symbol.split()[0].upper()
+            strike, expiration = parse_option(execution.symbol, execution.description)
+            parsed = ParsedExecution(
+                execution=execution,
+                underlying=underlying,
+                option_type=parse_option_type(execution.description, execution.symbol),
+                strike=strike,
+                expiration=expiration,
+            )
+            by_key = self._buckets.setdefault(underlying, {})
+            by_key.setdefault((parsed.option_type, expiration), []).append(parsed)
+            self.size += 1
+
+    def candidates(self, symbol: str, option_type: Optional[str] = None) -> List[ParsedExecution]:
+        """
+        All executions on `symbol` whose option type is compatible.
+
+        Unknown option types on either side are treated as compatible.
+        """
+        by_key = self._buckets.get(symbol.upper())
+        if not by_key:
+            return []
+
+        result = []
+        for (exec_type, _expiration), bucket in by_key.items():
+            if option_type and exec_type and exec_type != option_type:
+                continue
+            result.extend(bucket)
+        return result
+
+
+def solve_max_weight_assignment(weights: List[List[float]]) -> List[Tuple[int, int]]:
+    """
+    Maximum-weight bipartite assignment (Hungarian algorithm, O(n^2 m)).
+
+    `weights[i][j]` is the benefit of pairing row i with column j; use 0 for
+    "not allowed". Returns (row, col) pairs for every row when rows <= cols
+    (every column when cols < rows) - callers drop zero-weight pairs.
+    """
+    n_rows = len(weights)
+    if n_rows == 0:
+        return []
+    n_cols = len(weights[0])
+    if n_cols == 0:
+        return []
+
+    transposed = n_rows > n_cols
+    if transposed:
+        weights = [list(col) for col in zip(*weights)]
+        n_rows, n_cols = n_cols, n_rows
+
+    # Minimise cost = -weight. 1-indexed arrays with potentials u/v.
+    inf = float('inf')
+    u = [0.0] * (n_rows + 1)
+    v = [0.0] * (n_cols + 1)
+    p = [0] * (n_cols + 1)    # p[j] = row assigned to column j
+    way = [0] * (n_cols + 1)
+
+    for i in range(1, n_rows + 1):
+        p[0] = i
+        j0 = 0
+        minv = [inf] * (n_cols + 1)
+        used = [False] * (n_cols + 1)
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+            delta = inf
+            j1 = 0
+            for j in range(1, n_cols + 1):
+                if used[j]:
+                    continue
+                cur = -weights[i0 - 1][j - 1] - u[i0] - v[j]
+                if cur < minv[j]:
+                    minv[j] = cur
+                    way[j] = j0
+                if minv[j] < delta:
+                    delta = minv[j]
+                    j1 = j
+            for j in range(n_cols + 1):
+                if used[j]:
+                    u[p[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if p[j0] == 0:
+                break
+        while True:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+            if j0 == 0:
+                break
+
+    pairs = []
+    for j in range(1, n_cols + 1):
+        if p[j]:
+            row, col = p[j] - 1, j - 1
+            pairs.append((col, row) if transposed else (row, col))
+    return sorted(pairs)
+
+
+class ReconciliationMatcher:
+    """
+    Pairs recommendations with executions by best total score.
+
+    `score_fn(rec, parsed_execution)` returns (score 0-100, details) and is
+    only called for same-symbol, type-compatible candidates.
+    """
+
+    MIN_MATCH_SCORE = 50  # Same threshold the greedy matcher used
+
+    def __init__(
+        self,
+        index: ExecutionIndex,
+        score_fn: Callable[[Any, ParsedExecution], Tuple[float, Dict[str, Any]]]
+    ):
+        self.index = index
+        self.score_fn = score_fn
+
+    def assign(
+        self,
+        recommendations: List[Tuple[Any, str, Optional[str]]]
+    ) -> Dict[int, Tuple[ParsedExecution, float, Dict[str, Any]]]:
+        """
+        Assign executions to recommendations.
+
+        Args:
+            recommendations: (recommendation, symbol, option_type) tuples.
+
+        Returns:
+            {position in `recommendations`: (parsed execution, score, details)}
+            for every recommendation that got an execution scoring at least
+            MIN_MATCH_SCORE. Each execution is used at most once.
+        """
+        by_symbol: Dict[str, List[int]] = {}
+        for pos, (_rec, symbol, _option_type) in enumerate(recommendations):
+            by_symbol.setdefault(symbol.upper(), []).append(pos)
+
+        assigned: Dict[int, Tuple[ParsedExecution, float, Dict[str, Any]]] = {}
+
+        for symbol, positions in by_symbol.items():
+            candidates = self.index.candidates(symbol)
+            if not candidates:
+                continue
+
+            weights: List[List[float]] = []
+            scored: Dict[Tuple[int, int], Tuple[float, Dict[str, Any]]] = {}
+            for row, pos in enumerate(positions):
+                rec, _symbol, option_type = recommendations[pos]
+                row_weights = []
+                for col, parsed in enumerate(candidates):
+                    if option_type and parsed.option_type and parsed.option_type != option_type:
+                        row_weights.append(0.0)
+                        continue
+                    score, details = self.score_fn(rec, parsed)
+                    if score >= self.MIN_MATCH_SCORE:
+                        scored[(row, col)] = (score, details)
+                        row_weights.append(float(score))
+                    else:
+                        row_weights.append(0.0)
+                weights.append(row_weights)
+
+            if not scored:
+                continue
+
+            for row, col in solve_max_weight_assignment(weights):
+                hit = scored.get((row, col))
+                if hit is None:
+                    continue
+                score, details = hit
+                assigned[positions[row]] = (candidates[col], score, details)
+
+        return assigned
@@ -24,7 +24,7 @@ from typing import List, Dict, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
 from sqlalchemy import and_, or_, func, extract
 
 from app.modules.strategies.learning_models import (
@@ -43,8 +43,18 @@ from app.modules.strategies.recommendation_models import (
     RecommendationExecution,
     generate_recommendation_id,
 )
+from app.modules.strategies.recommendation_projection import (
+    get_latest_snapshot,
+    sync_latest_snapshot_status,
+)
 from app.modules.investments.models import InvestmentTransaction, InvestmentAccount
 from app.modules.strategies.algorithm_config import get_rlhf_config
+from app.modules.strategies.learning_analytics import LearningAnalytics, week_of
+from app.modules.strategies.reconciliation_matcher import (
+    ExecutionIndex,
+    ParsedExecution,
+    ReconciliationMatcher,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -103,6 +113,10 @@ class V2SnapshotAdapter:
             return 'sell'
         return action.lower() if action else 'unknown'
     
+    @property
+    def option_type(self) -> Optional[str]:
+        return (self.position.option_type or '').lower() or None
+    
     @property
     def priority(self) -> str:
         return self.snapshot.priority
@@ -217,6 +231,16 @@ class ReconciliationService:
     # Time windows
     MAX_HOURS_FOR_MATCH = 48  # Look up to 48 hours for matching execution
     
+    # Fields that identify a match row; never overwritten when re-reconciling
+    MATCH_IDENTITY_FIELDS = ('recommendation_id', 'recommendation_record_id', 'recommendation_date', 'algorithm_version')
+    
+    # Execution-side fields; only refreshed when the match has an execution
+    MATCH_EXECUTION_FIELDS = (
+        'execution_id', 'execution_date', 'execution_time', 'execution_action', 'execution_symbol',
+        'execution_strike', 'execution_expiration', 'execution_premium', 'execution_contracts',
+        'execution_account',
+    )
+    
     def __init__(self, db: Session):
         self.db = db
     
@@ -254,7 +278,10 @@ class ReconciliationService:
         # 6. Save independent executions
         independent_count = self._save_independent_executions(independent_executions, target_date)
         
-        # 7. Generate summary
+        # 7. Refresh the week's RLHF cohort aggregates
+        self.refresh_learning_analytics([week_of(target_date)])
+        
+        # 8. Generate summary
         summary = {
             "date": target_date.isoformat(),
             "recommendations_count": len(recommendations),
@@ -272,6 +299,14 @@ class ReconciliationService:
         logger.info(f"Reconciliation complete: {summary}")
         return summary
     
+    def refresh_learning_analytics(self, weeks: List[Tuple[int, int]]) -> None:
+        """Recompute cohort aggregates for ISO weeks touched by a run; never fails the run."""
+        try:
+            LearningAnalytics(self.db).refresh_weeks(weeks)
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error refreshing learning analytics for {weeks}: {e}")
+    
     def _get_recommendations_for_date(self, target_date: date) -> List[V2SnapshotAdapter]:
         """
         Get all V2 recommendations (snapshots) that were sent to the user on a specific date.
@@ -279,13 +314,20 @@ class ReconciliationService:
         Only includes snapshots where notification_sent_at is set, meaning the user
         actually received this notification. This is key for accurate RLHF learning.
         """
+        # Half-open [day start, next day start) range so the notification_sent_at
+        # index can be used (func.date(...) == target_date cannot)
+        day_start = datetime.combine(target_date, time.min)
+        day_end = day_start + timedelta(days=1)
+        
         # Query V2 snapshots where notifications were actually sent
         snapshots = self.db.query(RecommendationSnapshot).join(
             PositionRecommendation,
             RecommendationSnapshot.recommendation_id == PositionRecommendation.id
+        ).options(
+            contains_eager(RecommendationSnapshot.recommendation)
         ).filter(
-            RecommendationSnapshot.notification_sent_at.isnot(None),
-            func.date(RecommendationSnapshot.notification_sent_at) == target_date,
+            RecommendationSnapshot.notification_sent_at >= day_start,
+            RecommendationSnapshot.notification_sent_at < day_end,
         ).all()
         
         # Wrap in adapters for V1-compatible interface
@@ -326,18 +368,29 @@ class ReconciliationService:
         Match each recommendation to its best matching execution.
         
         Algorithm:
-        1. For each recommendation, find candidate executions (same symbol)
-        2. Score each candidate on strike, expiration, timing
-        3. Pick best match if score above threshold
-        4. Classify match type based on differences
+        1. Index executions once by (symbol, option_type, expiration)
+        2. For each recommendation, look up candidates by symbol (hash hit)
+        3. Score same-symbol pairs on strike, expiration, premium, action
+        4. Solve each symbol group as a best-score assignment (score >= 50)
+        5. Classify match type based on differences
         """
-        matches = []
-        used_executions = set()
+        index = ExecutionIndex(executions, self._parse_option_from_symbol)
+        matcher = ReconciliationMatcher(index, self._score_parsed_match)
         
+        # (symbol, option_type) per recommendation; None when there is no symbol
+        keys = []
         for rec in recommendations:
-            # Extract symbol from recommendation
             rec_symbol = self._extract_symbol_from_recommendation(rec)
-            if not rec_symbol:
+            keys.append((rec_symbol, self._extract_option_type_from_recommendation(rec)) if rec_symbol else None)
+        
+        matchable = [pos for pos, key in enumerate(keys) if key]
+        assigned = matcher.assign([(recommendations[pos], *keys[pos]) for pos in matchable])
+        assigned_by_pos = {matchable[i]: hit for i, hit in assigned.items()}
+        taken = {parsed.execution.id for parsed, _score, _details in assigned_by_pos.values()}
+        
+        matches = []
+        for pos, rec in enumerate(recommendations):
+            if not keys[pos]:
                 # Can't match without symbol - mark as no_action
                 matches.append(MatchResult(
                     match_type=MatchType.NO_ACTION,
@@ -346,13 +399,29 @@ class ReconciliationService:
                 ))
                 continue
             
-            # Find candidate executions for this symbol
-            candidates = [
-                e for e in executions 
-                if e.id not in used_executions 
-                and self._symbols_match(e.symbol, rec_symbol)
-            ]
+            hit = assigned_by_pos.get(pos)
+            if hit:
+                parsed, score, details = hit
+                exec = parsed.execution
+                
+                # Classify the match type
+                match_type = self._classify_match(rec, exec, details)
+                
+                # Calculate time to execution
+                hours_to_exec = self._calculate_hours_to_execution(rec, exec)
+                
+                matches.append(MatchResult(
+                    match_type=match_type,
+                    confidence=score,
+                    recommendation=rec,
+                    execution=exec,
+                    modification_details=details if match_type == MatchType.MODIFY else {},
+                    hours_to_execution=hours_to_exec
+                ))
+                continue
             
+            # Executions assigned to other recommendations aren't candidates
+            candidates = [c for c in index.candidates(*keys[pos]) if c.execution.id not in taken]
             if not candidates:
                 # No matching execution found - either reject or no_action
                 match_type = self._determine_no_execution_type(rec)
@@ -363,55 +432,26 @@ class ReconciliationService:
                 ))
                 continue
             
-            # Score candidates and find best match
-            best_match = None
-            best_score = 0
+            # Candidates existed but none scored well enough.
+            # Check if the recommendation was to WAIT/HOLD - in that case, no action = CONSENT
+            action_type = rec.action_type.upper() if rec.action_type else ''
+            is_wait_recommendation = action_type in ['WAIT', 'HOLD', 'MONITOR', 'WATCH']
             
-            for exec in candidates:
-                score, details = self._score_match(rec, exec)
-                if score > best_score:
-                    best_score = score
-                    best_match = (exec, details)
-            
-            if best_match and best_score >= 50:  # Minimum 50% match score
-                exec, details = best_match
-                used_executions.add(exec.id)
-                
-                # Classify the match type
-                match_type = self._classify_match(rec, exec, details)
-                
-                # Calculate time to execution
-                hours_to_exec = self._calculate_hours_to_execution(rec, exec)
-                
+            if is_wait_recommendation:
+                # User followed the WAIT advice by not acting - this is CONSENT
                 matches.append(MatchResult(
-                    match_type=match_type,
-                    confidence=best_score,
+                    match_type=MatchType.CONSENT,
+                    confidence=100.0,
                     recommendation=rec,
-                    execution=exec,
-                    modification_details=details if match_type == MatchType.MODIFY else {},
-                    hours_to_execution=hours_to_exec
+                    modification_details={'followed_wait_advice': True}
                 ))
             else:
-                # No execution found for this recommendation
-                # Check if the recommendation was to WAIT/HOLD - in that case, no action = CONSENT
-                action_type = rec.action_type.upper() if rec.action_type else ''
-                is_wait_recommendation = action_type in ['WAIT', 'HOLD', 'MONITOR', 'WATCH']
-                
-                if is_wait_recommendation:
-                    # User followed the WAIT advice by not acting - this is CONSENT
-                    matches.append(MatchResult(
-                        match_type=MatchType.CONSENT,
-                        confidence=100.0,
-                        recommendation=rec,
-                        modification_details={'followed_wait_advice': True}
-                    ))
-                else:
-                    # User didn't act on an actionable recommendation - this is REJECT
-                    matches.append(MatchResult(
-                        match_type=MatchType.REJECT,
-                        confidence=100.0,
-                        recommendation=rec
-                    ))
+                # User didn't act on an actionable recommendation - this is REJECT
+                matches.append(MatchResult(
+                    match_type=MatchType.REJECT,
+                    confidence=100.0,
+                    recommendation=rec
+                ))
         
         return matches
     
@@ -431,6 +471,14 @@ class ReconciliationService:
         
         return None
     
+    def _extract_option_type_from_recommendation(self, rec: Any) -> Optional[str]:
+        """Extract 'call'/'put' from a recommendation, if known."""
+        option_type = getattr(rec, 'option_type', None)
+        if not option_type and isinstance(rec.context_snapshot, dict):
+            option_type = rec.context_snapshot.get('option_type')
+        option_type = (option_type or '').lower()
+        return option_type if option_type in ('call', 'put') else None
+    
     def _symbols_match(self, execution_symbol: str, rec_symbol: str) -> bool:
         """
         Check if execution symbol matches recommendation symbol.
@@ -445,14 +493,26 @@ class ReconciliationService:
         exec_underlying = execution_symbol.split()[0].upper()
         return exec_underlying == rec_symbol.upper()
     
+    def _score_parsed_match(
+        self,
+        rec: Any,
+        parsed: ParsedExecution
+    ) -> Tuple[float, Dict[str, Any]]:
+        """Score a recommendation against an already-parsed execution."""
+        return self._score_match(rec, parsed.execution, (parsed.strike, parsed.expiration))
+    
     def _score_match(
         self, 
         rec: Any, 
-        exec: InvestmentTransaction
+        exec: InvestmentTransaction,
+        exec_option: Optional[Tuple[Optional[Decimal], Optional[date]]] = None
     ) -> Tuple[float, Dict[str, Any]]:
         """
         Score how well an execution matches a recommendation.
         
+        exec_option is the execution's pre-parsed (strike, expiration); it is
+        parsed from the description when not supplied.
+        
         Returns (score 0-100, modification details dict).
         """
         score = 100.0
@@ -512,7 +572,9 @@ class ReconciliationService:
                 rec_premium = float(context.get('total_premium')) / contracts
         
         # Parse execution details from description/symbol (description has full option details)
-        exec_strike, exec_expiration = self._parse_option_from_symbol(exec.symbol, exec.description)
+        if exec_option is None:
+            exec_option = self._parse_option_from_symbol(exec.symbol, exec.description)
+        exec_strike, exec_expiration = exec_option
         exec_premium = float(exec.amount) / (float(exec.quantity or 1) * 100) if exec.quantity else None
         
         # Compare strike
@@ -688,118 +750,172 @@ class ReconciliationService:
         delta = exec_time - rec_time
         return delta.total_seconds() / 3600  # Convert to hours
     
+    def _build_match_values(self, match: MatchResult, target_date: date) -> Dict[str, Any]:
+        """
+        Build the RecommendationExecutionMatch column values for a match result.
+        
+        Shared by the per-day save path and the bulk range reconciler.
+        """
+        iso_cal = target_date.isocalendar()
+        rec = match.recommendation
+        exec = match.execution
+        
+        # Extract recommendation details from context or recommendation_id
+        rec_strike = None
+        rec_expiration = None
+        rec_premium = None
+        rec_contracts = None
+        
+        if rec:
+            context = rec.context_snapshot or {}
+            rec_action = rec.action_type or ''
+            is_roll = 'roll' in rec_action.lower()
+            
+            # Check multiple key names since different recommendation types use different keys
+            # For rolls, prioritize target/new values (what we're rolling TO)
+            if is_roll:
+                rec_strike = (
+                    context.get('target_strike') or
+                    context.get('new_strike') or  # For roll recommendations
+                    context.get('strike') or 
+                    context.get('recommended_strike') or 
+                    context.get('strike_price')
+                )
+                rec_expiration = (
+                    context.get('target_expiration') or
+                    context.get('new_expiration') or  # For roll recommendations
+                    context.get('expiration') or 
+                    context.get('recommended_expiration') or 
+                    context.get('expiration_date')
+                )
+            else:
+                rec_strike = (
+                    context.get('strike') or 
+                    context.get('recommended_strike') or 
+                    context.get('strike_price') or  # Used in sell_unsold_contracts and new_covered_call
+                    context.get('target_strike') or
+                    context.get('new_strike')
+                )
+                rec_expiration = (
+                    context.get('expiration') or 
+                    context.get('recommended_expiration') or 
+                    context.get('expiration_date') or  # Common key in context
+                    context.get('target_expiration') or
+                    context.get('new_expiration')
+                )
+            # Try premium_per_contract first (per-contract value)
+            # For roll recommendations, prioritize new_premium (premium for the new position)
+            rec_premium = (
+                context.get('new_premium') or  # Premium for new position in roll
+                context.get('estimated_new_premium') or  # Alternative key for new premium
+                context.get('new_premium_income') or  # Income from new position
+                # Standard premium keys
+                context.get('premium') or 
+                context.get('expected_premium') or 
+                context.get('premium_per_contract') or  # Used in sell_unsold_contracts and new_covered_call
+                context.get('target_premium') or
+                context.get('potential_premium') or
+                context.get('net_credit')  # For spread recommendations
+            )
+            
+            # If we didn't find per-contract premium, try total_premium and divide by contracts
+            # Note: We store per-contract premium in recommended_premium field
+            if not rec_premium and context.get('total_premium'):
+                contracts = context.get('contracts') or context.get('unsold_contracts') or 1
+                if contracts > 0:
+                    rec_premium = float(context.get('total_premium')) / contracts
+            
+            # Also extract contracts for the match record
+            rec_contracts = context.get('contracts') or context.get('unsold_contracts')
+            
+            # Try to parse from recommendation_id if not in context
+            # Format: v3_roll_weekly_PLTR_207.5_Neels_Brokerage
+            if not rec_strike and rec.recommendation_id:
+                parts = rec.recommendation_id.split('_')
+                if len(parts) >= 5:
+                    try:
+                        rec_strike = Decimal(parts[4])  # Strike is typically 5th element
+                    except (ValueError, InvalidOperation):
+                        pass
+            
+            # Convert rec_expiration to date if it's a string
+            if rec_expiration and isinstance(rec_expiration, str):
+                try:
+                    rec_expiration = datetime.strptime(rec_expiration, '%Y-%m-%d').date()
+                except ValueError:
+                    try:
+                        rec_expiration = datetime.strptime(rec_expiration, '%m/%d/%Y').date()
+                    except ValueError:
+                        rec_expiration = None
+        
+        # Parse execution details from symbol (e.g., "PLTR 01/09/2026 Call $182.50")
+        exec_strike = None
+        exec_expiration = None
+        if exec:
+            exec_strike, exec_expiration = self._parse_option_from_symbol(exec.symbol, exec.description)
+        
+        return {
+            # Recommendation side
+            "recommendation_id": rec.recommendation_id if rec else None,
+            "recommendation_record_id": rec.id if rec else None,
+            "recommendation_date": target_date,
+            # Use notification_sent_at if available, otherwise fall back to created_at
+            "recommendation_time": rec.notification_sent_at if rec and rec.notification_sent_at else (rec.created_at if rec else None),
+            "recommendation_type": rec.recommendation_type if rec else None,
+            "recommended_action": rec.action_type if rec else None,
+            "recommended_symbol": rec.symbol if rec else None,
+            "recommended_strike": Decimal(str(rec_strike)) if rec_strike else None,
+            "recommended_expiration": rec_expiration if isinstance(rec_expiration, date) else None,
+            "recommended_premium": Decimal(str(rec_premium)) if rec_premium else None,
+            "recommended_contracts": int(rec_contracts) if rec_contracts else None,
+            "recommendation_priority": rec.priority if rec else None,
+            "recommendation_context": rec.context_snapshot if rec else None,
+            
+            # Execution side
+            "execution_id": exec.id if exec else None,
+            "execution_date": exec.transaction_date if exec else None,
+            # Convert transaction_date (Date) to DateTime for execution_time
+            # Use 9:30 AM as default time (market open) if we only have date
+            "execution_time": datetime.combine(exec.transaction_date, time(9, 30)) if exec and exec.transaction_date else None,
+            "execution_action": exec.transaction_type if exec else None,
+            "execution_symbol": exec.symbol if exec else None,
+            "execution_strike": exec_strike if exec_strike else None,
+            "execution_expiration": exec_expiration if exec_expiration else None,
+            "execution_premium": Decimal(str(abs(float(exec.amount or 0)))) if exec else None,
+            "execution_contracts": int(exec.quantity or 1) if exec else None,
+            "execution_account": exec.account_id if exec and exec.account_id else None,  # Use account_id from transaction
+            
+            # Match analysis
+            "match_type": match.match_type.value,
+            "match_confidence": Decimal(str(match.confidence)),
+            "modification_details": match.modification_details if match.modification_details else None,
+            "hours_to_execution": Decimal(str(match.hours_to_execution)) if match.hours_to_execution else None,
+            
+            # Week tracking
+            "year": iso_cal.year,
+            "week_number": iso_cal.week,
+            "algorithm_version": get_rlhf_config()["algorithm_version"],
+            "reconciled_at": datetime.utcnow(),
+        }
+    
+    def _match_update_values(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Subset of match values to refresh on an already-reconciled row."""
+        update = {k: v for k, v in values.items() if k not in self.MATCH_IDENTITY_FIELDS}
+        if values.get("execution_id") is None:
+            for key in self.MATCH_EXECUTION_FIELDS:
+                update.pop(key, None)
+        update["updated_at"] = datetime.utcnow()
+        return update
+    
     def _save_matches(self, matches: List[MatchResult], target_date: date) -> int:
         """Save match results to database."""
         saved = 0
-        iso_cal = target_date.isocalendar()
         
         for match in matches:
             try:
                 rec = match.recommendation
                 exec = match.execution
-                
-                # Extract recommendation details from context or recommendation_id
-                rec_strike = None
-                rec_expiration = None
-                rec_premium = None
-                
-                if rec:
-                    context = rec.context_snapshot or {}
-                    rec_action = rec.action_type or ''
-                    is_roll = 'roll' in rec_action.lower()
-                    
-                    # Check multiple key names since different recommendation types use different keys
-                    # For rolls, prioritize target/new values (what we're rolling TO)
-                    if is_roll:
-                        rec_strike = (
-                            context.get('target_strike') or
-                            context.get('new_strike') or  # For roll recommendations
-                            context.get('strike') or 
-                            context.get('recommended_strike') or 
-                            context.get('strike_price')
-                        )
-                        rec_expiration = (
-                            context.get('target_expiration') or
-                            context.get('new_expiration') or  # For roll recommendations
-                            context.get('expiration') or 
-                            context.get('recommended_expiration') or 
-                            context.get('expiration_date')
-                        )
-                    else:
-                        rec_strike = (
-                            context.get('strike') or 
-                            context.get('recommended_strike') or 
-                            context.get('strike_price') or  # Used in sell_unsold_contracts and new_covered_call
-                            context.get('target_strike') or
-                            context.get('new_strike')
-                        )
-                        rec_expiration = (
-                            context.get('expiration') or 
-                            context.get('recommended_expiration') or 
-                            context.get('expiration_date') or  # Common key in context
-                            context.get('target_expiration') or
-                            context.get('new_expiration')
-                        )
-                    # Try premium_per_contract first (per-contract value)
-                    # For roll recommendations, prioritize new_premium (premium for the new position)
-                    rec_premium = (
-                        context.get('new_premium') or  # Premium for new position in roll
-                        context.get('estimated_new_premium') or  # Alternative key for new premium
-                        context.get('new_premium_income') or  # Income from new position
-                        # Standard premium keys
-                        context.get('premium') or 
-                        context.get('expected_premium') or 
-                        context.get('premium_per_contract') or  # Used in sell_unsold_contracts and new_covered_call
-                        context.get('target_premium') or
-                        context.get('potential_premium') or
-                        context.get('net_credit')  # For spread recommendations
-                    )
-                    
-                    # If we didn't find per-contract premium, try total_premium and divide by contracts
-                    # Note: We store per-contract premium in recommended_premium field
-                    if not rec_premium and context.get('total_premium'):
-                        contracts = context.get('contracts') or context.get('unsold_contracts') or 1
-                        if contracts > 0:
-                            rec_premium = float(context.get('total_premium')) / contracts
-                    
-                    # Also extract contracts for the match record
-                    rec_contracts = context.get('contracts') or context.get('unsold_contracts')
-                    
-                    # Extract account name - try context first, then direct field
-                    rec_account = (
-                        context.get('account_name') or 
-                        context.get('account') or
-                        getattr(rec, 'account_name', None)  # V2SnapshotAdapter provides this
-                    )
-                    
-                    # Try to parse from recommendation_id if not in context
-                    # Format: v3_roll_weekly_PLTR_207.5_Neels_Brokerage
-                    if not rec_strike and rec.recommendation_id:
-                        parts = rec.recommendation_id.split('_')
-                        if len(parts) >= 5:
-                            try:
-                                rec_strike = Decimal(parts[4])  # Strike is typically 5th element
-                            except (ValueError, InvalidOperation):
-                                pass
-                    
-                    # Convert rec_expiration to date if it's a string
-                    if rec_expiration and isinstance(rec_expiration, str):
-                        try:
-                            rec_expiration = datetime.strptime(rec_expiration, '%Y-%m-%d').date()
-                        except ValueError:
-                            try:
-                                rec_expiration = datetime.strptime(rec_expiration, '%m/%d/%Y').date()
-                            except ValueError:
-                                rec_expiration = None
-                
-                # Parse execution details from symbol (e.g., "PLTR 01/09/2026 Call $182.50")
-                exec_strike = None
-                exec_expiration = None
-                exec_account = None
-                
-                if exec:
-                    exec_strike, exec_expiration = self._parse_option_from_symbol(exec.symbol, exec.description)
-                    exec_account = exec.account_id  # Use account_id from transaction
+                values = self._build_match_values(match, target_date)
                 
                 # Check if match already exists to avoid duplicates
                 existing_match = None
@@ -820,89 +936,11 @@ class ReconciliationService:
                 
                 if existing_match:
                     # Update existing match with latest data
-                    # Use notification_sent_at if available, otherwise fall back to created_at
-                    existing_match.recommendation_time = rec.notification_sent_at if rec and rec.notification_sent_at else (rec.created_at if rec else None)
-                    existing_match.recommendation_type = rec.recommendation_type if rec else None
-                    existing_match.recommended_action = rec.action_type if rec else None
-                    existing_match.recommended_symbol = rec.symbol if rec else None
-                    existing_match.recommended_strike = Decimal(str(rec_strike)) if rec_strike else None
-                    existing_match.recommended_expiration = rec_expiration if isinstance(rec_expiration, date) else None
-                    existing_match.recommended_premium = Decimal(str(rec_premium)) if rec_premium else None
-                    existing_match.recommended_contracts = int(rec_contracts) if rec_contracts else None
-                    existing_match.recommendation_priority = rec.priority if rec else None
-                    existing_match.recommendation_context = rec.context_snapshot if rec else None
-                    
-                    if exec:
-                        existing_match.execution_date = exec.transaction_date
-                        # Convert transaction_date (Date) to DateTime for execution_time
-                        # Use 9:30 AM as default time (market open) if we only have date
-                        if exec.transaction_date:
-                            existing_match.execution_time = datetime.combine(exec.transaction_date, time(9, 30))
-                        existing_match.execution_action = exec.transaction_type
-                        existing_match.execution_symbol = exec.symbol
-                        existing_match.execution_strike = exec_strike if exec_strike else None
-                        existing_match.execution_expiration = exec_expiration if exec_expiration else None
-                        existing_match.execution_premium = Decimal(str(abs(float(exec.amount or 0))))
-                        existing_match.execution_contracts = int(exec.quantity or 1)
-                        existing_match.execution_account = exec_account if exec_account else None
-                    
-                    existing_match.match_type = match.match_type.value
-                    existing_match.match_confidence = Decimal(str(match.confidence))
-                    existing_match.modification_details = match.modification_details if match.modification_details else None
-                    existing_match.hours_to_execution = Decimal(str(match.hours_to_execution)) if match.hours_to_execution else None
-                    existing_match.reconciled_at = datetime.utcnow()
-                    existing_match.updated_at = datetime.utcnow()
-                    
-                    # Week tracking
-                    existing_match.year = iso_cal.year
-                    existing_match.week_number = iso_cal.week
+                    for key, value in self._match_update_values(values).items():
+                        setattr(existing_match, key, value)
                 else:
                     # Create new match record
-                    db_match = RecommendationExecutionMatch(
-                        # Recommendation side
-                        recommendation_id=rec.recommendation_id if rec else None,
-                        recommendation_record_id=rec.id if rec else None,
-                        recommendation_date=target_date,
-                        # Use notification_sent_at if available, otherwise fall back to created_at
-                        recommendation_time=rec.notification_sent_at if rec and rec.notification_sent_at else (rec.created_at if rec else None),
-                        recommendation_type=rec.recommendation_type if rec else None,
-                        recommended_action=rec.action_type if rec else None,
-                        recommended_symbol=rec.symbol if rec else None,
-                        recommended_strike=Decimal(str(rec_strike)) if rec_strike else None,
-                        recommended_expiration=rec_expiration if isinstance(rec_expiration, date) else None,
-                        recommended_premium=Decimal(str(rec_premium)) if rec_premium else None,
-                        recommended_contracts=int(rec_contracts) if rec_contracts else None,
-                        recommendation_priority=rec.priority if rec else None,
-                        recommendation_context=rec.context_snapshot if rec else None,
-                        
-                        # Execution side
-                        execution_id=exec.id if exec else None,
-                        execution_date=exec.transaction_date if exec else None,
-                        # Convert transaction_date (Date) to DateTime for execution_time
-                        # Use 9:30 AM as default time (market open) if we only have date
-                        execution_time=datetime.combine(exec.transaction_date, time(9, 30)) if exec and exec.transaction_date else None,
-                        execution_action=exec.transaction_type if exec else None,
-                        execution_symbol=exec.symbol if exec else None,
-                        execution_strike=exec_strike if exec_strike else None,
-                        execution_expiration=exec_expiration if exec_expiration else None,
-                        execution_premium=Decimal(str(abs(float(exec.amount or 0)))) if exec else None,
-                        execution_contracts=int(exec.quantity or 1) if exec else None,
-                        execution_account=exec_account if exec_account else None,
-                        
-                        # Match analysis
-                        match_type=match.match_type.value,
-                        match_confidence=Decimal(str(match.confidence)),
-                        modification_details=match.modification_details if match.modification_details else None,
-                        hours_to_execution=Decimal(str(match.hours_to_execution)) if match.hours_to_execution else None,
-                        
-                        # Week tracking
-                        year=iso_cal.year,
-                        week_number=iso_cal.week,
-                        algorithm_version=get_rlhf_config()["algorithm_version"],
-                        reconciled_at=datetime.utcnow(),
-                    )
-                    
-                    self.db.add(db_match)
+                    self.db.add(RecommendationExecutionMatch(**values))
                 
                 saved += 1
                 
@@ -913,6 +951,25 @@ class ReconciliationService:
         self.db.commit()
         return saved
     
+    def _build_independent_values(self, exec: InvestmentTransaction, target_date: date) -> Dict[str, Any]:
+        """Build RecommendationExecutionMatch column values for an independent execution."""
+        values = self._build_match_values(
+            MatchResult(match_type=MatchType.INDEPENDENT, confidence=100.0, execution=exec),
+            target_date
+        )
+        # Independent rows carry only the execution side
+        for key in ('recommendation_time', 'recommendation_context'):
+            values.pop(key, None)
+        values["match_confidence"] = Decimal('100.0')
+        return values
+    
+    def _independent_update_values(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """Subset of independent-execution values to refresh on an existing row."""
+        keys = self.MATCH_EXECUTION_FIELDS + ('year', 'week_number', 'reconciled_at')
+        update = {k: values[k] for k in keys if k in values}
+        update["updated_at"] = datetime.utcnow()
+        return update
+    
     def _save_independent_executions(
         self, 
         executions: List[InvestmentTransaction],
@@ -920,10 +977,11 @@ class ReconciliationService:
     ) -> int:
         """Save independent executions (no matching recommendation)."""
         saved = 0
-        iso_cal = target_date.isocalendar()
         
         for exec in executions:
             try:
+                values = self._build_independent_values(exec, target_date)
+                
                 # Check if this independent execution already exists
                 existing_match = self.db.query(RecommendationExecutionMatch).filter(
                     RecommendationExecutionMatch.execution_id == exec.id,
@@ -932,58 +990,11 @@ class ReconciliationService:
                 ).first()
                 
                 if existing_match:
-                    # Update existing match with latest data
-                    exec_strike, exec_expiration = self._parse_option_from_symbol(exec.symbol, exec.description)
-                    exec_account = exec.account_id
-                    
-                    existing_match.execution_date = exec.transaction_date
-                    # Convert transaction_date (Date) to DateTime for execution_time
-                    if exec.transaction_date:
-                        existing_match.execution_time = datetime.combine(exec.transaction_date, time(9, 30))
-                    existing_match.execution_action = exec.transaction_type
-                    existing_match.execution_symbol = exec.symbol
-                    existing_match.execution_strike = exec_strike if exec_strike else None
-                    existing_match.execution_expiration = exec_expiration if exec_expiration else None
-                    existing_match.execution_premium = Decimal(str(abs(float(exec.amount or 0))))
-                    existing_match.execution_contracts = int(exec.quantity or 1)
-                    existing_match.execution_account = exec_account if exec_account else None
-                    existing_match.reconciled_at = datetime.utcnow()
-                    existing_match.updated_at = datetime.utcnow()
-                    existing_match.year = iso_cal.year
-                    existing_match.week_number = iso_cal.week
+                    # Update existing match with latest data (execution side only)
+                    for key, value in self._independent_update_values(values).items():
+                        setattr(existing_match, key, value)
                 else:
-                    # Parse execution details from description (has full option details)
-                    exec_strike, exec_expiration = self._parse_option_from_symbol(exec.symbol, exec.description)
-                    exec_account = exec.account_id
-                    
-                    db_match = RecommendationExecutionMatch(
-                        recommendation_date=target_date,
-                        
-                        # Execution side with full details
-                        execution_id=exec.id,
-                        execution_date=exec.transaction_date,
-                        # Convert transaction_date (Date) to DateTime for execution_time
-                        execution_time=datetime.combine(exec.transaction_date, time(9, 30)) if exec.transaction_date else None,
-                        execution_action=exec.transaction_type,
-                        execution_symbol=exec.symbol,
-                        execution_strike=exec_strike if exec_strike else None,
-                        execution_expiration=exec_expiration if exec_expiration else None,
-                        execution_premium=Decimal(str(abs(float(exec.amount or 0)))),
-                        execution_contracts=int(exec.quantity or 1),
-                        execution_account=exec_account if exec_account else None,
-                        
-                        # Mark as independent
-                        match_type=MatchType.INDEPENDENT.value,
-                        match_confidence=Decimal('100.0'),
-                        
-                        # Week tracking
-                        year=iso_cal.year,
-                        week_number=iso_cal.week,
-                        algorithm_version=get_rlhf_config()["algorithm_version"],
-                        reconciled_at=datetime.utcnow(),
-                    )
-                    
-                    self.db.add(db_match)
+                    self.db.add(RecommendationExecutionMatch(**values))
                 
                 saved += 1
                 
@@ -1020,19 +1031,22 @@ class ReconciliationService:
             RecommendationExecutionMatch.execution_id != None,  # Has execution
         ).all()
         
-        tracked = 0
+        tracked_ids = []
         for match in pending_matches:
             outcome = self._determine_position_outcome(match, as_of_date)
             if outcome:
                 self.db.add(outcome)
-                tracked += 1
+                tracked_ids.append(match.id)
         
         self.db.commit()
         
+        if tracked_ids:
+            LearningAnalytics(self.db).refresh_for_matches(tracked_ids)
+        
         return {
             "date": as_of_date.isoformat(),
             "pending_checked": len(pending_matches),
-            "outcomes_tracked": tracked
+            "outcomes_tracked": len(tracked_ids)
         }
     
     def _determine_position_outcome(
@@ -1046,7 +1060,7 @@ class ReconciliationService:
         if not match.execution_symbol:
             return None
         
-        strike, expiration = self._parse_option_from_symbol(match.execution_symbol)
+        strike, expiration = self._match_option_details(match)
         
         if not expiration:
             return None
@@ -1058,21 +1072,49 @@ class ReconciliationService:
         # Look for closing transaction (BTC) for this position
         closing_txn = self._find_closing_transaction(match)
         
+        values = self._position_outcome_values(
+            match,
+            closing_type=closing_txn.transaction_type if closing_txn else None,
+            closing_amount=closing_txn.amount if closing_txn else None,
+        )
+        return PositionOutcome(match_id=match.id, **values)
+    
+    def _match_option_details(self, match: RecommendationExecutionMatch) -> Tuple[Optional[Decimal], Optional[date]]:
+        """Strike and expiration of a match's execution, preferring the reconciled columns."""
+        if match.execution_strike and match.execution_expiration:
+            return match.execution_strike, match.execution_expiration
+        strike, expiration = self._parse_option_from_symbol(match.execution_symbol)
+        return match.execution_strike or strike, match.execution_expiration or expiration
+    
+    def _position_outcome_values(
+        self,
+        match: RecommendationExecutionMatch,
+        closing_type: Optional[str],
+        closing_amount: Optional[Decimal],
+        closed_on: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """
+        PositionOutcome column values for a match given how it was closed.
+        
+        closing_type is the closing transaction type (BTC, OASGN, OEXP) or
+        None when the option simply ran to expiration.
+        """
+        strike, expiration = self._match_option_details(match)
+        
         # Determine status
-        if closing_txn:
-            if closing_txn.transaction_type == 'BTC':
-                status = 'closed_profit' if float(closing_txn.amount) < float(match.execution_premium or 0) else 'closed_loss'
-                premium_paid = Decimal(str(abs(float(closing_txn.amount))))
-            elif closing_txn.transaction_type == 'OASGN':
-                status = 'assigned'
-                premium_paid = None
-            else:
-                status = 'closed_profit'
-                premium_paid = None
-        else:
-            # No closing transaction = expired worthless
+        if closing_type == 'BTC':
+            status = 'closed_profit' if float(closing_amount) < float(match.execution_premium or 0) else 'closed_loss'
+            premium_paid = Decimal(str(abs(float(closing_amount))))
+        elif closing_type == 'OASGN':
+            status = 'assigned'
+            premium_paid = None
+        elif closing_type in (None, 'OEXP'):
+            # No closing transaction (or an expiration record) = expired worthless
             status = 'expired_worthless'
             premium_paid = Decimal('0')
+        else:
+            status = 'closed_profit'
+            premium_paid = None
         
         # Calculate profit
         premium_received = match.execution_premium or Decimal('0')
@@ -1088,8 +1130,8 @@ class ReconciliationService:
         # Parse option type from symbol
         option_type = 'put' if 'Put' in (match.execution_symbol or '') else 'call'
         
-        return PositionOutcome(
-            match_id=match.id,
+        end_date = closed_on or expiration
+        return dict(
             symbol=match.execution_symbol.split()[0] if match.execution_symbol else 'UNKNOWN',
             strike=strike or Decimal('0'),
             expiration_date=expiration,
@@ -1101,7 +1143,8 @@ class ReconciliationService:
             premium_paid_to_close=premium_paid,
             net_profit=net_profit,
             profit_percent=profit_pct,
-            days_held=(expiration - match.execution_date).days if match.execution_date else None,
+            days_held=(end_date - match.execution_date).days if match.execution_date and end_date else None,
+            closed_at=datetime.combine(closed_on, time.min) if closed_on else None,
             tracked_at=datetime.utcnow(),
             completed_at=datetime.utcnow(),
         )
@@ -1150,34 +1193,14 @@ class ReconciliationService:
             logger.info(f"Weekly summary already exists for {year}-W{week_number}")
             return existing
         
-        # Get all matches for the week
-        matches = self.db.query(RecommendationExecutionMatch).filter(
-            RecommendationExecutionMatch.year == year,
-            RecommendationExecutionMatch.week_number == week_number
-        ).all()
-        
-        # Get outcomes for these matches
-        match_ids = [m.id for m in matches]
-        outcomes = self.db.query(PositionOutcome).filter(
-            PositionOutcome.match_id.in_(match_ids)
-        ).all() if match_ids else []
-        
-        # Count by match type
-        type_counts = {mt.value: 0 for mt in MatchType}
-        for match in matches:
-            type_counts[match.match_type] = type_counts.get(match.match_type, 0) + 1
-        
-        # Count by recommendation type
-        rec_type_counts = {}
-        for match in matches:
-            if match.recommendation_type:
-                rec_type_counts[match.recommendation_type] = rec_type_counts.get(match.recommendation_type, 0) + 1
-        
-        # Calculate P&L
-        actual_pnl = sum(float(o.net_profit or 0) for o in outcomes)
+        # Read the week's cohort aggregates instead of replaying matches
+        analytics = LearningAnalytics(self.db)
+        analytics.refresh_weeks([(year, week_number)])
+        totals = analytics.week_totals(year, week_number)
+        rec_type_counts = analytics.strategy_counts(year, week_number)
         
         # Detect patterns
-        patterns = self._detect_patterns(matches, outcomes)
+        patterns = self._detect_patterns(totals)
         
         # Generate V4 candidates from patterns
         v4_candidates = self._generate_v4_candidates(patterns)
@@ -1189,19 +1212,19 @@ class ReconciliationService:
             week_start=week_start,
             week_end=week_end,
             
-            total_recommendations=len([m for m in matches if m.recommendation_id]),
-            total_executions=len([m for m in matches if m.execution_id]),
+            total_recommendations=totals['recommendation_count'],
+            total_executions=totals['execution_count'],
             
-            consent_count=type_counts.get('consent', 0),
-            modify_count=type_counts.get('modify', 0),
-            reject_count=type_counts.get('reject', 0),
-            independent_count=type_counts.get('independent', 0),
-            no_action_count=type_counts.get('no_action', 0),
+            consent_count=totals['consent_count'],
+            modify_count=totals['modify_count'],
+            reject_count=totals['reject_count'],
+            independent_count=totals['independent_count'],
+            no_action_count=totals['no_action_count'],
             
             recommendations_by_type=rec_type_counts if rec_type_counts else None,
             
-            actual_pnl=Decimal(str(actual_pnl)),
-            actual_trades=len(outcomes),
+            actual_pnl=Decimal(str(totals['outcome_pnl_sum'])),
+            actual_trades=totals['outcome_count'],
             
             patterns_observed=patterns if patterns else None,
             v4_candidates=v4_candidates if v4_candidates else None,
@@ -1215,77 +1238,55 @@ class ReconciliationService:
         logger.info(f"Generated weekly summary for {year}-W{week_number}")
         return summary
     
-    def _detect_patterns(
-        self,
-        matches: List[RecommendationExecutionMatch],
-        outcomes: List[PositionOutcome]
-    ) -> List[Dict[str, Any]]:
+    def _detect_patterns(self, totals: Dict[str, Any]) -> List[Dict[str, Any]]:
         """
-        Detect patterns in user behavior.
+        Detect patterns in user behavior from a week's cohort aggregate totals.
         
         Looks for:
         - Consistent modifications (DTE, strike, premium threshold)
-        - Symbol preferences
-        - Time-of-day patterns
         - Rejection patterns
         """
         patterns = []
         
+        # Modify matches that carried modification details
+        modified = totals.get('modify_with_details_count', 0)
+        
         # Pattern 1: DTE modifications
-        dte_mods = [
-            m.modification_details.get('expiration_diff_days', 0)
-            for m in matches 
-            if m.match_type == 'modify' and m.modification_details
-        ]
-        
-        if len(dte_mods) >= 3:
-            avg_dte_diff = sum(dte_mods) / len(dte_mods)
+        if modified >= 3:
+            avg_dte_diff = totals.get('dte_diff_sum', 0) / modified
             if abs(avg_dte_diff) > 3:  # Average of 3+ days difference
                 patterns.append({
                     'pattern_id': 'prefer_longer_dte' if avg_dte_diff > 0 else 'prefer_shorter_dte',
                     'description': f'User {"adds" if avg_dte_diff > 0 else "reduces"} {abs(avg_dte_diff):.0f} days on average',
-                    'occurrences': len(dte_mods),
+                    'occurrences': modified,
                     'avg_modification': avg_dte_diff,
-                    'confidence': 'high' if len(dte_mods) >= 5 else 'medium'
+                    'confidence': 'high' if modified >= 5 else 'medium'
                 })
         
         # Pattern 2: Strike modifications
-        strike_mods = [
-            m.modification_details.get('strike_diff', 0)
-            for m in matches
-            if m.match_type == 'modify' and m.modification_details
-        ]
-        
-        if len(strike_mods) >= 3:
-            avg_strike_diff = sum(strike_mods) / len(strike_mods)
+        if modified >= 3:
+            avg_strike_diff = totals.get('strike_diff_sum', 0) / modified
             if abs(avg_strike_diff) > 2:  # $2+ average difference
                 patterns.append({
                     'pattern_id': 'prefer_higher_strike' if avg_strike_diff > 0 else 'prefer_lower_strike',
                     'description': f'User chooses strike ${abs(avg_strike_diff):.0f} {"higher" if avg_strike_diff > 0 else "lower"}',
-                    'occurrences': len(strike_mods),
+                    'occurrences': modified,
                     'avg_modification': avg_strike_diff,
-                    'confidence': 'high' if len(strike_mods) >= 5 else 'medium'
+                    'confidence': 'high' if modified >= 5 else 'medium'
                 })
         
         # Pattern 3: Rejection of low-premium recommendations
-        rejected = [
-            m for m in matches 
-            if m.match_type == 'reject' and m.recommendation_context
-        ]
-        
-        if rejected:
+        rejected = totals.get('reject_with_context_count', 0)
+        premium_count = totals.get('rejected_premium_count', 0)
+        if rejected and premium_count:
             # Check if rejections correlate with low premium
-            rejected_premiums = [
-                m.recommendation_context.get('premium', 0) 
-                for m in rejected 
-                if m.recommendation_context and m.recommendation_context.get('premium')
-            ]
-            if rejected_premiums and sum(rejected_premiums) / len(rejected_premiums) < 0.30:
+            avg_rejected_premium = totals.get('rejected_premium_sum', 0) / premium_count
+            if avg_rejected_premium < 0.30:
                 patterns.append({
                     'pattern_id': 'reject_low_premium',
                     'description': 'User tends to reject low-premium recommendations',
-                    'occurrences': len(rejected),
-                    'avg_rejected_premium': sum(rejected_premiums) / len(rejected_premiums),
+                    'occurrences': rejected,
+                    'avg_rejected_premium': avg_rejected_premium,
                     'confidence': 'medium'
                 })
         
@@ -1386,9 +1387,7 @@ class ReconciliationService:
                 return None
             
             # Get the latest snapshot
-            latest_snapshot = self.db.query(RecommendationSnapshot).filter(
-                RecommendationSnapshot.recommendation_id == v2_rec.id
-            ).order_by(RecommendationSnapshot.snapshot_number.desc()).first()
+            latest_snapshot = get_latest_snapshot(self.db, v2_rec.id)
             
             # Parse execution details
             exec_strike = None
@@ -1431,6 +1430,7 @@ class ReconciliationService:
                 v2_rec.days_active = (datetime.utcnow() - v2_rec.first_detected_at).days
             
             v2_rec.updated_at = datetime.utcnow()
+            sync_latest_snapshot_status(self.db, v2_rec)
             
             self.db.flush()
             
@@ -1473,9 +1473,7 @@ class ReconciliationService:
             
             # Check if this looks like a roll (STO = Sell to Open for new position)
             # or if the recommended action was a roll
-            latest_snapshot = self.db.query(RecommendationSnapshot).filter(
-                RecommendationSnapshot.recommendation_id == old_rec.id
-            ).order_by(RecommendationSnapshot.snapshot_number.desc()).first()
+            latest_snapshot = get_latest_snapshot(self.db, old_rec.id)
             
             was_roll_recommended = False
             if latest_snapshot and latest_snapshot.recommended_action:
@@ -1527,6 +1525,7 @@ class ReconciliationService:
             old_rec.status = 'superseded'
             old_rec.resolution_type = 'rolled_to_new'
             old_rec.resolution_notes = f'Rolled to {exec_strike} {exec_expiration}'
+            sync_latest_snapshot_status(self.db, old_rec)
             
             logger.info(
                 f"[V2_RECONCILE] Created new recommendation {new_rec_id} for rolled position "
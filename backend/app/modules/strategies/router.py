@@ -355,11 +355,11 @@ async def get_buy_borrow_die_actuals(
     Get actual spending and income data for Buy/Borrow/Die tracking.
     
     Uses the SAME database as the Income page for consistency.
-    Income includes: Options, Dividends, Interest from investment_transactions
+    Income includes: Options, Dividends, Interest from income_monthly_rollup
     Plus: Salary and Rental from their respective services
     Spending: Tracked from CASH_MOVEMENT transactions in the database (withdrawals, transfers to spending)
     """
-    from app.modules.income import db_queries as income_db
+    from app.modules.income.income_aggregation import aggregate_income
     from app.modules.income.salary_service import get_salary_service
     from app.modules.income.rental_service import get_rental_service
     
@@ -372,27 +372,21 @@ async def get_buy_borrow_die_actuals(
     # INCOME: Get from database (same source as Income page)
     # =========================================================================
 
-    # Get options income by month from database (all accounts)
-    options_monthly = income_db.get_options_income_monthly(db, year=year)
+    # One grouped query: every income category per account and month
+    income_aggregate = aggregate_income(db, year=year, by_month=True)
 
-    # Get dividend income by month from database (all accounts)
-    dividends_monthly = income_db.get_dividend_income_monthly(db, year=year)
-
-    # Get interest income by month from database (all accounts)
-    interest_monthly = income_db.get_interest_income_monthly(db, year=year)
+    # Options, dividend and interest income by month (all accounts)
+    options_monthly = income_aggregate.monthly('options')
+    dividends_monthly = income_aggregate.monthly('dividends')
+    interest_monthly = income_aggregate.monthly('interest')
 
     # =========================================================================
-    # TAXABLE INCOME: Exclude IRA, Roth IRA, and retirement accounts
+    # TAXABLE INCOME: Exclude IRA, Roth IRA, 401k, HSA and retirement accounts
     # =========================================================================
 
-    # Get taxable options income (excludes IRA, Roth IRA, retirement)
-    taxable_options_monthly = income_db.get_options_income_monthly(db, year=year, taxable_only=True)
-
-    # Get taxable dividend income
-    taxable_dividends_monthly = income_db.get_dividend_income_monthly(db, year=year, taxable_only=True)
-
-    # Get taxable interest income
-    taxable_interest_monthly = income_db.get_interest_income_monthly(db, year=year, taxable_only=True)
+    taxable_options_monthly = income_aggregate.monthly('options', taxable_only=True)
+    taxable_dividends_monthly = income_aggregate.monthly('dividends', taxable_only=True)
+    taxable_interest_monthly = income_aggregate.monthly('interest', taxable_only=True)
     
     # Get salary income from SalaryService (same as Income page)
     # Use get_salary_by_year() for simpler data access
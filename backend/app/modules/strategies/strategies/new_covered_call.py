@@ -32,6 +32,10 @@ from app.modules.strategies.recommendation_models import (
     RecommendationSnapshot,
     generate_recommendation_id
 )
+from app.modules.strategies.recommendation_projection import (
+    get_latest_snapshot,
+    record_latest_snapshot
+)
 
 logger = logging.getLogger(__name__)
 
@@ -416,9 +420,7 @@ class NewCoveredCallStrategy(BaseStrategy):
                 self.db.flush()  # Get the ID
             
             # Get previous snapshot to track changes
-            prev_snapshot = self.db.query(RecommendationSnapshot).filter(
-                RecommendationSnapshot.recommendation_id == recommendation.id
-            ).order_by(RecommendationSnapshot.snapshot_number.desc()).first()
+            prev_snapshot = get_latest_snapshot(self.db, recommendation.id)
             
             snapshot_number = (prev_snapshot.snapshot_number + 1) if prev_snapshot else 1
             
@@ -472,6 +474,8 @@ class NewCoveredCallStrategy(BaseStrategy):
             recommendation.total_snapshots = snapshot_number
             recommendation.last_snapshot_at = now
             
+            record_latest_snapshot(self.db, recommendation, snapshot)
+            
             self.db.commit()
             
             logger.info(
@@ -26,6 +26,7 @@ from app.modules.strategies.recommendation_models import (
     RecommendationSnapshot,
     generate_recommendation_id
 )
+from app.modules.strategies.recommendation_projection import get_latest_snapshot_pairs
 from app.core.timezone import format_datetime_for_api, now_utc_iso
 
 logger = logging.getLogger(__name__)
@@ -86,22 +87,14 @@ class V2NotificationService:
         }
         
         # Get all active recommendations with their latest snapshots
-        active_recs = self.db.query(PositionRecommendation).filter(
-            PositionRecommendation.status == 'active'
-        ).all()
-        
-        for rec in active_recs:
-            # Get the latest snapshot
-            latest_snapshot = self.db.query(RecommendationSnapshot).filter(
-                RecommendationSnapshot.recommendation_id == rec.id
-            ).order_by(desc(RecommendationSnapshot.snapshot_number)).first()
-            
-            if not latest_snapshot:
-                continue
-            
-            # Skip if action is NO_ACTION or HOLD
-            if latest_snapshot.recommended_action in ('NO_ACTION', 'HOLD', 'no_action', 'hold'):
-                continue
+        # (one indexed scan over the latest-snapshot projection)
+        active_pairs = get_latest_snapshot_pairs(
+            self.db,
+            status='active',
+            exclude_actions=('NO_ACTION', 'HOLD', 'no_action', 'hold')
+        )
+        
+        for rec, latest_snapshot in active_pairs:
             
             # Build notification item
             notif_item = self._build_notification_item(rec, latest_snapshot)
@@ -11,6 +11,8 @@ from datetime import date, datetime
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, extract, func
 
+from app.modules.tax.harvest_scanner import load_open_lots, summarize_unrealized, value_lots
+from app.modules.tax.lot_engine import LadderLot, LotLadder
 from app.modules.tax.models import StockLot, StockLotSale
 
 
@@ -154,73 +156,34 @@ class CostBasisService:
         """
         # Get available lots
         lots = self.get_open_lots(symbol=symbol, source=source, account_id=account_id)
-
-        if lot_method == "LIFO":
-            lots = sorted(lots, key=lambda x: x.purchase_date, reverse=True)
-
-        if not lots:
-            raise ValueError(f"No open lots available for {symbol}")
-
-        # Calculate proceeds per share
-        proceeds_per_share = proceeds / quantity_sold if quantity_sold > 0 else Decimal(0)
-
-        # Match sale to lots
-        remaining_to_sell = quantity_sold
-        sales = []
-        tax_year = sale_date.year
-
-        for lot in lots:
-            if remaining_to_sell <= 0:
-                break
-
-            # Determine how much to sell from this lot
-            quantity_from_lot = min(remaining_to_sell, lot.quantity_remaining)
-
-            # Calculate cost basis for this portion
-            cost_basis_portion = lot.cost_per_share * quantity_from_lot
-            proceeds_portion = proceeds_per_share * quantity_from_lot
-
-            # Calculate gain/loss
-            gain_loss = proceeds_portion - cost_basis_portion
-
-            # Calculate holding period
-            holding_period_days = (sale_date - lot.purchase_date).days
-            is_long_term = holding_period_days > 365
-
-            # Create sale record
-            sale = StockLotSale(
+        lots_by_id = {lot.lot_id: lot for lot in lots}
+
+        # Same matching rules as the sync's lot engine
+        ladder = LotLadder(
+            LadderLot(
+                purchase_date=lot.purchase_date,
+                quantity=Decimal(str(lot.quantity)),
+                cost_basis=Decimal(str(lot.cost_basis)),
+                quantity_remaining=Decimal(str(lot.quantity_remaining)),
                 lot_id=lot.lot_id,
-                sale_date=sale_date,
-                sale_transaction_id=sale_transaction_id,
-                quantity_sold=quantity_from_lot,
-                proceeds=proceeds_portion,
-                proceeds_per_share=proceeds_per_share,
-                cost_basis=cost_basis_portion,
-                gain_loss=gain_loss,
-                holding_period_days=holding_period_days,
-                is_long_term=is_long_term,
-                tax_year=tax_year,
-                wash_sale=False,  # TODO: Implement wash sale detection
-                notes=notes
             )
+            for lot in lots
+        )
+        matches = ladder.sell(
+            symbol, sale_date, quantity_sold, proceeds,
+            sale_transaction_id=sale_transaction_id, lot_method=lot_method,
+        )
 
+        sales = []
+        for match in matches:
+            sale = StockLotSale(**match.values(), notes=notes)
             self.db.add(sale)
             sales.append(sale)
 
             # Update lot
-            lot.quantity_remaining -= quantity_from_lot
-            if lot.quantity_remaining == 0:
-                lot.status = 'closed'
-            elif lot.quantity_remaining < lot.quantity:
-                lot.status = 'partial'
-
-            remaining_to_sell -= quantity_from_lot
-
-        if remaining_to_sell > 0:
-            raise ValueError(
-                f"Insufficient shares to sell. Needed {quantity_sold}, "
-                f"but only {quantity_sold - remaining_to_sell} available in lots."
-            )
+            lot = lots_by_id[match.lot.lot_id]
+            lot.quantity_remaining = match.lot.quantity_remaining
+            lot.status = match.lot.status
 
         self.db.commit()
 
@@ -261,12 +224,19 @@ class CostBasisService:
         """
         Get capital gains summary for a tax year.
 
+        Wash-sale disallowed losses (see wash_sales.py) are added back, so
+        gains are what is reportable for the year; replacement lots already
+        carry the disallowed amount in their sales' cost basis.
+
         Returns dict with:
         - total_short_term_gain
         - total_long_term_gain
         - total_gain
         - total_proceeds
         - total_cost_basis
+        - total_wash_sale_disallowed
+        - short_term_wash_adjusted_gain / long_term_wash_adjusted_gain
+          (gains of sales with a wash-sale adjustment, for Form 8949 / Schedule D)
         - num_transactions
         - by_symbol breakdown
         """
@@ -276,6 +246,8 @@ class CostBasisService:
         long_term_gain = Decimal(0)
         total_proceeds = Decimal(0)
         total_cost_basis = Decimal(0)
+        wash_sale_disallowed = Decimal(0)
+        wash_adjusted = {True: Decimal(0), False: Decimal(0)}
 
         by_symbol = {}
 
@@ -283,10 +255,15 @@ class CostBasisService:
             lot = self.db.query(StockLot).filter(StockLot.lot_id == sale.lot_id).first()
             symbol = lot.symbol if lot else "UNKNOWN"
 
+            disallowed = Decimal(str(sale.wash_sale_disallowed or 0))
+            gain = Decimal(str(sale.gain_loss)) + disallowed
             if sale.is_long_term:
-                long_term_gain += Decimal(str(sale.gain_loss))
+                long_term_gain += gain
             else:
-                short_term_gain += Decimal(str(sale.gain_loss))
+                short_term_gain += gain
+            if disallowed:
+                wash_sale_disallowed += disallowed
+                wash_adjusted[bool(sale.is_long_term)] += gain
 
             total_proceeds += Decimal(str(sale.proceeds))
             total_cost_basis += Decimal(str(sale.cost_basis))
@@ -299,17 +276,19 @@ class CostBasisService:
                     "total_gain": Decimal(0),
                     "proceeds": Decimal(0),
                     "cost_basis": Decimal(0),
+                    "wash_sale_disallowed": Decimal(0),
                     "num_sales": 0
                 }
 
             if sale.is_long_term:
-                by_symbol[symbol]["long_term_gain"] += Decimal(str(sale.gain_loss))
+                by_symbol[symbol]["long_term_gain"] += gain
             else:
-                by_symbol[symbol]["short_term_gain"] += Decimal(str(sale.gain_loss))
+                by_symbol[symbol]["short_term_gain"] += gain
 
-            by_symbol[symbol]["total_gain"] += Decimal(str(sale.gain_loss))
+            by_symbol[symbol]["total_gain"] += gain
             by_symbol[symbol]["proceeds"] += Decimal(str(sale.proceeds))
             by_symbol[symbol]["cost_basis"] += Decimal(str(sale.cost_basis))
+            by_symbol[symbol]["wash_sale_disallowed"] += disallowed
             by_symbol[symbol]["num_sales"] += 1
 
         return {
@@ -319,6 +298,9 @@ class CostBasisService:
             "total_gain": float(short_term_gain + long_term_gain),
             "total_proceeds": float(total_proceeds),
             "total_cost_basis": float(total_cost_basis),
+            "total_wash_sale_disallowed": float(wash_sale_disallowed),
+            "short_term_wash_adjusted_gain": float(wash_adjusted[False]),
+            "long_term_wash_adjusted_gain": float(wash_adjusted[True]),
             "num_transactions": len(sales),
             "by_symbol": {
                 symbol: {
@@ -327,6 +309,7 @@ class CostBasisService:
                     "total_gain": float(data["total_gain"]),
                     "proceeds": float(data["proceeds"]),
                     "cost_basis": float(data["cost_basis"]),
+                    "wash_sale_disallowed": float(data["wash_sale_disallowed"]),
                     "num_sales": data["num_sales"]
                 }
                 for symbol, data in by_symbol.items()
@@ -348,63 +331,14 @@ class CostBasisService:
             symbol: Filter by symbol
 
         Returns:
-            Dict with unrealized gain/loss information
+            Dict with unrealized gain/loss information (basis includes
+            wash-sale adjustments; see harvest_scanner.py)
         """
-        lots = self.get_open_lots(symbol=symbol)
-
-        total_unrealized = Decimal(0)
-        total_market_value = Decimal(0)
-        total_cost_basis = Decimal(0)
-
-        by_symbol = {}
-
-        for lot in lots:
-            if lot.quantity_remaining <= 0:
-                continue
-
-            current_price = current_prices.get(lot.symbol, Decimal(0))
-            market_value = current_price * lot.quantity_remaining
-            cost_basis = lot.cost_per_share * lot.quantity_remaining
-            unrealized_gain = market_value - cost_basis
-
-            total_unrealized += unrealized_gain
-            total_market_value += market_value
-            total_cost_basis += cost_basis
-
-            if lot.symbol not in by_symbol:
-                by_symbol[lot.symbol] = {
-                    "quantity": Decimal(0),
-                    "cost_basis": Decimal(0),
-                    "market_value": Decimal(0),
-                    "unrealized_gain": Decimal(0),
-                    "num_lots": 0
-                }
-
-            by_symbol[lot.symbol]["quantity"] += lot.quantity_remaining
-            by_symbol[lot.symbol]["cost_basis"] += cost_basis
-            by_symbol[lot.symbol]["market_value"] += market_value
-            by_symbol[lot.symbol]["unrealized_gain"] += unrealized_gain
-            by_symbol[lot.symbol]["num_lots"] += 1
-
-        return {
-            "total_unrealized_gain": float(total_unrealized),
-            "total_market_value": float(total_market_value),
-            "total_cost_basis": float(total_cost_basis),
-            "by_symbol": {
-                symbol: {
-                    "quantity": float(data["quantity"]),
-                    "cost_basis": float(data["cost_basis"]),
-                    "market_value": float(data["market_value"]),
-                    "unrealized_gain": float(data["unrealized_gain"]),
-                    "unrealized_gain_pct": float(
-                        (data["unrealized_gain"] / data["cost_basis"] * 100)
-                        if data["cost_basis"] > 0 else 0
-                    ),
-                    "num_lots": data["num_lots"]
-                }
-                for symbol, data in by_symbol.items()
-            }
-        }
+        lots = load_open_lots(self.db, symbol=symbol)
+        # Symbols without a price are valued at 0
+        prices = {lot_symbol: float(current_prices.get(lot_symbol, 0)) for lot_symbol in set(lots.symbol.tolist())}
+        valuation = value_lots(lots, prices, date.today())
+        return summarize_unrealized(lots, valuation)
 
     # ===== Import/Export =====
 
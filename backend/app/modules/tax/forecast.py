@@ -23,10 +23,12 @@ from datetime import date
 import json
 
 from app.modules.tax.models import IncomeTaxReturn, EstimatedTaxPayment
+from app.modules.tax.forecast_cache import forecast_cache
 from app.modules.income.models import W2Record, RetirementContribution
 from app.modules.income import db_queries
+from app.modules.income.income_aggregation import IncomeAggregate, aggregate_income
 from app.modules.income.salary_service import get_salary_service
-from app.modules.income.rental_service import get_rental_service
+from app.modules.income.rental_service import RentalIncomeService
 from app.modules.investments.models import InvestmentTransaction, InvestmentAccount
 
 
@@ -56,6 +58,31 @@ QUARTERLY_PAYMENT_SCHEDULE = {
     ],
 }
 
+# Underpayment interest rates for 2025 (annual); California uses similar rates
+FEDERAL_PENALTY_RATE = 0.07
+CA_PENALTY_RATE = 0.07
+
+# Required cumulative payments by quarter (25%, 50%, 75%, 100%)
+REQUIRED_QUARTERLY_PERCENTAGES = [0.25, 0.50, 0.75, 1.00]
+
+# No underpayment penalty when the balance due is below these
+FEDERAL_PENALTY_MIN_BALANCE = 1000
+CA_PENALTY_MIN_BALANCE = 500
+
+# Months of the year W-2 withholding is spread over
+W2_MONTHS = 10
+
+# Net capital loss deductible per year ($3,000 for MFJ, $1,500 for MFS)
+CAPITAL_LOSS_LIMIT = 3000
+
+# NIIT: 3.8% on investment income above $250,000 (MFJ). Source: IRS Topic 559
+NIIT_THRESHOLD = 250000
+NIIT_RATE = 0.038
+
+# California Mental Health Services Tax: additional 1% on income over $1M
+CA_MENTAL_HEALTH_THRESHOLD = 1000000
+CA_MENTAL_HEALTH_RATE = 0.01
+
 
 def _calculate_underpayment_penalty(
     payment_schedule: List[Dict[str, Any]],
@@ -75,12 +102,7 @@ def _calculate_underpayment_penalty(
     - Penalty is calculated on underpayment from due date to payment date
     - Interest rate: 7% annually for federal (2025), similar for CA
     """
-    # Interest rates for 2025 (annual)
-    FEDERAL_RATE = 0.07  # 7% for 2025
-    CA_RATE = 0.07  # California uses similar rates
-
-    # Required cumulative payments by quarter (25%, 50%, 75%, 100%)
-    quarterly_percentages = [0.25, 0.50, 0.75, 1.00]
+    quarterly_percentages = REQUIRED_QUARTERLY_PERCENTAGES
 
     federal_quarters = []
     state_quarters = []
@@ -118,8 +140,8 @@ def _calculate_underpayment_penalty(
             penalty_days = (april_15_next - due_date).days
 
         # Calculate penalty (simple interest for this period)
-        fed_penalty = fed_underpayment * (FEDERAL_RATE * penalty_days / 365)
-        state_penalty = state_underpayment * (CA_RATE * penalty_days / 365)
+        fed_penalty = fed_underpayment * (FEDERAL_PENALTY_RATE * penalty_days / 365)
+        state_penalty = state_underpayment * (CA_PENALTY_RATE * penalty_days / 365)
 
         total_federal_penalty += fed_penalty
         total_state_penalty += state_penalty
@@ -154,8 +176,8 @@ def _calculate_underpayment_penalty(
     federal_balance_due = max(0, current_federal_tax - total_fed_paid)
     state_balance_due = max(0, current_state_tax - total_state_paid)
 
-    federal_penalty_waived = federal_safe_harbor_met or federal_balance_due < 1000
-    state_penalty_waived = state_safe_harbor_met or state_balance_due < 500  # CA threshold is $500
+    federal_penalty_waived = federal_safe_harbor_met or federal_balance_due < FEDERAL_PENALTY_MIN_BALANCE
+    state_penalty_waived = state_safe_harbor_met or state_balance_due < CA_PENALTY_MIN_BALANCE
 
     return {
         "federal": {
@@ -168,7 +190,7 @@ def _calculate_underpayment_penalty(
             "penalty_waived": federal_penalty_waived,
             "estimated_penalty": round(total_federal_penalty, 2) if not federal_penalty_waived else 0,
             "quarters": federal_quarters,
-            "interest_rate": f"{FEDERAL_RATE * 100:.0f}%"
+            "interest_rate": f"{FEDERAL_PENALTY_RATE * 100:.0f}%"
         },
         "state": {
             "safe_harbor": round(state_safe_harbor, 2),
@@ -180,7 +202,7 @@ def _calculate_underpayment_penalty(
             "penalty_waived": state_penalty_waived,
             "estimated_penalty": round(total_state_penalty, 2) if not state_penalty_waived else 0,
             "quarters": state_quarters,
-            "interest_rate": f"{CA_RATE * 100:.0f}%"
+            "interest_rate": f"{CA_PENALTY_RATE * 100:.0f}%"
         },
         "total_estimated_penalty": round(
             (total_federal_penalty if not federal_penalty_waived else 0) +
@@ -232,6 +254,28 @@ def _get_estimated_payments(db: Session, year: int) -> Dict[str, Any]:
     }
 
 
+def _payment_schedule(year: int) -> List[Dict[str, Any]]:
+    """Quarterly due dates for a tax year (2026 is the template for years not listed)."""
+    # Get payment schedule for this year (or use 2026 as template for future years)
+    schedule_year = year if year in QUARTERLY_PAYMENT_SCHEDULE else 2026
+    schedule = QUARTERLY_PAYMENT_SCHEDULE[schedule_year]
+    
+    # Adjust due dates for the actual tax year if using template
+    if year not in QUARTERLY_PAYMENT_SCHEDULE:
+        schedule = []
+        template = QUARTERLY_PAYMENT_SCHEDULE[2026]
+        for q in template:
+            new_q = q.copy()
+            # Adjust year offsets
+            year_offset = year - 2026
+            due_year = q["due_date"].year + year_offset
+            new_q["due_date"] = date(due_year, q["due_date"].month, q["due_date"].day)
+            new_q["period"] = q["period"].replace("2026", str(year)).replace("2027", str(year + 1))
+            schedule.append(new_q)
+
+    return schedule
+
+
 def _calculate_quarterly_payments(
     total_tax: float,
     federal_tax: float,
@@ -241,7 +285,7 @@ def _calculate_quarterly_payments(
     state_withheld: float,
     income_by_month: Dict[int, float],
     year: int,
-    w2_months: int = 10,  # Number of months W2 income was earned (for withholding distribution)
+    w2_months: int = W2_MONTHS,  # Number of months W2 income was earned (for withholding distribution)
     estimated_payments: Optional[Dict[str, Any]] = None  # Estimated payments already made
 ) -> List[Dict[str, Any]]:
     """
@@ -269,22 +313,7 @@ def _calculate_quarterly_payments(
     Returns:
         List of quarterly payment details with due dates and amounts (federal + state)
     """
-    # Get payment schedule for this year (or use 2026 as template for future years)
-    schedule_year = year if year in QUARTERLY_PAYMENT_SCHEDULE else 2026
-    schedule = QUARTERLY_PAYMENT_SCHEDULE[schedule_year]
-    
-    # Adjust due dates for the actual tax year if using template
-    if year not in QUARTERLY_PAYMENT_SCHEDULE:
-        schedule = []
-        template = QUARTERLY_PAYMENT_SCHEDULE[2026]
-        for q in template:
-            new_q = q.copy()
-            # Adjust year offsets
-            year_offset = year - 2026
-            due_year = q["due_date"].year + year_offset
-            new_q["due_date"] = date(due_year, q["due_date"].month, q["due_date"].day)
-            new_q["period"] = q["period"].replace("2026", str(year)).replace("2027", str(year + 1))
-            schedule.append(new_q)
+    schedule = _payment_schedule(year)
     
     # Calculate total annual income
     total_annual_income = sum(income_by_month.values()) if income_by_month else 0
@@ -449,6 +478,10 @@ def calculate_tax_forecast(
     """
     Calculate tax forecast for a given year based on historical data and projected income.
     
+    Results are cached until one of the source tables changes (see
+    forecast_cache.py), so the tax page, the forms and the PDF exports
+    share one computation.
+    
     Args:
         db: Database session
         forecast_year: Year to forecast (default: 2025)
@@ -457,6 +490,14 @@ def calculate_tax_forecast(
     Returns:
         Dictionary with forecasted tax data in the same format as IncomeTaxReturn
     """
+    return forecast_cache.get_or_compute(
+        db, forecast_year, base_year,
+        lambda: _compute_tax_forecast(db, forecast_year, base_year),
+    )
+
+
+def _compute_tax_forecast(db: Session, forecast_year: int, base_year: int) -> Dict[str, Any]:
+    """Compute the forecast from a fresh pass over the source tables."""
     # Get base year tax return for deductions and filing status
     base_return = db.query(IncomeTaxReturn).filter(
         IncomeTaxReturn.tax_year == base_year
@@ -659,21 +700,25 @@ def _get_forecast_income(db: Session, year: int) -> Dict[str, Any]:
     
     # Get TAXABLE investment income only (excludes IRA, Roth IRA, 401k, HSA)
     # Income in retirement accounts is tax-deferred or tax-free
-    taxable_income_summary = db_queries.get_taxable_income_summary(db, year=year)
+    # One grouped query covers the totals and the per-account breakdowns
+    income_aggregate = aggregate_income(db, year=year)
+    taxable_income_summary = db_queries.get_taxable_income_summary(db, year=year, aggregate=income_aggregate)
     income["options_income"] = taxable_income_summary.get("options_income", 0)
     income["dividend_income"] = taxable_income_summary.get("dividend_income", 0)
     income["interest_income"] = taxable_income_summary.get("interest_income", 0)
     
     # Get account-level breakdowns for taxable income
-    income["options_by_account"] = _get_taxable_income_by_account(db, year, "options")
-    income["dividends_by_account"] = _get_taxable_income_by_account(db, year, "dividends")
-    income["interest_by_account"] = _get_taxable_income_by_account(db, year, "interest")
+    income["options_by_account"] = _get_taxable_income_by_account(income_aggregate, "options")
+    income["dividends_by_account"] = _get_taxable_income_by_account(income_aggregate, "dividends")
+    income["interest_by_account"] = _get_taxable_income_by_account(income_aggregate, "interest")
     
     # Get monthly income breakdown for quarterly payment calculations
     income["monthly_income"] = _get_monthly_income_breakdown(db, year, income)
     
-    # Get rental income for the forecast year
-    rental_service = get_rental_service()
+    # Get rental income for the forecast year. Always a fresh read: the cached
+    # forecast is keyed on the rental tables' watermarks, so it must not come
+    # from a service instance that predates them
+    rental_service = RentalIncomeService()
     rental_summary = rental_service.get_rental_summary()
     
     # Filter rental data for the forecast year
@@ -765,7 +810,6 @@ def _calculate_agi(income: Dict[str, Any]) -> float:
     
     # Apply the $3,000 capital loss limitation (for MFJ)
     # If net is negative (loss), limit deduction to $3,000
-    CAPITAL_LOSS_LIMIT = 3000  # $3,000 for MFJ, $1,500 for MFS
     if net_capital_gain < 0:
         # Can only deduct up to the limit
         applicable_loss = max(net_capital_gain, -CAPITAL_LOSS_LIMIT)
@@ -785,21 +829,24 @@ def _calculate_agi(income: Dict[str, Any]) -> float:
     return agi
 
 
-def _calculate_taxable_income(
-    agi: float,
-    deductions: Dict[str, Any],
-    year: int
-) -> float:
-    """Calculate taxable income after deductions."""
-    # Standard deduction amounts (Married Filing Jointly)
+def _standard_deduction(year: int) -> float:
+    """Standard deduction (Married Filing Jointly)."""
     # Source: One Big Beautiful Bill Act (OBBBA), signed July 4, 2025
     standard_deductions = {
         2025: 31500,  # Official IRS amount for 2025 (OBBBA)
         2024: 29200,
         2023: 27700,
     }
+    return standard_deductions.get(year, 31500)
+
 
-    standard_deduction = standard_deductions.get(year, 31500)
+def _calculate_taxable_income(
+    agi: float,
+    deductions: Dict[str, Any],
+    year: int
+) -> float:
+    """Calculate taxable income after deductions."""
+    standard_deduction = _standard_deduction(year)
     itemized_total = deductions.get("itemized_total", 0)
 
     # Use the larger of standard or itemized
@@ -819,6 +866,11 @@ def _calculate_federal_tax(
     Updated for 2025 with TCJA provisions made permanent.
     Source: IRS Revenue Procedure 2024-40, Tax Foundation
     """
+    return _bracket_tax(taxable_income, _federal_brackets(filing_status, year))
+
+
+def _federal_brackets(filing_status: str, year: int) -> List[tuple]:
+    """(bracket start, rate) pairs for the federal income tax."""
     # 2025 Official Tax Brackets (Married Filing Jointly)
     # Source: https://taxfoundation.org/data/all/federal/2025-tax-brackets/
     if year >= 2025:
@@ -876,6 +928,11 @@ def _calculate_federal_tax(
                 (609350, 0.37),
             ]
 
+    return brackets
+
+
+def _bracket_tax(taxable_income: float, brackets: List[tuple]) -> float:
+    """Tax on taxable_income under (bracket start, rate) pairs."""
     tax = 0.0
     remaining_income = taxable_income
 
@@ -908,6 +965,18 @@ def _calculate_ca_state_tax(
     2025 brackets are slightly adjusted for inflation from 2024.
     Source: California Franchise Tax Board (FTB)
     """
+    tax = _bracket_tax(taxable_income, _ca_brackets(filing_status, year))
+
+    # Mental Health Services Tax: Additional 1% on income over $1M
+    if taxable_income > CA_MENTAL_HEALTH_THRESHOLD:
+        mental_health_tax = (taxable_income - CA_MENTAL_HEALTH_THRESHOLD) * CA_MENTAL_HEALTH_RATE
+        tax += mental_health_tax
+
+    return tax
+
+
+def _ca_brackets(filing_status: str, year: int) -> List[tuple]:
+    """(bracket start, rate) pairs for the California income tax."""
     # 2025 California Tax Brackets (Married Filing Jointly)
     # Note: California adjusts brackets annually for inflation
     # Using 2024 brackets with ~2.8% inflation adjustment for 2025
@@ -963,27 +1032,7 @@ def _calculate_ca_state_tax(
                 (613712, 0.123),
             ]
 
-    tax = 0.0
-    remaining_income = taxable_income
-
-    for i in range(len(brackets)):
-        bracket_start, rate = brackets[i]
-        bracket_end = brackets[i + 1][0] if i + 1 < len(brackets) else float('inf')
-
-        if remaining_income <= 0:
-            break
-
-        if taxable_income > bracket_start:
-            bracket_income = min(remaining_income, bracket_end - bracket_start)
-            tax += bracket_income * rate
-            remaining_income -= bracket_income
-
-    # Mental Health Services Tax: Additional 1% on income over $1M
-    if taxable_income > 1000000:
-        mental_health_tax = (taxable_income - 1000000) * 0.01
-        tax += mental_health_tax
-
-    return tax
+    return brackets
 
 
 def _calculate_other_taxes(
@@ -1013,7 +1062,7 @@ def _calculate_other_taxes(
     # NIIT (Net Investment Income Tax) - 3.8% on investment income above threshold
     # Threshold: $250,000 for MFJ, $200,000 for Single
     # Source: IRS Topic 559
-    niit_threshold = 250000  # MFJ default
+    niit_threshold = NIIT_THRESHOLD  # MFJ default
     
     # NIIT applies to ALL net investment income including capital gains
     cap_gains = income.get("capital_gains", {})
@@ -1032,7 +1081,7 @@ def _calculate_other_taxes(
     
     if agi > niit_threshold and investment_income > 0:
         niit_base = min(investment_income, agi - niit_threshold)
-        niit = niit_base * 0.038
+        niit = niit_base * NIIT_RATE
         other_tax += niit
     
     return other_tax
@@ -1124,10 +1173,10 @@ def _build_forecast_details(
     )
     
     agi = _calculate_agi(income)
-    niit_threshold = 250000
+    niit_threshold = NIIT_THRESHOLD
     if agi > niit_threshold and investment_income > 0:
         niit_base = min(investment_income, agi - niit_threshold)
-        niit = niit_base * 0.038
+        niit = niit_base * NIIT_RATE
         details["additional_taxes"]["niit"] = niit
         details["additional_taxes"]["niit_base"] = niit_base
         details["additional_taxes"]["investment_income_total"] = investment_income
@@ -1142,7 +1191,10 @@ def _build_forecast_details(
         details["capital_gains"] = {
             "short_term": cap_gains.get("net_short_term", 0),
             "long_term": cap_gains.get("net_long_term", 0),
-            "total": cap_gains.get("net_short_term", 0) + cap_gains.get("net_long_term", 0)
+            "total": cap_gains.get("net_short_term", 0) + cap_gains.get("net_long_term", 0),
+            "wash_sale_disallowed": cap_gains.get("wash_sale_disallowed", 0),
+            "short_term_wash_adjusted": cap_gains.get("short_term_wash_adjusted", 0),
+            "long_term_wash_adjusted": cap_gains.get("long_term_wash_adjusted", 0),
         }
         # Add to income sources
         net_stock_sale_income = cap_gains.get("net_short_term", 0) + cap_gains.get("net_long_term", 0)
@@ -1186,8 +1238,11 @@ def _calculate_capital_gains(db: Session, year: int) -> Dict[str, float]:
                 "total_proceeds": summary.get("total_proceeds", 0),
                 "total_cost_basis": summary.get("total_cost_basis", 0),
                 "num_transactions": summary.get("num_transactions", 0),
+                "wash_sale_disallowed": summary.get("total_wash_sale_disallowed", 0),
+                "short_term_wash_adjusted": summary.get("short_term_wash_adjusted_gain", 0),
+                "long_term_wash_adjusted": summary.get("long_term_wash_adjusted_gain", 0),
                 "taxable_accounts_only": True,
-                "note": "Actual cost basis data"
+                "note": "Actual cost basis data (wash-sale adjusted)"
             }
     except Exception:
         # Cost basis tracking not available or failed - rollback and fall back to estimation
@@ -1362,57 +1417,31 @@ def _get_monthly_income_breakdown(
 
 
 def _get_taxable_income_by_account(
-    db: Session, 
-    year: int, 
+    aggregate: IncomeAggregate,
     income_type: str
 ) -> list:
     """
     Get income breakdown by taxable account for a specific income type.
     
     Args:
-        db: Database session
-        year: Tax year
+        aggregate: Grouped income for the tax year (aggregate_income)
         income_type: 'options', 'dividends', or 'interest'
     
     Returns:
         List of {account_name, account_id, source, amount} for taxable accounts only
     """
-    # Non-taxable account types to exclude
-    non_taxable_types = ['ira', 'roth_ira', 'traditional_ira', '401k', 'hsa', 'retirement']
-    
-    # Get all active accounts with their data
-    accounts = db.query(InvestmentAccount).filter(
-        InvestmentAccount.is_active == 'Y'
-    ).all()
+    if income_type not in ("options", "dividends", "interest"):
+        return []
     
     result = []
-    for account in accounts:
-        account_type = (account.account_type or "").lower()
-        
-        # Skip non-taxable accounts
-        if account_type in non_taxable_types:
-            continue
-        
-        # Get income for this specific account
-        if income_type == "options":
-            summary = db_queries.get_options_income_summary(db, year=year, account_id=account.account_id)
-        elif income_type == "dividends":
-            summary = db_queries.get_dividend_income_summary(db, year=year, account_id=account.account_id)
-        elif income_type == "interest":
-            summary = db_queries.get_interest_income_summary(db, year=year, account_id=account.account_id)
-        else:
-            continue
-        
-        total = summary.get("total_income", 0)
+    for account in aggregate.by_account(taxable_only=True, active_only=True):
+        total = account.amount(income_type)
         if total > 0:
-            # Derive owner from account_name
-            owner = account.account_name.split("'")[0] if account.account_name and "'" in account.account_name else 'Unknown'
-            
             result.append({
                 "account_name": account.account_name,
                 "account_id": account.account_id,
                 "source": account.source,
-                "owner": owner,
+                "owner": account.owner,
                 "amount": round(total, 2)
             })
     
@@ -0,0 +1,126 @@
+"""
+Tax forecast cache keyed by (year, input fingerprint).
+
+calculate_tax_forecast() reads W-2s, investment income, lots and sales,
+rental data, retirement contributions and estimated payments in a fresh
+pass on every call. /tax/returns runs it for every forecast year and
+generate_tax_forms() runs it again for the forms and each PDF download.
+
+The fingerprint is one round trip of per-table watermarks over the tables
+the forecast reads (app/core/watermarks.py): row count (catches deletes),
+max(id) (inserts) and max(updated_at) (edits). Together with the forecast/base year and today's
+date (the payment schedule marks quarters past due), a cached result stays
+valid until relevant data changes - no ingestion path has to remember to
+invalidate it.
+"""
+
+import copy
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.watermarks import source_watermarks
+from app.modules.income.models import (
+    IncomeMonthlyRollup,
+    RentalAnnualSummary,
+    RentalExpense,
+    RentalMonthlyIncome,
+    RentalProperty,
+    RetirementContribution,
+    W2Record,
+)
+from app.modules.investments.models import InvestmentAccount, InvestmentTransaction
+from app.modules.tax.models import EstimatedTaxPayment, IncomeTaxReturn, StockLot, StockLotSale
+
+logger = logging.getLogger(__name__)
+
+
+# (model, id column, updated_at column) for every table the forecast reads
+FORECAST_SOURCES = (
+    (IncomeTaxReturn, IncomeTaxReturn.id, IncomeTaxReturn.updated_at),
+    (EstimatedTaxPayment, EstimatedTaxPayment.id, EstimatedTaxPayment.updated_at),
+    (W2Record, W2Record.id, W2Record.updated_at),
+    (RetirementContribution, RetirementContribution.id, RetirementContribution.updated_at),
+    (InvestmentAccount, InvestmentAccount.id, InvestmentAccount.updated_at),
+    (InvestmentTransaction, InvestmentTransaction.id, InvestmentTransaction.updated_at),
+    (IncomeMonthlyRollup, IncomeMonthlyRollup.id, IncomeMonthlyRollup.updated_at),
+    (StockLot, StockLot.lot_id, StockLot.updated_at),
+    (StockLotSale, StockLotSale.sale_id, StockLotSale.updated_at),
+    (RentalProperty, RentalProperty.id, RentalProperty.updated_at),
+    (RentalAnnualSummary, RentalAnnualSummary.id, RentalAnnualSummary.updated_at),
+    (RentalMonthlyIncome, RentalMonthlyIncome.id, RentalMonthlyIncome.updated_at),
+    (RentalExpense, RentalExpense.id, RentalExpense.updated_at),
+)
+
+# Forecasts kept (a few years x base years is all the app asks for)
+MAX_ENTRIES = 16
+
+
+def input_fingerprint(db: Session, as_of: Optional[date] = None) -> str:
+    """Hash of the source watermarks and the date the forecast is computed on."""
+    watermarks = source_watermarks(db, FORECAST_SOURCES)
+    parts = [(as_of or date.today()).isoformat()]
+    parts.extend(f"{table}={watermarks[table]!r}" for table in sorted(watermarks))
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+class ForecastCache:
+    """Bounded, thread-safe map of (forecast_year, base_year, fingerprint) -> forecast."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[int, int, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(
+        self,
+        db: Session,
+        forecast_year: int,
+        base_year: int,
+        compute: Callable[[], Dict[str, Any]],
+    ) -> Dict[str, Any]:
+        """
+        The cached forecast for the current inputs, computing it on a miss.
+
+        Callers get a copy, so mutating a result never changes the cache.
+        Failures (e.g. a missing base-year return) are not cached.
+        """
+        key = (forecast_year, base_year, input_fingerprint(db))
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(cached)
+            self.misses += 1
+
+        result = compute()
+
+        with self._lock:
+            # Older fingerprints of the same years can never match again
+            for stale in [k for k in self._entries if k[:2] == key[:2] and k != key]:
+                del self._entries[stale]
+            self._entries[key] = copy.deepcopy(result)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        logger.info(f"[FORECAST_CACHE] Computed forecast {forecast_year} (base {base_year})")
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Shared by the tax router, the form generator and the PDF exports
+forecast_cache = ForecastCache()
@@ -311,17 +311,23 @@ def _generate_schedule_d(forecast: Dict[str, Any]) -> ScheduleD:
     details = forecast.get("details", {})
     cap_gains = details.get("capital_gains", {})
 
-    short_term = cap_gains.get("short_term", 0)
-    long_term = cap_gains.get("long_term", 0)
-    total = cap_gains.get("total", 0)
+    short_term = cap_gains.get("short_term", cap_gains.get("net_short_term", 0))
+    long_term = cap_gains.get("long_term", cap_gains.get("net_long_term", 0))
+    total = cap_gains.get("total", short_term + long_term)
+
+    # Sales with wash-sale adjustments are reported on Form 8949 (lines 1b/8b)
+    short_term_adjusted = cap_gains.get("short_term_wash_adjusted", 0)
+    long_term_adjusted = cap_gains.get("long_term_wash_adjusted", 0)
 
     return ScheduleD(
         # Short-term
-        line_1a=short_term,
+        line_1a=short_term - short_term_adjusted,
+        line_1b=short_term_adjusted,
         line_7=short_term,
 
         # Long-term
-        line_8a=long_term,
+        line_8a=long_term - long_term_adjusted,
+        line_8b=long_term_adjusted,
         line_15=long_term,
 
         # Summary
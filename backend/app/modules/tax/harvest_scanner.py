@@ -0,0 +1,409 @@
+"""
+Unrealized gains and tax-loss-harvest scanner.
+
+CostBasisService.get_unrealized_gains() walked the open lots one ORM object
+at a time with a caller-supplied price dict, and /cost-basis/unrealized
+never had prices at all, so harvesting was a manual exercise.
+
+scan_harvest_candidates():
+
+1. Loads every open lot into arrays with one query (plus one grouped query
+   for the wash-sale basis already realized by earlier sales).
+2. Joins the lots to one batched quote snapshot (get_prices_schwab_first).
+3. Computes market value, unrealized gain, holding class (ST/LT), days
+   until long-term and tax impact per lot as array operations. Tax impact
+   uses marginal rates derived from the year's (cached) tax forecast.
+4. Ranks loss lots by tax savings and flags wash-sale conflicts: other
+   acquisitions of the symbol in the last 30 days (open lots and buys in
+   any account, IRAs included) and planned buys in the next 30 days.
+
+It is cheap enough to run in the evening scan (RecommendationScheduler).
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.modules.investments.models import InvestmentTransaction
+from app.modules.tax.lot_engine import BUY_TYPES, LONG_TERM_DAYS
+from app.modules.tax.models import StockLot, StockLotSale
+from app.modules.tax.wash_sales import WASH_SALE_WINDOW_DAYS
+
+logger = logging.getLogger(__name__)
+
+
+# 2025 federal long-term capital gain brackets (taxable income, rate).
+# Source: IRS Revenue Procedure 2024-40
+LONG_TERM_CAPITAL_GAIN_BRACKETS = {
+    "MFJ": [(0, 0.0), (96700, 0.15), (600050, 0.20)],
+    "Single": [(0, 0.0), (48350, 0.15), (533400, 0.20)],
+}
+
+# Used when there is no forecast to take marginal rates from
+DEFAULT_SHORT_TERM_RATE = 0.45
+DEFAULT_LONG_TERM_RATE = 0.30
+
+# Smallest loss (dollars) reported as a harvest candidate
+MIN_HARVEST_LOSS = 100
+
+# The evening scan alerts when clean candidates would save at least this much
+HARVEST_ALERT_MIN_SAVINGS = 500
+
+# Gain lots this close to long-term are reported as "wait to sell"
+APPROACHING_LONG_TERM_DAYS = 30
+
+
+@dataclass
+class OpenLots:
+    """Open lots as aligned arrays."""
+    lot_id: np.ndarray
+    symbol: np.ndarray
+    source: np.ndarray
+    account_id: np.ndarray
+    purchase_date: np.ndarray  # datetime64[D]
+    purchase_transaction_id: np.ndarray  # -1 when unknown
+    quantity: np.ndarray  # shares remaining
+    cost_basis: np.ndarray  # basis of the remaining shares, wash-sale adjustments included
+
+    def __len__(self) -> int:
+        return len(self.lot_id)
+
+
+@dataclass
+class LotValuation:
+    """Per-lot valuation arrays, aligned with OpenLots."""
+    price: np.ndarray  # nan when the snapshot had no quote
+    market_value: np.ndarray
+    unrealized_gain: np.ndarray
+    holding_days: np.ndarray
+    is_long_term: np.ndarray
+    days_to_long_term: np.ndarray
+    tax_rate: np.ndarray
+    tax_impact: np.ndarray  # tax due if sold now; negative is a saving
+
+
+def load_open_lots(db: Session, symbol: Optional[str] = None) -> OpenLots:
+    """All lots with shares remaining, in purchase order."""
+    query = db.query(
+        StockLot.lot_id, StockLot.symbol, StockLot.source, StockLot.account_id, StockLot.purchase_date,
+        StockLot.purchase_transaction_id, StockLot.quantity, StockLot.quantity_remaining,
+        StockLot.cost_basis, StockLot.wash_sale_basis_adjustment,
+    ).filter(StockLot.quantity_remaining > 0)
+    if symbol:
+        query = query.filter(StockLot.symbol == symbol.upper())
+    rows = query.order_by(StockLot.purchase_date, StockLot.lot_id).all()
+
+    # Wash-sale basis carried into a lot leaves it as the lot's shares are sold
+    realized = dict(
+        db.query(StockLotSale.lot_id, func.sum(StockLotSale.basis_adjustment))
+        .join(StockLot, StockLot.lot_id == StockLotSale.lot_id)
+        .filter(StockLot.quantity_remaining > 0, StockLot.wash_sale_basis_adjustment != 0)
+        .group_by(StockLotSale.lot_id)
+        .all()
+    )
+
+    quantity = np.array([float(row.quantity) for row in rows], dtype=float)
+    remaining = np.array([float(row.quantity_remaining) for row in rows], dtype=float)
+    cost_basis = np.array([float(row.cost_basis) for row in rows], dtype=float)
+    adjustment = np.array([
+        float(row.wash_sale_basis_adjustment or 0) - float(realized.get(row.lot_id) or 0) for row in rows
+    ], dtype=float)
+    share = np.divide(remaining, quantity, out=np.zeros_like(remaining), where=quantity > 0)
+
+    return OpenLots(
+        lot_id=np.array([row.lot_id for row in rows], dtype=np.int64),
+        symbol=np.array([row.symbol.upper() for row in rows], dtype=object),
+        source=np.array([row.source for row in rows], dtype=object),
+        account_id=np.array([row.account_id for row in rows], dtype=object),
+        purchase_date=np.array([row.purchase_date for row in rows], dtype="datetime64[D]"),
+        purchase_transaction_id=np.array(
+            [row.purchase_transaction_id if row.purchase_transaction_id is not None else -1 for row in rows],
+            dtype=np.int64,
+        ),
+        quantity=remaining,
+        cost_basis=cost_basis * share + adjustment,
+    )
+
+
+def quote_snapshot(symbols: Iterable[str]) -> Dict[str, float]:
+    """One batched quote request (Schwab first, Yahoo for the rest)."""
+    from app.modules.investments.price_service import get_prices_schwab_first
+
+    symbols = sorted(set(symbols))
+    if not symbols:
+        return {}
+    quotes = get_prices_schwab_first(symbols)
+    return {symbol: quote["current_price"] for symbol, quote in quotes.items() if quote.get("current_price")}
+
+
+def _bracket_rate(brackets: Sequence[Tuple[float, float]], income: float) -> float:
+    """Marginal rate of the bracket containing `income`."""
+    starts = [start for start, _ in brackets]
+    return brackets[max(0, int(np.searchsorted(starts, income, side="right")) - 1)][1]
+
+
+def marginal_rates(db: Session, year: int, base_year: int = 2024) -> Dict[str, Any]:
+    """
+    Short- and long-term marginal rates (federal + California + NIIT) at the
+    year's forecast taxable income. California taxes both as ordinary income.
+
+    Falls back to the default rates when there is no forecast (no base-year
+    return); anything else wrong with the forecast raises.
+    """
+    from app.modules.tax import forecast
+
+    try:
+        result = forecast.calculate_tax_forecast(db, forecast_year=year, base_year=base_year)
+    except ValueError:
+        return {"short_term": DEFAULT_SHORT_TERM_RATE, "long_term": DEFAULT_LONG_TERM_RATE, "source": "default"}
+
+    agi = result.get("agi", 0)
+    status = result.get("filing_status") or "MFJ"
+    taxable = forecast._calculate_taxable_income(agi, result.get("details", {}).get("deductions", {}), year)
+
+    federal = _bracket_rate(forecast._federal_brackets(status, year), taxable)
+    state = _bracket_rate(forecast._ca_brackets(status, year), taxable)
+    if taxable > forecast.CA_MENTAL_HEALTH_THRESHOLD:
+        state += forecast.CA_MENTAL_HEALTH_RATE
+    niit = forecast.NIIT_RATE if agi > forecast.NIIT_THRESHOLD else 0.0
+    long_term_brackets = LONG_TERM_CAPITAL_GAIN_BRACKETS["Single" if status in ("Single", "single") else "MFJ"]
+
+    return {
+        "short_term": round(federal + state + niit, 4),
+        "long_term": round(_bracket_rate(long_term_brackets, taxable) + state + niit, 4),
+        "source": f"forecast {year}",
+    }
+
+
+def value_lots(
+    lots: OpenLots,
+    prices: Mapping[str, float],
+    as_of: date,
+    short_term_rate: float = DEFAULT_SHORT_TERM_RATE,
+    long_term_rate: float = DEFAULT_LONG_TERM_RATE,
+) -> LotValuation:
+    """Valuation of every lot against one price snapshot."""
+    symbols, inverse = np.unique(lots.symbol.astype(str), return_inverse=True)
+    symbol_prices = np.array([prices.get(symbol, np.nan) for symbol in symbols], dtype=float)
+    price = symbol_prices[inverse] if len(lots) else np.zeros(0)
+
+    market_value = price * lots.quantity
+    unrealized_gain = market_value - lots.cost_basis
+    holding_days = (np.datetime64(as_of, "D") - lots.purchase_date).astype(np.int64)
+    is_long_term = holding_days > LONG_TERM_DAYS
+    tax_rate = np.where(is_long_term, long_term_rate, short_term_rate)
+
+    return LotValuation(
+        price=price,
+        market_value=market_value,
+        unrealized_gain=unrealized_gain,
+        holding_days=holding_days,
+        is_long_term=is_long_term,
+        days_to_long_term=np.maximum(0, LONG_TERM_DAYS + 1 - holding_days),
+        tax_rate=tax_rate,
+        tax_impact=unrealized_gain * tax_rate,
+    )
+
+
+def _recent_buys(db: Session, symbols: Sequence[str], since: date, until: date) -> List[Tuple[int, str, str, date]]:
+    """(transaction id, symbol, account, date) of buys in any account."""
+    if not symbols:
+        return []
+    return db.query(
+        InvestmentTransaction.id, InvestmentTransaction.symbol,
+        InvestmentTransaction.account_id, InvestmentTransaction.transaction_date,
+    ).filter(
+        InvestmentTransaction.transaction_type.in_(BUY_TYPES),
+        InvestmentTransaction.symbol.in_(sorted(symbols)),
+        InvestmentTransaction.transaction_date >= since,
+        InvestmentTransaction.transaction_date <= until,
+    ).all()
+
+
+def wash_sale_conflicts(
+    lots: OpenLots,
+    candidates: np.ndarray,
+    recent_buys: Iterable[Tuple[int, str, str, date]],
+    planned_buys: Mapping[str, Iterable[date]],
+    as_of: date,
+) -> Dict[int, List[Dict[str, Any]]]:
+    """
+    Acquisitions that would make selling each candidate lot today a wash
+    sale, keyed by position in `lots`.
+
+    Open lots bought in the window are listed by lot_id: selling them in
+    the same trade removes the conflict.
+    """
+    window = timedelta(days=WASH_SALE_WINDOW_DAYS)
+    start, end = np.datetime64(as_of - window, "D"), np.datetime64(as_of, "D")
+
+    acquisitions: Dict[str, List[Dict[str, Any]]] = {}
+    in_window = np.flatnonzero((lots.purchase_date >= start) & (lots.purchase_date <= end))
+    lot_transactions = set(lots.purchase_transaction_id[in_window].tolist())
+    for i in in_window:
+        acquisitions.setdefault(lots.symbol[i], []).append({
+            "kind": "open_lot", "lot_id": int(lots.lot_id[i]),
+            "date": lots.purchase_date[i].item(), "account_id": lots.account_id[i],
+        })
+    for transaction_id, symbol, account_id, transaction_date in recent_buys:
+        if transaction_id not in lot_transactions:
+            acquisitions.setdefault(symbol.upper(), []).append({
+                "kind": "recent_buy", "transaction_id": transaction_id,
+                "date": transaction_date, "account_id": account_id,
+            })
+    for symbol, dates in planned_buys.items():
+        for planned in dates:
+            if as_of <= planned <= as_of + window:
+                acquisitions.setdefault(symbol.upper(), []).append({"kind": "planned_buy", "date": planned})
+
+    conflicts = {}
+    for i in candidates:
+        found = [
+            acquisition for acquisition in acquisitions.get(lots.symbol[i], [])
+            if acquisition.get("lot_id") != int(lots.lot_id[i])
+        ]
+        if found:
+            conflicts[int(i)] = sorted(found, key=lambda acquisition: acquisition["date"])
+    return conflicts
+
+
+def scan_harvest_candidates(
+    db: Session,
+    as_of: Optional[date] = None,
+    prices: Optional[Mapping[str, float]] = None,
+    planned_buys: Optional[Mapping[str, Iterable[date]]] = None,
+    rates: Optional[Dict[str, Any]] = None,
+    min_loss: float = MIN_HARVEST_LOSS,
+    limit: int = 25,
+) -> Dict[str, Any]:
+    """
+    Value all open lots and rank tax-loss-harvest candidates.
+
+    prices defaults to one quote snapshot for the open symbols and rates to
+    marginal_rates() for the current year.
+    """
+    as_of = as_of or date.today()
+    lots = load_open_lots(db)
+    symbols = sorted(set(lots.symbol.tolist()))
+    if prices is None:
+        prices = quote_snapshot(symbols)
+    if rates is None:
+        rates = marginal_rates(db, as_of.year)
+
+    valuation = value_lots(lots, prices, as_of, rates["short_term"], rates["long_term"])
+    priced = ~np.isnan(valuation.price)
+    gain = np.where(priced, valuation.unrealized_gain, 0.0)
+
+    # Loss lots, largest tax saving first
+    is_candidate = priced & (gain <= -min_loss)
+    candidates = np.flatnonzero(is_candidate)
+    candidates = candidates[np.argsort(valuation.tax_impact[candidates], kind="stable")]
+
+    candidate_symbols = sorted(set(lots.symbol[candidates].tolist()))
+    window = timedelta(days=WASH_SALE_WINDOW_DAYS)
+    conflicts = wash_sale_conflicts(
+        lots, candidates, _recent_buys(db, candidate_symbols, as_of - window, as_of), planned_buys or {}, as_of,
+    )
+    # Clean candidates first; stable sort keeps the savings order within each group
+    candidates = sorted(candidates.tolist(), key=lambda i: i in conflicts)
+
+    def lot_row(i: int) -> Dict[str, Any]:
+        return {
+            "lot_id": int(lots.lot_id[i]),
+            "symbol": lots.symbol[i],
+            "source": lots.source[i],
+            "account_id": lots.account_id[i],
+            "purchase_date": lots.purchase_date[i].item().isoformat(),
+            "quantity": float(lots.quantity[i]),
+            "cost_basis": round(float(lots.cost_basis[i]), 2),
+            "price": float(valuation.price[i]),
+            "market_value": round(float(valuation.market_value[i]), 2),
+            "unrealized_gain": round(float(valuation.unrealized_gain[i]), 2),
+            "term": "long" if valuation.is_long_term[i] else "short",
+            "holding_days": int(valuation.holding_days[i]),
+            "days_to_long_term": int(valuation.days_to_long_term[i]),
+            "tax_impact": round(float(valuation.tax_impact[i]), 2),
+        }
+
+    candidate_rows = []
+    for i in candidates[:limit]:
+        row = lot_row(i)
+        row["tax_savings"] = -row.pop("tax_impact")
+        lot_conflicts = conflicts.get(i, [])
+        row["wash_sale_conflict"] = bool(lot_conflicts)
+        row["conflicts"] = [
+            {**conflict, "date": conflict["date"].isoformat()} for conflict in lot_conflicts
+        ]
+        recent = [c["date"] for c in lot_conflicts if c["kind"] != "planned_buy"]
+        row["wash_clear_date"] = (max(recent) + window + timedelta(days=1)).isoformat() if recent else None
+        candidate_rows.append(row)
+
+    # Short-term gains about to turn long-term: selling now costs the rate difference
+    approaching = np.flatnonzero(
+        priced & (gain > 0) & ~valuation.is_long_term
+        & (valuation.days_to_long_term <= APPROACHING_LONG_TERM_DAYS)
+    )
+    approaching = approaching[np.argsort(valuation.days_to_long_term[approaching], kind="stable")]
+
+    is_long_term = valuation.is_long_term
+    harvestable = gain[is_candidate]
+    result = {
+        "as_of": as_of.isoformat(),
+        "rates": rates,
+        "lots_scanned": len(lots),
+        "symbols": len(symbols),
+        "missing_prices": sorted(set(lots.symbol[~priced].tolist())),
+        "totals": {
+            "market_value": round(float(valuation.market_value[priced].sum()), 2),
+            "cost_basis": round(float(lots.cost_basis[priced].sum()), 2),
+            "unrealized_gain": round(float(gain.sum()), 2),
+            "short_term_gain": round(float(gain[~is_long_term].sum()), 2),
+            "long_term_gain": round(float(gain[is_long_term].sum()), 2),
+            "harvestable_loss": round(float(harvestable.sum()), 2),
+            "harvest_tax_savings": round(float(-valuation.tax_impact[is_candidate].sum()), 2),
+        },
+        "candidates": candidate_rows,
+        "approaching_long_term": [lot_row(int(i)) for i in approaching[:limit]],
+    }
+    logger.info(
+        f"[HARVEST_SCAN] {len(lots)} lots, {len(candidates)} candidates "
+        f"({len(conflicts)} with wash-sale conflicts), ${result['totals']['harvestable_loss']:,.0f} harvestable"
+    )
+    return result
+
+
+def summarize_unrealized(lots: OpenLots, valuation: LotValuation) -> Dict[str, Any]:
+    """Totals and per-symbol sums (the get_unrealized_gains() format)."""
+    symbols, inverse = np.unique(lots.symbol.astype(str), return_inverse=True)
+    width = len(symbols)
+
+    def by_symbol(values: np.ndarray) -> np.ndarray:
+        return np.bincount(inverse, weights=values, minlength=width)
+
+    quantity = by_symbol(lots.quantity)
+    cost_basis = by_symbol(lots.cost_basis)
+    market_value = by_symbol(valuation.market_value)
+    gain = by_symbol(valuation.unrealized_gain)
+    num_lots = np.bincount(inverse, minlength=width)
+
+    return {
+        "total_unrealized_gain": float(valuation.unrealized_gain.sum()),
+        "total_market_value": float(valuation.market_value.sum()),
+        "total_cost_basis": float(lots.cost_basis.sum()),
+        "by_symbol": {
+            symbol: {
+                "quantity": float(quantity[k]),
+                "cost_basis": float(cost_basis[k]),
+                "market_value": float(market_value[k]),
+                "unrealized_gain": float(gain[k]),
+                "unrealized_gain_pct": float(gain[k] / cost_basis[k] * 100) if cost_basis[k] > 0 else 0.0,
+                "num_lots": int(num_lots[k]),
+            }
+            for k, symbol in enumerate(symbols)
+        },
+    }
@@ -0,0 +1,487 @@
+"""
+Incremental tax-lot engine.
+
+/cost-basis/sync used to replay the entire BUY/SELL history through
+CostBasisService one row at a time: an existence check per transaction, a
+commit per new lot, and for every sale a query over open StockLot rows, a
+Python FIFO match and another commit. A full resync over years of trading
+took minutes.
+
+The engine works per (source, account_id, symbol):
+
+- LotLadder holds a key's open lots in a deque, oldest first. A sale
+  consumes from the left (FIFO) or the right (LIFO); a buy appends.
+- LotEngine loads every open lot for the keys in a batch with one query,
+  replays the batch's buys and sells in (date, id) order in memory, and
+  writes new lots, changed lots and sales with bulk statements.
+- sync_lots() applies only transactions after the TaxLotCheckpoint,
+  re-runs wash-sale detection and advances the checkpoint in the same
+  commit. A key that receives a transaction dated before its latest lot
+  or sale (a backfilled import) is rebuilt from its full history so the
+  ladder order stays correct.
+
+Lots with source 'manual' are entered by hand and never touched by a sync.
+"""
+
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, insert, tuple_, update
+from sqlalchemy.orm import Session
+
+from app.ingestion.bulk_writer import CHUNK_SIZE
+from app.modules.investments.account_types import non_taxable_account_type
+from app.modules.investments.models import InvestmentAccount, InvestmentTransaction
+from app.modules.tax.models import StockLot, StockLotSale, TaxLotCheckpoint
+from app.modules.tax.wash_sales import detect_wash_sales
+
+logger = logging.getLogger(__name__)
+
+
+BUY_TYPES = ('BUY', 'BOUGHT')
+SELL_TYPES = ('SELL', 'SOLD')
+
+# Lots with this source are entered by hand and left alone by syncs
+MANUAL_SOURCE = 'manual'
+
+CHECKPOINT_NAME = 'cost_basis'
+
+LONG_TERM_DAYS = 365
+
+_CENT = Decimal('0.01')
+_PER_SHARE = Decimal('0.0001')
+
+# (source, account_id, symbol)
+LotKey = Tuple[str, str, str]
+
+
+@dataclass
+class LadderLot:
+    """An open lot while sales are matched against it."""
+    purchase_date: date
+    quantity: Decimal
+    cost_basis: Decimal
+    quantity_remaining: Decimal
+    key: Optional[LotKey] = None
+    lot_id: Optional[int] = None  # None until a new lot is written
+    purchase_transaction_id: Optional[int] = None
+    changed: bool = False
+
+    @property
+    def cost_per_share(self) -> Decimal:
+        # Stored as Numeric(18, 4); match the stored value
+        if self.quantity <= 0:
+            return Decimal(0)
+        return (self.cost_basis / self.quantity).quantize(_PER_SHARE)
+
+    @property
+    def status(self) -> str:
+        if self.quantity_remaining <= 0:
+            return 'closed'
+        return 'partial' if self.quantity_remaining < self.quantity else 'open'
+
+
+@dataclass
+class LotMatch:
+    """The part of one sale matched to one lot (a StockLotSale row)."""
+    lot: LadderLot
+    sale_date: date
+    sale_transaction_id: Optional[int]
+    quantity_sold: Decimal
+    proceeds: Decimal
+    proceeds_per_share: Decimal
+    cost_basis: Decimal
+    gain_loss: Decimal
+    holding_period_days: int
+    is_long_term: bool
+
+    @property
+    def tax_year(self) -> int:
+        return self.sale_date.year
+
+    def values(self) -> Dict[str, Any]:
+        """stock_lot_sale column values (lot_id must be resolved)."""
+        return {
+            "lot_id": self.lot.lot_id,
+            "sale_date": self.sale_date,
+            "sale_transaction_id": self.sale_transaction_id,
+            "quantity_sold": self.quantity_sold,
+            "proceeds": self.proceeds.quantize(_CENT),
+            "proceeds_per_share": self.proceeds_per_share.quantize(_PER_SHARE),
+            "cost_basis": self.cost_basis.quantize(_CENT),
+            "gain_loss": self.gain_loss.quantize(_CENT),
+            "holding_period_days": self.holding_period_days,
+            "is_long_term": self.is_long_term,
+            "tax_year": self.tax_year,
+            "wash_sale": False,
+            "basis_adjustment": Decimal(0),
+        }
+
+
+class LotLadder:
+    """One key's open lots, oldest first."""
+
+    def __init__(self, lots: Iterable[LadderLot] = ()):
+        self.lots: Deque[LadderLot] = deque(lot for lot in lots if lot.quantity_remaining > 0)
+
+    def __len__(self) -> int:
+        return len(self.lots)
+
+    @property
+    def available(self) -> Decimal:
+        return sum((lot.quantity_remaining for lot in self.lots), Decimal(0))
+
+    def buy(self, lot: LadderLot) -> None:
+        self.lots.append(lot)
+
+    def sell(
+        self,
+        symbol: str,
+        sale_date: date,
+        quantity_sold: Decimal,
+        proceeds: Decimal,
+        sale_transaction_id: Optional[int] = None,
+        lot_method: str = "FIFO",
+    ) -> List[LotMatch]:
+        """
+        Match a sale to lots, consuming them; returns one LotMatch per lot.
+
+        Raises ValueError (leaving the ladder unchanged) if there are no
+        lots or not enough shares.
+        """
+        if not self.lots:
+            raise ValueError(f"No open lots available for {symbol}")
+        available = self.available
+        if available < quantity_sold:
+            raise ValueError(
+                f"Insufficient shares to sell. Needed {quantity_sold}, "
+                f"but only {available} available in lots."
+            )
+
+        proceeds_per_share = proceeds / quantity_sold if quantity_sold > 0 else Decimal(0)
+        lifo = lot_method == "LIFO"
+        remaining = quantity_sold
+        matches = []
+
+        while remaining > 0:
+            lot = self.lots[-1] if lifo else self.lots[0]
+            quantity = min(remaining, lot.quantity_remaining)
+            cost_basis = lot.cost_per_share * quantity
+            proceeds_portion = proceeds_per_share * quantity
+            holding_period_days = (sale_date - lot.purchase_date).days
+
+            matches.append(LotMatch(
+                lot=lot,
+                sale_date=sale_date,
+                sale_transaction_id=sale_transaction_id,
+                quantity_sold=quantity,
+                proceeds=proceeds_portion,
+                proceeds_per_share=proceeds_per_share,
+                cost_basis=cost_basis,
+                gain_loss=proceeds_portion - cost_basis,
+                holding_period_days=holding_period_days,
+                is_long_term=holding_period_days > LONG_TERM_DAYS,
+            ))
+
+            lot.quantity_remaining -= quantity
+            lot.changed = True
+            if lot.quantity_remaining <= 0:
+                if lifo:
+                    self.lots.pop()
+                else:
+                    self.lots.popleft()
+            remaining -= quantity
+
+        return matches
+
+
+@dataclass
+class LotSyncResult:
+    """Outcome of one sync."""
+    lots_created: int = 0
+    lots_updated: int = 0
+    sales_created: int = 0
+    transactions_processed: int = 0
+    rebuilt_keys: int = 0
+    wash_sales: int = 0
+    last_transaction_id: int = 0
+    errors: List[str] = field(default_factory=list)
+
+
+class LotEngine:
+    """Replays batches of buys and sells onto in-memory lot ladders."""
+
+    def __init__(self, lot_method: str = "FIFO"):
+        self.lot_method = lot_method
+        self.ladders: Dict[LotKey, LotLadder] = {}
+        self.new_lots: List[LadderLot] = []
+        self.loaded_lots: List[LadderLot] = []
+        self.matches: List[LotMatch] = []
+        self.errors: List[str] = []
+
+    def ladder(self, key: LotKey) -> LotLadder:
+        ladder = self.ladders.get(key)
+        if ladder is None:
+            ladder = self.ladders[key] = LotLadder()
+        return ladder
+
+    def load(self, db: Session, keys: Iterable[LotKey]) -> int:
+        """Load the open, non-manual lots of `keys` with one query; returns the lot count."""
+        keys = [key for key in set(keys) if key not in self.ladders]
+        if not keys:
+            return 0
+        rows = db.query(StockLot).filter(
+            tuple_(StockLot.source, StockLot.account_id, StockLot.symbol).in_(keys),
+            StockLot.source != MANUAL_SOURCE,
+            StockLot.quantity_remaining > 0,
+        ).order_by(StockLot.purchase_date, StockLot.lot_id).all()
+
+        for key in keys:
+            self.ladders[key] = LotLadder()
+        for row in rows:
+            key = (row.source, row.account_id, row.symbol)
+            lot = LadderLot(
+                purchase_date=row.purchase_date,
+                quantity=Decimal(str(row.quantity)),
+                cost_basis=Decimal(str(row.cost_basis)),
+                quantity_remaining=Decimal(str(row.quantity_remaining)),
+                key=key,
+                lot_id=row.lot_id,
+                purchase_transaction_id=row.purchase_transaction_id,
+            )
+            self.loaded_lots.append(lot)
+            self.ladders[key].buy(lot)
+        return len(rows)
+
+    def apply(self, transactions: Iterable[Any]) -> int:
+        """
+        Replay transactions (rows with id, transaction_date, transaction_type,
+        symbol, quantity, amount, account_id, source) in (date, id) order.
+
+        Returns the number applied; failed sales are recorded in `errors`.
+        """
+        applied = 0
+        for txn in sorted(transactions, key=lambda t: (t.transaction_date, t.id)):
+            txn_type = txn.transaction_type.upper()
+            symbol = txn.symbol.upper()
+            quantity = Decimal(str(abs(txn.quantity or 0)))
+            amount = Decimal(str(abs(txn.amount or 0)))
+            if quantity <= 0 or amount <= 0:
+                continue
+            key = (txn.source or "unknown", txn.account_id or "unknown", symbol)
+            ladder = self.ladder(key)
+
+            if txn_type in BUY_TYPES:
+                lot = LadderLot(
+                    purchase_date=txn.transaction_date,
+                    quantity=quantity,
+                    cost_basis=amount,
+                    quantity_remaining=quantity,
+                    key=key,
+                    purchase_transaction_id=txn.id,
+                )
+                ladder.buy(lot)
+                self.new_lots.append(lot)
+            elif txn_type in SELL_TYPES:
+                try:
+                    self.matches.extend(ladder.sell(
+                        symbol, txn.transaction_date, quantity, amount,
+                        sale_transaction_id=txn.id, lot_method=self.lot_method,
+                    ))
+                except ValueError as e:
+                    # No matching lots - the buy may predate our data
+                    self.errors.append(f"{symbol} on {txn.transaction_date}: {e}")
+                    continue
+            else:
+                continue
+            applied += 1
+        return applied
+
+    def flush(self, db: Session) -> Tuple[int, int, int]:
+        """
+        Write new lots, changed loaded lots and sales in bulk. Does not commit.
+
+        Returns (lots_created, lots_updated, sales_created).
+        """
+        now = datetime.utcnow()
+
+        for start in range(0, len(self.new_lots), CHUNK_SIZE):
+            chunk = self.new_lots[start:start + CHUNK_SIZE]
+            rows = db.execute(
+                insert(StockLot).values([
+                    {
+                        "symbol": lot.key[2],
+                        "purchase_date": lot.purchase_date,
+                        "quantity": lot.quantity,
+                        "cost_basis": lot.cost_basis.quantize(_CENT),
+                        "cost_per_share": lot.cost_per_share,
+                        "account_id": lot.key[1],
+                        "source": lot.key[0],
+                        "purchase_transaction_id": lot.purchase_transaction_id,
+                        "quantity_remaining": lot.quantity_remaining,
+                        "status": lot.status,
+                        "lot_method": self.lot_method,
+                        "wash_sale_basis_adjustment": Decimal(0),
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for lot in chunk
+                ]).returning(StockLot.lot_id, StockLot.purchase_transaction_id)
+            ).all()
+            lot_ids = {purchase_transaction_id: lot_id for lot_id, purchase_transaction_id in rows}
+            for lot in chunk:
+                lot.lot_id = lot_ids[lot.purchase_transaction_id]
+
+        changed = [lot for lot in self.loaded_lots if lot.changed]
+        for start in range(0, len(changed), CHUNK_SIZE):
+            db.execute(update(StockLot), [
+                {
+                    "lot_id": lot.lot_id,
+                    "quantity_remaining": lot.quantity_remaining,
+                    "status": lot.status,
+                    "updated_at": now,
+                }
+                for lot in changed[start:start + CHUNK_SIZE]
+            ])
+
+        for start in range(0, len(self.matches), CHUNK_SIZE):
+            db.execute(insert(StockLotSale).values([
+                {**match.values(), "created_at": now, "updated_at": now}
+                for match in self.matches[start:start + CHUNK_SIZE]
+            ]))
+
+        counts = (len(self.new_lots), len(changed), len(self.matches))
+        self.new_lots, self.matches = [], []
+        for lot in changed:
+            lot.changed = False
+        return counts
+
+
+def _taxable_transactions(db: Session):
+    """BUY/SELL investment transactions in taxable accounts."""
+    txn = InvestmentTransaction
+    return db.query(
+        txn.id, txn.transaction_date, txn.transaction_type, txn.symbol,
+        txn.quantity, txn.amount, txn.account_id, txn.source,
+    ).join(
+        InvestmentAccount,
+        (InvestmentAccount.account_id == txn.account_id) & (InvestmentAccount.source == txn.source),
+    ).filter(
+        txn.transaction_type.in_(BUY_TYPES + SELL_TYPES),
+        txn.symbol.isnot(None),
+        txn.symbol != '',
+        txn.quantity > 0,
+        # Trades in retirement accounts have no capital gains consequence
+        ~non_taxable_account_type(InvestmentAccount.account_type),
+    )
+
+
+def _row_key(row: Any) -> LotKey:
+    return (row.source or "unknown", row.account_id or "unknown", row.symbol.upper())
+
+
+def _latest_applied_dates(db: Session, keys: List[LotKey]) -> Dict[LotKey, date]:
+    """Latest purchase or sale date already recorded per key."""
+    lot_key = tuple_(StockLot.source, StockLot.account_id, StockLot.symbol)
+    latest: Dict[LotKey, date] = {}
+    for source, account_id, symbol, last_date in db.query(
+        StockLot.source, StockLot.account_id, StockLot.symbol, func.max(StockLot.purchase_date),
+    ).filter(lot_key.in_(keys), StockLot.source != MANUAL_SOURCE).group_by(
+        StockLot.source, StockLot.account_id, StockLot.symbol
+    ):
+        latest[(source, account_id, symbol)] = last_date
+    for source, account_id, symbol, last_date in db.query(
+        StockLot.source, StockLot.account_id, StockLot.symbol, func.max(StockLotSale.sale_date),
+    ).join(StockLotSale, StockLotSale.lot_id == StockLot.lot_id).filter(
+        lot_key.in_(keys), StockLot.source != MANUAL_SOURCE
+    ).group_by(StockLot.source, StockLot.account_id, StockLot.symbol):
+        key = (source, account_id, symbol)
+        latest[key] = max(latest.get(key, last_date), last_date)
+    return latest
+
+
+def _delete_lots(db: Session, keys: Optional[List[LotKey]] = None) -> None:
+    """Delete non-manual lots (all, or those of `keys`) and their sales."""
+    lots = db.query(StockLot.lot_id).filter(StockLot.source != MANUAL_SOURCE)
+    if keys is not None:
+        lots = lots.filter(tuple_(StockLot.source, StockLot.account_id, StockLot.symbol).in_(keys))
+    db.query(StockLotSale).filter(StockLotSale.lot_id.in_(lots.scalar_subquery())).delete(synchronize_session=False)
+    db.query(StockLot).filter(StockLot.lot_id.in_(lots.scalar_subquery())).delete(synchronize_session=False)
+
+
+def sync_lots(db: Session, rebuild: bool = False, lot_method: str = "FIFO") -> LotSyncResult:
+    """
+    Apply investment transactions after the checkpoint to stock lots and commit.
+
+    With rebuild=True, or when there is no checkpoint yet (lots written by
+    the old row-by-row sync carry no transaction ids), every non-manual lot
+    is deleted and the whole history is replayed.
+    """
+    checkpoint = db.get(TaxLotCheckpoint, CHECKPOINT_NAME)
+    if checkpoint is None:
+        checkpoint = TaxLotCheckpoint(name=CHECKPOINT_NAME, last_transaction_id=0, transactions_applied=0)
+        db.add(checkpoint)
+        rebuild = True
+    last_id = 0 if rebuild else checkpoint.last_transaction_id
+
+    result = LotSyncResult()
+    try:
+        if rebuild:
+            _delete_lots(db)
+
+        rows = _taxable_transactions(db).filter(InvestmentTransaction.id > last_id).all()
+        keys = sorted({_row_key(row) for row in rows})
+
+        # Keys receiving a transaction older than what they already recorded
+        # are replayed from their full history
+        stale: Set[LotKey] = set()
+        if keys and not rebuild:
+            latest = _latest_applied_dates(db, keys)
+            first_new: Dict[LotKey, date] = {}
+            for row in rows:
+                key = _row_key(row)
+                first_new[key] = min(first_new.get(key, row.transaction_date), row.transaction_date)
+            stale = {key for key in keys if key in latest and first_new[key] < latest[key]}
+        if stale:
+            _delete_lots(db, sorted(stale))
+            history = _taxable_transactions(db).filter(
+                InvestmentTransaction.id <= last_id,
+                InvestmentTransaction.source.in_(sorted({key[0] for key in stale})),
+                InvestmentTransaction.account_id.in_(sorted({key[1] for key in stale})),
+            ).all()
+            rows.extend(row for row in history if _row_key(row) in stale)
+            logger.info(f"[LOT_ENGINE] Replaying full history of {len(stale)} keys with backdated transactions")
+
+        engine = LotEngine(lot_method=lot_method)
+        if not rebuild:
+            engine.load(db, [key for key in keys if key not in stale])
+        engine.apply(rows)
+        result.lots_created, result.lots_updated, result.sales_created = engine.flush(db)
+        if rows:
+            result.wash_sales = detect_wash_sales(db).wash_sales
+
+        result.transactions_processed = len(rows)
+        result.rebuilt_keys = len(stale)
+        result.errors = engine.errors
+        if rows:
+            newest = max(rows, key=lambda row: row.id)
+            checkpoint.last_transaction_id = max(last_id, newest.id)
+            checkpoint.last_transaction_date = newest.transaction_date
+        elif rebuild:
+            checkpoint.last_transaction_id = 0
+        checkpoint.transactions_applied = (checkpoint.transactions_applied or 0) + len(rows)
+        result.last_transaction_id = checkpoint.last_transaction_id
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(
+        f"[LOT_ENGINE] Applied {result.transactions_processed} transactions: {result.lots_created} lots, "
+        f"{result.sales_created} sales, {len(result.errors)} errors (checkpoint {result.last_transaction_id})"
+    )
+    return result
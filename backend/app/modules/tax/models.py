@@ -2,7 +2,9 @@
 Tax module database models.
 """
 
-from sqlalchemy import Column, Integer, String, Numeric, Date, Text, UniqueConstraint, ForeignKey, Index, Boolean, DateTime
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, BigInteger, String, Numeric, Date, Text, UniqueConstraint, ForeignKey, Index, Boolean, DateTime
 from sqlalchemy.orm import relationship
 
 from app.shared.models.base import BaseModel, TimestampMixin
@@ -192,6 +194,9 @@ class StockLot(Base, TimestampMixin):
     # Lot matching method
     lot_method = Column(String(20), nullable=True)  # 'FIFO', 'LIFO', 'specific_id', 'avg_cost'
 
+    # Disallowed wash-sale losses carried into this (replacement) lot's basis
+    wash_sale_basis_adjustment = Column(Numeric(18, 2), nullable=False, default=0)
+
     # Notes
     notes = Column(Text, nullable=True)
 
@@ -203,6 +208,7 @@ class StockLot(Base, TimestampMixin):
         Index('idx_stock_lot_source', 'source'),
         Index('idx_stock_lot_status', 'status'),
         Index('idx_stock_lot_purchase_date', 'purchase_date'),
+        Index('idx_stock_lot_key', 'source', 'account_id', 'symbol'),
     )
 
 
@@ -246,6 +252,7 @@ class StockLotSale(Base, TimestampMixin):
     # Wash sale tracking
     wash_sale = Column(Boolean, nullable=False, default=False)  # True if this is a wash sale
     wash_sale_disallowed = Column(Numeric(18, 2), nullable=True)  # Loss disallowed due to wash sale
+    basis_adjustment = Column(Numeric(18, 2), nullable=False, default=0)  # Carried-in wash-sale basis included in cost_basis
 
     # Notes
     notes = Column(Text, nullable=True)
@@ -258,5 +265,55 @@ class StockLotSale(Base, TimestampMixin):
         Index('idx_stock_lot_sale_tax_year', 'tax_year'),
         Index('idx_stock_lot_sale_date', 'sale_date'),
         Index('idx_stock_lot_sale_is_long_term', 'is_long_term'),
+        Index('idx_stock_lot_sale_transaction', 'sale_transaction_id'),
     )
 
+
+class WashSaleAdjustment(Base):
+    """
+    One wash-sale match: part of a loss sale's loss disallowed because
+    substantially identical shares (the replacement lot, or a purchase in a
+    retirement account) were acquired within 30 days before or after it.
+
+    The disallowed amount is added to the replacement lot's basis; a loss
+    washed by a retirement account purchase is lost. Rows are rewritten by
+    each wash-sale detection run.
+    """
+
+    __tablename__ = "wash_sale_adjustments"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    sale_id = Column(Integer, ForeignKey("stock_lot_sale.sale_id", ondelete="CASCADE"), nullable=False)
+    replacement_lot_id = Column(Integer, ForeignKey("stock_lot.lot_id", ondelete="CASCADE"), nullable=True)
+    replacement_transaction_id = Column(Integer, nullable=True)  # Retirement account purchase (no lot)
+    symbol = Column(String(20), nullable=False)
+    sale_date = Column(Date, nullable=False)
+    replacement_date = Column(Date, nullable=False)
+    quantity = Column(Numeric(18, 6), nullable=False)  # Replacement shares matched to the loss
+    disallowed_loss = Column(Numeric(18, 2), nullable=False)
+    tax_year = Column(Integer, nullable=False)  # Year of the loss sale
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        Index('idx_wash_sale_adj_sale', 'sale_id'),
+        Index('idx_wash_sale_adj_lot', 'replacement_lot_id'),
+        Index('idx_wash_sale_adj_tax_year', 'tax_year'),
+    )
+
+
+class TaxLotCheckpoint(Base):
+    """
+    Last investment transaction applied to stock lots by the lot engine.
+
+    A sync applies only transactions with a higher id, and advances the
+    checkpoint in the same commit as the lots and sales it writes.
+    """
+
+    __tablename__ = "tax_lot_checkpoints"
+
+    name = Column(String(50), primary_key=True)  # e.g. 'cost_basis'
+    last_transaction_id = Column(Integer, nullable=False, default=0)
+    last_transaction_date = Column(Date, nullable=True)
+    transactions_applied = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
@@ -16,6 +16,7 @@ from app.core.database import get_db
 from app.core.auth import get_current_user
 from app.modules.tax.models import IncomeTaxReturn
 from app.modules.tax.planning import get_tax_planning_analysis, TaxPlanningAnalysis
+from app.modules.tax.scenarios import run_scenario_sweep
 from app.modules.tax.forecast import calculate_tax_forecast
 from app.modules.tax.form_generator import generate_tax_forms, TaxFormPackage
 from app.modules.tax.pdf_generator import (
@@ -24,7 +25,7 @@ from app.modules.tax.pdf_generator import (
     generate_tax_forms_pdf
 )
 from app.modules.tax.cost_basis_service import CostBasisService
-from app.modules.tax.models import StockLot, StockLotSale
+from app.modules.tax.models import StockLot, StockLotSale, WashSaleAdjustment
 
 router = APIRouter()
 
@@ -248,6 +249,41 @@ async def get_planning_analysis(
     return get_tax_planning_analysis(db)
 
 
+class ScenarioSweepRequest(BaseModel):
+    """Lever values to sweep; omitted levers use the default grid."""
+    base_year: int = 2024
+    extra_401k: Optional[List[float]] = None
+    extra_ira: Optional[List[float]] = None
+    harvested_gains: Optional[List[float]] = None
+    charitable: Optional[List[float]] = None
+    payment_timing: Optional[List[str]] = None
+
+
+@router.post("/planning/scenarios/{year}")
+async def sweep_tax_scenarios(
+    year: int,
+    request: Optional[ScenarioSweepRequest] = None,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user)
+):
+    """
+    Evaluate every combination of year-end levers (extra 401k/IRA
+    contributions, gains/losses harvested, charitable gifts, estimated
+    payment timing) and return the efficient frontier of total tax vs.
+    cash committed.
+    """
+    request = request or ScenarioSweepRequest()
+    levers = {
+        name: value
+        for name, value in request.model_dump(exclude={"base_year"}).items()
+        if value is not None
+    }
+    try:
+        return run_scenario_sweep(db, year, base_year=request.base_year, levers=levers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/forecast/{year}")
 async def get_tax_forecast(
     year: int,
@@ -434,6 +470,115 @@ async def download_all_forms_pdf(
 
 # ==================== Cost Basis Tracking Endpoints ====================
 
+# Registered before /cost-basis/{year} so these paths are not parsed as a year
+
+@router.post("/cost-basis/wash-sales/detect")
+async def detect_wash_sales(
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user)
+):
+    """
+    Recompute wash-sale adjustments for all lot sales.
+
+    Loss sales with a same-symbol acquisition within 30 days (any account,
+    IRAs included) get their loss disallowed; the disallowed amount is added
+    to the replacement shares' basis. Also run by /cost-basis/sync.
+    """
+    from app.modules.tax.wash_sales import rebuild_wash_sales
+
+    result = rebuild_wash_sales(db)
+    return {
+        "success": True,
+        "wash_sales": result.wash_sales,
+        "adjustments": result.adjustments,
+        "disallowed_loss": float(result.disallowed_loss),
+        "sales_updated": result.sales_updated,
+        "lots_updated": result.lots_updated,
+        "by_year": result.by_year,
+    }
+
+
+@router.get("/cost-basis/wash-sales/{year}")
+async def get_wash_sale_adjustments(
+    year: int,
+    symbol: Optional[str] = Query(default=None),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user)
+):
+    """Get the wash-sale adjustments for loss sales in a tax year."""
+    query = db.query(WashSaleAdjustment).filter(WashSaleAdjustment.tax_year == year)
+    if symbol:
+        query = query.filter(WashSaleAdjustment.symbol == symbol.upper())
+    adjustments = query.order_by(WashSaleAdjustment.sale_date, WashSaleAdjustment.id).all()
+
+    return {
+        "tax_year": year,
+        "adjustments": [
+            {
+                "sale_id": adj.sale_id,
+                "replacement_lot_id": adj.replacement_lot_id,
+                "replacement_transaction_id": adj.replacement_transaction_id,
+                "symbol": adj.symbol,
+                "sale_date": adj.sale_date.isoformat(),
+                "replacement_date": adj.replacement_date.isoformat(),
+                "quantity": float(adj.quantity),
+                "disallowed_loss": float(adj.disallowed_loss),
+            }
+            for adj in adjustments
+        ],
+        "total_disallowed": float(sum(adj.disallowed_loss for adj in adjustments)),
+        "count": len(adjustments)
+    }
+
+
+@router.get("/cost-basis/unrealized")
+async def get_unrealized_gains(
+    symbol: Optional[str] = Query(default=None),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user)
+):
+    """
+    Get unrealized gains for open positions, priced with one batched
+    quote snapshot.
+    """
+    from app.modules.tax.harvest_scanner import load_open_lots, quote_snapshot
+
+    service = CostBasisService(db)
+    current_prices = quote_snapshot(load_open_lots(db, symbol=symbol).symbol.tolist())
+    summary = service.get_unrealized_gains(current_prices, symbol=symbol)
+    summary["missing_prices"] = sorted(set(summary["by_symbol"]) - set(current_prices))
+    return summary
+
+
+@router.get("/cost-basis/harvest")
+async def get_harvest_candidates(
+    min_loss: float = Query(default=100, description="Smallest loss to report"),
+    limit: int = Query(default=25, le=200),
+    planned: List[str] = Query(default=[], description="Planned buys as SYMBOL:YYYY-MM-DD"),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user)
+):
+    """
+    Rank tax-loss-harvest candidates among the open lots.
+
+    Each candidate carries its tax savings at the forecast's marginal rates
+    and any wash-sale conflicts (acquisitions of the symbol in the last 30
+    days in any account, or planned buys in the next 30).
+    """
+    from datetime import date as date_type
+    from app.modules.tax.harvest_scanner import scan_harvest_candidates
+
+    planned_buys: Dict[str, List] = {}
+    try:
+        for entry in planned:
+            planned_symbol, planned_date = entry.split(":", 1)
+            planned_buys.setdefault(planned_symbol.upper(), []).append(date_type.fromisoformat(planned_date))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="planned must be SYMBOL:YYYY-MM-DD")
+
+    return scan_harvest_candidates(db, planned_buys=planned_buys, min_loss=min_loss, limit=limit)
+
+
 @router.get("/cost-basis/{year}")
 async def get_capital_gains_summary(
     year: int,
@@ -485,6 +630,7 @@ async def get_realized_gains(
             "holding_period_days": sale.holding_period_days,
             "is_long_term": sale.is_long_term,
             "wash_sale": sale.wash_sale,
+            "wash_sale_disallowed": float(sale.wash_sale_disallowed or 0),
             "notes": sale.notes
         })
 
@@ -544,44 +690,6 @@ async def get_stock_lots(
     }
 
 
-@router.get("/cost-basis/unrealized")
-async def get_unrealized_gains(
-    symbol: Optional[str] = Query(default=None),
-    db: Session = Depends(get_db),
-    user=Depends(get_current_user)
-):
-    """
-    Get unrealized gains for open positions.
-
-    Note: This endpoint requires current market prices.
-    Currently returns placeholder data. Will be enhanced to fetch live prices.
-    """
-    service = CostBasisService(db)
-
-    # TODO: Fetch current prices from market data API
-    # For now, return 0 to indicate this feature needs price data
-    current_prices = {}
-
-    lots = service.get_open_lots(symbol=symbol)
-
-    # Return lot information without unrealized gains until we have price data
-    results = []
-    for lot in lots:
-        results.append({
-            "symbol": lot.symbol,
-            "quantity_remaining": float(lot.quantity_remaining),
-            "cost_basis": float(lot.cost_per_share * lot.quantity_remaining),
-            "cost_per_share": float(lot.cost_per_share),
-            "purchase_date": lot.purchase_date.isoformat(),
-            "note": "Current price data needed for unrealized gain calculation"
-        })
-
-    return {
-        "open_positions": results,
-        "note": "Market data integration required for unrealized gains"
-    }
-
-
 @router.post("/cost-basis/lots")
 async def create_stock_lot(
     lot_data: Dict[str, Any],
@@ -744,121 +852,32 @@ async def sync_from_investment_transactions(
     """
     Sync Cost Basis Tracker from existing investment_transactions table.
     
-    This imports all BUY and SELL transactions from your investment accounts
-    into the Cost Basis Tracker for accurate gain/loss calculations.
+    Applies the BUY and SELL transactions from taxable accounts that were
+    added since the last sync (the lot engine's checkpoint). With
+    clear_existing, all lots are deleted and the full history is replayed.
     """
-    from sqlalchemy import text
-    from datetime import datetime
-    from decimal import Decimal
-    
-    service = CostBasisService(db)
+    from app.modules.tax.lot_engine import sync_lots
     
     # Optionally clear existing data
     if clear_existing:
         db.query(StockLotSale).delete()
         db.query(StockLot).delete()
-        db.commit()
     
-    # Query all BUY and SELL transactions from taxable accounts
-    # Exclude retirement accounts (IRA, Roth, 401k, HSA)
-    non_taxable_types = ['ira', 'roth_ira', 'traditional_ira', '401k', 'hsa', 'retirement']
-    
-    query = text("""
-        SELECT 
-            it.transaction_date,
-            it.transaction_type,
-            it.symbol,
-            it.quantity,
-            it.amount,
-            it.price_per_share,
-            it.account_id,
-            it.source
-        FROM investment_transactions it
-        JOIN investment_accounts ia ON it.account_id = ia.account_id AND it.source = ia.source
-        WHERE it.transaction_type IN ('BUY', 'BOUGHT', 'SELL', 'SOLD')
-          AND it.symbol IS NOT NULL 
-          AND it.symbol != ''
-          AND it.quantity > 0
-          AND LOWER(COALESCE(ia.account_type, '')) NOT IN :non_taxable
-        ORDER BY it.transaction_date ASC
-    """)
-    
-    result = db.execute(query, {"non_taxable": tuple(non_taxable_types)}).fetchall()
-    
-    lots_created = 0
-    sales_created = 0
-    errors = []
-    
-    for row in result:
-        try:
-            txn_date = row.transaction_date
-            txn_type = row.transaction_type.upper()
-            symbol = row.symbol.upper()
-            quantity = Decimal(str(abs(row.quantity or 0)))
-            amount = Decimal(str(abs(row.amount or 0)))
-            account_id = row.account_id or "unknown"
-            source = row.source or "unknown"
-            
-            if quantity <= 0 or amount <= 0:
-                continue
-            
-            if txn_type in ["BUY", "BOUGHT"]:
-                # Check if lot already exists (avoid duplicates)
-                existing = db.query(StockLot).filter(
-                    StockLot.symbol == symbol,
-                    StockLot.purchase_date == txn_date,
-                    StockLot.quantity == quantity,
-                    StockLot.cost_basis == amount
-                ).first()
-                
-                if not existing:
-                    service.create_lot(
-                        symbol=symbol,
-                        purchase_date=txn_date,
-                        quantity=quantity,
-                        cost_basis=amount,
-                        source=source,
-                        account_id=account_id,
-                        lot_method="FIFO"
-                    )
-                    lots_created += 1
-                    
-            elif txn_type in ["SELL", "SOLD"]:
-                # Check if sale already exists
-                existing = db.query(StockLotSale).filter(
-                    StockLotSale.sale_date == txn_date,
-                    StockLotSale.quantity_sold == quantity,
-                    StockLotSale.proceeds == amount
-                ).first()
-                
-                if not existing:
-                    try:
-                        sales = service.process_sale(
-                            symbol=symbol,
-                            sale_date=txn_date,
-                            quantity_sold=quantity,
-                            proceeds=amount,
-                            source=source,
-                            account_id=account_id,
-                            lot_method="FIFO"
-                        )
-                        sales_created += len(sales)
-                    except ValueError as e:
-                        # No matching lots found - this can happen if buy was before our data
-                        errors.append(f"{symbol} on {txn_date}: {str(e)}")
-                        
-        except Exception as e:
-            errors.append(f"Error processing {row}: {str(e)}")
-            db.rollback()
+    result = sync_lots(db, rebuild=clear_existing)
+    errors = result.errors
     
     return {
         "success": True,
-        "lots_created": lots_created,
-        "sales_created": sales_created,
-        "transactions_processed": len(result),
+        "lots_created": result.lots_created,
+        "lots_updated": result.lots_updated,
+        "sales_created": result.sales_created,
+        "transactions_processed": result.transactions_processed,
+        "rebuilt_keys": result.rebuilt_keys,
+        "wash_sales": result.wash_sales,
+        "checkpoint_transaction_id": result.last_transaction_id,
         "errors": errors[:10] if errors else [],  # Limit errors shown
         "total_errors": len(errors),
-        "message": f"Synced {lots_created} lots and {sales_created} sales from investment transactions"
+        "message": f"Synced {result.lots_created} lots and {result.sales_created} sales from investment transactions"
     }
 
 
@@ -0,0 +1,367 @@
+"""
+Vectorized tax scenario sweep.
+
+calculate_tax_forecast() evaluates one fixed set of inputs, so a year-end
+question ("how much more should go into the 401(k), which losses should we
+harvest, how much should we give?") meant one full forecast - a DB pass
+plus Python bracket loops - per combination.
+
+run_scenario_sweep() loads the forecast inputs once and sweep_scenarios()
+evaluates every combination of the levers at the same time with NumPy:
+
+- extra_401k: additional pre-tax 401(k) deferrals (reduce W-2 wages)
+- extra_ira: additional deductible traditional IRA contributions
+- harvested_gains: gains (positive) or losses (negative) realized before year end
+- charitable: additional itemized charitable contributions
+- payment_timing: how the estimated payments are spread over the quarters
+
+Income taxes use cumulative bracket tables: with bracket starts s and
+rates r, base[i] is the tax on income up to s[i], so
+tax(x) = base[k] + (x - s[k]) * r[k] with k = searchsorted(s, x) - 1.
+AGI, deductions, NIIT and the underpayment penalty follow the rules of
+forecast.py, applied elementwise.
+
+The efficient frontier keeps the scenarios that no other scenario beats on
+both total cost (tax plus penalty) and cash committed (contributions plus
+gifts).
+"""
+
+import json
+import logging
+from dataclasses import asdict, dataclass, field, replace
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.modules.tax.models import IncomeTaxReturn
+from app.modules.tax.forecast import (
+    CA_MENTAL_HEALTH_RATE,
+    CA_MENTAL_HEALTH_THRESHOLD,
+    CA_PENALTY_MIN_BALANCE,
+    CA_PENALTY_RATE,
+    CAPITAL_LOSS_LIMIT,
+    FEDERAL_PENALTY_MIN_BALANCE,
+    FEDERAL_PENALTY_RATE,
+    NIIT_RATE,
+    NIIT_THRESHOLD,
+    REQUIRED_QUARTERLY_PERCENTAGES,
+    W2_MONTHS,
+    _ca_brackets,
+    _federal_brackets,
+    _get_forecast_income,
+    _payment_schedule,
+    _standard_deduction,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# 2025 contribution limits per person
+K401_LIMIT = 23500
+IRA_LIMIT = 7000
+
+# Cumulative share of the year's estimated payments made by each quarter
+PAYMENT_TIMINGS = {
+    "quarterly": (0.25, 0.50, 0.75, 1.00),
+    "year_end": (0.0, 0.0, 0.0, 1.00),
+    "with_return": (0.0, 0.0, 0.0, 0.0),  # nothing until the return is filed
+}
+
+# Largest grid evaluated in one sweep
+MAX_SCENARIOS = 250_000
+
+
+class BracketTable:
+    """(bracket start, rate) pairs as arrays with the tax owed at each start."""
+
+    def __init__(self, brackets: Sequence[Tuple[float, float]]):
+        self.starts = np.array([start for start, _ in brackets], dtype=float)
+        self.rates = np.array([rate for _, rate in brackets], dtype=float)
+        self.base = np.concatenate(([0.0], np.cumsum(np.diff(self.starts) * self.rates[:-1])))
+
+    def tax(self, taxable_income: np.ndarray) -> np.ndarray:
+        income = np.maximum(np.asarray(taxable_income, dtype=float), 0.0)
+        k = np.searchsorted(self.starts, income, side="right") - 1
+        return self.base[k] + (income - self.starts[k]) * self.rates[k]
+
+
+@dataclass
+class ScenarioInputs:
+    """The forecast inputs the levers act on."""
+    year: int
+    filing_status: str
+    wages: float
+    investment_income: float  # options + dividends + interest (taxable accounts)
+    rental_income: float
+    rental_depreciation: float
+    net_short_term: float
+    net_long_term: float
+    above_line_deductions: float  # IRA + HSA already contributed
+    itemized_total: float
+    payroll_taxes: float
+    federal_withheld: float
+    state_withheld: float
+    prior_federal_tax: float
+    prior_state_tax: float
+    k401_contributed: float = 0.0
+    earners: int = 1
+
+
+@dataclass
+class ScenarioGrid:
+    """Values to try for each lever; every combination is evaluated."""
+    extra_401k: List[float] = field(default_factory=lambda: [0.0])
+    extra_ira: List[float] = field(default_factory=lambda: [0.0])
+    harvested_gains: List[float] = field(default_factory=lambda: [0.0])
+    charitable: List[float] = field(default_factory=lambda: [0.0])
+    payment_timing: List[str] = field(default_factory=lambda: ["quarterly"])
+
+    @property
+    def size(self) -> int:
+        return (len(self.extra_401k) * len(self.extra_ira) * len(self.harvested_gains)
+                * len(self.charitable) * len(self.payment_timing))
+
+
+def _steps(limit: float, step: float) -> List[float]:
+    """0, step, 2*step, ... up to and including `limit`."""
+    if limit <= 0:
+        return [0.0]
+    values = list(np.arange(0.0, limit, step))
+    return [float(v) for v in values] + [float(limit)]
+
+
+def default_grid(inputs: ScenarioInputs) -> ScenarioGrid:
+    """Contribution room from the limits, +/-$50k of harvesting, up to $50k of gifts."""
+    k401_room = max(0.0, K401_LIMIT * inputs.earners - inputs.k401_contributed)
+    return ScenarioGrid(
+        extra_401k=_steps(k401_room, 5000),
+        extra_ira=_steps(IRA_LIMIT * inputs.earners, 1000),
+        harvested_gains=[float(v) for v in range(-50000, 50001, 5000)],
+        charitable=[float(v) for v in range(0, 50001, 5000)],
+        payment_timing=list(PAYMENT_TIMINGS),
+    )
+
+
+def scenario_inputs(db: Session, forecast_year: int, base_year: int) -> ScenarioInputs:
+    """Load the forecast inputs once (same sources as calculate_tax_forecast)."""
+    base_return = db.query(IncomeTaxReturn).filter(IncomeTaxReturn.tax_year == base_year).first()
+    if not base_return:
+        raise ValueError(f"No tax return found for base year {base_year}")
+
+    base_details = {}
+    if base_return.details_json:
+        try:
+            base_details = json.loads(base_return.details_json)
+        except ValueError:
+            pass
+
+    income = _get_forecast_income(db, forecast_year)
+    w2 = income.get("w2_income", {})
+    cap_gains = income.get("capital_gains", {})
+    retirement = income.get("retirement_contributions", {})
+    employees = {entry.get("employee_name") for entry in w2.get("breakdown", [])}
+
+    return ScenarioInputs(
+        year=forecast_year,
+        filing_status=base_return.filing_status or "MFJ",
+        wages=w2.get("total_wages", 0),
+        investment_income=(income.get("options_income", 0) + income.get("dividend_income", 0)
+                           + income.get("interest_income", 0)),
+        rental_income=income.get("rental_income", 0),
+        rental_depreciation=income.get("rental_depreciation", 0),
+        net_short_term=cap_gains.get("net_short_term", 0),
+        net_long_term=cap_gains.get("net_long_term", 0),
+        above_line_deductions=retirement.get("ira_deduction", 0) + retirement.get("hsa_contribution", 0),
+        itemized_total=base_details.get("deductions", {}).get("itemized_total", 0),
+        payroll_taxes=w2.get("social_security", 0) + w2.get("medicare", 0),
+        federal_withheld=w2.get("federal_withheld", 0),
+        state_withheld=w2.get("state_withheld", 0),
+        prior_federal_tax=float(base_return.federal_tax or 0),
+        prior_state_tax=float(base_return.state_tax or 0),
+        k401_contributed=retirement.get("k401_total", 0),
+        earners=max(1, len(employees)),
+    )
+
+
+@dataclass
+class ScenarioSweep:
+    """One array per lever and outcome, aligned by scenario."""
+    levers: Dict[str, np.ndarray]
+    outcomes: Dict[str, np.ndarray]
+    timing_names: List[str]
+
+    def __len__(self) -> int:
+        return len(self.outcomes["total_cost"])
+
+    def scenario(self, index: int) -> Dict[str, Any]:
+        row = {name: float(values[index]) for name, values in self.levers.items() if name != "payment_timing"}
+        row["payment_timing"] = self.timing_names[int(self.levers["payment_timing"][index])]
+        row.update({name: round(float(values[index]), 2) for name, values in self.outcomes.items()})
+        return row
+
+    def efficient_frontier(self) -> np.ndarray:
+        """
+        Indices of the scenarios not dominated on (total cost, cash committed),
+        ordered by cash committed.
+        """
+        cost = self.outcomes["total_cost"]
+        cash = self.outcomes["cash_committed"]
+        order = np.lexsort((cost, cash))  # by cash, then cost
+        sorted_cost = cost[order]
+        best_before = np.concatenate(([np.inf], np.minimum.accumulate(sorted_cost)[:-1]))
+        return order[sorted_cost < best_before - 0.005]
+
+
+def _penalty(
+    tax: np.ndarray,
+    safe_harbor: np.ndarray,
+    withheld: float,
+    w2_cumulative: np.ndarray,
+    timing: np.ndarray,
+    days: np.ndarray,
+    rate: float,
+    min_balance: float,
+) -> np.ndarray:
+    """_calculate_underpayment_penalty for one jurisdiction, per scenario."""
+    estimated = np.maximum(0.0, safe_harbor - withheld)
+    paid = w2_cumulative[None, :] + timing * estimated[:, None]
+    required = safe_harbor[:, None] * np.array(REQUIRED_QUARTERLY_PERCENTAGES)[None, :]
+    penalty = (np.maximum(0.0, required - paid) * (rate * days / 365)[None, :]).sum(axis=1)
+
+    total_paid = paid[:, -1]
+    waived = (total_paid >= safe_harbor) | (np.maximum(0.0, tax - total_paid) < min_balance)
+    return np.where(waived, 0.0, penalty)
+
+
+def _safe_harbor(prior_tax: float, current_tax: np.ndarray) -> np.ndarray:
+    if prior_tax > 0:
+        return np.minimum(prior_tax * 1.10, current_tax * 0.90)
+    return current_tax * 0.90
+
+
+def sweep_scenarios(inputs: ScenarioInputs, grid: ScenarioGrid) -> ScenarioSweep:
+    """Evaluate every combination of the grid's levers."""
+    if grid.size == 0:
+        raise ValueError("Every lever needs at least one value")
+    if grid.size > MAX_SCENARIOS:
+        raise ValueError(f"Scenario grid has {grid.size} combinations (max {MAX_SCENARIOS})")
+    unknown = [name for name in grid.payment_timing if name not in PAYMENT_TIMINGS]
+    if unknown:
+        raise ValueError(f"Unknown payment timing: {', '.join(unknown)}")
+
+    axes = np.meshgrid(
+        np.asarray(grid.extra_401k, dtype=float),
+        np.asarray(grid.extra_ira, dtype=float),
+        np.asarray(grid.harvested_gains, dtype=float),
+        np.asarray(grid.charitable, dtype=float),
+        np.arange(len(grid.payment_timing)),
+        indexing="ij",
+    )
+    extra_401k, extra_ira, harvested, charitable, timing_index = (axis.ravel() for axis in axes)
+
+    # AGI (_calculate_agi)
+    rental = inputs.rental_income
+    if rental > 0:
+        rental -= min(inputs.rental_depreciation, rental)
+    net_capital_gain = inputs.net_short_term + inputs.net_long_term + harvested
+    agi = (
+        inputs.wages - extra_401k
+        + inputs.investment_income
+        + rental
+        + np.maximum(net_capital_gain, -CAPITAL_LOSS_LIMIT)
+        - inputs.above_line_deductions
+        - extra_ira
+    )
+
+    # Taxable income (_calculate_taxable_income)
+    itemized = inputs.itemized_total + charitable
+    standard = _standard_deduction(inputs.year)
+    deduction = np.where(itemized > 0, np.maximum(standard, itemized), standard)
+    taxable_income = np.maximum(0.0, agi - deduction)
+
+    # Income taxes (_calculate_federal_tax, _calculate_ca_state_tax)
+    federal_tax = BracketTable(_federal_brackets(inputs.filing_status, inputs.year)).tax(taxable_income)
+    state_tax = BracketTable(_ca_brackets(inputs.filing_status, inputs.year)).tax(taxable_income)
+    state_tax += np.maximum(0.0, taxable_income - CA_MENTAL_HEALTH_THRESHOLD) * CA_MENTAL_HEALTH_RATE
+
+    # Payroll and NIIT (_calculate_other_taxes)
+    investment_income = (
+        inputs.investment_income + net_capital_gain
+        + max(0.0, inputs.rental_income - inputs.rental_depreciation)
+    )
+    niit_base = np.minimum(investment_income, agi - NIIT_THRESHOLD)
+    niit = np.where((agi > NIIT_THRESHOLD) & (investment_income > 0), niit_base * NIIT_RATE, 0.0)
+    other_tax = inputs.payroll_taxes + niit
+
+    # Underpayment penalty for the chosen payment timing
+    schedule = _payment_schedule(inputs.year)
+    due_dates = [q["due_date"] for q in schedule]
+    next_dates = due_dates[1:] + [date(inputs.year + 1, 4, 15)]
+    days = np.array([(end - start).days for start, end in zip(due_dates, next_dates)], dtype=float)
+    w2_share = np.cumsum([sum(1 for m in q["months"] if m <= W2_MONTHS) for q in schedule]) / W2_MONTHS
+    timing = np.array([PAYMENT_TIMINGS[name] for name in grid.payment_timing])[timing_index]
+
+    penalty = (
+        _penalty(federal_tax, _safe_harbor(inputs.prior_federal_tax, federal_tax), inputs.federal_withheld,
+                 w2_share * inputs.federal_withheld, timing, days, FEDERAL_PENALTY_RATE, FEDERAL_PENALTY_MIN_BALANCE)
+        + _penalty(state_tax, _safe_harbor(inputs.prior_state_tax, state_tax), inputs.state_withheld,
+                   w2_share * inputs.state_withheld, timing, days, CA_PENALTY_RATE, CA_PENALTY_MIN_BALANCE)
+    )
+
+    total_tax = federal_tax + state_tax + other_tax
+    return ScenarioSweep(
+        levers={
+            "extra_401k": extra_401k,
+            "extra_ira": extra_ira,
+            "harvested_gains": harvested,
+            "charitable": charitable,
+            "payment_timing": timing_index,
+        },
+        outcomes={
+            "agi": agi,
+            "taxable_income": taxable_income,
+            "federal_tax": federal_tax,
+            "state_tax": state_tax,
+            "other_tax": other_tax,
+            "penalty": penalty,
+            "total_tax": total_tax,
+            "total_cost": total_tax + penalty,
+            "cash_committed": extra_401k + extra_ira + charitable,
+        },
+        timing_names=list(grid.payment_timing),
+    )
+
+
+def run_scenario_sweep(
+    db: Session,
+    forecast_year: int,
+    base_year: int = 2024,
+    levers: Optional[Dict[str, List[Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Sweep default_grid() with any lever values in `levers` replacing the
+    defaults, and report the efficient frontier.
+    """
+    inputs = scenario_inputs(db, forecast_year, base_year)
+    grid = replace(default_grid(inputs), **(levers or {}))
+    sweep = sweep_scenarios(inputs, grid)
+
+    baseline = sweep_scenarios(inputs, ScenarioGrid()).scenario(0)
+    frontier = []
+    for index in sweep.efficient_frontier():
+        point = sweep.scenario(int(index))
+        point["tax_savings"] = round(baseline["total_cost"] - point["total_cost"], 2)
+        frontier.append(point)
+
+    logger.info(f"[TAX_SCENARIOS] {forecast_year}: {len(sweep)} scenarios, {len(frontier)} on the frontier")
+    return {
+        "tax_year": forecast_year,
+        "base_year": base_year,
+        "inputs": asdict(inputs),
+        "grid": asdict(grid),
+        "scenarios_evaluated": len(sweep),
+        "baseline": baseline,
+        "frontier": frontier,
+    }
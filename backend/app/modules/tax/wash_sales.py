@@ -0,0 +1,362 @@
+"""
+Wash-sale detection over stock lots and lot sales.
+
+Wash sales were a TODO: every StockLotSale was written with
+wash_sale=False, so the capital gains summary, the tax forecast and
+Schedule D counted the full loss of a sale followed (or preceded) by a
+rebuy of the same shares.
+
+detect_wash_sales() recomputes every adjustment from the stored lots and
+sales:
+
+1. Restores each sale's and lot's unadjusted basis (basis_adjustment /
+   wash_sale_basis_adjustment record what the previous run added).
+2. Builds an AcquisitionIndex: per symbol, lot purchase dates and the
+   purchases in IRA/401k/HSA accounts (which have no lots) in sorted
+   order. A loss sale's candidate replacements are one bisect interval
+   query over [sale_date - 30, sale_date + 30], across all accounts.
+3. Walks the sales in date order. For a loss, replacement shares are taken
+   from the candidates in acquisition order (excluding the sold lot, lots
+   sold in the same trade, shares already sold and shares already used as
+   a replacement). The loss per share times the matched shares is
+   disallowed and added to the basis of exactly those replacement shares,
+   so the replacement lot's later sales of them carry the higher basis -
+   and a loss on those can wash again. A loss washed by a retirement
+   account purchase is disallowed without a basis adjustment.
+4. Writes changed sales and lots with bulk UPDATEs and the matches as
+   WashSaleAdjustment rows.
+
+Substantially identical means the same symbol. Holding periods of
+replacement shares are not extended. A lot's sales use up its adjusted
+(replacement) shares before its other shares.
+"""
+
+import logging
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from app.ingestion.bulk_writer import CHUNK_SIZE
+from app.modules.tax.models import StockLot, StockLotSale, WashSaleAdjustment
+
+logger = logging.getLogger(__name__)
+
+
+# Days before and after a loss sale in which an acquisition is a replacement
+WASH_SALE_WINDOW_DAYS = 30
+
+_CENT = Decimal('0.01')
+_ZERO = Decimal(0)
+
+
+@dataclass
+class WashLot:
+    """
+    A lot as an acquisition and a source of sales, or (lot_id None) a
+    purchase in a retirement account, which is only an acquisition.
+    """
+    lot_id: Optional[int]
+    symbol: str
+    purchase_date: date
+    quantity: Decimal
+    transaction_id: Optional[int] = None  # retirement purchases
+    sold: Decimal = _ZERO  # shares sold by the sales processed so far
+    used: Decimal = _ZERO  # shares already matched as a replacement
+    adjustment: Decimal = _ZERO  # disallowed loss carried into the lot
+    # Unsold replacement shares as [quantity, adjustment per share], oldest first
+    adjusted: List[List[Decimal]] = field(default_factory=list)
+
+    @property
+    def retirement(self) -> bool:
+        return self.lot_id is None
+
+    @property
+    def replacement_shares(self) -> Decimal:
+        if self.retirement:
+            return max(_ZERO, self.quantity - self.used)
+        unsold_adjusted = sum((shares for shares, _ in self.adjusted), _ZERO)
+        return max(_ZERO, self.quantity - self.sold - unsold_adjusted)
+
+    def carry(self, quantity: Decimal, disallowed: Decimal) -> None:
+        """Add a disallowed loss to the basis of `quantity` replacement shares."""
+        self.used += quantity
+        if self.retirement:
+            return
+        self.adjustment += disallowed
+        self.adjusted.append([quantity, disallowed / quantity])
+
+    def sell(self, quantity: Decimal) -> Decimal:
+        """Record a sale; returns the carried basis of the shares it sold."""
+        self.sold += quantity
+        carried = _ZERO
+        while quantity > 0 and self.adjusted:
+            tranche = self.adjusted[0]
+            shares = min(quantity, tranche[0])
+            carried += shares * tranche[1]
+            quantity -= shares
+            tranche[0] -= shares
+            if tranche[0] <= 0:
+                self.adjusted.pop(0)
+        return carried
+
+
+@dataclass
+class WashSale:
+    """A lot sale with its unadjusted figures."""
+    sale_id: int
+    lot_id: int
+    sale_date: date
+    sale_transaction_id: Optional[int]
+    quantity_sold: Decimal
+    raw_cost_basis: Decimal
+    raw_gain_loss: Decimal
+    basis_adjustment: Decimal = _ZERO
+    disallowed: Decimal = _ZERO
+
+    @property
+    def cost_basis(self) -> Decimal:
+        return self.raw_cost_basis + self.basis_adjustment
+
+    @property
+    def gain_loss(self) -> Decimal:
+        return self.raw_gain_loss - self.basis_adjustment
+
+
+@dataclass
+class WashMatch:
+    """One disallowed-loss record."""
+    sale: WashSale
+    replacement: WashLot
+    quantity: Decimal
+    disallowed_loss: Decimal
+
+
+class AcquisitionIndex:
+    """Per-symbol acquisition dates in sorted order, for interval queries."""
+
+    def __init__(self, lots: Iterable[WashLot]):
+        by_symbol: Dict[str, List[WashLot]] = defaultdict(list)
+        for lot in lots:
+            by_symbol[lot.symbol].append(lot)
+        self._lots: Dict[str, List[WashLot]] = {}
+        self._dates: Dict[str, List[date]] = {}
+        for symbol, symbol_lots in by_symbol.items():
+            symbol_lots.sort(key=lambda lot: (lot.purchase_date, lot.retirement, lot.lot_id or lot.transaction_id or 0))
+            self._lots[symbol] = symbol_lots
+            self._dates[symbol] = [lot.purchase_date for lot in symbol_lots]
+
+    def between(self, symbol: str, start: date, end: date) -> List[WashLot]:
+        """Lots of `symbol` acquired from `start` to `end` inclusive, oldest first."""
+        dates = self._dates.get(symbol)
+        if not dates:
+            return []
+        return self._lots[symbol][bisect_left(dates, start):bisect_right(dates, end)]
+
+
+@dataclass
+class WashSaleResult:
+    """Outcome of one detection run."""
+    wash_sales: int = 0
+    adjustments: int = 0
+    disallowed_loss: Decimal = _ZERO
+    sales_updated: int = 0
+    lots_updated: int = 0
+    by_year: Dict[int, float] = field(default_factory=dict)
+
+
+def match_wash_sales(lots: Iterable[WashLot], sales: Iterable[WashSale]) -> List[WashMatch]:
+    """
+    Find wash sales and carry their disallowed losses into replacement lots.
+
+    Updates the WashSale/WashLot objects in place and returns the matches.
+    """
+    lots = list(lots)
+    lots_by_id = {lot.lot_id: lot for lot in lots if not lot.retirement}
+    index = AcquisitionIndex(lots)
+    window = timedelta(days=WASH_SALE_WINDOW_DAYS)
+    sales = sorted(sales, key=lambda s: (s.sale_date, s.sale_id))
+
+    # Lots sold together in one trade are not replacements for each other
+    trade_lots: Dict[int, set] = defaultdict(set)
+    for sale in sales:
+        if sale.sale_transaction_id is not None:
+            trade_lots[sale.sale_transaction_id].add(sale.lot_id)
+
+    matches = []
+    for sale in sales:
+        lot = lots_by_id.get(sale.lot_id)
+        if lot is None:
+            continue
+
+        sale.basis_adjustment = lot.sell(sale.quantity_sold).quantize(_CENT)
+        sale.disallowed = _ZERO
+
+        if sale.gain_loss >= 0 or sale.quantity_sold <= 0:
+            continue
+
+        excluded = trade_lots.get(sale.sale_transaction_id, set()) | {sale.lot_id}
+        loss_per_share = -sale.gain_loss / sale.quantity_sold
+        needed = sale.quantity_sold
+
+        for candidate in index.between(lot.symbol, sale.sale_date - window, sale.sale_date + window):
+            if needed <= 0:
+                break
+            if candidate.lot_id in excluded:
+                continue
+            available = candidate.replacement_shares
+            if available <= 0:
+                continue
+
+            quantity = min(needed, available)
+            disallowed = (loss_per_share * quantity).quantize(_CENT)
+            candidate.carry(quantity, disallowed)
+            sale.disallowed += disallowed
+            needed -= quantity
+            matches.append(WashMatch(sale=sale, replacement=candidate, quantity=quantity, disallowed_loss=disallowed))
+
+    return matches
+
+
+def _retirement_purchases(db: Session) -> List[WashLot]:
+    """Purchases in IRA/401k/HSA accounts; they replace shares sold at a loss elsewhere."""
+    from app.modules.investments.account_types import non_taxable_account_type
+    from app.modules.investments.models import InvestmentAccount, InvestmentTransaction
+    from app.modules.tax.lot_engine import BUY_TYPES
+
+    txn = InvestmentTransaction
+    rows = db.query(
+        txn.id, txn.symbol, txn.transaction_date, txn.quantity,
+    ).join(
+        InvestmentAccount,
+        (InvestmentAccount.account_id == txn.account_id) & (InvestmentAccount.source == txn.source),
+    ).filter(
+        txn.transaction_type.in_(BUY_TYPES),
+        txn.symbol.isnot(None),
+        txn.symbol != '',
+        txn.quantity > 0,
+        non_taxable_account_type(InvestmentAccount.account_type),
+    ).all()
+    return [
+        WashLot(lot_id=None, transaction_id=row.id, symbol=row.symbol.upper(),
+                purchase_date=row.transaction_date, quantity=Decimal(str(row.quantity)))
+        for row in rows
+    ]
+
+
+def _load(db: Session) -> Tuple[List[WashLot], List[WashSale], Dict[int, Tuple[Any, ...]], Dict[int, Any]]:
+    lot_rows = db.query(
+        StockLot.lot_id, StockLot.symbol, StockLot.purchase_date, StockLot.quantity,
+        StockLot.wash_sale_basis_adjustment,
+    ).all()
+    sale_rows = db.query(
+        StockLotSale.sale_id, StockLotSale.lot_id, StockLotSale.sale_date, StockLotSale.sale_transaction_id,
+        StockLotSale.quantity_sold, StockLotSale.cost_basis, StockLotSale.gain_loss,
+        StockLotSale.basis_adjustment, StockLotSale.wash_sale, StockLotSale.wash_sale_disallowed,
+    ).all()
+
+    lots = [
+        WashLot(lot_id=row.lot_id, symbol=row.symbol.upper(), purchase_date=row.purchase_date,
+                quantity=Decimal(str(row.quantity)))
+        for row in lot_rows
+    ]
+    lots.extend(_retirement_purchases(db))
+    sales = []
+    stored_sales = {}
+    for row in sale_rows:
+        adjustment = Decimal(str(row.basis_adjustment or 0))
+        sales.append(WashSale(
+            sale_id=row.sale_id,
+            lot_id=row.lot_id,
+            sale_date=row.sale_date,
+            sale_transaction_id=row.sale_transaction_id,
+            quantity_sold=Decimal(str(row.quantity_sold)),
+            raw_cost_basis=Decimal(str(row.cost_basis)) - adjustment,
+            raw_gain_loss=Decimal(str(row.gain_loss)) + adjustment,
+        ))
+        stored_sales[row.sale_id] = (adjustment, bool(row.wash_sale), Decimal(str(row.wash_sale_disallowed or 0)))
+    stored_lots = {row.lot_id: Decimal(str(row.wash_sale_basis_adjustment or 0)) for row in lot_rows}
+    return lots, sales, stored_sales, stored_lots
+
+
+def detect_wash_sales(db: Session) -> WashSaleResult:
+    """Recompute every wash-sale adjustment from stored lots and sales. Does not commit."""
+    lots, sales, stored_sales, stored_lots = _load(db)
+    matches = match_wash_sales(lots, sales)
+    now = datetime.utcnow()
+
+    changed_sales = [
+        {
+            "sale_id": sale.sale_id,
+            "cost_basis": sale.cost_basis,
+            "gain_loss": sale.gain_loss,
+            "basis_adjustment": sale.basis_adjustment,
+            "wash_sale": sale.disallowed > 0,
+            "wash_sale_disallowed": sale.disallowed if sale.disallowed > 0 else None,
+            "updated_at": now,
+        }
+        for sale in sales
+        if stored_sales[sale.sale_id] != (sale.basis_adjustment, sale.disallowed > 0, sale.disallowed)
+    ]
+    changed_lots = [
+        {"lot_id": lot.lot_id, "wash_sale_basis_adjustment": lot.adjustment, "updated_at": now}
+        for lot in lots
+        if not lot.retirement and stored_lots[lot.lot_id] != lot.adjustment
+    ]
+
+    for start in range(0, len(changed_sales), CHUNK_SIZE):
+        db.execute(update(StockLotSale), changed_sales[start:start + CHUNK_SIZE])
+    for start in range(0, len(changed_lots), CHUNK_SIZE):
+        db.execute(update(StockLot), changed_lots[start:start + CHUNK_SIZE])
+
+    db.query(WashSaleAdjustment).delete(synchronize_session=False)
+    for start in range(0, len(matches), CHUNK_SIZE):
+        db.execute(insert(WashSaleAdjustment).values([
+            {
+                "sale_id": match.sale.sale_id,
+                "replacement_lot_id": match.replacement.lot_id,
+                "replacement_transaction_id": match.replacement.transaction_id,
+                "symbol": match.replacement.symbol,
+                "sale_date": match.sale.sale_date,
+                "replacement_date": match.replacement.purchase_date,
+                "quantity": match.quantity,
+                "disallowed_loss": match.disallowed_loss,
+                "tax_year": match.sale.sale_date.year,
+                "created_at": now,
+            }
+            for match in matches[start:start + CHUNK_SIZE]
+        ]))
+
+    result = WashSaleResult(
+        wash_sales=sum(1 for sale in sales if sale.disallowed > 0),
+        adjustments=len(matches),
+        disallowed_loss=sum((match.disallowed_loss for match in matches), _ZERO),
+        sales_updated=len(changed_sales),
+        lots_updated=len(changed_lots),
+    )
+    by_year: Dict[int, Decimal] = defaultdict(Decimal)
+    for match in matches:
+        by_year[match.sale.sale_date.year] += match.disallowed_loss
+    result.by_year = {year: float(amount) for year, amount in sorted(by_year.items())}
+
+    logger.info(
+        f"[WASH_SALES] {result.wash_sales} wash sales, ${result.disallowed_loss} disallowed "
+        f"({result.sales_updated} sales, {result.lots_updated} lots updated)"
+    )
+    return result
+
+
+def rebuild_wash_sales(db: Session) -> WashSaleResult:
+    """detect_wash_sales() and commit."""
+    try:
+        result = detect_wash_sales(db)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result
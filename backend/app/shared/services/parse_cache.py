@@ -0,0 +1,90 @@
+"""
+Content-addressed cache for parsed documents.
+
+Parsing a PDF (pdfplumber + regex) costs far more than hashing it. Parsers
+store their result under SHA-256(file contents) + parser version, so a file
+is only parsed again when its bytes change or the parser is bumped. Renamed
+or moved files are still hits.
+
+Entries are pickles under DATA_DIR/cache/parse/<namespace>/, written
+atomically. Callers only store successful results; a file the parser
+rejected is parsed again on the next load.
+
+Usage:
+    cache = ParseCache('payslips', version='1')
+    digest = file_sha256(path)
+    result = cache.get(digest)
+    if result is MISS:
+        result = parse(path)
+        if result is not None:
+            cache.put(digest, result)
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Returned by ParseCache.get() when there is no usable entry
+MISS = object()
+
+_CHUNK_SIZE = 1024 * 1024
+
+
+def file_sha256(path: Union[str, Path]) -> str:
+    """Hex SHA-256 of a file's contents, read in 1 MB chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """On-disk parse results for one parser, keyed by content hash + version."""
+
+    def __init__(self, namespace: str, version: str, cache_dir: Optional[Path] = None):
+        self.namespace = namespace
+        self.version = str(version)
+        self.cache_dir = Path(cache_dir) if cache_dir else settings.DATA_DIR / "cache" / "parse" / namespace
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}.v{self.version}.pkl"
+
+    def get(self, digest: str) -> Any:
+        """Cached result for `digest`, or MISS."""
+        path = self._path(digest)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            return MISS
+        except Exception as e:
+            # Truncated or from an incompatible class layout - reparse
+            logger.warning(f"[PARSE_CACHE] Ignoring unreadable entry {path.name}: {e}")
+            self.misses += 1
+            return MISS
+        self.hits += 1
+        return value
+
+    def put(self, digest: str, value: Any) -> None:
+        """Store `value` for `digest`. Failures are logged, never raised."""
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(digest))
+        except Exception as e:
+            logger.warning(f"[PARSE_CACHE] Could not write {self.namespace} entry {digest[:12]}: {e}")
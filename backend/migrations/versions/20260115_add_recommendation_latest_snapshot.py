@@ -0,0 +1,70 @@
+"""Add recommendation_latest_snapshot projection table
+
+Revision ID: add_rec_latest_snapshot
+Revises: add_account_cash_balances
+Create Date: 2026-01-15
+
+Materialized "latest snapshot per recommendation" projection. One row per
+position_recommendations row, pointing at its newest recommendation_snapshots
+row, with status/account/symbol denormalized for indexed filtering.
+
+Maintained on write by recommendation_projection.record_latest_snapshot().
+Backfilled here; scripts/rebuild_latest_snapshots.py repairs drift.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_rec_latest_snapshot'
+down_revision = 'add_account_cash_balances'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create and backfill recommendation_latest_snapshot."""
+    op.create_table(
+        'recommendation_latest_snapshot',
+        sa.Column('recommendation_id', sa.Integer(), nullable=False),
+        sa.Column('snapshot_id', sa.Integer(), nullable=False),
+        sa.Column('snapshot_number', sa.Integer(), nullable=False),
+        sa.Column('evaluated_at', sa.DateTime(), nullable=False),
+        sa.Column('status', sa.String(30), nullable=False),
+        sa.Column('account_name', sa.String(200), nullable=False),
+        sa.Column('symbol', sa.String(20), nullable=False),
+        sa.Column('recommended_action', sa.String(50), nullable=True),
+        sa.Column('priority', sa.String(20), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('recommendation_id'),
+        sa.ForeignKeyConstraint(['recommendation_id'], ['position_recommendations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['snapshot_id'], ['recommendation_snapshots.id'], ondelete='CASCADE'),
+    )
+
+    op.create_index(
+        'idx_rls_status_account_symbol',
+        'recommendation_latest_snapshot',
+        ['status', 'account_name', 'symbol']
+    )
+    op.create_index('idx_rls_snapshot', 'recommendation_latest_snapshot', ['snapshot_id'])
+
+    # Backfill from existing snapshots
+    op.execute("""
+        INSERT INTO recommendation_latest_snapshot (
+            recommendation_id, snapshot_id, snapshot_number, evaluated_at,
+            status, account_name, symbol, recommended_action, priority, updated_at
+        )
+        SELECT DISTINCT ON (s.recommendation_id)
+            s.recommendation_id, s.id, s.snapshot_number, s.evaluated_at,
+            r.status, r.account_name, r.symbol, s.recommended_action, s.priority, NOW()
+        FROM recommendation_snapshots s
+        JOIN position_recommendations r ON r.id = s.recommendation_id
+        ORDER BY s.recommendation_id, s.snapshot_number DESC
+    """)
+
+
+def downgrade() -> None:
+    """Drop recommendation_latest_snapshot."""
+    op.drop_index('idx_rls_snapshot', table_name='recommendation_latest_snapshot')
+    op.drop_index('idx_rls_status_account_symbol', table_name='recommendation_latest_snapshot')
+    op.drop_table('recommendation_latest_snapshot')
@@ -0,0 +1,43 @@
+"""Add composite indexes for range-based reconciliation
+
+Revision ID: add_reconciliation_indexes
+Revises: add_rec_latest_snapshot
+Create Date: 2026-01-16
+
+Reconciliation now selects notified snapshots with a half-open timestamp
+range on notification_sent_at and option executions with a date range.
+These indexes back those predicates:
+- recommendation_snapshots(notification_sent_at, recommendation_id), partial
+  on notified rows only
+- investment_transactions(transaction_type, transaction_date)
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_reconciliation_indexes'
+down_revision = 'add_rec_latest_snapshot'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create reconciliation indexes."""
+    op.create_index(
+        'idx_recsnap_notified_at',
+        'recommendation_snapshots',
+        ['notification_sent_at', 'recommendation_id'],
+        postgresql_where=sa.text('notification_sent_at IS NOT NULL')
+    )
+    op.create_index(
+        'idx_transaction_type_date',
+        'investment_transactions',
+        ['transaction_type', 'transaction_date']
+    )
+
+
+def downgrade() -> None:
+    """Drop reconciliation indexes."""
+    op.drop_index('idx_transaction_type_date', table_name='investment_transactions')
+    op.drop_index('idx_recsnap_notified_at', table_name='recommendation_snapshots')
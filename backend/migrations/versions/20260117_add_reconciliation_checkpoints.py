@@ -0,0 +1,49 @@
+"""Add reconciliation_checkpoints table
+
+Revision ID: add_reconciliation_checkpoints
+Revises: add_reconciliation_indexes
+Create Date: 2026-01-17
+
+Progress marker for multi-day reconciliation runs. The range reconciler
+commits each day's matches together with last_completed_date so an
+interrupted backfill resumes where it stopped.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_reconciliation_checkpoints'
+down_revision = 'add_reconciliation_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create reconciliation_checkpoints."""
+    op.create_table(
+        'reconciliation_checkpoints',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('run_key', sa.String(200), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('end_date', sa.Date(), nullable=False),
+        sa.Column('accounts', sa.JSON(), nullable=True),
+        sa.Column('status', sa.String(20), nullable=False, server_default='running'),
+        sa.Column('last_completed_date', sa.Date(), nullable=True),
+        sa.Column('days_completed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('matches_saved', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('independent_saved', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('started_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('run_key'),
+    )
+    op.create_index('idx_rc_status', 'reconciliation_checkpoints', ['status'])
+
+
+def downgrade() -> None:
+    """Drop reconciliation_checkpoints."""
+    op.drop_index('idx_rc_status', table_name='reconciliation_checkpoints')
+    op.drop_table('reconciliation_checkpoints')
@@ -0,0 +1,89 @@
+"""Add transaction change feed and consumer cursors
+
+Revision ID: add_transaction_change_feed
+Revises: add_reconciliation_checkpoints
+Create Date: 2026-01-18
+
+transaction_change_feed is an append-only log of close (BTC), expire (OEXP)
+and assign (OASGN) investment transactions, written alongside each insert.
+change_feed_cursors holds per-consumer high-water marks; the incremental
+outcome tracker consumes the feed past its cursor instead of re-scanning
+every match each night.
+
+Existing closing transactions are backfilled so the tracker's first run
+sees full history once.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_transaction_change_feed'
+down_revision = 'add_reconciliation_checkpoints'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create and backfill transaction_change_feed; create change_feed_cursors."""
+    op.create_table(
+        'transaction_change_feed',
+        sa.Column('id', sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column('transaction_id', sa.Integer(), nullable=False),
+        sa.Column('event_type', sa.String(20), nullable=False),
+        sa.Column('transaction_type', sa.String(20), nullable=False),
+        sa.Column('account_id', sa.String(100), nullable=False),
+        sa.Column('underlying', sa.String(20), nullable=False),
+        sa.Column('transaction_date', sa.Date(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['transaction_id'], ['investment_transactions.id'], ondelete='CASCADE'),
+        sa.UniqueConstraint('transaction_id', name='uq_tcf_transaction'),
+    )
+    op.create_index(
+        'idx_tcf_account_underlying_date',
+        'transaction_change_feed',
+        ['account_id', 'underlying', 'transaction_date']
+    )
+
+    op.create_table(
+        'change_feed_cursors',
+        sa.Column('consumer', sa.String(50), nullable=False),
+        sa.Column('last_event_id', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('last_match_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_expiration_date', sa.Date(), nullable=True),
+        sa.Column('events_processed', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('consumer'),
+    )
+
+    # Backfill from existing closing transactions, oldest first
+    op.execute("""
+        INSERT INTO transaction_change_feed (
+            transaction_id, event_type, transaction_type, account_id,
+            underlying, transaction_date, created_at
+        )
+        SELECT
+            t.id,
+            CASE UPPER(t.transaction_type)
+                WHEN 'BTC' THEN 'close'
+                WHEN 'OEXP' THEN 'expire'
+                ELSE 'assign'
+            END,
+            UPPER(t.transaction_type),
+            t.account_id,
+            UPPER(SPLIT_PART(TRIM(COALESCE(NULLIF(TRIM(t.symbol), ''), t.description)), ' ', 1)),
+            t.transaction_date,
+            NOW()
+        FROM investment_transactions t
+        WHERE UPPER(t.transaction_type) IN ('BTC', 'OEXP', 'OASGN')
+          AND COALESCE(NULLIF(TRIM(t.symbol), ''), NULLIF(TRIM(t.description), '')) IS NOT NULL
+        ORDER BY t.transaction_date, t.id
+    """)
+
+
+def downgrade() -> None:
+    """Drop change feed tables."""
+    op.drop_table('change_feed_cursors')
+    op.drop_index('idx_tcf_account_underlying_date', table_name='transaction_change_feed')
+    op.drop_table('transaction_change_feed')
@@ -0,0 +1,81 @@
+"""Add rlhf_cohort_aggregates table
+
+Revision ID: add_rlhf_cohort_aggregates
+Revises: add_transaction_change_feed
+Create Date: 2026-01-19
+
+Weekly RLHF counters per cohort (strategy, symbol, DTE bucket, delta bucket,
+algorithm_version). Refreshed per touched week after reconciliation and
+outcome tracking; read by the weekly summary and /learning/analytics/*.
+
+Cohort bucketing reads recommendation_context JSON in Python, so the table
+is populated by scripts/rebuild_cohort_aggregates.py (or
+POST /learning/analytics/cohorts/rebuild) rather than here.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_rlhf_cohort_aggregates'
+down_revision = 'add_transaction_change_feed'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create rlhf_cohort_aggregates."""
+    op.create_table(
+        'rlhf_cohort_aggregates',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('week_number', sa.Integer(), nullable=False),
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('strategy', sa.String(50), nullable=False, server_default=''),
+        sa.Column('symbol', sa.String(20), nullable=False, server_default=''),
+        sa.Column('dte_bucket', sa.String(10), nullable=False, server_default='unknown'),
+        sa.Column('delta_bucket', sa.String(10), nullable=False, server_default='unknown'),
+        sa.Column('algorithm_version', sa.String(20), nullable=False, server_default=''),
+        sa.Column('total_matches', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('recommendation_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('execution_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('consent_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('modify_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reject_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('independent_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('no_action_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('modify_with_details_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('dte_diff_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('dte_diff_sum', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('strike_diff_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('strike_diff_sum', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('premium_diff_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('premium_diff_sum', sa.Numeric(14, 4), nullable=False, server_default='0'),
+        sa.Column('reject_with_context_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rejected_premium_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('rejected_premium_sum', sa.Numeric(14, 4), nullable=False, server_default='0'),
+        sa.Column('outcome_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('outcome_pnl_sum', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('consent_outcome_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('consent_pnl_sum', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('consent_win_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('diverge_outcome_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('diverge_pnl_sum', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('diverge_win_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'idx_rca_cohort_week',
+        'rlhf_cohort_aggregates',
+        ['year', 'week_number', 'strategy', 'symbol', 'dte_bucket', 'delta_bucket', 'algorithm_version'],
+        unique=True
+    )
+    op.create_index('idx_rca_week_start', 'rlhf_cohort_aggregates', ['week_start'])
+
+
+def downgrade() -> None:
+    """Drop rlhf_cohort_aggregates."""
+    op.drop_index('idx_rca_week_start', table_name='rlhf_cohort_aggregates')
+    op.drop_index('idx_rca_cohort_week', table_name='rlhf_cohort_aggregates')
+    op.drop_table('rlhf_cohort_aggregates')
@@ -0,0 +1,78 @@
+"""Add income_monthly_rollup table
+
+Revision ID: add_income_monthly_rollup
+Revises: add_rlhf_cohort_aggregates
+Create Date: 2026-01-20
+
+Monthly options/dividend/interest (plus stock lending and stock sale)
+totals per (source, account_id, income_type, year, month). Updated in the same transaction as each
+investment transaction insert and read by the income summaries and charts
+instead of extract()/to_char() aggregation over investment_transactions.
+
+Backfilled here with one INSERT ... SELECT; scripts/rebuild_income_rollup.py
+repeats the same rebuild on demand.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_income_monthly_rollup'
+down_revision = 'add_rlhf_cohort_aggregates'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create income_monthly_rollup and backfill it from investment_transactions."""
+    op.create_table(
+        'income_monthly_rollup',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('source', sa.String(50), nullable=False),
+        sa.Column('account_id', sa.String(100), nullable=False),
+        sa.Column('income_type', sa.String(20), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=False),
+        sa.Column('total_amount', sa.Numeric(18, 2), nullable=False, server_default='0'),
+        sa.Column('transaction_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('source', 'account_id', 'income_type', 'year', 'month', name='uq_income_monthly_rollup'),
+    )
+    op.create_index('idx_imr_type_year_month', 'income_monthly_rollup', ['income_type', 'year', 'month'])
+
+    op.execute("""
+        INSERT INTO income_monthly_rollup
+            (source, account_id, income_type, year, month, total_amount, transaction_count, updated_at)
+        SELECT source, account_id, income_type, year, month, SUM(amount), COUNT(*), NOW()
+        FROM (
+            SELECT
+                source,
+                account_id,
+                amount,
+                CASE
+                    WHEN transaction_type IN ('STO', 'BTC') THEN 'options'
+                    WHEN transaction_type IN ('DIVIDEND', 'CDIV', 'QUAL DIV REINVEST', 'REINVEST DIVIDEND',
+                                              'CASH DIVIDEND', 'QUALIFIED DIVIDEND') THEN 'dividends'
+                    WHEN transaction_type = 'SLIP' THEN 'stock_lending'
+                    WHEN transaction_type IN ('SELL', 'SOLD') THEN 'stock_sales'
+                    ELSE 'interest'
+                END AS income_type,
+                EXTRACT(YEAR FROM transaction_date)::int AS year,
+                EXTRACT(MONTH FROM transaction_date)::int AS month
+            FROM investment_transactions
+            WHERE transaction_type IN (
+                'STO', 'BTC',
+                'DIVIDEND', 'CDIV', 'QUAL DIV REINVEST', 'REINVEST DIVIDEND', 'CASH DIVIDEND', 'QUALIFIED DIVIDEND',
+                'INTEREST', 'INT', 'BANK INTEREST', 'BOND INTEREST',
+                'SLIP', 'SELL', 'SOLD'
+            )
+        ) t
+        GROUP BY source, account_id, income_type, year, month
+    """)
+
+
+def downgrade() -> None:
+    """Drop income_monthly_rollup."""
+    op.drop_index('idx_imr_type_year_month', table_name='income_monthly_rollup')
+    op.drop_table('income_monthly_rollup')
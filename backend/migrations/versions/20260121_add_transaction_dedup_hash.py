@@ -0,0 +1,65 @@
+"""Add dedup_hash to investment_transactions
+
+Revision ID: add_transaction_dedup_hash
+Revises: add_income_monthly_rollup
+Create Date: 2026-01-21
+
+SHA-256 of each transaction's canonical natural key, backed by a unique
+index. The ingestion batch writer inserts a whole file in chunks with
+INSERT ... ON CONFLICT (dedup_hash) DO NOTHING instead of running duplicate
+checks per record.
+
+Backfilled with the same formula as app/modules/investments/dedup.py. Rows
+that share a key (only possible with a NULL quantity, which the composite
+unique constraint treats as distinct) keep the hash on the oldest row only.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_transaction_dedup_hash'
+down_revision = 'add_income_monthly_rollup'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add, backfill and uniquely index investment_transactions.dedup_hash."""
+    op.add_column('investment_transactions', sa.Column('dedup_hash', sa.String(64), nullable=True))
+
+    op.execute("""
+        UPDATE investment_transactions t
+        SET dedup_hash = h.dedup_hash
+        FROM (
+            SELECT id, dedup_hash,
+                   ROW_NUMBER() OVER (PARTITION BY dedup_hash ORDER BY id) AS rn
+            FROM (
+                SELECT id,
+                       encode(sha256(convert_to(concat_ws('|',
+                           source,
+                           account_id,
+                           transaction_date::text,
+                           COALESCE(symbol, ''),
+                           transaction_type,
+                           COALESCE(quantity::text, ''),
+                           amount::text
+                       ), 'UTF8')), 'hex') AS dedup_hash
+                FROM investment_transactions
+            ) keyed
+        ) h
+        WHERE t.id = h.id AND h.rn = 1
+    """)
+
+    op.create_index(
+        'uq_investment_transaction_dedup_hash',
+        'investment_transactions',
+        ['dedup_hash'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    """Drop investment_transactions.dedup_hash."""
+    op.drop_index('uq_investment_transaction_dedup_hash', table_name='investment_transactions')
+    op.drop_column('investment_transactions', 'dedup_hash')
@@ -0,0 +1,30 @@
+"""Add transactions_cursor to plaid_items
+
+Revision ID: add_plaid_transactions_cursor
+Revises: add_transaction_dedup_hash
+Create Date: 2026-01-22
+
+Per-item sync cursor for Plaid investment transactions. Each sync re-reads
+a short overlap before the cursor, upserts added/modified rows on
+investment_transaction_id and deletes rows Plaid no longer returns, instead
+of re-fetching a fixed 30-day window.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_plaid_transactions_cursor'
+down_revision = 'add_transaction_dedup_hash'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add plaid_items.transactions_cursor."""
+    op.add_column('plaid_items', sa.Column('transactions_cursor', sa.String(100), nullable=True))
+
+
+def downgrade() -> None:
+    """Drop plaid_items.transactions_cursor."""
+    op.drop_column('plaid_items', 'transactions_cursor')
@@ -0,0 +1,43 @@
+"""Add tax_lot_checkpoints and lot engine indexes
+
+Revision ID: add_tax_lot_checkpoints
+Revises: add_plaid_transactions_cursor
+Create Date: 2026-01-23
+
+Checkpoint for the incremental lot engine: /cost-basis/sync applies only
+investment transactions after the last one it applied, instead of
+replaying the whole history through one query and commit per sale. The
+indexes serve loading open lots per (source, account_id, symbol) and
+finding the sales written for a transaction.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_tax_lot_checkpoints'
+down_revision = 'add_plaid_transactions_cursor'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create tax_lot_checkpoints and the lot key/sale transaction indexes."""
+    op.create_table(
+        'tax_lot_checkpoints',
+        sa.Column('name', sa.String(50), nullable=False),
+        sa.Column('last_transaction_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_transaction_date', sa.Date(), nullable=True),
+        sa.Column('transactions_applied', sa.BigInteger(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.create_index('idx_stock_lot_key', 'stock_lot', ['source', 'account_id', 'symbol'])
+    op.create_index('idx_stock_lot_sale_transaction', 'stock_lot_sale', ['sale_transaction_id'])
+
+
+def downgrade() -> None:
+    """Drop tax_lot_checkpoints and the lot engine indexes."""
+    op.drop_index('idx_stock_lot_sale_transaction', table_name='stock_lot_sale')
+    op.drop_index('idx_stock_lot_key', table_name='stock_lot')
+    op.drop_table('tax_lot_checkpoints')
@@ -0,0 +1,56 @@
+"""Add wash_sale_adjustments and wash-sale basis columns
+
+Revision ID: add_wash_sale_adjustments
+Revises: add_tax_lot_checkpoints
+Create Date: 2026-01-24
+
+Wash-sale detection records each disallowed loss against its replacement
+lot. stock_lot.wash_sale_basis_adjustment holds the disallowed losses
+carried into a lot, and stock_lot_sale.basis_adjustment the part of that
+carried basis included in a sale's cost_basis, so a detection run can
+restore the unadjusted figures before recomputing.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_wash_sale_adjustments'
+down_revision = 'add_tax_lot_checkpoints'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create wash_sale_adjustments and add the basis adjustment columns."""
+    op.add_column('stock_lot', sa.Column('wash_sale_basis_adjustment', sa.Numeric(18, 2), nullable=False, server_default='0'))
+    op.add_column('stock_lot_sale', sa.Column('basis_adjustment', sa.Numeric(18, 2), nullable=False, server_default='0'))
+    op.create_table(
+        'wash_sale_adjustments',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('sale_id', sa.Integer(), nullable=False),
+        sa.Column('replacement_lot_id', sa.Integer(), nullable=False),
+        sa.Column('symbol', sa.String(20), nullable=False),
+        sa.Column('sale_date', sa.Date(), nullable=False),
+        sa.Column('replacement_date', sa.Date(), nullable=False),
+        sa.Column('quantity', sa.Numeric(18, 6), nullable=False),
+        sa.Column('disallowed_loss', sa.Numeric(18, 2), nullable=False),
+        sa.Column('tax_year', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['sale_id'], ['stock_lot_sale.sale_id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['replacement_lot_id'], ['stock_lot.lot_id'], ondelete='CASCADE'),
+    )
+    op.create_index('idx_wash_sale_adj_sale', 'wash_sale_adjustments', ['sale_id'])
+    op.create_index('idx_wash_sale_adj_lot', 'wash_sale_adjustments', ['replacement_lot_id'])
+    op.create_index('idx_wash_sale_adj_tax_year', 'wash_sale_adjustments', ['tax_year'])
+
+
+def downgrade() -> None:
+    """Drop wash_sale_adjustments and the basis adjustment columns."""
+    op.drop_index('idx_wash_sale_adj_tax_year', table_name='wash_sale_adjustments')
+    op.drop_index('idx_wash_sale_adj_lot', table_name='wash_sale_adjustments')
+    op.drop_index('idx_wash_sale_adj_sale', table_name='wash_sale_adjustments')
+    op.drop_table('wash_sale_adjustments')
+    op.drop_column('stock_lot_sale', 'basis_adjustment')
+    op.drop_column('stock_lot', 'wash_sale_basis_adjustment')
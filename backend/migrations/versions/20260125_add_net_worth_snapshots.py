@@ -0,0 +1,56 @@
+"""Add net_worth_snapshots and net_worth_sources
+
+Revision ID: add_net_worth_snapshots
+Revises: add_wash_sale_adjustments
+Create Date: 2026-01-25
+
+The dashboard summary and wealth history read materialized net worth:
+one row per (date, asset class, account) in net_worth_snapshots, and per
+section the watermarks of its source tables plus the summary breakdowns in
+net_worth_sources.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_net_worth_snapshots'
+down_revision = 'add_wash_sale_adjustments'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create net_worth_snapshots and net_worth_sources."""
+    op.create_table(
+        'net_worth_snapshots',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('snapshot_date', sa.Date(), nullable=False),
+        sa.Column('asset_class', sa.String(30), nullable=False),
+        sa.Column('account', sa.String(100), nullable=False),
+        sa.Column('label', sa.String(255), nullable=True),
+        sa.Column('value', sa.Numeric(18, 2), nullable=False),
+        sa.Column('origin', sa.String(10), nullable=False, server_default='daily'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('snapshot_date', 'asset_class', 'account', name='uq_net_worth_snapshot'),
+    )
+    op.create_index('idx_net_worth_class_date', 'net_worth_snapshots', ['asset_class', 'snapshot_date'])
+
+    op.create_table(
+        'net_worth_sources',
+        sa.Column('section', sa.String(30), nullable=False),
+        sa.Column('fingerprint', sa.String(64), nullable=False),
+        sa.Column('watermarks', sa.JSON(), nullable=True),
+        sa.Column('summary', sa.JSON(), nullable=True),
+        sa.Column('snapshot_date', sa.Date(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('section'),
+    )
+
+
+def downgrade() -> None:
+    """Drop net_worth_sources and net_worth_snapshots."""
+    op.drop_table('net_worth_sources')
+    op.drop_index('idx_net_worth_class_date', table_name='net_worth_snapshots')
+    op.drop_table('net_worth_snapshots')
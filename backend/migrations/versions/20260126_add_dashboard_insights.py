@@ -0,0 +1,66 @@
+"""Add dashboard_insights and insight_passes
+
+Revision ID: add_dashboard_insights
+Revises: add_net_worth_snapshots
+Create Date: 2026-01-26
+
+Discovered insights are materialized with their stable ID, validity window
+and archive status (previously data/insights_archive.json). insight_passes
+records the data fingerprint each discovery pass last ran on, so a refresh
+re-runs only the passes whose data changed.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_dashboard_insights'
+down_revision = 'add_net_worth_snapshots'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create dashboard_insights and insight_passes."""
+    op.create_table(
+        'dashboard_insights',
+        sa.Column('insight_id', sa.String(12), nullable=False),
+        sa.Column('pass_name', sa.String(30), nullable=False),
+        sa.Column('sequence', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('category', sa.String(20), nullable=False),
+        sa.Column('sentiment', sa.String(20), nullable=False),
+        sa.Column('title', sa.String(255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=False),
+        sa.Column('metric_name', sa.String(50), nullable=False),
+        sa.Column('metric_value', sa.Float(), nullable=True),
+        sa.Column('comparison_value', sa.Float(), nullable=True),
+        sa.Column('change_percent', sa.Float(), nullable=True),
+        sa.Column('icon', sa.String(30), nullable=True),
+        sa.Column('priority', sa.Integer(), nullable=False, server_default='50'),
+        sa.Column('tags', sa.JSON(), nullable=True),
+        sa.Column('discovered_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column('valid_from', sa.Date(), nullable=False),
+        sa.Column('valid_until', sa.Date(), nullable=True),
+        sa.Column('is_archived', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('archived_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('insight_id'),
+    )
+    op.create_index('idx_dashboard_insights_active', 'dashboard_insights', ['is_archived', 'priority'])
+    op.create_index('idx_dashboard_insights_pass', 'dashboard_insights', ['pass_name'])
+
+    op.create_table(
+        'insight_passes',
+        sa.Column('pass_name', sa.String(30), nullable=False),
+        sa.Column('fingerprint', sa.String(64), nullable=False),
+        sa.Column('insight_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('pass_name'),
+    )
+
+
+def downgrade() -> None:
+    """Drop insight_passes and dashboard_insights."""
+    op.drop_table('insight_passes')
+    op.drop_index('idx_dashboard_insights_pass', table_name='dashboard_insights')
+    op.drop_index('idx_dashboard_insights_active', table_name='dashboard_insights')
+    op.drop_table('dashboard_insights')
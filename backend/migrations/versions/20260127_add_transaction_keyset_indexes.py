@@ -0,0 +1,41 @@
+"""Add keyset pagination indexes on investment_transactions
+
+Revision ID: add_transaction_keyset_indexes
+Revises: add_dashboard_insights
+Create Date: 2026-01-27
+
+Transaction lists page with keyset cursors ordered by
+(transaction_date, id) descending. These indexes back that order, for all
+transactions and per account:
+- investment_transactions(transaction_date, id)
+- investment_transactions(account_id, transaction_date, id)
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_transaction_keyset_indexes'
+down_revision = 'add_dashboard_insights'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create keyset pagination indexes."""
+    op.create_index(
+        'idx_transaction_date_id',
+        'investment_transactions',
+        ['transaction_date', 'id']
+    )
+    op.create_index(
+        'idx_transaction_account_date_id',
+        'investment_transactions',
+        ['account_id', 'transaction_date', 'id']
+    )
+
+
+def downgrade() -> None:
+    """Drop keyset pagination indexes."""
+    op.drop_index('idx_transaction_account_date_id', table_name='investment_transactions')
+    op.drop_index('idx_transaction_date_id', table_name='investment_transactions')
@@ -0,0 +1,83 @@
+"""Add daily_closes and the portfolio valuation tables
+
+Revision ID: add_portfolio_valuations
+Revises: add_transaction_keyset_indexes
+Create Date: 2026-01-28
+
+The valuation engine replays holdings from transactions against locally
+kept daily closes:
+- daily_closes: (symbol, date) -> close
+- position_valuations: quantity and value per (account, date, symbol)
+- account_valuations: value and external cash flow per (account, date)
+- valuation_sources: per account, the transaction fingerprint and the
+  date range valued, so the nightly run only appends new days
+
+Accounts are keyed by (source, account_id), as in investment_accounts.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_portfolio_valuations'
+down_revision = 'add_transaction_keyset_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create daily_closes and the valuation tables."""
+    op.create_table(
+        'daily_closes',
+        sa.Column('symbol', sa.String(20), nullable=False),
+        sa.Column('price_date', sa.Date(), nullable=False),
+        sa.Column('close', sa.Numeric(18, 4), nullable=False),
+        sa.Column('source', sa.String(20), nullable=False, server_default='yahoo'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('symbol', 'price_date'),
+    )
+
+    op.create_table(
+        'position_valuations',
+        sa.Column('source', sa.String(50), nullable=False),
+        sa.Column('account_id', sa.String(100), nullable=False),
+        sa.Column('valuation_date', sa.Date(), nullable=False),
+        sa.Column('symbol', sa.String(20), nullable=False),
+        sa.Column('quantity', sa.Numeric(18, 8), nullable=False),
+        sa.Column('close', sa.Numeric(18, 4), nullable=True),
+        sa.Column('value', sa.Numeric(18, 2), nullable=False),
+        sa.PrimaryKeyConstraint('source', 'account_id', 'valuation_date', 'symbol'),
+    )
+    op.create_index('idx_position_valuation_date', 'position_valuations', ['valuation_date'])
+
+    op.create_table(
+        'account_valuations',
+        sa.Column('source', sa.String(50), nullable=False),
+        sa.Column('account_id', sa.String(100), nullable=False),
+        sa.Column('valuation_date', sa.Date(), nullable=False),
+        sa.Column('value', sa.Numeric(18, 2), nullable=False),
+        sa.Column('net_flow', sa.Numeric(18, 2), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('source', 'account_id', 'valuation_date'),
+    )
+    op.create_index('idx_account_valuation_date', 'account_valuations', ['valuation_date'])
+
+    op.create_table(
+        'valuation_sources',
+        sa.Column('source', sa.String(50), nullable=False),
+        sa.Column('account_id', sa.String(100), nullable=False),
+        sa.Column('fingerprint', sa.String(64), nullable=False),
+        sa.Column('valued_from', sa.Date(), nullable=False),
+        sa.Column('valued_through', sa.Date(), nullable=False),
+        sa.Column('refreshed_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint('source', 'account_id'),
+    )
+
+
+def downgrade() -> None:
+    """Drop the valuation tables and daily_closes."""
+    op.drop_table('valuation_sources')
+    op.drop_index('idx_account_valuation_date', table_name='account_valuations')
+    op.drop_table('account_valuations')
+    op.drop_index('idx_position_valuation_date', table_name='position_valuations')
+    op.drop_table('position_valuations')
+    op.drop_table('daily_closes')
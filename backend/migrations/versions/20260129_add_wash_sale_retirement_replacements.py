@@ -0,0 +1,32 @@
+"""Allow wash-sale replacements in retirement accounts
+
+Revision ID: add_wash_sale_retirement_replacements
+Revises: add_portfolio_valuations
+Create Date: 2026-01-29
+
+A purchase in an IRA, 401k or HSA account washes a loss sold elsewhere,
+but those accounts have no stock lots. wash_sale_adjustments rows for such
+matches reference the purchase transaction instead of a replacement lot.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_wash_sale_retirement_replacements'
+down_revision = 'add_portfolio_valuations'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add replacement_transaction_id and make replacement_lot_id optional."""
+    op.add_column('wash_sale_adjustments', sa.Column('replacement_transaction_id', sa.Integer(), nullable=True))
+    op.alter_column('wash_sale_adjustments', 'replacement_lot_id', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade() -> None:
+    """Drop retirement matches and replacement_transaction_id."""
+    op.execute("DELETE FROM wash_sale_adjustments WHERE replacement_lot_id IS NULL")
+    op.alter_column('wash_sale_adjustments', 'replacement_lot_id', existing_type=sa.Integer(), nullable=False)
+    op.drop_column('wash_sale_adjustments', 'replacement_transaction_id')
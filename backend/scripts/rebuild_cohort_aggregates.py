@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Rebuild the RLHF cohort aggregates from recommendation_execution_matches.
+
+Normally the aggregates are refreshed per week after each reconciliation and
+outcome-tracking run; use this after the migration or to repair drift.
+
+Usage:
+    python scripts/rebuild_cohort_aggregates.py                     # all weeks
+    python scripts/rebuild_cohort_aggregates.py --start 2026-01-01  # from a date
+"""
+
+import sys
+import argparse
+from pathlib import Path
+from datetime import date
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.database import SessionLocal
+from app.modules.strategies.learning_analytics import LearningAnalytics
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild RLHF cohort aggregates')
+    parser.add_argument('--start', type=str, help='Only rebuild weeks from this date (YYYY-MM-DD)')
+    args = parser.parse_args()
+
+    start_date = date.fromisoformat(args.start) if args.start else None
+
+    db = SessionLocal()
+    try:
+        print("🔄 Rebuilding RLHF cohort aggregates...")
+        result = LearningAnalytics(db).rebuild(start_date)
+        print(f"✅ Rebuilt {result['rows']} cohort rows across {result['weeks']} weeks")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
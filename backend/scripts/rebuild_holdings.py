@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Rebuild one account's holdings from its transaction history.
+
+Replays the account's BUY/SELL/OASGN transactions through the position
+ledger and upserts the resulting holdings in one statement. Use after a
+historical import, or to repair holdings that drifted from transactions.
+
+Usage:
+    python scripts/rebuild_holdings.py neel_brokerage
+    python scripts/rebuild_holdings.py neel_brokerage --source robinhood
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.database import SessionLocal
+from app.modules.investments.position_ledger import rebuild_account_holdings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild an account's holdings from transactions")
+    parser.add_argument("account_id", help="Account to rebuild, e.g. neel_brokerage")
+    parser.add_argument("--source", help="Only replay transactions from this source")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print(f"🔄 Rebuilding holdings for {args.account_id}...")
+        result = rebuild_account_holdings(db, args.account_id, source=args.source)
+        print(f"✅ Wrote {result['holdings']} holdings from {result['transactions']} transactions")
+        if result['skipped']:
+            print(f"⚠️  Kept {result['skipped']} stored holdings whose history is partial")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Rebuild the monthly income rollup from investment_transactions.
+
+Normally income_monthly_rollup is updated as each transaction is written;
+use this after bulk deletes, manual SQL fixes, or to repair drift.
+
+Usage:
+    python scripts/rebuild_income_rollup.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.database import SessionLocal
+from app.modules.income.income_rollup import rebuild_income_rollup
+
+
+def main():
+    db = SessionLocal()
+    try:
+        print("🔄 Rebuilding income monthly rollup...")
+        result = rebuild_income_rollup(db)
+        print(f"✅ Rebuilt {result['rows']} rollup rows covering {result['transactions']} transactions")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
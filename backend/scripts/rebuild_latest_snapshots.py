@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Backfill / repair the recommendation_latest_snapshot projection.
+
+Recomputes the newest snapshot per V2 recommendation from
+recommendation_snapshots and rewrites the projection table.
+
+Usage:
+    python scripts/rebuild_latest_snapshots.py --dry-run   # report drift only
+    python scripts/rebuild_latest_snapshots.py             # rebuild
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.database import SessionLocal
+from app.modules.strategies.recommendation_projection import rebuild_latest_snapshots
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild the latest-snapshot projection')
+    parser.add_argument('--dry-run', action='store_true', help='Only report drift, do not rewrite')
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        print("🔍 Checking recommendation_latest_snapshot...")
+        result = rebuild_latest_snapshots(db, dry_run=args.dry_run)
+
+        print(f"   Expected rows: {result['expected']}")
+        print(f"   Missing:       {result['missing']}")
+        print(f"   Stale:         {result['stale']}")
+        print(f"   Orphaned:      {result['orphaned']}")
+
+        if args.dry_run:
+            print("\nDry run - no changes made")
+        else:
+            print(f"\n✅ Rebuilt {result['rebuilt']} projection rows")
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,15 @@
 """
 Reconcile multiple days at once.
 
+Loads the whole range in two queries, matches days in parallel worker
+processes and bulk-writes match rows. Progress is checkpointed per day, so
+re-running the same command after an interruption resumes where it stopped.
+
 Usage:
     python scripts/reconcile_date_range.py --days 7
     python scripts/reconcile_date_range.py --start 2026-01-01 --end 2026-01-07
+    python scripts/reconcile_date_range.py --start 2026-01-01 --end 2026-01-31 --accounts "Neel's Brokerage" --workers 4
+    python scripts/reconcile_date_range.py --days 30 --no-resume   # ignore checkpoint, redo all days
 """
 
 import sys
@@ -17,13 +23,16 @@ backend_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(backend_dir))
 
 from app.core.database import SessionLocal
-from app.modules.strategies.reconciliation_service import ReconciliationService
+from app.modules.strategies.reconciliation_backfill import RangeReconciler
 
 def main():
     parser = argparse.ArgumentParser(description='Reconcile multiple days')
     parser.add_argument('--days', type=int, default=7, help='Number of days to reconcile (default: 7)')
     parser.add_argument('--start', type=str, help='Start date (YYYY-MM-DD)')
     parser.add_argument('--end', type=str, help='End date (YYYY-MM-DD)')
+    parser.add_argument('--accounts', type=str, nargs='+', help='Account names or ids to reconcile (default: all)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes for matching (default: min(4, CPUs))')
+    parser.add_argument('--no-resume', action='store_true', help='Ignore the checkpoint and reconcile every day again')
     
     args = parser.parse_args()
     
@@ -37,40 +46,31 @@ def main():
     
     db = SessionLocal()
     try:
-        service = ReconciliationService(db)
+        reconciler = RangeReconciler(db, workers=args.workers)
         
         print(f"🔄 Reconciling from {start_date} to {end_date}...")
         print("=" * 60)
         
-        total_matches = 0
-        total_independent = 0
+        summary = reconciler.run(start_date, end_date, accounts=args.accounts, resume=not args.no_resume)
+        
+        for result in summary['results']:
+            print(f"\n📅 {result['date']}")
+            print(f"   Recommendations: {result['recommendations_count']}, Executions: {result['executions_count']}")
+            print(f"   Matches saved: {result['matches_saved']}, Independent: {result['independent_actions']}")
         
-        current_date = start_date
-        while current_date <= end_date:
-            print(f"\n📅 Reconciling {current_date}...")
-            result = service.reconcile_day(current_date)
-            
-            matches = result.get('matches_saved', 0)
-            independent = result.get('independent_actions', 0)
-            recs = result.get('recommendations_count', 0)
-            execs = result.get('executions_count', 0)
-            
-            print(f"   Recommendations: {recs}, Executions: {execs}")
-            print(f"   Matches saved: {matches}, Independent: {independent}")
-            
-            total_matches += matches
-            total_independent += independent
-            
-            current_date += timedelta(days=1)
+        total_matches = summary['total_matches_saved']
+        total_independent = summary['total_independent']
         
         print("\n" + "=" * 60)
         print(f"✅ Reconciliation complete!")
+        print(f"   Days completed: {summary['days_completed']}")
         print(f"   Total matches: {total_matches}")
         print(f"   Total independent: {total_independent}")
         print(f"   Total records: {total_matches + total_independent}")
         
     except Exception as e:
         print(f"❌ Error: {e}")
+        print("   Re-run the same command to resume from the last completed day")
         import traceback
         traceback.print_exc()
     finally:
@@ -78,6 +78,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
-
-
@@ -137,6 +137,11 @@ def delete_records(db, ingestion_ids):
     db.commit()
     print(f"\nTotal deleted: {total} records")
     print("Ingestion logs marked as 'rolled_back'")
+    
+    # Deleted transactions drop out of the monthly income rollup
+    from app.modules.income.income_rollup import rebuild_income_rollup
+    result = rebuild_income_rollup(db)
+    print(f"Income rollup rebuilt ({result['rows']} rows)")
 
 
 def main():
@@ -0,0 +1,141 @@
+"""
+Unit Tests for the Bulk Transaction Writer
+
+Tests the per-file ingestion path for investment transactions:
+1. dedup_hash is deterministic across numeric/date representations
+2. Records are normalized once (account mapping, invalid rows)
+3. Cross-account duplicate rules are applied in memory for a whole file
+4. Moving a transaction re-keys its dedup_hash and income rollup month
+5. save_records falls back to per-record saves if the bulk path fails
+
+Run with: pytest tests/test_bulk_writer.py -v
+"""
+
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ingestion.bulk_writer import (
+    ExistingTransaction,
+    cross_account_key,
+    move_transaction,
+    plan_batch,
+    prepare_transactions,
+)
+from app.ingestion.parsers.base import ParsedRecord, RecordType
+from app.ingestion import services
+from app.modules.investments.dedup import transaction_dedup_hash
+
+
+def _record(account_id="neel_brokerage", symbol="AAPL", txn_type="STO", amount=125.5,
+            quantity=1.0, txn_date=date(2025, 3, 7), record_type=RecordType.TRANSACTION):
+    return ParsedRecord(
+        record_type=record_type,
+        data={
+            "source": "robinhood",
+            "account_id": account_id,
+            "transaction_date": txn_date,
+            "transaction_type": txn_type,
+            "symbol": symbol,
+            "quantity": quantity,
+            "amount": amount,
+        },
+        source_row=1,
+    )
+
+
+class TestDedupHash:
+    """Canonical natural-key hash."""
+
+    def test_representation_independent(self):
+        as_float = transaction_dedup_hash("robinhood", "neel_brokerage", date(2025, 3, 7), "AAPL", "STO", 1.0, 125.5)
+        as_decimal = transaction_dedup_hash(
+            "robinhood", "neel_brokerage", datetime(2025, 3, 7, 9, 30), "AAPL", "STO",
+            Decimal("1.00000000"), Decimal("125.50")
+        )
+        assert as_float == as_decimal
+
+    def test_every_key_field_matters(self):
+        base = transaction_dedup_hash("robinhood", "neel_brokerage", date(2025, 3, 7), "AAPL", "STO", 1, 125.5)
+        assert base != transaction_dedup_hash("robinhood", "jaya_brokerage", date(2025, 3, 7), "AAPL", "STO", 1, 125.5)
+        assert base != transaction_dedup_hash("robinhood", "neel_brokerage", date(2025, 3, 7), "AAPL", "STO", None, 125.5)
+        assert base != transaction_dedup_hash("robinhood", "neel_brokerage", date(2025, 3, 7), "AAPL", "STO", 1, 125.51)
+
+
+class TestPlanBatch:
+    """Cross-account duplicate rules over a whole file."""
+
+    def test_prepare_normalizes_and_drops_invalid(self):
+        prepared, invalid = prepare_transactions([
+            _record(account_id="robinhood_neel_individual"),
+            _record(txn_date=None),
+        ], ingestion_id=7)
+        assert invalid == 1
+        assert prepared[0].values["account_id"] == "neel_brokerage"
+        assert prepared[0].values["ingestion_id"] == 7
+
+    def test_existing_and_in_file_duplicates_are_skipped(self):
+        prepared, _ = prepare_transactions([
+            _record(symbol="AAPL"),
+            _record(symbol="MSFT"),
+            _record(symbol="MSFT", account_id="jaya_brokerage"),  # same key, other account
+            _record(symbol="", txn_type="INTEREST", amount=1.25),
+        ])
+        existing = [
+            ExistingTransaction(1, "neel_brokerage", cross_account_key("robinhood", date(2025, 3, 7), "AAPL", "STO", Decimal("125.50"))),
+            # '' and 'UNKNOWN' symbols are the same key
+            ExistingTransaction(2, "neel_brokerage", cross_account_key("robinhood", date(2025, 3, 7), "UNKNOWN", "INTEREST", Decimal("1.25"))),
+        ]
+
+        plan = plan_batch(prepared, existing)
+        assert [row.values["symbol"] for row in plan.inserts] == ["MSFT"]
+        assert plan.skipped == 3
+        assert plan.migrations == []
+
+    def test_generic_account_rows_move_to_specific_account(self):
+        prepared, _ = prepare_transactions([_record(account_id="jaya_ira")])
+        existing = [ExistingTransaction(9, "robinhood_default", prepared[0].cross_key)]
+
+        plan = plan_batch(prepared, existing)
+        assert plan.migrations == [(9, "jaya_ira")]
+        assert plan.inserts == [] and plan.skipped == 0
+
+
+class TestMoveTransaction:
+    """Moving a transaction between accounts."""
+
+    def test_dedup_hash_and_rollup_follow_the_account(self):
+        txn = MagicMock(
+            id=9, source="robinhood", account_id="robinhood_default", transaction_date=date(2025, 3, 7),
+            symbol="AAPL", transaction_type="STO", quantity=Decimal("1"), amount=Decimal("125.50"),
+        )
+        moved_from = []
+        with patch("app.modules.income.income_rollup.record_income_transaction",
+                   side_effect=lambda db, t, sign=1: moved_from.append((t.account_id, sign))):
+            move_transaction(MagicMock(), txn, "jaya_ira")
+
+        assert txn.account_id == "jaya_ira"
+        assert txn.dedup_hash == transaction_dedup_hash(
+            "robinhood", "jaya_ira", date(2025, 3, 7), "AAPL", "STO", 1, 125.5
+        )
+        assert moved_from == [("robinhood_default", -1), ("jaya_ira", 1)]
+
+
+class TestSaveRecords:
+    """save_records routing."""
+
+    def test_bulk_failure_falls_back_to_per_record(self):
+        records = [_record(), _record(symbol="MSFT")]
+        with patch("app.ingestion.bulk_writer.save_investment_transactions", side_effect=RuntimeError("no pg")), \
+                patch.object(services, "save_investment_transaction", side_effect=["created", "skipped"]) as per_record, \
+                patch("app.modules.strategies.services.update_premium_settings_from_averages",
+                      return_value={"updated": 0, "skipped": 0}):
+            result = services.save_records(MagicMock(), records, ingestion_id=3)
+
+        assert per_record.call_count == 2
+        assert result == {"created": 1, "updated": 0, "skipped": 1}
@@ -0,0 +1,93 @@
+"""
+Unit Tests for the Tax Forecast Cache
+
+Tests app/modules/tax/forecast_cache.py:
+1. Watermarks are read for every source table in one statement
+2. The fingerprint changes with the data and with the date
+3. A forecast is computed once per (year, base year, fingerprint)
+4. Results are copies; failures are not cached
+
+Run with: pytest tests/test_forecast_cache.py -v
+"""
+
+import pytest
+from datetime import date, datetime
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.watermarks import source_watermarks
+from app.modules.tax import forecast_cache as forecast_cache_module
+from app.modules.tax.forecast_cache import FORECAST_SOURCES, ForecastCache, input_fingerprint
+
+
+def _db(*rows):
+    db = MagicMock()
+    db.execute.return_value.one.side_effect = list(rows)
+    return db
+
+
+def _row(stamp=datetime(2025, 6, 1)):
+    return tuple(value for _ in FORECAST_SOURCES for value in (5, 42, stamp))
+
+
+class TestFingerprint:
+    """Source-table watermarks."""
+
+    def test_watermarks_cover_every_source_in_one_statement(self):
+        db = _db(_row())
+        watermarks = source_watermarks(db, FORECAST_SOURCES)
+
+        assert db.execute.call_count == 1
+        assert set(watermarks) >= {"investment_transactions", "stock_lot_sale", "w2_records", "estimated_tax_payments"}
+        assert watermarks["rental_expenses"] == (5, 42, datetime(2025, 6, 1))
+
+    def test_fingerprint_tracks_data_and_date(self):
+        same = input_fingerprint(_db(_row()), as_of=date(2025, 6, 2))
+        assert input_fingerprint(_db(_row()), as_of=date(2025, 6, 2)) == same
+        assert input_fingerprint(_db(_row(datetime(2025, 6, 3))), as_of=date(2025, 6, 2)) != same
+        assert input_fingerprint(_db(_row()), as_of=date(2025, 6, 3)) != same
+
+
+class TestForecastCache:
+    """Memoized computation."""
+
+    @pytest.fixture
+    def fingerprint(self, monkeypatch):
+        value = ["a"]
+        monkeypatch.setattr(forecast_cache_module, "input_fingerprint", lambda db: value[0])
+        return value
+
+    def test_computes_once_until_inputs_change(self, fingerprint):
+        cache = ForecastCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return {"total_tax": 100.0, "details": {"income_sources": []}}
+
+        first = cache.get_or_compute(None, 2025, 2024, compute)
+        first["details"]["income_sources"].append("mutated")
+        second = cache.get_or_compute(None, 2025, 2024, compute)
+
+        assert len(calls) == 1
+        assert second["details"]["income_sources"] == []
+        cache.get_or_compute(None, 2026, 2024, compute)
+        assert len(calls) == 2
+
+        fingerprint[0] = "b"
+        cache.get_or_compute(None, 2025, 2024, compute)
+        assert len(calls) == 3
+        assert cache.stats() == {"entries": 2, "hits": 1, "misses": 3}  # the stale 2025 entry was dropped
+
+    def test_failures_are_not_cached(self, fingerprint):
+        cache = ForecastCache()
+
+        def compute():
+            raise ValueError("No tax return found for base year 2024")
+
+        with pytest.raises(ValueError):
+            cache.get_or_compute(None, 2025, 2024, compute)
+        assert cache.stats()["entries"] == 0
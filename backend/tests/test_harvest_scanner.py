@@ -0,0 +1,176 @@
+"""
+Unit Tests for the Tax-Loss Harvest Scanner
+
+Tests app/modules/tax/harvest_scanner.py:
+1. Per-lot valuation: gain, holding period, days to long-term, tax impact
+2. Per-symbol unrealized sums
+3. Wash-sale conflicts from open lots, recent buys and planned buys
+4. Candidate ranking (clean candidates first, largest saving first)
+5. Marginal rates fall back to the defaults only when there is no base-year return
+
+Run with: pytest tests/test_harvest_scanner.py -v
+"""
+
+from datetime import date
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.tax import forecast, harvest_scanner
+from app.modules.tax.harvest_scanner import (
+    OpenLots,
+    marginal_rates,
+    scan_harvest_candidates,
+    summarize_unrealized,
+    value_lots,
+    wash_sale_conflicts,
+)
+
+AS_OF = date(2025, 6, 30)
+
+
+def _lots(*rows):
+    """rows of (lot_id, symbol, purchase_date, quantity, cost_basis[, purchase_transaction_id])."""
+    return OpenLots(
+        lot_id=np.array([row[0] for row in rows], dtype=np.int64),
+        symbol=np.array([row[1] for row in rows], dtype=object),
+        source=np.array(["robinhood"] * len(rows), dtype=object),
+        account_id=np.array(["acct"] * len(rows), dtype=object),
+        purchase_date=np.array([row[2] for row in rows], dtype="datetime64[D]"),
+        purchase_transaction_id=np.array([row[5] if len(row) > 5 else -1 for row in rows], dtype=np.int64),
+        quantity=np.array([row[3] for row in rows], dtype=float),
+        cost_basis=np.array([row[4] for row in rows], dtype=float),
+    )
+
+
+class TestValuation:
+    """Array valuation against one price snapshot."""
+
+    def test_lot_metrics(self):
+        lots = _lots(
+            (1, "AAPL", date(2024, 1, 2), 10, 1500.0),   # long-term gain
+            (2, "AAPL", date(2025, 6, 1), 10, 2500.0),   # short-term loss
+            (3, "NVDA", date(2025, 1, 1), 5, 500.0),     # no quote
+        )
+
+        valuation = value_lots(lots, {"AAPL": 200.0}, AS_OF, short_term_rate=0.4, long_term_rate=0.2)
+
+        assert valuation.unrealized_gain[0] == 500.0
+        assert valuation.unrealized_gain[1] == -500.0
+        assert valuation.is_long_term.tolist()[:2] == [True, False]
+        assert valuation.days_to_long_term[0] == 0
+        assert valuation.days_to_long_term[1] == 366 - 29
+        assert valuation.tax_impact[0] == 100.0
+        assert valuation.tax_impact[1] == -200.0
+        assert np.isnan(valuation.price[2])
+
+    def test_summarize_by_symbol(self):
+        lots = _lots(
+            (1, "AAPL", date(2024, 1, 2), 10, 1500.0),
+            (2, "AAPL", date(2025, 6, 1), 10, 2500.0),
+            (3, "MSFT", date(2025, 1, 1), 2, 800.0),
+        )
+
+        summary = summarize_unrealized(lots, value_lots(lots, {"AAPL": 200.0, "MSFT": 300.0}, AS_OF))
+
+        assert summary["total_unrealized_gain"] == -200.0
+        assert summary["by_symbol"]["AAPL"]["quantity"] == 20
+        assert summary["by_symbol"]["AAPL"]["num_lots"] == 2
+        assert summary["by_symbol"]["AAPL"]["unrealized_gain"] == 0.0
+        assert summary["by_symbol"]["MSFT"]["unrealized_gain_pct"] == -25.0
+
+
+class TestWashSaleConflicts:
+    """Acquisitions within 30 days of a sale today."""
+
+    def test_conflict_kinds(self):
+        lots = _lots(
+            (1, "AAPL", date(2024, 1, 2), 10, 2500.0),
+            (2, "AAPL", date(2025, 6, 20), 1, 250.0, 77),
+            (3, "MSFT", date(2024, 1, 2), 10, 5000.0),
+        )
+        recent_buys = [
+            (77, "AAPL", "acct", date(2025, 6, 20)),    # already open lot 2
+            (78, "AAPL", "ira", date(2025, 6, 25)),
+        ]
+        planned = {"MSFT": [date(2025, 7, 15), date(2025, 9, 1)]}
+
+        conflicts = wash_sale_conflicts(lots, np.array([0, 2]), recent_buys, planned, AS_OF)
+
+        assert [(c["kind"], c.get("lot_id"), c.get("transaction_id")) for c in conflicts[0]] == [
+            ("open_lot", 2, None), ("recent_buy", None, 78),
+        ]
+        assert [c["kind"] for c in conflicts[2]] == ["planned_buy"]
+
+    def test_candidate_is_not_its_own_replacement(self):
+        lots = _lots((1, "AAPL", date(2025, 6, 20), 10, 2500.0, 77))
+
+        conflicts = wash_sale_conflicts(lots, np.array([0]), [(77, "AAPL", "acct", date(2025, 6, 20))], {}, AS_OF)
+
+        assert conflicts == {}
+
+
+class TestScan:
+    """Candidate ranking."""
+
+    def test_clean_candidates_rank_first(self, monkeypatch):
+        lots = _lots(
+            (1, "AAPL", date(2024, 1, 2), 10, 5000.0),   # -3000 long-term, recent rebuy
+            (2, "MSFT", date(2025, 3, 1), 10, 4000.0),   # -1000 short-term
+            (3, "NVDA", date(2025, 3, 1), 10, 3000.0),   # -2000 short-term
+            (4, "TSLA", date(2025, 3, 1), 10, 1050.0),   # -50, below min loss
+            (5, "AMZN", date(2024, 7, 10), 10, 1000.0),  # gain, 5 days to long-term
+        )
+        monkeypatch.setattr(harvest_scanner, "load_open_lots", lambda db: lots)
+        monkeypatch.setattr(
+            harvest_scanner, "_recent_buys",
+            lambda db, symbols, since, until: [(9, "AAPL", "ira", date(2025, 6, 10))],
+        )
+        prices = {"AAPL": 200.0, "MSFT": 300.0, "NVDA": 100.0, "TSLA": 100.0, "AMZN": 150.0}
+
+        result = scan_harvest_candidates(
+            MagicMock(), as_of=AS_OF, prices=prices,
+            rates={"short_term": 0.5, "long_term": 0.3, "source": "test"},
+        )
+
+        candidates = result["candidates"]
+        assert [c["symbol"] for c in candidates] == ["NVDA", "MSFT", "AAPL"]
+        assert candidates[0]["tax_savings"] == 1000.0
+        assert candidates[2]["wash_sale_conflict"] is True
+        assert candidates[2]["wash_clear_date"] == "2025-07-11"
+        assert [lot["symbol"] for lot in result["approaching_long_term"]] == ["AMZN"]
+        assert result["totals"]["harvestable_loss"] == -6000.0
+
+
+class TestMarginalRates:
+    """Rates from the forecast, defaults when there is none."""
+
+    def test_rates_at_forecast_income(self, monkeypatch):
+        monkeypatch.setattr(
+            forecast, "calculate_tax_forecast",
+            lambda db, forecast_year, base_year: {"agi": 300000, "filing_status": "MFJ", "details": {}},
+        )
+
+        rates = marginal_rates(MagicMock(), 2025)
+
+        assert rates == {"short_term": 0.371, "long_term": 0.281, "source": "forecast 2025"}
+
+    def test_no_base_return(self, monkeypatch):
+        def fail(db, forecast_year, base_year):
+            raise ValueError("No tax return found for base year 2024")
+        monkeypatch.setattr(forecast, "calculate_tax_forecast", fail)
+
+        assert marginal_rates(MagicMock(), 2025)["source"] == "default"
+
+    def test_forecast_errors_propagate(self, monkeypatch):
+        def fail(db, forecast_year, base_year):
+            raise KeyError("deductions")
+        monkeypatch.setattr(forecast, "calculate_tax_forecast", fail)
+
+        with pytest.raises(KeyError):
+            marginal_rates(MagicMock(), 2025)
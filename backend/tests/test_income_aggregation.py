@@ -0,0 +1,141 @@
+"""
+Unit Tests for Grouped Income Aggregation
+
+Tests the IncomeAggregate slicing that replaces per-account income queries:
+1. aggregate_income() reads income_monthly_rollup, not transactions
+2. Taxable / active account filters, with account types compared
+   case-insensitively
+3. Per-account and per-month views of a by-month aggregate
+
+Run with: pytest tests/test_income_aggregation.py -v
+"""
+
+import pytest
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+from app.modules.income.income_aggregation import (
+    AccountIncome,
+    IncomeAggregate,
+    aggregate_income,
+)
+from app.modules.investments.account_types import is_taxable_account_type, non_taxable_account_type
+from app.modules.investments.models import InvestmentAccount
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class _CapturedQuery(Query):
+    """A session-less query that records itself and returns no rows."""
+
+    captured = []
+
+    def all(self):
+        _CapturedQuery.captured.append(self)
+        return []
+
+
+def _row(account_id, account_type="brokerage", active=True, month=None, **amounts):
+    return AccountIncome(
+        account_id=account_id,
+        source="robinhood",
+        account_name=f"Neel's {account_id}",
+        account_type=account_type,
+        is_active=active,
+        month=month,
+        amounts=amounts,
+        counts={category: 1 for category in amounts},
+    )
+
+
+class TestAggregateQuery:
+    """aggregate_income() is one grouped query over the monthly rollup."""
+
+    def _sql(self, **kwargs) -> str:
+        db = MagicMock()
+        db.query.side_effect = lambda *entities: _CapturedQuery(entities)
+        _CapturedQuery.captured.clear()
+
+        assert aggregate_income(db, **kwargs).rows == []
+        return _sql(_CapturedQuery.captured[-1].statement)
+
+    def test_reads_rollup_for_the_year(self):
+        sql = self._sql(year=2025)
+        assert "FROM investment_accounts LEFT OUTER JOIN income_monthly_rollup" in sql
+        assert "income_monthly_rollup.year = 2025" in sql
+        assert "income_monthly_rollup.income_type = 'stock_sales'" in sql
+        assert "investment_transactions" not in sql
+
+    def test_by_month_groups_by_rollup_month(self):
+        sql = self._sql(by_month=True)
+        assert "GROUP BY" in sql and "income_monthly_rollup.year, income_monthly_rollup.month" in sql
+        assert "income_monthly_rollup.year =" not in sql
+
+
+class TestAccountFilters:
+    """Taxable and active filters match the old per-query WHERE clauses."""
+
+    def test_taxable_excludes_retirement_types(self):
+        aggregate = IncomeAggregate(year=2025, rows=[
+            _row("neel_brokerage", options=100.0),
+            _row("neel_ira", account_type="IRA", options=40.0),
+            _row("jaya_401k", account_type="401k", options=10.0),
+            _row("legacy", account_type=None, options=5.0),
+        ])
+        assert aggregate.total("options") == 155.0
+        assert aggregate.total("options", taxable_only=True) == 105.0
+
+    def test_account_types_case_insensitive(self):
+        assert not is_taxable_account_type("Roth_IRA")
+        assert not is_taxable_account_type("HSA")
+        assert is_taxable_account_type("Brokerage")
+        assert is_taxable_account_type(None)
+        assert _sql(non_taxable_account_type(InvestmentAccount.account_type)) == (
+            "lower(coalesce(investment_accounts.account_type, '')) "
+            "IN ('ira', 'roth_ira', 'traditional_ira', '401k', 'hsa', 'retirement')"
+        )
+
+    def test_active_only(self):
+        aggregate = IncomeAggregate(year=2025, rows=[
+            _row("neel_brokerage", dividends=20.0),
+            _row("closed", active=False, dividends=3.0),
+        ])
+        assert aggregate.total("dividends", active_only=True) == 20.0
+        assert aggregate.count("dividends", active_only=True) == 1
+
+    def test_owner_from_account_name(self):
+        assert _row("neel_brokerage").owner == "Neel"
+        assert AccountIncome("x", "robinhood", None, None, True).owner == "Unknown"
+
+
+class TestMonthlyViews:
+    """A by-month aggregate serves both the monthly and per-account views."""
+
+    def _aggregate(self):
+        return IncomeAggregate(year=2025, rows=[
+            _row("neel_brokerage", month="2025-02", options=30.0, interest=1.0),
+            _row("neel_brokerage", month="2025-01", options=70.0),
+            _row("neel_ira", account_type="ira", month="2025-01", options=50.0),
+            _row("empty", month=None),
+        ])
+
+    def test_monthly_is_sorted_and_skips_empty_months(self):
+        aggregate = self._aggregate()
+        assert aggregate.monthly("options") == {"2025-01": 120.0, "2025-02": 30.0}
+        assert aggregate.monthly("options", taxable_only=True) == {"2025-01": 70.0, "2025-02": 30.0}
+        assert aggregate.monthly("interest") == {"2025-02": 1.0}
+
+    def test_by_account_merges_months(self):
+        accounts = {a.account_id: a for a in self._aggregate().by_account()}
+        assert accounts["neel_brokerage"].options_income == 100.0
+        assert accounts["neel_brokerage"].investment_income == 101.0
+        assert accounts["neel_brokerage"].counts["options"] == 2
+        assert accounts["empty"].investment_income == 0.0
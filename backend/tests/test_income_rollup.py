@@ -0,0 +1,94 @@
+"""
+Unit Tests for the Monthly Income Rollup
+
+Tests the write path of income_monthly_rollup:
+1. Transaction types classify into the same income types the queries used
+2. Income transactions upsert an additive delta into their month
+3. Non-income transactions leave the rollup untouched
+
+Run with: pytest tests/test_income_rollup.py -v
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.dialects import postgresql
+
+from app.modules.income.income_rollup import (
+    ROLLUP_TRANSACTION_TYPES,
+    income_type_for,
+    record_income_transaction,
+)
+
+
+def _txn(transaction_type, amount="125.50", on=date(2026, 3, 14)):
+    return SimpleNamespace(
+        source="robinhood",
+        account_id="neel_brokerage",
+        transaction_type=transaction_type,
+        transaction_date=on,
+        amount=Decimal(amount),
+    )
+
+
+def _executed_params(db):
+    stmt = db.execute.call_args[0][0]
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    return str(compiled), compiled.params
+
+
+class TestIncomeTypeFor:
+    """Classification of transaction types."""
+
+    def test_known_codes(self):
+        assert income_type_for("STO") == "options"
+        assert income_type_for("BTC") == "options"
+        assert income_type_for("QUAL DIV REINVEST") == "dividends"
+        assert income_type_for("BANK INTEREST") == "interest"
+        assert income_type_for("SLIP") == "stock_lending"
+        assert income_type_for("SOLD") == "stock_sales"
+
+    def test_non_income_codes(self):
+        assert income_type_for("BUY") is None
+        assert income_type_for("OEXP") is None
+        assert income_type_for(None) is None
+
+    def test_codes_belong_to_one_type(self):
+        codes = [c for codes in ROLLUP_TRANSACTION_TYPES.values() for c in codes]
+        assert len(codes) == len(set(codes))
+
+
+class TestRecordIncomeTransaction:
+    """Additive upserts into the transaction's month."""
+
+    def test_insert_adds_amount_and_count(self):
+        db = MagicMock()
+        assert record_income_transaction(db, _txn("CDIV")) is True
+
+        sql, params = _executed_params(db)
+        assert "ON CONFLICT (source, account_id, income_type, year, month) DO UPDATE" in sql
+        assert "income_monthly_rollup.total_amount + excluded.total_amount" in sql
+        assert params["income_type"] == "dividends"
+        assert (params["year"], params["month"]) == (2026, 3)
+        assert params["total_amount"] == Decimal("125.50")
+        assert params["transaction_count"] == 1
+
+    def test_negative_sign_removes(self):
+        db = MagicMock()
+        record_income_transaction(db, _txn("STO"), sign=-1)
+
+        _sql, params = _executed_params(db)
+        assert params["total_amount"] == Decimal("-125.50")
+        assert params["transaction_count"] == -1
+
+    def test_non_income_is_ignored(self):
+        db = MagicMock()
+        assert record_income_transaction(db, _txn("BUY")) is False
+        db.execute.assert_not_called()
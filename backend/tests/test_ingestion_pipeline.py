@@ -0,0 +1,130 @@
+"""
+Unit Tests for the Fingerprint-Dispatched Ingestion Pipeline
+
+Tests that inbox files are routed from a single read:
+1. Fingerprints carry the CSV header row and leading text
+2. dispatch() picks the first parser whose matches() accepts the file
+3. The pipeline saves each file in its own transaction, skips content that
+   was already ingested, and keeps going after a failing file
+
+Run with: pytest tests/test_ingestion_pipeline.py -v
+"""
+
+import pytest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.ingestion.parsers.base import BaseParser, ParseResult
+from app.ingestion.parsers.fidelity_csv import FidelityCSVParser
+from app.ingestion.parsers.robinhood import RobinhoodParser
+from app.ingestion.pipeline import IngestionPipeline, dispatch, fingerprint_file
+
+
+ROBINHOOD_HEADER = "Activity Date,Process Date,Settle Date,Instrument,Description,Trans Code,Quantity,Price,Amount\n"
+
+
+class FakeParser(BaseParser):
+    """Accepts .txt files; fails on files whose name contains 'bad'."""
+    source_name = "fake"
+    supported_extensions = [".txt"]
+
+    def can_parse(self, file_path: Path) -> bool:
+        raise AssertionError("dispatch must not reopen the file")
+
+    def matches(self, fingerprint) -> bool:
+        return fingerprint.suffix == ".txt"
+
+    def parse(self, file_path: Path) -> ParseResult:
+        if "bad" in file_path.name:
+            raise ValueError("corrupt statement")
+        return ParseResult(True, self.source_name, file_path, [], [], [], {})
+
+
+class TestFingerprintDispatch:
+    """One read per file, one dispatch step."""
+
+    def test_csv_header_routes_to_robinhood(self, tmp_path):
+        path = tmp_path / "neel_brokerage.csv"
+        path.write_text("\ufeff" + ROBINHOOD_HEADER + "1/2/2025,1/2/2025,1/3/2025,AAPL,Apple,Buy,1,100,-100\n")
+
+        fingerprint = fingerprint_file(path)
+        assert "Trans Code" in fingerprint.csv_headers
+        assert len(fingerprint.sha256) == 64
+
+        parsers = [FidelityCSVParser(), RobinhoodParser()]
+        assert dispatch(fingerprint, parsers).source_name == RobinhoodParser.source_name
+        assert RobinhoodParser().matches(fingerprint) == RobinhoodParser().can_parse(path)
+
+    def test_leading_text_routes_to_fidelity(self, tmp_path):
+        path = tmp_path / "hsa.csv"
+        path.write_text("Account,Health Savings Account\nSymbol/CUSIP,Quantity\nFXAIX,10\n")
+
+        fingerprint = fingerprint_file(path)
+        parser = dispatch(fingerprint, [RobinhoodParser(), FidelityCSVParser()])
+        assert parser.source_name == "fidelity"
+
+    def test_unrecognized_file(self, tmp_path):
+        path = tmp_path / "notes.csv"
+        path.write_text("a,b,c\n1,2,3\n")
+        assert dispatch(fingerprint_file(path), [RobinhoodParser(), FidelityCSVParser()]) is None
+
+
+@pytest.fixture
+def inbox(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "INBOX_DIR", tmp_path / "inbox")
+    monkeypatch.setattr(settings, "PROCESSED_DIR", tmp_path / "processed")
+    folder = tmp_path / "inbox" / "investments" / "other"
+    folder.mkdir(parents=True)
+    return folder
+
+
+def _db(successful_logs=()):
+    db = MagicMock()
+    db.query.return_value.filter.return_value.all.return_value = list(successful_logs)
+    return db
+
+
+class TestIngestionPipeline:
+    """Per-file transactions and duplicate skipping."""
+
+    def test_each_file_commits_separately(self, inbox, tmp_path):
+        (inbox / "a.txt").write_text("statement a")
+        (inbox / "bad.txt").write_text("statement b")
+        (inbox / "c.txt").write_text("statement c")
+        (inbox / "skip.pdf").write_bytes(b"not a pdf")
+        db = _db()
+
+        outcomes = IngestionPipeline(db, parsers=[FakeParser()], workers=1, verify=False).run(
+            [("investments/other", inbox)]
+        )
+
+        statuses = {o.file_name: o.status for o in outcomes}
+        assert statuses == {"a.txt": "success", "bad.txt": "exception", "c.txt": "success", "skip.pdf": "unmatched"}
+        # The failed file is rolled back and its failure logged on its own
+        assert db.rollback.call_count == 1
+        assert db.commit.call_count == 3
+        # Only successful files leave the inbox
+        processed = tmp_path / "processed" / "investments" / "other"
+        assert sorted(p.name for p in processed.iterdir()) == ["a.txt", "c.txt"]
+        assert (inbox / "bad.txt").exists()
+
+    def test_already_ingested_content_is_not_parsed(self, inbox):
+        path = inbox / "again.txt"
+        path.write_text("same bytes")
+        previous = SimpleNamespace(file_hash=fingerprint_file(path).sha256, id=42, file_name="first.txt")
+
+        parser = FakeParser()
+        parser.parse = MagicMock(side_effect=AssertionError("should not parse"))
+        outcomes = IngestionPipeline(_db([previous]), parsers=[parser], workers=1).run(
+            [("investments/other", inbox)]
+        )
+
+        assert outcomes[0].status == "skipped_duplicate"
+        assert outcomes[0].original_ingestion_id == 42
+        assert not path.exists()
@@ -0,0 +1,174 @@
+"""
+Unit Tests for the Insights Store
+
+Tests app/modules/dashboard/insight_store.py and the pass runner of
+app/modules/dashboard/insights.py:
+1. Category watermarks come from one statement; pass fingerprints follow the
+   watermarks of the categories a pass reads
+2. Only passes with a changed fingerprint are re-run
+3. A repeated insight ID keeps the higher priority
+4. Stored rows to the /dashboard/insights response shape
+5. discover_passes() runs only the named passes
+
+Run with: pytest tests/test_insight_store.py -v
+"""
+
+from datetime import date, datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.modules.dashboard import insights as insights_module
+from app.modules.dashboard.insight_store import (
+    CALENDAR,
+    SEQUENCE_STRIDE,
+    TABLE_CATEGORIES,
+    TRANSACTION_CATEGORIES,
+    _latest_by_id,
+    category_watermarks,
+    insight_to_dict,
+    pass_fingerprint,
+    stale_passes,
+)
+from app.modules.dashboard.insights import Insight, InsightCategory, InsightSentiment, InsightsEngine
+
+
+def _marks(**changed):
+    marks = {category: (1, 1, None) for category in [*TRANSACTION_CATEGORIES, *TABLE_CATEGORIES]}
+    marks[CALENDAR] = ("2026-03-15",)
+    marks.update(changed)
+    return marks
+
+
+def _fingerprints(marks):
+    return {
+        name: pass_fingerprint(categories, marks)
+        for name, (_, categories) in InsightsEngine.PASSES.items()
+    }
+
+
+def _insight(title, priority=50):
+    return Insight(
+        category=InsightCategory.RECORD,
+        sentiment=InsightSentiment.POSITIVE,
+        title=title,
+        description=f"{title} description",
+        metric_name="metric",
+        priority=priority,
+    )
+
+
+class TestCategoryWatermarks:
+    """Watermarks per data category."""
+
+    def test_one_statement_for_every_category(self):
+        db = MagicMock()
+        # investment_accounts, investment_holdings, portfolio_snapshots, then options, dividends, interest
+        db.execute.return_value.one.return_value = tuple(value for i in range(6) for value in (i, 10 + i, None))
+
+        marks = category_watermarks(db, date(2026, 3, 15))
+
+        assert db.execute.call_count == 1
+        sql = str(db.execute.call_args.args[0].compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        assert "investment_transactions.transaction_type IN ('STO', 'BTC', 'OEXP', 'OASGN')" in sql
+        assert marks["options"] == (3, 13, None)
+        assert marks["interest"] == (5, 15, None)
+        assert marks["accounts"] == ((0, 10, None),)
+        assert marks["holdings"] == ((0, 10, None), (1, 11, None), (2, 12, None))
+        assert marks[CALENDAR] == ("2026-03-15",)
+
+
+class TestStalePasses:
+    """Which passes a refresh re-runs."""
+
+    def test_new_dividends_rerun_dividend_passes(self):
+        before = _fingerprints(_marks())
+        after = _fingerprints(_marks(dividends=(2, 9, datetime(2026, 3, 15, 9, 0))))
+
+        assert stale_passes(after, before) == ["dividends", "income_totals"]
+
+    def test_new_day_reruns_calendar_passes(self):
+        before = _fingerprints(_marks())
+        after = _fingerprints(_marks(**{CALENDAR: ("2026-03-16",)}))
+
+        assert stale_passes(after, before) == ["comparison"]
+
+    def test_unknown_and_forced_passes(self):
+        fingerprints = _fingerprints(_marks())
+
+        assert stale_passes(fingerprints, {}) == list(InsightsEngine.PASSES)
+        assert stale_passes(fingerprints, fingerprints) == []
+        assert stale_passes(fingerprints, fingerprints, force=True) == list(InsightsEngine.PASSES)
+
+
+class TestLatestById:
+    """Insights of the re-run passes, keyed by stable ID."""
+
+    def test_sequence_and_repeated_ids(self):
+        results = {
+            "options": [_insight("Record month", 80), _insight("Streak", 40)],
+            "monthly": [_insight("Record month", 90)],
+        }
+
+        latest = _latest_by_id(results)
+
+        monthly = list(InsightsEngine.PASSES).index("monthly")
+        name, sequence, insight = latest[_insight("Record month").id]
+        assert (name, sequence, insight.priority) == ("monthly", monthly * SEQUENCE_STRIDE, 90)
+        assert latest[_insight("Streak").id][:2] == ("options", 1)
+
+
+class TestInsightToDict:
+    """Stored rows in the API response shape."""
+
+    def test_response_keys(self):
+        row = SimpleNamespace(
+            insight_id="abc123", category="record", sentiment="positive", title="Record month",
+            description="d", metric_name="metric", metric_value=1200.0, comparison_value=None,
+            change_percent=None, icon="trophy", priority=80, tags=None,
+            discovered_at=datetime(2026, 3, 15, 0, 5), valid_from=date(2026, 3, 15), valid_until=None,
+        )
+
+        result = insight_to_dict(row)
+
+        assert result["id"] == "abc123"
+        assert result["tags"] == []
+        assert result["timestamp"] == "2026-03-15T00:05:00"
+        assert result["valid_from"] == "2026-03-15"
+        assert result["valid_until"] is None
+
+
+class TestDiscoverPasses:
+    """The engine runs only the passes asked for."""
+
+    def test_runs_named_passes(self, monkeypatch):
+        loads = []
+        monkeypatch.setattr(insights_module, "get_income_service", lambda: loads.append(1) or "income")
+
+        def portfolio(self):
+            self.insights.append(_insight("Portfolio"))
+
+        def dividends(self, income_service):
+            assert income_service == "income"
+            self.insights.append(_insight("Dividends"))
+
+        monkeypatch.setattr(InsightsEngine, "_discover_portfolio_insights", portfolio)
+        monkeypatch.setattr(InsightsEngine, "_discover_dividend_insights", dividends)
+
+        results = InsightsEngine(db=None).discover_passes(["portfolio", "dividends"])
+
+        assert list(results) == ["dividends", "portfolio"]
+        assert [i.title for i in results["portfolio"]] == ["Portfolio"]
+        assert len(loads) == 1
+
+    def test_holdings_only_pass_skips_income_service(self, monkeypatch):
+        monkeypatch.setattr(insights_module, "get_income_service", lambda: pytest.fail("income service loaded"))
+        monkeypatch.setattr(InsightsEngine, "_discover_portfolio_insights", lambda self: None)
+
+        assert InsightsEngine(db=None).discover_passes(["portfolio"]) == {"portfolio": []}
@@ -0,0 +1,117 @@
+"""
+Unit Tests for RLHF Cohort Aggregates
+
+Tests the pure aggregation that feeds rlhf_cohort_aggregates:
+1. DTE / delta bucketing and cohort keys
+2. Counters match the per-request loops they replace
+3. Weekly patterns are detected from aggregate totals
+
+Run with: pytest tests/test_learning_analytics.py -v
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.strategies.learning_analytics import (
+    aggregate_matches,
+    cohort_key,
+    delta_bucket,
+    dte_bucket,
+)
+from app.modules.strategies.reconciliation_service import ReconciliationService
+
+
+def _match(match_id, match_type, context=None, details=None, rec_type="roll", symbol="AAPL", version="v3.4"):
+    return SimpleNamespace(
+        id=match_id,
+        recommendation_id=None if match_type == "independent" else f"rec_{match_id}",
+        execution_id=None if match_type in ("reject", "no_action") else 100 + match_id,
+        recommendation_date=date(2026, 1, 5),
+        recommendation_type=None if match_type == "independent" else rec_type,
+        recommended_symbol=None if match_type == "independent" else symbol,
+        recommended_expiration=None,
+        recommendation_context=context,
+        execution_symbol=f"{symbol} 01/16/2026 Call $250.00",
+        execution_date=date(2026, 1, 5),
+        execution_expiration=date(2026, 1, 16),
+        match_type=match_type,
+        modification_details=details,
+        algorithm_version=version,
+    )
+
+
+class TestBuckets:
+    """Tests for cohort dimensions."""
+
+    def test_dte_bucket(self):
+        assert dte_bucket(0) == "0-7"
+        assert dte_bucket(14) == "8-14"
+        assert dte_bucket(45) == "31-60"
+        assert dte_bucket(90) == "60+"
+        assert dte_bucket(None) == "unknown"
+
+    def test_delta_bucket(self):
+        assert delta_bucket(-0.10) == "<0.15"
+        assert delta_bucket(0.30) == "0.30-0.50"
+        assert delta_bucket(0.65) == "0.50+"
+        assert delta_bucket(None) == "unknown"
+
+    def test_cohort_key_prefers_context(self):
+        match = _match(1, "consent", context={"dte": 21, "delta": 0.22})
+        assert cohort_key(match) == ("roll", "AAPL", "15-30", "0.15-0.30", "v3.4")
+
+    def test_independent_falls_back_to_execution(self):
+        match = _match(1, "independent")
+        assert cohort_key(match) == ("", "AAPL", "8-14", "unknown", "v3.4")
+
+
+class TestAggregateMatches:
+    """Tests for per-cohort counters."""
+
+    def test_counts_modifications_rejections_and_outcomes(self):
+        matches = [
+            _match(1, "consent"),
+            _match(2, "modify", details={"expiration_diff_days": 7, "strike_diff": 5.0}),
+            _match(3, "modify", details={"premium_diff": 0.1}),
+            _match(4, "reject", context={"premium": 0.2}),
+            _match(5, "independent"),
+        ]
+        cohorts = aggregate_matches(matches, {1: Decimal("50"), 2: Decimal("-20"), 5: Decimal("10")})
+        totals = {}
+        for counters in cohorts.values():
+            for field, value in counters.items():
+                totals[field] = totals.get(field, 0) + value
+
+        assert totals["total_matches"] == 5
+        assert totals["recommendation_count"] == 4
+        assert totals["modify_with_details_count"] == 2
+        assert (totals["dte_diff_count"], totals["dte_diff_sum"]) == (1, 7)
+        assert (totals["premium_diff_count"], totals["premium_diff_sum"]) == (1, 0.1)
+        assert (totals["rejected_premium_count"], totals["rejected_premium_sum"]) == (1, 0.2)
+        assert (totals["consent_outcome_count"], totals["consent_win_count"]) == (1, 1)
+        assert (totals["diverge_outcome_count"], totals["diverge_pnl_sum"]) == (1, -20)
+        assert (totals["outcome_count"], totals["outcome_pnl_sum"]) == (3, 40)
+
+
+class TestDetectPatterns:
+    """Tests for weekly pattern detection from aggregate totals."""
+
+    def test_longer_dte_and_low_premium_rejections(self):
+        totals = {
+            "modify_with_details_count": 5,
+            "dte_diff_sum": 35,
+            "strike_diff_sum": 0,
+            "reject_with_context_count": 2,
+            "rejected_premium_count": 2,
+            "rejected_premium_sum": 0.4,
+        }
+        patterns = ReconciliationService(None)._detect_patterns(totals)
+        ids = [p["pattern_id"] for p in patterns]
+        assert ids == ["prefer_longer_dte", "reject_low_premium"]
+        assert patterns[0]["confidence"] == "high"
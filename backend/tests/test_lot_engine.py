@@ -0,0 +1,117 @@
+"""
+Unit Tests for the Incremental Tax-Lot Engine
+
+Tests app/modules/tax/lot_engine.py:
+1. FIFO/LIFO matching on a deque lot ladder
+2. A failed sale leaves the ladder unchanged
+3. A batch is replayed in (date, id) order across keys
+4. New lots, changed lots and sales are written with bulk statements
+
+Run with: pytest tests/test_lot_engine.py -v
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.tax.lot_engine import LadderLot, LotEngine, LotLadder
+
+
+def _lot(purchase_date, quantity, cost_basis, lot_id=None):
+    quantity = Decimal(str(quantity))
+    return LadderLot(
+        purchase_date=purchase_date,
+        quantity=quantity,
+        cost_basis=Decimal(str(cost_basis)),
+        quantity_remaining=quantity,
+        key=("robinhood", "acc", "AAPL"),
+        lot_id=lot_id,
+    )
+
+
+def _txn(txn_id, txn_date, txn_type, quantity, amount, symbol="AAPL", account_id="acc"):
+    return SimpleNamespace(
+        id=txn_id, transaction_date=txn_date, transaction_type=txn_type, symbol=symbol,
+        quantity=Decimal(str(quantity)), amount=Decimal(str(amount)), account_id=account_id, source="robinhood",
+    )
+
+
+class TestLotLadder:
+    """Matching sales against a ladder."""
+
+    def test_fifo_consumes_oldest_first(self):
+        ladder = LotLadder([_lot(date(2023, 1, 10), 10, 1000, lot_id=1), _lot(date(2024, 6, 1), 10, 1500, lot_id=2)])
+        matches = ladder.sell("AAPL", date(2024, 6, 20), Decimal(15), Decimal(1800))
+
+        assert [(m.lot.lot_id, m.quantity_sold) for m in matches] == [(1, 10), (2, 5)]
+        assert matches[0].gain_loss == Decimal(200) and matches[0].is_long_term
+        assert matches[1].gain_loss == Decimal(-150) and not matches[1].is_long_term
+        assert len(ladder) == 1 and ladder.lots[0].status == "partial"
+        assert matches[0].lot.status == "closed"
+
+    def test_lifo_consumes_newest_first(self):
+        ladder = LotLadder([_lot(date(2023, 1, 10), 10, 1000, lot_id=1), _lot(date(2024, 6, 1), 10, 1500, lot_id=2)])
+        matches = ladder.sell("AAPL", date(2024, 6, 20), Decimal(4), Decimal(600), lot_method="LIFO")
+
+        assert [(m.lot.lot_id, m.quantity_sold) for m in matches] == [(2, 4)]
+        assert matches[0].values()["cost_basis"] == Decimal("600.00")
+
+    def test_insufficient_shares_leave_ladder_unchanged(self):
+        ladder = LotLadder([_lot(date(2024, 1, 2), 5, 500, lot_id=1)])
+        with pytest.raises(ValueError, match="Insufficient shares"):
+            ladder.sell("AAPL", date(2024, 2, 1), Decimal(6), Decimal(700))
+        assert ladder.available == Decimal(5)
+
+        with pytest.raises(ValueError, match="No open lots"):
+            LotLadder().sell("MSFT", date(2024, 2, 1), Decimal(1), Decimal(100))
+
+
+class TestLotEngine:
+    """Batch replay and bulk writes."""
+
+    def test_batch_replays_in_date_order(self):
+        engine = LotEngine()
+        applied = engine.apply([
+            _txn(3, date(2024, 3, 1), "SELL", 15, 2400),
+            _txn(1, date(2024, 1, 2), "BUY", 10, 1000),
+            _txn(2, date(2024, 2, 1), "BOUGHT", 10, 2000),
+            _txn(4, date(2024, 3, 1), "SELL", 1, 100, symbol="msft"),
+            _txn(5, date(2024, 3, 2), "DIVIDEND", 1, 5),
+        ])
+
+        assert applied == 3
+        assert [m.sale_transaction_id for m in engine.matches] == [3, 3]
+        assert [m.lot.purchase_transaction_id for m in engine.matches] == [1, 2]
+        assert engine.errors == ["MSFT on 2024-03-01: No open lots available for MSFT"]
+        assert engine.ladders[("robinhood", "acc", "AAPL")].available == Decimal(5)
+
+    def test_flush_writes_in_bulk(self):
+        db = MagicMock()
+        db.query.return_value.filter.return_value.order_by.return_value.all.return_value = [
+            SimpleNamespace(lot_id=7, source="robinhood", account_id="acc", symbol="AAPL",
+                            purchase_date=date(2023, 5, 1), quantity=Decimal(10), cost_basis=Decimal(900),
+                            quantity_remaining=Decimal(10), purchase_transaction_id=None),
+        ]
+        db.execute.return_value.all.return_value = [(100, 1), (101, 2)]
+
+        engine = LotEngine()
+        assert engine.load(db, [("robinhood", "acc", "AAPL")]) == 1
+        engine.apply([
+            _txn(1, date(2024, 1, 2), "BUY", 10, 1000),
+            _txn(2, date(2024, 1, 3), "BUY", 5, 600),
+            _txn(3, date(2024, 2, 1), "SELL", 12, 1440),
+        ])
+        created, updated, sales = engine.flush(db)
+
+        assert (created, updated, sales) == (2, 1, 2)
+        assert db.execute.call_count == 3  # lots INSERT, lots UPDATE, sales INSERT
+        update_rows = db.execute.call_args_list[1].args[1]
+        assert update_rows[0]["lot_id"] == 7 and update_rows[0]["status"] == "closed"
+        assert engine.ladders[("robinhood", "acc", "AAPL")].lots[0].lot_id == 100
+        db.commit.assert_not_called()
@@ -0,0 +1,150 @@
+"""
+Unit Tests for the Net Worth Snapshots
+
+Tests app/modules/dashboard/net_worth.py:
+1. Section fingerprints follow table watermarks (and the day for daily sections)
+2. Refresh planning: rebuild changed sections, copy unchanged ones forward
+3. Snapshot rows are one per (date, asset class, account)
+4. The dashboard summary from class totals and section summaries
+5. The wealth history from year-end values
+
+Run with: pytest tests/test_net_worth.py -v
+"""
+
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.dashboard.net_worth import (
+    DAILY,
+    SECTIONS,
+    _snapshot_rows,
+    assemble_summary,
+    build_wealth_history,
+    plan_refresh,
+    section_fingerprint,
+)
+
+TODAY = date(2026, 3, 15)
+SECTION = {section.name: section for section in SECTIONS}
+
+
+def _watermarks(**changed):
+    tables = {model.__tablename__ for section in SECTIONS for model in section.models}
+    marks = {table: (1, 1, None) for table in tables}
+    marks.update(changed)
+    return marks
+
+
+class TestFingerprints:
+    """Watermark fingerprints per section."""
+
+    def test_only_sections_reading_a_table_change(self):
+        before = _watermarks()
+        after = _watermarks(properties=(2, 2, datetime(2026, 3, 15, 9, 0)))
+
+        changed = [
+            section.name for section in SECTIONS
+            if section_fingerprint(section, before, TODAY) != section_fingerprint(section, after, TODAY)
+        ]
+
+        assert changed == ["real_estate"]
+
+    def test_daily_sections_change_with_the_day(self):
+        marks = _watermarks()
+        tomorrow = date(2026, 3, 16)
+
+        assert section_fingerprint(SECTION["india_investments"], marks, TODAY) != \
+            section_fingerprint(SECTION["india_investments"], marks, tomorrow)
+        assert section_fingerprint(SECTION["cash"], marks, TODAY) == \
+            section_fingerprint(SECTION["cash"], marks, tomorrow)
+
+
+class TestPlanRefresh:
+    """Which sections are rebuilt and which are copied forward."""
+
+    def test_rebuild_changed_and_copy_forward_stale(self):
+        fingerprints = {section.name: "new" for section in SECTIONS}
+        stored = {
+            "public_equity": SimpleNamespace(fingerprint="new", snapshot_date=date(2026, 3, 14)),
+            "real_estate": SimpleNamespace(fingerprint="old", snapshot_date=date(2026, 3, 14)),
+            "cash": SimpleNamespace(fingerprint="new", snapshot_date=TODAY),
+        }
+
+        rebuild, copy_forward = plan_refresh(SECTIONS, fingerprints, stored, TODAY)
+
+        assert rebuild == ["real_estate", "startup_equity", "india_investments", "income"]
+        assert copy_forward == ["public_equity"]
+
+    def test_force_rebuilds_everything(self):
+        fingerprints = {section.name: "same" for section in SECTIONS}
+        stored = {name: SimpleNamespace(fingerprint="same", snapshot_date=TODAY) for name in fingerprints}
+
+        assert plan_refresh(SECTIONS, fingerprints, stored, TODAY) == ([], [])
+        assert plan_refresh(SECTIONS, fingerprints, stored, TODAY, force=True)[0] == list(fingerprints)
+
+
+class TestSnapshotRows:
+    """Insert rows for the snapshot table."""
+
+    def test_repeated_keys_are_summed(self):
+        now = datetime(2026, 3, 15)
+        rows = _snapshot_rows([
+            (TODAY, "cash", "chase:1", "Chase Checking", 100.004),
+            (TODAY, "cash", "chase:1", "Chase Checking", 50),
+            (TODAY, "cash", 7, None, 25),
+        ], DAILY, now)
+
+        assert [(row["account"], row["value"]) for row in rows] == [("chase:1", 150.0), ("7", 25.0)]
+        assert all(row["origin"] == DAILY and row["created_at"] == now for row in rows)
+
+
+class TestSummary:
+    """The /dashboard/summary response."""
+
+    def test_totals_and_breakdowns(self):
+        totals = {
+            "public_equity": 500000.0, "real_estate": 1200000.0, "mortgage": 400000.0,
+            "startup_equity": 50000.0, "cash": 25000.0, "india_investments": 10000.0,
+        }
+        summaries = {
+            "public_equity": {"by_owner": {"Neel": {"value": 500000.0, "accounts": 2}}, "account_count": 2},
+            "income": {"options_income": 1200.0, "total_investment_income": 1500.0},
+        }
+
+        summary = assemble_summary(totals, summaries, datetime(2026, 3, 15, 23, 45))
+
+        assert summary["total_assets"] == 1785000.0
+        assert summary["total_liabilities"] == 400000.0
+        assert summary["total_net_worth"] == 1385000.0
+        assert summary["assets"]["real_estate"]["value"] == 800000.0
+        assert summary["assets"]["public_equity"]["account_count"] == 2
+        assert summary["assets"]["cash"]["accounts"] == []
+        assert summary["income"]["options_income"] == 1200.0
+        assert summary["last_updated"] == "2026-03-15T23:45:00"
+
+
+class TestWealthHistory:
+    """Year-end values to the wealth journey."""
+
+    def test_property_values_carry_forward(self):
+        year_end = {
+            2023: {"real_estate": {"1": 700000.0}},
+            2024: {"real_estate": {"2": 300000.0}, "public_equity": {"neel_brokerage": 90000.0}},
+        }
+        latest = {"real_estate": 1100000.0, "mortgage": 200000.0, "public_equity": 150000.0, "cash": 5000.0}
+
+        result = build_wealth_history(year_end, latest, TODAY)
+
+        history = {row["year"]: row for row in result["history"]}
+        assert result["start_year"] == 2023
+        assert history[2024]["realEstate"] == 1000000.0
+        assert history[2024]["netWorth"] == 1090000.0
+        assert history[2025]["realEstate"] == 1000000.0
+        assert history[2025]["investments"] == 0
+        assert history[2026]["realEstate"] == 900000.0
+        assert history[2026]["netWorth"] == 1055000.0
+        assert result["current_age"] == 45
@@ -0,0 +1,147 @@
+"""
+Unit Tests for the Incremental Outcome Tracker
+
+Tests the pure pairing of change-feed events to open positions:
+1. Events only close same-account, same-underlying, compatible positions
+2. Each position is closed at most once, oldest first
+3. Outcome values reflect how the position was closed
+4. Matches whose expiration is only in the option symbol are still checked
+   for expiry, and the parsed expiration is stored
+
+Run with: pytest tests/test_outcome_tracker.py -v
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.strategies.outcome_tracker import (
+    ClosingEvent,
+    OutcomeTracker,
+    event_closes_match,
+    pair_events_to_matches,
+)
+from app.modules.strategies.reconciliation_service import ReconciliationService
+from app.modules.investments.change_feed import underlying_symbol
+
+
+def _match(match_id, executed=date(2026, 1, 5), strike="250", expiration=date(2026, 1, 16),
+           account="acct1", symbol="AAPL"):
+    return SimpleNamespace(
+        id=match_id,
+        execution_account=account,
+        execution_symbol=symbol,
+        execution_date=executed,
+        execution_strike=Decimal(strike) if strike else None,
+        execution_expiration=expiration,
+        execution_premium=Decimal("120"),
+        execution_contracts=1,
+    )
+
+
+def _event(event_id, on=date(2026, 1, 9), txn_type="BTC", strike=Decimal("250"),
+           expiration=date(2026, 1, 16), account="acct1", underlying="AAPL", amount=Decimal("-40")):
+    return ClosingEvent(
+        event_id=event_id,
+        account_id=account,
+        underlying=underlying,
+        transaction_date=on,
+        transaction_type=txn_type,
+        amount=amount,
+        strike=strike,
+        expiration=expiration,
+    )
+
+
+class TestEventPairing:
+    """Tests for matching feed events to open STO positions."""
+
+    def test_underlying_symbol(self):
+        assert underlying_symbol("aapl 01/16/2026 Call $250") == "AAPL"
+        assert underlying_symbol("", "NVDA 01/10/2025 Put $130.00") == "NVDA"
+        assert underlying_symbol(None, None) is None
+
+    def test_rejects_other_account_strike_or_earlier_date(self):
+        match = _match(1)
+        assert event_closes_match(_event(1), match)
+        assert not event_closes_match(_event(1, account="acct2"), match)
+        assert not event_closes_match(_event(1, strike=Decimal("255")), match)
+        assert not event_closes_match(_event(1, on=date(2026, 1, 2)), match)
+        assert not event_closes_match(_event(1, on=date(2026, 1, 25), txn_type="OASGN"), match)
+
+    def test_assignment_after_expiration_within_grace(self):
+        assert event_closes_match(_event(1, on=date(2026, 1, 19), txn_type="OASGN"), _match(1))
+
+    def test_unknown_event_details_still_pair(self):
+        assert event_closes_match(_event(1, strike=None, expiration=None), _match(1))
+
+    def test_each_match_closed_once_oldest_first(self):
+        older = _match(1, executed=date(2026, 1, 2))
+        newer = _match(2, executed=date(2026, 1, 5))
+        pairs = pair_events_to_matches(
+            [_event(10), _event(11), _event(12)],
+            [newer, older],
+        )
+        assert [(e.event_id, m.id) for e, m in pairs] == [(10, 1), (11, 2)]
+
+
+class TestOutcomeValues:
+    """Tests for outcome values derived from the closing transaction."""
+
+    def setup_method(self):
+        self.service = ReconciliationService(None)
+
+    def test_buy_to_close(self):
+        values = self.service._position_outcome_values(
+            _match(1), closing_type="BTC", closing_amount=Decimal("-40"), closed_on=date(2026, 1, 9)
+        )
+        assert values["final_status"] == "closed_profit"
+        assert values["net_profit"] == Decimal("80")
+        assert values["days_held"] == 4
+
+    def test_expired(self):
+        for closing_type in (None, "OEXP"):
+            values = self.service._position_outcome_values(_match(1), closing_type=closing_type, closing_amount=None)
+            assert values["final_status"] == "expired_worthless"
+            assert values["net_profit"] == Decimal("120")
+            assert values["days_held"] == 11
+
+
+class TestSymbolExpiration:
+    """Tests for matches without a stored expiration."""
+
+    def test_pending_includes_unstored_expiration(self):
+        db = MagicMock()
+        tracker = OutcomeTracker(db)
+        cursor = SimpleNamespace(last_match_id=10, last_expiration_date=date(2026, 1, 15))
+
+        tracker._pending_matches(cursor, 12, date(2026, 1, 16))
+
+        query = db.query.return_value.outerjoin.return_value
+        due = str(query.filter.call_args.args[2])
+        assert "execution_expiration IS NULL AND recommendation_execution_matches.execution_symbol IS NOT NULL" in due
+
+    def test_expired_from_symbol_is_closed_and_persisted(self):
+        tracker = OutcomeTracker(MagicMock())
+        match = _match(1, expiration=None, account=None, symbol="AAPL 01/16/2026 Call $250.00")
+        match.execution_action = "STO"
+
+        created = tracker._resolve_pending([match], 0, date(2026, 1, 20))
+
+        assert created == 1
+        assert match.execution_expiration == date(2026, 1, 16)
+        assert tracker.touched_match_ids == {1}
+
+    def test_open_position_keeps_parsed_expiration(self):
+        tracker = OutcomeTracker(MagicMock())
+        match = _match(1, expiration=None, account=None, symbol="AAPL 01/16/2026 Call $250.00")
+        match.execution_action = "STO"
+
+        assert tracker._resolve_pending([match], 0, date(2026, 1, 9)) == 0
+        assert match.execution_expiration == date(2026, 1, 16)
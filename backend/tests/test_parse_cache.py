@@ -0,0 +1,113 @@
+"""
+Unit Tests for the Content-Addressed Parse Cache
+
+Tests that parsed payslips/W-2s are reused across service rebuilds:
+1. Entries are keyed by file content and parser version
+2. SalaryService only re-parses new or changed files
+3. W-2 keys also depend on the file name the parser reads
+4. Files the parser rejected are not cached, so they are parsed again
+
+Run with: pytest tests/test_parse_cache.py -v
+"""
+
+import pytest
+from datetime import datetime
+from pathlib import Path
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.shared.services.parse_cache import MISS, ParseCache, file_sha256
+from app.modules.income.salary_service import SalaryPayslip, SalaryService
+
+
+class TestParseCache:
+    """Content hash + version keyed storage."""
+
+    def test_roundtrip_and_version(self, tmp_path):
+        pdf = tmp_path / "a.pdf"
+        pdf.write_bytes(b"payslip-1")
+        digest = file_sha256(pdf)
+
+        cache = ParseCache("payslips", version="1", cache_dir=tmp_path / "cache")
+        assert cache.get(digest) is MISS
+        cache.put(digest, {"gross": 100.0})
+        assert cache.get(digest) == {"gross": 100.0}
+
+        # A parser bump invalidates every entry
+        assert ParseCache("payslips", version="2", cache_dir=tmp_path / "cache").get(digest) is MISS
+
+    def test_corrupt_entry_is_a_miss(self, tmp_path):
+        cache = ParseCache("w2", version="1", cache_dir=tmp_path)
+        (tmp_path / "abc.v1.pkl").write_bytes(b"not a pickle")
+        assert cache.get("abc") is MISS
+
+
+def _service(tmp_path, calls):
+    service = SalaryService(data_dir=str(tmp_path / "salary"), workers=1)
+    service._parse_caches = {
+        'payslip': ParseCache('payslips', version='1', cache_dir=tmp_path / "cache" / "payslips"),
+        'w2': ParseCache('w2', version='1', cache_dir=tmp_path / "cache" / "w2"),
+    }
+
+    def fake_parse(filepath):
+        calls.append(filepath.name)
+        if filepath.read_bytes().startswith(b"bad"):
+            return None
+        return SalaryPayslip(
+            employee_name="Neel", employer="Cisco Systems Inc",
+            pay_date=datetime(2025, 1, 15), period_start=datetime(2025, 1, 1),
+            period_end=datetime(2025, 1, 14), year=2025,
+            gross_pay_ytd=float(len(filepath.read_bytes())),
+        )
+
+    service._parse_cisco_payslip = fake_parse
+    return service
+
+
+class TestSalaryServiceCaching:
+    """Rebuilding the service only parses new or changed PDFs."""
+
+    def test_only_changed_files_are_parsed(self, tmp_path):
+        files = []
+        for name, body in [("jan.pdf", b"x" * 10), ("feb.pdf", b"y" * 20)]:
+            path = tmp_path / name
+            path.write_bytes(body)
+            files.append(path)
+
+        calls = []
+        first = _service(tmp_path, calls)._parse_pdfs('payslip', files)
+        assert sorted(calls) == ["feb.pdf", "jan.pdf"]
+        assert [p.gross_pay_ytd for _, p in first] == [10.0, 20.0]
+
+        # Fresh service (as after reset_salary_service): everything is cached
+        calls.clear()
+        _service(tmp_path, calls)._parse_pdfs('payslip', files)
+        assert calls == []
+
+        # Changed content is parsed again; the unchanged file is not
+        files[1].write_bytes(b"y" * 25)
+        second = _service(tmp_path, calls)._parse_pdfs('payslip', files)
+        assert calls == ["feb.pdf"]
+        assert second[1][1].gross_pay_ytd == 25.0
+
+    def test_failed_parse_is_retried(self, tmp_path):
+        path = tmp_path / "mar.pdf"
+        path.write_bytes(b"bad payslip")
+
+        calls = []
+        assert _service(tmp_path, calls)._parse_pdfs('payslip', [path]) == [(path, None)]
+        _service(tmp_path, calls)._parse_pdfs('payslip', [path])
+        assert calls == ["mar.pdf", "mar.pdf"]
+
+    def test_w2_key_includes_file_name(self, tmp_path):
+        service = SalaryService(workers=1)
+        path = Path("Neel_W2_2024.pdf")
+        assert service._parse_cache_key('payslip', path, "abc") == "abc"
+        assert service._parse_cache_key('w2', path, "abc") != service._parse_cache_key('w2', Path("Jaya_W2_2024.pdf"), "abc")
+
+    def test_w2_key_includes_year_directory(self):
+        service = SalaryService(workers=1)
+        in_2023 = Path("tax/2023/Neel_W2.pdf")
+        assert service._parse_cache_key('w2', in_2023, "abc") != service._parse_cache_key('w2', Path("tax/2024/Neel_W2.pdf"), "abc")
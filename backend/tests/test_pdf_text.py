@@ -0,0 +1,184 @@
+"""
+Unit Tests for the Shared PDF Text Layer
+
+Tests app/ingestion/parsers/pdf_text.py against an in-memory fake document:
+1. Page text is extracted once and memoized
+2. Declared sections collect only their pages (start/end, from_page, max_pages)
+3. Reading stops once every section has ended
+4. Crop boxes are applied before extraction
+5. The TD Ameritrade sections pick up the same transactions as a
+   whole-document scan of representative statement pages
+
+Run with: pytest tests/test_pdf_text.py -v
+"""
+
+import pytest
+from contextlib import nullcontext
+from pathlib import Path
+from types import SimpleNamespace
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ingestion.parsers import tdameritrade_pdf
+from app.ingestion.parsers.pdf_text import PdfSection, PdfText
+from app.ingestion.parsers.tdameritrade_pdf import TDAmeritradePDFParser
+
+
+class FakePage:
+    """Just enough of a pdfplumber page."""
+
+    width = 600
+    height = 800
+
+    def __init__(self, text, calls):
+        self._text = text
+        self.calls = calls
+        self.bbox = None
+
+    def extract_text(self):
+        self.calls.append(("text", self._text.split("\n")[0]))
+        return self._text
+
+    def extract_text_simple(self):
+        self.calls.append(("simple", self._text.split("\n")[0]))
+        return self._text
+
+    def crop(self, bbox):
+        cropped = FakePage(self._text, self.calls)
+        cropped.bbox = bbox
+        return cropped
+
+    def close(self):
+        pass
+
+
+def _pdf(*texts):
+    calls = []
+    return PdfText(SimpleNamespace(pages=[FakePage(text, calls) for text in texts])), calls
+
+
+STATEMENT = [
+    "Cover letter",
+    "Account Summary\nTotal $100.00",
+    "Account Positions\nAAPL 10",
+    "Account Positions (continued)\nMSFT 5",
+    "Account Activity\nBuy AAPL",
+    "Important Information\nDisclosures",
+    "More disclosures",
+]
+
+
+class TestPageText:
+    """Per-page extraction."""
+
+    def test_text_is_memoized(self):
+        pdf, calls = _pdf("one", "two")
+        assert pdf.text(1) == "two"
+        assert pdf.text(1) == "two"
+        assert pdf.full_text() == "one\ntwo\n"
+        assert calls == [("text", "two"), ("text", "one")]
+        assert pdf.pages_extracted == 2
+
+    def test_page_texts_is_lazy(self):
+        pdf, calls = _pdf("one", "two", "three")
+        pages = pdf.page_texts()
+        assert next(pages) == "one"
+        assert pdf.pages_extracted == 1
+        assert list(pdf.page_texts(stop=10)) == ["one", "two", "three"]
+
+    def test_crop_is_fractional(self):
+        pdf, _ = _pdf("one")
+        pdf.crop = (0, 0.1, 1, 0.9)
+        page = pdf._page(0)
+        assert page.bbox == pytest.approx((0, 80, 600, 720))
+
+
+class TestSections:
+    """Declared page ranges."""
+
+    def test_sections_skip_and_stop_early(self):
+        pdf, calls = _pdf(*STATEMENT)
+        sections = pdf.sections([
+            PdfSection("positions", start=r"^Account Positions", end=r"^Account Activity"),
+            PdfSection("activity", start=r"^Account Activity", end=r"^Important Information"),
+        ])
+
+        assert [text.split("\n")[0] for text in sections.page_texts("positions")] == [
+            "Account Positions", "Account Positions (continued)", "Account Activity",
+        ]
+        assert sections.page_texts("activity") == ["Account Activity\nBuy AAPL", "Important Information\nDisclosures"]
+        # The last page is never touched, earlier pages are only probed
+        assert sections.pages_read == 6
+        assert ("text", "Cover letter") not in calls
+        assert ("simple", "Cover letter") in calls
+        assert all(page != "More disclosures" for _kind, page in calls)
+
+    def test_end_marker_must_follow_start_on_opening_page(self):
+        pdf, _ = _pdf("Activity ends here\nActivity\nrow 1", "row 2\nActivity ends here", "tail")
+        sections = pdf.sections([PdfSection("activity", start=r"^Activity$", end=r"^Activity ends")])
+        assert len(sections.page_texts("activity")) == 2
+        assert sections.pages_read == 2
+
+    def test_from_page_and_max_pages(self):
+        pdf, _ = _pdf(*STATEMENT)
+        sections = pdf.sections([
+            PdfSection("summary", max_pages=2),
+            PdfSection("positions", start=r"^Account", from_page=2, max_pages=1),
+        ])
+        assert sections.page_texts("summary") == ["Cover letter", "Account Summary\nTotal $100.00"]
+        assert sections.page_texts("positions") == ["Account Positions\nAAPL 10"]
+        assert sections.pages_read == 3
+
+    def test_missing_section_reads_to_the_end(self):
+        pdf, _ = _pdf(*STATEMENT)
+        sections = pdf.sections([PdfSection("holdings", start=r"^Holdings")])
+        assert not sections.found("holdings")
+        assert sections.text("holdings") == ""
+        assert sections.pages_read == len(STATEMENT)
+        assert pdf.pages_extracted == 0
+
+
+TD_STATEMENT = [
+    "TD Ameritrade\nStatement Reporting Period: 07/01/20 - 07/31/20\nNEEL KAMAL\n123 MAIN ST\n"
+    "Account # 866-800538\nPortfolio Summary\nTotal $212,520.00",
+    "Dear Client, your Account Activity and Account Positions follow.",
+    "Page 3 of 7\nAccount Positions\n"
+    "APPLE INC COM AAPL 500 425.04 212,520.00 03/23/20 166,035.12 332.07 46,484.88",
+    "Page 4 of 7 Account Activity\n"
+    "Trade Date Settle Date Acct Type Transaction Description Symbol Quantity Price Amount\n"
+    "07/07/20 07/09/20 Cash Buy - Securities Purchased APPLE INC AAPL 100 376.97 (37,697.00)",
+    "Page 5 of 7\nAccount Activity (continued)\n"
+    "07/20/20 07/22/20 Cash Sell - Securities Sold AMAZON COM INC AMZN 5 3,164.68 15,823.40",
+    "Important Information\nPlease review your Account Activity.",
+    "Account Disclosures\nMore disclosures",
+]
+
+
+class TestTDAmeritradeSections:
+    """The TD parser's sections against representative statement pages."""
+
+    def _parse(self, monkeypatch):
+        pdf, calls = _pdf(*TD_STATEMENT)
+        monkeypatch.setattr(tdameritrade_pdf, "PdfText", SimpleNamespace(open=lambda path: nullcontext(pdf)))
+        return TDAmeritradePDFParser().parse(Path("TDA - Brokerage Statement_2020-07-31_151.PDF")), calls
+
+    def test_same_transactions_as_full_text(self, monkeypatch):
+        result, _calls = self._parse(monkeypatch)
+
+        full_text = "".join(text + "\n" for text in TD_STATEMENT)
+        expected = TDAmeritradePDFParser()._extract_transactions(full_text)
+        transactions = [r.data for r in result.records if r.record_type.name == "TRANSACTION"]
+        assert [(t["symbol"], t["amount"]) for t in transactions] == [
+            (t["symbol"], t["amount"]) for t in expected
+        ] == [("AAPL", -37697.0), ("AMZN", 15823.4)]
+        assert result.metadata["account_id"] == "neel_brokerage_538"
+        assert result.metadata["portfolio_value"] == 212520.0
+
+    def test_stops_after_important_information(self, monkeypatch):
+        result, calls = self._parse(monkeypatch)
+
+        # Activity ends on the Important Information page; the last page is never read
+        assert result.metadata["pages_read"] == 6
+        assert all(page != "Account Disclosures" for _kind, page in calls)
@@ -0,0 +1,174 @@
+"""
+Unit Tests for Plaid Investment Transaction Sync
+
+Runs PlaidService against a local fake Plaid server (PLAID_HOST) to test:
+1. Every page of /investments/transactions/get is fetched
+2. The sync window resumes from the item's cursor
+3. Fetched rows are diffed into added / modified / removed; a first sync
+   seeds legacy rows, and an inconsistent listing removes nothing
+4. A sync writes with bulk statements and advances the cursor
+
+Run with: pytest tests/test_plaid_sync.py -v
+"""
+
+import json
+import threading
+import pytest
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("plaid")
+
+from app.core.config import settings
+from app.modules.plaid import sync
+from app.modules.plaid.service import PlaidService
+
+
+SECURITY = {
+    "security_id": "sec_aapl", "isin": None, "cusip": None, "sedol": None,
+    "institution_security_id": None, "institution_id": None, "proxy_security_id": None,
+    "name": "Apple Inc", "ticker_symbol": "AAPL", "is_cash_equivalent": False, "type": "equity",
+    "close_price": None, "close_price_as_of": None, "iso_currency_code": "USD",
+    "unofficial_currency_code": None, "market_identifier_code": None, "sector": None,
+    "industry": None, "cfi_code": None, "figi": None, "option_contract": None, "fixed_income": None,
+}
+
+
+def _plaid_txn(i):
+    return {
+        "investment_transaction_id": f"txn_{i}", "account_id": "acc_1", "security_id": "sec_aapl",
+        "date": "2025-01-02", "name": "BUY AAPL", "quantity": 1.0, "amount": 150.0, "price": 150.0,
+        "fees": 0.0, "type": "buy", "subtype": "buy", "iso_currency_code": "USD",
+        "unofficial_currency_code": None,
+    }
+
+
+class FakePlaid(BaseHTTPRequestHandler):
+    """Serves /investments/transactions/get from a fixed transaction list."""
+
+    transactions = []
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        FakePlaid.requests.append(body)
+        options = body.get("options", {})
+        offset, count = options.get("offset", 0), options.get("count", 100)
+        payload = json.dumps({
+            "item": {
+                "item_id": "item_1", "webhook": None, "error": None, "available_products": [],
+                "billed_products": [], "consent_expiration_time": None, "update_type": "background",
+            },
+            "accounts": [],
+            "securities": [SECURITY],
+            "investment_transactions": FakePlaid.transactions[offset:offset + count],
+            "total_investment_transactions": len(FakePlaid.transactions),
+            "request_id": "req",
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def plaid_service(monkeypatch):
+    server = HTTPServer(("127.0.0.1", 0), FakePlaid)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(settings, "PLAID_CLIENT_ID", "client")
+    monkeypatch.setattr(settings, "PLAID_SECRET", "secret")
+    monkeypatch.setattr(settings, "PLAID_HOST", f"http://127.0.0.1:{server.server_port}")
+    FakePlaid.requests = []
+    yield PlaidService()
+    server.shutdown()
+
+
+def _stored(txn_id, row_id, **overrides):
+    values = sync.transaction_values({**_plaid_txn(0), "investment_transaction_id": txn_id, "security_name": "Apple Inc",
+                                      "ticker_symbol": "AAPL", "security_type": "equity"})
+    values.update(overrides)
+    return SimpleNamespace(id=row_id, **values)
+
+
+class TestFetch:
+    """Paging through the fake server."""
+
+    def test_all_pages_are_fetched(self, plaid_service):
+        FakePlaid.transactions = [_plaid_txn(i) for i in range(7)]
+        pages = list(plaid_service.iter_investment_transaction_pages("token", date(2025, 1, 1), date(2025, 2, 1), page_size=3))
+
+        assert [len(page["transactions"]) for page in pages] == [3, 3, 1]
+        assert [request["options"]["offset"] for request in FakePlaid.requests] == [0, 3, 6]
+        assert pages[0]["transactions"][0]["ticker_symbol"] == "AAPL"
+
+
+class TestDiff:
+    """Window and added/modified/removed split."""
+
+    def test_window_resumes_from_cursor(self):
+        today = date(2025, 6, 30)
+        assert sync.sync_window("2025-06-20", today) == (date(2025, 6, 6), today)
+        assert sync.sync_window(None, today)[0] == date(2023, 7, 1)
+        assert sync.sync_window("2025-06-20", today, date(2025, 1, 1))[0] == date(2025, 1, 1)
+
+    def test_added_modified_removed(self):
+        fetched = [sync.transaction_values({**_plaid_txn(i), "security_name": "Apple Inc", "ticker_symbol": "AAPL",
+                                            "security_type": "equity"}) for i in range(3)]
+        stored = [
+            _stored("txn_0", 10),                        # unchanged
+            _stored("txn_1", 11, amount="149.0"),        # modified by Plaid
+            _stored("txn_gone", 12),                     # cancelled in the window
+            _stored("txn_old", 13, date=datetime(2024, 1, 2)),  # outside the window
+        ]
+
+        diff = sync.diff_transactions(fetched, stored, {"acc_1"}, date(2025, 1, 1), date(2025, 2, 1))
+        assert [row["investment_transaction_id"] for row in diff.added] == ["txn_2"]
+        assert [row["investment_transaction_id"] for row in diff.modified] == ["txn_1"]
+        assert diff.removed == ["txn_gone"]
+
+    def test_first_sync_seeds_legacy_rows(self):
+        fetched = [sync.transaction_values({**_plaid_txn(0), "security_name": "Apple Inc", "ticker_symbol": "AAPL",
+                                            "security_type": "equity"})]
+        legacy = [_stored("txn_0", 10, security_name=None, quantity="1")]
+
+        diff = sync.diff_transactions(fetched, legacy, {"acc_1"}, date(2025, 1, 1), date(2025, 2, 1), seeding=True)
+        assert diff.modified == [] and len(diff.seeded) == 1
+
+    def test_shifted_pages_remove_nothing(self):
+        fetched = [sync.transaction_values(_plaid_txn(i)) for i in (0, 1, 1)]  # txn_2 skipped, txn_1 repeated
+        stored = [_stored("txn_2", 12)]
+
+        assert not sync.listing_complete([3, 3], fetched)
+        assert not sync.listing_complete([3, 4], fetched[:2])
+        assert sync.listing_complete([2], fetched[:2])
+        diff = sync.diff_transactions(fetched, stored, {"acc_1"}, date(2025, 1, 1), date(2025, 2, 1), complete=False)
+        assert diff.removed == []
+
+
+class TestSyncToDb:
+    """End-to-end sync against the fake server."""
+
+    def test_sync_bulk_writes_and_advances_cursor(self, plaid_service):
+        FakePlaid.transactions = [_plaid_txn(i) for i in range(1200)]
+        item = SimpleNamespace(id=1, access_token="token", transactions_cursor="2025-01-20", last_synced_at=None)
+        db = MagicMock()
+
+        with patch.object(sync, "load_stored", return_value=[]):
+            result = plaid_service.sync_transactions_to_db(item, db, end_date=datetime(2025, 2, 1))
+
+        assert result.added == 1200 and result.modified == 0 and result.removed == 0
+        assert result.start_date == date(2025, 1, 6)
+        assert len(FakePlaid.requests) == 3
+        assert db.execute.call_count == 2  # two INSERT chunks
+        assert item.transactions_cursor == "2025-02-01"
+        db.commit.assert_called_once()
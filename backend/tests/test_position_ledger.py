@@ -0,0 +1,125 @@
+"""
+Unit Tests for the Position Ledger
+
+Tests app/modules/investments/position_ledger.py:
+1. Only share transactions on share symbols are collected
+2. Replay keeps the per-transaction rules (no negative quantity, no
+   position opened by a sell, latest price wins)
+3. Weighted-average cost basis across buys and sells
+4. A batch is written with a single upsert statement
+5. A rebuild keeps the stored holding when the history does not cover a sell
+
+Run with: pytest tests/test_position_ledger.py -v
+"""
+
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.investments.position_ledger import Position, PositionLedger, quantity_change
+
+KEY = ("robinhood", "neel_brokerage", "AAPL")
+
+
+def _add(ledger, txn_type, quantity, price, day, symbol="AAPL", amount=None):
+    return ledger.add("robinhood", "neel_brokerage", symbol, txn_type, quantity, price, date(2025, 1, day), amount)
+
+
+class TestCollection:
+    """Which transactions reach the ledger."""
+
+    def test_skips_non_share_transactions(self):
+        ledger = PositionLedger()
+        assert not _add(ledger, "BUY", 1, 10, 1, symbol="HOOD 12/5/2025 Put $120.00")
+        assert not _add(ledger, "BUY", 1, 10, 1, symbol="CASH")
+        assert not _add(ledger, "DIVIDEND", None, None, 1)
+        assert not _add(ledger, "SPLIT", 2, None, 1)
+        assert _add(ledger, "BUY", 1, 10, 1)
+        assert len(ledger) == 1
+
+    def test_assignment_is_in_contracts(self):
+        assert quantity_change("OASGN", 2) == Decimal("200")
+        assert quantity_change("SELL", "3.5") == Decimal("-3.5")
+
+
+class TestReplay:
+    """Replaying a batch onto current holdings."""
+
+    def test_entries_replay_in_date_order(self):
+        ledger = PositionLedger()
+        _add(ledger, "SELL", 4, 12, 5)
+        _add(ledger, "BUY", 10, 10, 1, amount=-100)
+
+        position = ledger.replay({})[KEY]
+        assert position.quantity == Decimal("6")
+        assert position.cost_basis == Decimal("60")  # 6 shares at the $10 average
+        assert position.current_price == Decimal("12")
+        assert position.market_value == Decimal("72")
+        assert position.last_updated == datetime(2025, 1, 5)
+
+    def test_sell_never_opens_or_goes_negative(self):
+        ledger = PositionLedger()
+        _add(ledger, "SELL", 5, 10, 1)
+        assert ledger.replay({}) == {}
+
+        ledger = PositionLedger()
+        _add(ledger, "SELL", 5, None, 1)
+        existing = {KEY: Position(quantity=Decimal("2"), cost_basis=None, exists=True)}
+        position = ledger.replay(existing)[KEY]
+        assert position.quantity == 0
+        assert position.cost_basis is None
+
+    def test_buy_without_price_or_amount_makes_cost_unknown(self):
+        ledger = PositionLedger()
+        _add(ledger, "BUY", 1, 10, 1)
+        _add(ledger, "BUY", 1, None, 2)
+        assert ledger.replay({})[KEY].cost_basis is None
+
+
+class TestApply:
+    """Writing holdings."""
+
+    def test_batch_is_one_upsert(self):
+        ledger = PositionLedger()
+        for day in range(1, 11):
+            _add(ledger, "BUY", 1, 10, day)
+        _add(ledger, "BUY", 1, 10, 1, symbol="MSFT")
+
+        db = MagicMock()
+        assert ledger.apply(db, rebuild=True) == 2
+        assert db.execute.call_count == 1
+        db.query.assert_not_called()
+        assert len(ledger) == 0
+
+    def test_rebuild_skips_partial_history(self):
+        ledger = PositionLedger()
+        # 100 AAPL shares were transferred in: only a later buy and sell are on file
+        _add(ledger, "BUY", 10, 10, 1)
+        _add(ledger, "SELL", 50, 12, 2)
+        # MSFT bought before the first import, then sold
+        _add(ledger, "SELL", 5, 400, 3, symbol="MSFT")
+        _add(ledger, "BUY", 2, 10, 1, symbol="NVDA")
+
+        db = MagicMock()
+        assert ledger.apply(db, rebuild=True) == 1
+        assert ledger.skipped == [KEY, ("robinhood", "neel_brokerage", "MSFT")]
+        params = db.execute.call_args.args[0].compile().params
+        assert params["symbol_m0"] == "NVDA"
+
+    def test_full_history_is_not_skipped(self):
+        ledger = PositionLedger()
+        _add(ledger, "BUY", 10, 10, 1)
+        _add(ledger, "SELL", 10, 12, 2)
+
+        assert ledger.apply(MagicMock(), rebuild=True) == 1
+        assert ledger.skipped == []
+
+    def test_empty_ledger_writes_nothing(self):
+        db = MagicMock()
+        assert PositionLedger().apply(db) == 0
+        db.execute.assert_not_called()
@@ -0,0 +1,183 @@
+"""
+Unit Tests for Price Resolution
+
+Tests app/modules/investments/price_resolver.py and get_prices_schwab_first:
+1. Quote prices are read whichever field name the provider uses
+2. Providers are asked only for symbols still unpriced; failures fall through
+3. Resolved quotes are cached and record the provider that answered
+4. The Yahoo quote endpoint is batched; chart requests run concurrently
+5. Schwab batch quotes (currentPrice) are used instead of falling back
+
+Run with: pytest tests/test_price_resolver.py -v
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from app.modules.investments import price_resolver
+from app.modules.investments.price_resolver import (
+    provider_counts,
+    quote_price,
+    resolve_prices,
+    resolve_with_providers,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    price_resolver.clear_price_cache()
+    price_resolver._yahoo_quote_disabled_until = None
+    yield
+    price_resolver.clear_price_cache()
+
+
+def _provider(prices, calls):
+    def fetch(symbols):
+        calls.append(list(symbols))
+        return {symbol: prices[symbol] for symbol in symbols if symbol in prices}
+    return fetch
+
+
+class TestQuotePrice:
+    """Price fields across provider formats."""
+
+    def test_field_names(self):
+        assert quote_price({"currentPrice": 101.5, "lastPrice": 99}) == 101.5
+        assert quote_price({"lastPrice": "42.10"}) == 42.10
+        assert quote_price({"regularMarketPrice": 7}) == 7.0
+        assert quote_price({"mark": 3.2, "lastPrice": 0}) == 3.2
+
+    def test_missing_or_unusable(self):
+        assert quote_price(None) is None
+        assert quote_price({}) is None
+        assert quote_price({"currentPrice": None, "lastPrice": "n/a"}) is None
+
+
+class TestResolveWithProviders:
+    """The provider chain."""
+
+    def test_later_providers_get_only_missing_symbols(self):
+        calls_a, calls_b = [], []
+        quotes = resolve_with_providers(
+            ["AAPL", "MSFT", "XYZ"],
+            [("a", _provider({"AAPL": 190.0}, calls_a)), ("b", _provider({"MSFT": 410.0}, calls_b))],
+        )
+
+        assert calls_b == [["MSFT", "XYZ"]]
+        assert {s: q.provider for s, q in quotes.items()} == {"AAPL": "a", "MSFT": "b"}
+
+    def test_failing_provider_is_skipped(self):
+        def broken(symbols):
+            raise ConnectionError("down")
+
+        quotes = resolve_with_providers(["AAPL"], [("a", broken), ("b", _provider({"AAPL": 190.0}, []))])
+
+        assert quotes["AAPL"].provider == "b"
+
+
+class TestResolvePrices:
+    """Caching, CASH and provider tracking."""
+
+    def test_cache_and_cash(self, monkeypatch):
+        calls = []
+        monkeypatch.setitem(price_resolver.PROVIDERS, "schwab", _provider({"AAPL": 190.0, "MSFT": 410.0}, calls))
+
+        first = resolve_prices(["AAPL", "CASH", "AAPL"], chain=("schwab",))
+        second = resolve_prices(["AAPL", "MSFT"], chain=("schwab",))
+
+        assert calls == [["AAPL"], ["MSFT"]]
+        assert first["CASH"].price == 1.0 and first["CASH"].provider == "fixed"
+        assert second["AAPL"].provider == "schwab"
+        assert provider_counts({**first, **second}) == {"schwab": 2, "fixed": 1}
+
+    def test_source_is_provider_family(self, monkeypatch):
+        monkeypatch.setitem(price_resolver.PROVIDERS, "yahoo_quote", _provider({"VTI": 280.0}, []))
+
+        quote = resolve_prices(["VTI"], chain=("yahoo_quote",))["VTI"]
+
+        assert (quote.provider, quote.source) == ("yahoo_quote", "yahoo")
+
+
+class TestYahoo:
+    """Batched and concurrent Yahoo requests."""
+
+    def test_quote_endpoint_is_batched(self, monkeypatch):
+        requested = []
+
+        def fake_get(url, params=None, **kwargs):
+            chunk = params["symbols"].split(",")
+            requested.append(chunk)
+            result = [{"symbol": s, "regularMarketPrice": 10.0} for s in chunk]
+            return SimpleNamespace(status_code=200, json=lambda: {"quoteResponse": {"result": result}})
+
+        monkeypatch.setattr(price_resolver.requests, "get", fake_get)
+        monkeypatch.setattr(price_resolver, "YAHOO_BATCH_SIZE", 2)
+
+        prices = price_resolver._yahoo_quote_prices(["A", "B", "C"])
+
+        assert requested == [["A", "B"], ["C"]]
+        assert prices == {"A": 10.0, "B": 10.0, "C": 10.0}
+
+    def test_refused_quote_endpoint_backs_off(self, monkeypatch):
+        calls = []
+
+        def fake_get(url, **kwargs):
+            calls.append(url)
+            return SimpleNamespace(status_code=401)
+
+        monkeypatch.setattr(price_resolver.requests, "get", fake_get)
+
+        assert price_resolver._yahoo_quote_prices(["A"]) == {}
+        assert price_resolver._yahoo_quote_prices(["A"]) == {}
+        assert len(calls) == 1
+
+    def test_chart_requests_are_concurrent_and_bounded(self, monkeypatch):
+        lock = threading.Lock()
+        state = {"active": 0, "peak": 0}
+
+        def fake_price(symbol):
+            with lock:
+                state["active"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.02)
+            with lock:
+                state["active"] -= 1
+            return None if symbol == "BAD" else 5.0
+
+        monkeypatch.setattr(price_resolver, "_yahoo_chart_price", fake_price)
+        monkeypatch.setattr(price_resolver, "YAHOO_MAX_CONCURRENCY", 3)
+        symbols = [f"S{i}" for i in range(9)] + ["BAD"]
+
+        prices = price_resolver._yahoo_chart_prices(symbols)
+
+        assert len(prices) == 9 and "BAD" not in prices
+        assert 1 < state["peak"] <= 3
+
+
+class TestSchwabFirst:
+    """get_prices_schwab_first with Schwab batch quotes."""
+
+    def test_current_price_quotes_are_used(self, monkeypatch):
+        from app.modules.investments import price_service
+        from app.modules.strategies import schwab_service
+
+        yahoo_calls = []
+        monkeypatch.setattr(schwab_service, "is_schwab_configured", lambda: True)
+        monkeypatch.setattr(schwab_service, "get_stock_quotes_batch_schwab", lambda symbols: {
+            "AAPL": {"symbol": "AAPL", "currentPrice": 190.123, "_source": "schwab"},
+        })
+        monkeypatch.setitem(price_resolver.PROVIDERS, "yahoo_quote", _provider({"XYZ": 3.0}, yahoo_calls))
+        monkeypatch.setitem(price_resolver.PROVIDERS, "yahoo_chart", _provider({}, []))
+
+        prices = price_service.get_prices_schwab_first(["AAPL", "XYZ"])
+
+        assert prices["AAPL"] == {"current_price": 190.12, "source": "schwab", "provider": "schwab"}
+        assert prices["XYZ"]["source"] == "yahoo"
+        assert yahoo_calls == [["XYZ"]]
@@ -0,0 +1,142 @@
+"""
+Unit Tests for the Latest-Snapshot Projection
+
+Tests app/modules/strategies/recommendation_projection.py:
+1. record_latest_snapshot() upserts the projection row on write and only
+   moves it forward
+2. The exclude-actions filter keeps rows without an action
+3. The migration's backfill and rebuild_latest_snapshots() compute the same
+   projection, with the columns the write path maintains
+
+Run with: pytest tests/test_recommendation_projection.py -v
+"""
+
+import importlib.util
+import re
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+
+from app.modules.strategies.recommendation_projection import (
+    get_latest_snapshot_pairs,
+    rebuild_latest_snapshots,
+    record_latest_snapshot,
+)
+
+MIGRATION = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "migrations", "versions", "20260115_add_recommendation_latest_snapshot.py",
+)
+
+
+def _sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def _normalized(sql: str) -> str:
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+class _CapturedQuery(Query):
+    """A session-less query whose all() returns the query itself."""
+
+    def all(self):
+        return self
+
+
+def _recommendation(status="active"):
+    return SimpleNamespace(id=7, status=status, account_name="Neel's Brokerage", symbol="AAPL")
+
+
+def _snapshot(number=3, action="ROLL"):
+    return SimpleNamespace(
+        id=41, snapshot_number=number, evaluated_at=datetime(2026, 1, 5, 6, 0),
+        recommended_action=action, priority="high",
+    )
+
+
+class TestRecordLatestSnapshot:
+    """Upsert on write."""
+
+    def test_upserts_forward_only(self):
+        db = MagicMock()
+
+        record_latest_snapshot(db, _recommendation(), _snapshot())
+
+        db.flush.assert_called_once()
+        sql = _sql(db.execute.call_args.args[0])
+        assert "ON CONFLICT (recommendation_id) DO UPDATE" in sql
+        assert "WHERE recommendation_latest_snapshot.snapshot_number <= excluded.snapshot_number" in sql
+        assert "41, 3" in sql and "'ROLL', 'high'" in sql
+        db.commit.assert_not_called()
+
+    def test_missing_status_is_active(self):
+        db = MagicMock()
+
+        record_latest_snapshot(db, _recommendation(status=None), _snapshot())
+
+        assert "'active'" in _sql(db.execute.call_args.args[0])
+
+
+class TestLatestSnapshotPairs:
+    """Filters on the projection."""
+
+    def test_exclude_actions_keeps_null_actions(self):
+        db = MagicMock()
+        db.query.side_effect = lambda *entities: _CapturedQuery(entities)
+
+        sql = _sql(get_latest_snapshot_pairs(db, exclude_actions=["HOLD", "MONITOR"]).statement)
+
+        assert (
+            "recommendation_latest_snapshot.recommended_action IS NULL OR "
+            "(recommendation_latest_snapshot.recommended_action NOT IN ('HOLD', 'MONITOR'))"
+        ) in sql
+        assert "recommendation_latest_snapshot.status = 'active'" in sql
+
+    def test_no_exclusions_no_action_filter(self):
+        db = MagicMock()
+        db.query.side_effect = lambda *entities: _CapturedQuery(entities)
+
+        sql = _sql(get_latest_snapshot_pairs(db, status=None).statement)
+
+        assert "recommended_action IS NULL" not in sql
+        assert "NOT IN" not in sql
+
+
+class TestBackfillParity:
+    """The migration backfill and the rebuild produce the same projection."""
+
+    def _migration_backfill(self, monkeypatch) -> str:
+        spec = importlib.util.spec_from_file_location("rec_latest_snapshot_migration", MIGRATION)
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+        op = MagicMock()
+        monkeypatch.setattr(migration, "op", op)
+        migration.upgrade()
+        return op.execute.call_args.args[0]
+
+    def _rebuild_insert(self) -> str:
+        db = MagicMock()
+        db.execute.return_value.fetchone.return_value = SimpleNamespace(expected=0, missing=0, stale=0, orphaned=0)
+        rebuild_latest_snapshots(db)
+        return str(db.execute.call_args_list[-1].args[0])
+
+    def test_same_backfill_statement(self, monkeypatch):
+        assert _normalized(self._migration_backfill(monkeypatch)) == _normalized(self._rebuild_insert())
+
+    def test_backfill_covers_the_written_columns(self, monkeypatch):
+        db = MagicMock()
+        record_latest_snapshot(db, _recommendation(), _snapshot())
+        written = set(db.execute.call_args.args[0].compile(dialect=postgresql.dialect()).params)
+
+        columns = re.search(r"INSERT INTO recommendation_latest_snapshot \(([^)]*)\)", self._migration_backfill(monkeypatch))
+        backfilled = {column.strip() for column in columns.group(1).split(",")}
+
+        assert backfilled == written
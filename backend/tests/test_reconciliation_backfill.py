@@ -0,0 +1,114 @@
+"""
+Unit Tests for the Range Reconciler
+
+Tests the pure parts of multi-day reconciliation:
+1. Range-loaded rows are split into the same per-day windows as reconcile_day
+2. Per-day matching runs on plain rows without a database
+3. Checkpoint run keys are stable
+
+Run with: pytest tests/test_reconciliation_backfill.py -v
+"""
+
+import pickle
+import pytest
+from datetime import date, datetime
+from decimal import Decimal
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.strategies.reconciliation_backfill import (
+    ExecutionRow,
+    RecommendationRow,
+    make_run_key,
+    match_day,
+    split_by_day,
+)
+
+
+def _rec(rec_id, sent_at, symbol="AAPL", action="ROLL", context=None):
+    return RecommendationRow(
+        id=rec_id,
+        recommendation_id=f"rec_{rec_id}",
+        symbol=symbol,
+        account_name="Brokerage",
+        action_type=action,
+        recommendation_type="roll",
+        option_type="call",
+        priority="high",
+        notification_sent_at=sent_at,
+        created_at=sent_at,
+        context_snapshot=context or {},
+    )
+
+
+def _exec(exec_id, txn_date, symbol="AAPL", description="AAPL 01/16/2026 Call $250.00", txn_type="STO"):
+    return ExecutionRow(
+        id=exec_id,
+        account_id="acct1",
+        transaction_date=txn_date,
+        transaction_type=txn_type,
+        symbol=symbol,
+        description=description,
+        amount=Decimal("120.00"),
+        quantity=Decimal("1"),
+    )
+
+
+class TestSplitByDay:
+    """Tests for partitioning range-loaded rows into daily windows."""
+
+    def test_each_day_sees_same_and_next_day_executions(self):
+        recs = [_rec(1, datetime(2026, 1, 5, 10)), _rec(2, datetime(2026, 1, 6, 23, 59))]
+        execs = [_exec(10, date(2026, 1, 5)), _exec(11, date(2026, 1, 6)), _exec(12, date(2026, 1, 7))]
+
+        days = split_by_day(date(2026, 1, 5), date(2026, 1, 6), recs, execs)
+
+        assert [d for d, _, _ in days] == [date(2026, 1, 5), date(2026, 1, 6)]
+        assert [r.id for r in days[0][1]] == [1]
+        assert [e.id for e in days[0][2]] == [10, 11]
+        assert [r.id for r in days[1][1]] == [2]
+        assert [e.id for e in days[1][2]] == [11, 12]
+
+    def test_empty_days_are_still_emitted(self):
+        days = split_by_day(date(2026, 1, 1), date(2026, 1, 3), [], [])
+        assert len(days) == 3
+        assert all(recs == [] and execs == [] for _, recs, execs in days)
+
+
+class TestMatchDay:
+    """Tests for database-free per-day matching."""
+
+    def test_matched_and_independent_values(self):
+        day = date(2026, 1, 5)
+        rec = _rec(1, datetime(2026, 1, 5, 9), action="SELL", context={
+            "strike_price": 250.0, "expiration_date": "2026-01-16", "premium_per_contract": 1.20,
+        })
+        execs = [
+            _exec(10, day),
+            _exec(11, day, symbol="MSFT", description="MSFT 01/16/2026 Call $500.00"),
+        ]
+
+        result = match_day(day, [rec], execs)
+
+        assert result.recommendations_count == 1
+        assert result.executions_count == 2
+        assert [v["execution_id"] for v in result.match_values] == [10]
+        assert result.match_values[0]["recommendation_record_id"] == 1
+        assert [v["execution_id"] for v in result.independent_values] == [11]
+        assert result.independent_values[0]["match_type"] == "independent"
+
+    def test_rows_and_results_are_picklable(self):
+        day = date(2026, 1, 5)
+        result = match_day(day, [_rec(1, datetime(2026, 1, 5, 9))], [_exec(10, day)])
+        assert pickle.loads(pickle.dumps(result)).day == day
+
+
+class TestRunKey:
+    """Tests for checkpoint run keys."""
+
+    def test_account_order_does_not_matter(self):
+        start, end = date(2026, 1, 1), date(2026, 1, 31)
+        assert make_run_key(start, end, ["b", "a"]) == make_run_key(start, end, ["a", "b"])
+        assert make_run_key(start, end, None) == "2026-01-01:2026-01-31:all"
@@ -0,0 +1,177 @@
+"""
+Unit Tests for the Reconciliation Matcher
+
+Tests the indexed, assignment-based recommendation ↔ execution matching:
+1. Hungarian assignment picks the best total score
+2. Execution index buckets by symbol and call/put
+3. Matcher never reuses an execution and respects the score threshold
+4. The service classifies a recommendation whose candidates were all taken
+   like one with no candidates
+
+Run with: pytest tests/test_reconciliation_matcher.py -v
+"""
+
+import pytest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.strategies.reconciliation_matcher import (
+    ExecutionIndex,
+    ReconciliationMatcher,
+    parse_option_type,
+    solve_max_weight_assignment,
+)
+from app.modules.strategies.reconciliation_service import MatchType, ReconciliationService
+
+
+def _execution(exec_id, symbol, description):
+    execution = MagicMock()
+    execution.id = exec_id
+    execution.symbol = symbol
+    execution.description = description
+    return execution
+
+
+def _parse(symbol, description):
+    """Minimal stand-in for ReconciliationService._parse_option_from_symbol."""
+    strike = None
+    for part in (description or symbol).split():
+        if part.startswith('$'):
+            strike = Decimal(part[1:])
+    return strike, date(2026, 1, 16)
+
+
+class TestAssignment:
+    """Tests for the max-weight assignment solver."""
+
+    def test_beats_greedy(self):
+        """Greedy would give row 0 col 0 (90) and leave row 1 with 0."""
+        weights = [
+            [90, 80],
+            [85, 0],
+        ]
+        pairs = solve_max_weight_assignment(weights)
+        assert pairs == [(0, 1), (1, 0)]
+
+    def test_more_rows_than_columns(self):
+        weights = [
+            [10],
+            [70],
+            [30],
+        ]
+        pairs = solve_max_weight_assignment(weights)
+        assert pairs == [(1, 0)]
+
+    def test_empty(self):
+        assert solve_max_weight_assignment([]) == []
+        assert solve_max_weight_assignment([[]]) == []
+
+
+class TestExecutionIndex:
+    """Tests for the symbol/option-type execution index."""
+
+    def test_parse_option_type(self):
+        assert parse_option_type("NVDA 01/10/2025 Put $130.00") == "put"
+        assert parse_option_type(None, "AAPL 01/16/2026 Call $250") == "call"
+        assert parse_option_type("AAPL") is None
+
+    def test_candidates_filter_by_option_type(self):
+        index = ExecutionIndex([
+            _execution(1, "AAPL", "AAPL 01/16/2026 Call $250.00"),
+            _execution(2, "AAPL", "AAPL 01/16/2026 Put $230.00"),
+            _execution(3, "MSFT", "MSFT 01/16/2026 Call $500.00"),
+        ], _parse)
+
+        assert index.size == 3
+        assert {p.execution.id for p in index.candidates("aapl")} == {1, 2}
+        assert [p.execution.id for p in index.candidates("AAPL", "put")] == [2]
+        assert index.candidates("TSLA") == []
+
+
+class TestReconciliationMatcher:
+    """Tests for assignment-based matching."""
+
+    def test_each_execution_used_once(self):
+        index = ExecutionIndex([
+            _execution(1, "AAPL", "AAPL 01/16/2026 Call $250.00"),
+        ], _parse)
+        scores = {("rec_a", 1): 80, ("rec_b", 1): 95}
+        matcher = ReconciliationMatcher(
+            index, lambda rec, parsed: (scores[(rec, parsed.execution.id)], {})
+        )
+
+        assigned = matcher.assign([("rec_a", "AAPL", "call"), ("rec_b", "AAPL", "call")])
+
+        assert list(assigned) == [1]
+        assert assigned[1][0].execution.id == 1
+        assert assigned[1][1] == 95
+
+    def test_below_threshold_not_assigned(self):
+        index = ExecutionIndex([
+            _execution(1, "AAPL", "AAPL 01/16/2026 Call $250.00"),
+        ], _parse)
+        matcher = ReconciliationMatcher(index, lambda rec, parsed: (40, {}))
+
+        assert matcher.assign([("rec_a", "AAPL", "call")]) == {}
+
+    def test_option_type_mismatch_not_scored(self):
+        index = ExecutionIndex([
+            _execution(1, "AAPL", "AAPL 01/16/2026 Put $230.00"),
+        ], _parse)
+        score_fn = MagicMock(return_value=(100, {}))
+        matcher = ReconciliationMatcher(index, score_fn)
+
+        assert matcher.assign([("rec_a", "AAPL", "call")]) == {}
+        score_fn.assert_not_called()
+
+
+class TestServiceMatching:
+    """Tests for classifying unmatched recommendations in the service."""
+
+    def _recommendation(self, rec_type, action_type="sell"):
+        return SimpleNamespace(
+            symbol="AAPL", context_snapshot=None, option_type="call",
+            recommendation_type=rec_type, action_type=action_type,
+        )
+
+    def _service(self, scores):
+        service = ReconciliationService(MagicMock())
+        service._score_parsed_match = lambda rec, parsed: (scores[rec.recommendation_type], {})
+        service._classify_match = MagicMock(return_value=MatchType.CONSENT)
+        service._calculate_hours_to_execution = MagicMock(return_value=1.0)
+        return service
+
+    def test_taken_candidates_fall_back_to_no_execution_type(self):
+        service = self._service({"roll_options": 95, "earnings_alert": 80})
+        roll = self._recommendation("roll_options")
+        alert = self._recommendation("earnings_alert")
+
+        matches = service._match_recommendations_to_executions(
+            [roll, alert], [_execution(1, "AAPL", "AAPL 01/16/2026 Call $250.00")]
+        )
+
+        assert matches[0].execution.id == 1
+        assert matches[1].execution is None
+        assert matches[1].match_type == MatchType.NO_ACTION
+
+    def test_low_scoring_free_candidate_is_reject(self):
+        service = self._service({"roll_options": 95, "sell_unsold_contracts": 20})
+        roll = self._recommendation("roll_options")
+        sell = self._recommendation("sell_unsold_contracts")
+
+        matches = service._match_recommendations_to_executions(
+            [roll, sell],
+            [
+                _execution(1, "AAPL", "AAPL 01/16/2026 Call $250.00"),
+                _execution(2, "AAPL", "AAPL 01/23/2026 Call $260.00"),
+            ],
+        )
+
+        assert matches[0].execution is not None
+        assert matches[1].match_type == MatchType.REJECT
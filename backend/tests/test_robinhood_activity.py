@@ -0,0 +1,107 @@
+"""
+Unit Tests for the Robinhood Activity CSV Parser
+
+Tests app/modules/income/robinhood_activity.py and its use by IncomeService:
+1. One pass over the file, preamble and disclaimer rows skipped; rows selected by code
+2. Multi-line quoted fields and parenthesized amounts
+3. Parsed columns round-trip through the content-hash cache
+4. IncomeService classifies the parsed rows into account income, and still
+   lists an account whose activity has no income rows
+
+Run with: pytest tests/test_robinhood_activity.py -v
+"""
+
+import pytest
+from datetime import datetime
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.income import robinhood_activity
+from app.modules.income.robinhood_activity import load_activity, parse_activity_csv
+from app.modules.income.services import IncomeService
+from app.shared.services.parse_cache import ParseCache
+
+
+ACTIVITY_CSV = (
+    "Robinhood activity export\n"
+    "\n"
+    '"Activity Date","Process Date","Settle Date","Instrument","Description","Trans Code","Quantity","Price","Amount"\n'
+    '"11/21/2025","11/21/2025","11/24/2025","AAPL","AAPL 11/28/2025 Call $280.00","STO","1","$2.50","$249.95"\n'
+    '"11/20/2025","11/20/2025","11/21/2025","AAPL","AAPL 11/28/2025 Call $280.00","BTC","1","$0.50","($50.05)"\n'
+    '"11/13/2025","11/13/2025","11/13/2025","KO","Cash Div: R/D 2025-11-10 P/D 2025-11-13 - 1700 shares at 0.26","CDIV","","","$442.00"\n'
+    '"11/03/2025","11/03/2025","11/03/2025","","Interest Payment\nfor October","INT","","","$12.34"\n'
+    '"11/02/2025","11/02/2025","11/04/2025","MSFT","Microsoft","Sell","2.5","$400.00","$1,000.00"\n'
+    '"11/01/2025","11/01/2025","11/01/2025","","ACH Deposit","","","","$500.00"\n'
+    '"","","","","","","","",""\n'
+    '"The data provided is for informational purposes only.","","","","","","","",""\n'
+)
+
+
+@pytest.fixture
+def activity_file(tmp_path):
+    path = tmp_path / "neel_individual.csv"
+    path.write_text(ACTIVITY_CSV, encoding="utf-8-sig")
+    return path
+
+
+class TestParseActivity:
+    """Single-pass parsing into columns."""
+
+    def test_rows_are_parsed_and_filtered(self, activity_file):
+        activity = parse_activity_csv(activity_file)
+        rows = list(activity.rows())
+
+        assert [row.trans_code for row in rows] == ["STO", "BTC", "CDIV", "INT", "SELL"]
+        assert rows[0].date == datetime(2025, 11, 21)
+        assert rows[1].amount == pytest.approx(-50.05)
+        assert rows[2].price is None and rows[2].quantity == ""
+        assert rows[3].description == "Interest Payment\nfor October"
+        assert rows[4].quantity == "2.5" and rows[4].amount == pytest.approx(1000.0)
+        assert activity.codes == ["STO", "BTC", "CDIV", "INT", "SELL"]
+
+    def test_rows_select_codes(self, activity_file):
+        activity = parse_activity_csv(activity_file)
+
+        assert [row.trans_code for row in activity.rows({"CDIV", "SELL"})] == ["CDIV", "SELL"]
+        assert list(activity.rows({"ACH"})) == []
+
+    def test_cache_round_trip(self, activity_file, tmp_path):
+        cache = ParseCache("robinhood_activity", version="test", cache_dir=tmp_path / "cache")
+        first = load_activity(activity_file, cache=cache)
+        second = load_activity(activity_file, cache=cache)
+
+        assert cache.misses == 1 and cache.hits == 1
+        assert list(second.rows()) == list(first.rows())
+
+
+class TestIncomeServiceCsv:
+    """IncomeService on top of the parsed columns."""
+
+    def test_load_all_transactions(self, activity_file, tmp_path, monkeypatch):
+        monkeypatch.setattr(robinhood_activity, "_cache", ParseCache("robinhood_activity", "test", tmp_path / "cache"))
+        accounts = IncomeService(data_dir=str(activity_file.parent)).load_all_transactions()
+
+        account = accounts["Neel's Individual"]
+        assert account.total_options_income == pytest.approx(199.90)
+        assert account.monthly_options == {"2025-11": pytest.approx(199.90)}
+        assert account.dividend_transactions[0].shares == 1700
+        assert account.total_interest_income == pytest.approx(12.34)
+        assert account.stock_sale_transactions[0].quantity == 2
+        assert account.options_transactions[0].strike == 280.0
+
+    def test_account_without_income_rows_is_listed(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(robinhood_activity, "_cache", ParseCache("robinhood_activity", "test", tmp_path / "cache"))
+        (tmp_path / "neel_individual.csv").write_text(
+            '"Activity Date","Process Date","Settle Date","Instrument","Description","Trans Code","Quantity","Price","Amount"\n'
+            '"11/02/2025","11/02/2025","11/04/2025","MSFT","Microsoft","Buy","1","$400.00","($400.00)"\n'
+            '"11/01/2025","11/01/2025","11/01/2025","","ACH Deposit","ACH","","","$500.00"\n'
+        )
+
+        accounts = IncomeService(data_dir=str(tmp_path)).load_all_transactions()
+
+        account = accounts["Neel's Individual"]
+        assert account.total_options_income == 0
+        assert account.total_dividend_income == 0
+        assert account.options_transactions == []
@@ -0,0 +1,195 @@
+"""
+Unit Tests for the Service Registry
+
+Tests app/core/service_registry.py:
+1. Services load lazily, once, after their dependencies
+2. Invalidation cascades to dependents
+3. Ingestion sources invalidate only the services built from them
+4. Background warm-up and the readiness report
+5. The ingestion pipeline invalidates by the tables a run wrote
+
+Run with: pytest tests/test_service_registry.py -v
+"""
+
+import threading
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import service_registry
+from app.core.service_registry import CHEAP, EXPENSIVE, FAILED, NOT_LOADED, READY, ServiceRegistry, ServiceSpec
+from app.ingestion import pipeline as pipeline_module
+from app.ingestion.parsers.base import ParsedRecord, ParseResult, RecordType
+
+
+def _counting_factory(name, calls, gate=None):
+    def factory():
+        if gate is not None:
+            gate.wait(5)
+        calls.append(name)
+        return {"name": name, "load": len(calls)}
+    return factory
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def registry(calls):
+    registry = ServiceRegistry()
+    registry.register(ServiceSpec("income", _counting_factory("income", calls), cost=EXPENSIVE,
+                                  data_sources=("investment_transactions",)))
+    registry.register(ServiceSpec("salary", _counting_factory("salary", calls), cost=EXPENSIVE,
+                                  data_sources=("w2_records",)))
+    registry.register(ServiceSpec("insights", _counting_factory("insights", calls), depends_on=("income",),
+                                  cost=EXPENSIVE, data_sources=("investment_holdings",)))
+    registry.register(ServiceSpec("rental", _counting_factory("rental", calls), cost=CHEAP))
+    return registry
+
+
+class TestLoading:
+    """Lazy, single loads in dependency order."""
+
+    def test_nothing_loads_until_requested(self, registry, calls):
+        assert calls == []
+        assert registry.peek("income") is None
+
+        insights = registry.get("insights")
+        assert calls == ["income", "insights"]
+        assert registry.get("insights") is insights
+        assert calls == ["income", "insights"]
+
+    def test_concurrent_requests_share_one_load(self, calls):
+        gate = threading.Event()
+        registry = ServiceRegistry()
+        registry.register(ServiceSpec("income", _counting_factory("income", calls, gate), cost=EXPENSIVE))
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.get("income"))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        gate.set()
+        for thread in threads:
+            thread.join(5)
+
+        assert calls == ["income"]
+        assert len(results) == 4 and all(result is results[0] for result in results)
+
+    def test_failed_load_is_reported_and_retried(self):
+        attempts = []
+
+        def factory():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise RuntimeError("database unavailable")
+            return "loaded"
+
+        registry = ServiceRegistry()
+        registry.register(ServiceSpec("income", factory, cost=EXPENSIVE))
+
+        with pytest.raises(RuntimeError):
+            registry.get("income")
+        assert registry.status()["services"]["income"]["state"] == FAILED
+        assert registry.get("income") == "loaded"
+
+    def test_max_age_rebuilds(self, calls, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(service_registry.time, "monotonic", lambda: now[0])
+        registry = ServiceRegistry()
+        registry.register(ServiceSpec("rental", _counting_factory("rental", calls), max_age=300))
+
+        registry.get("rental")
+        now[0] += 299
+        registry.get("rental")
+        now[0] += 2
+        registry.get("rental")
+        assert calls == ["rental", "rental"]
+
+
+class TestInvalidation:
+    """Dependents and data sources."""
+
+    def test_invalidate_cascades_to_dependents(self, registry, calls):
+        registry.get("insights")
+        registry.get("salary")
+
+        assert registry.invalidate("income") == ["income", "insights"]
+        assert registry.peek("salary") is not None
+        registry.get("insights")
+        assert calls == ["income", "insights", "salary", "income", "insights"]
+
+    def test_sources_invalidate_only_their_services(self, registry):
+        for name in ("income", "salary", "insights", "rental"):
+            registry.get(name)
+
+        dropped = registry.invalidate_sources({"w2_records", "cash_transactions"})
+        assert dropped == ["salary"]
+        assert registry.status()["services"]["income"]["state"] == READY
+
+        assert registry.invalidate_sources({"investment_holdings"}) == ["insights"]
+        assert registry.peek("income") is not None
+
+    def test_reload_rebuilds_in_background(self, registry, calls):
+        registry.get("income")
+        registry.invalidate_sources({"investment_transactions"}, reload=True)
+        registry._warm_up_thread.join(5)
+
+        assert calls == ["income", "income"]
+        assert registry.peek("income") is not None
+
+
+class TestWarmUp:
+    """Background warm-up and readiness."""
+
+    def test_warm_up_loads_expensive_services(self, registry, calls):
+        status = registry.status()
+        assert status["ready"] is False
+        assert status["services"]["rental"]["state"] == NOT_LOADED
+
+        registry.start_warm_up().join(5)
+
+        status = registry.status()
+        assert status["ready"] is True and status["warming_up"] is False
+        assert sorted(calls) == ["income", "insights", "salary"]
+        assert status["services"]["rental"]["state"] == NOT_LOADED
+        assert status["services"]["insights"]["depends_on"] == ["income"]
+
+
+class TestPipelineInvalidation:
+    """IngestionPipeline invalidates by the tables a run wrote."""
+
+    def test_run_invalidates_written_tables(self, registry, monkeypatch, tmp_path):
+        monkeypatch.setattr(pipeline_module, "registry", registry)
+        monkeypatch.setattr(pipeline_module, "save_records", lambda db, records, log_id: {"created": len(records)})
+        monkeypatch.setattr(pipeline_module, "create_ingestion_log", lambda **kwargs: SimpleNamespace(id=1))
+        monkeypatch.setattr(pipeline_module, "complete_ingestion_log", lambda **kwargs: None)
+        for name in ("income", "salary", "insights"):
+            registry.get(name)
+
+        folder = tmp_path / "inbox"
+        folder.mkdir()
+        (folder / "activity.csv").write_text("Activity Date,Trans Code\n")
+        parser = MagicMock(source_name="robinhood")
+        parser.matches.return_value = True
+        parser.parse.return_value = ParseResult(
+            success=True, source_name="robinhood", file_path=folder / "activity.csv",
+            records=[ParsedRecord(record_type=RecordType.TRANSACTION, data={}, source_row=1)],
+            warnings=[], errors=[], metadata={},
+        )
+
+        pipeline = pipeline_module.IngestionPipeline(MagicMock(), parsers=[parser], workers=1, verify=False)
+        monkeypatch.setattr(pipeline, "_successful_logs", lambda hashes: {})
+        monkeypatch.setattr(pipeline, "_move_to_processed", lambda file_path, folder_path: file_path)
+        pipeline.run([("inbox", folder)])
+        registry._warm_up_thread.join(5)
+
+        assert "investment_transactions" in pipeline.touched_tables
+        status = registry.status()["services"]
+        assert status["salary"]["loaded_at"] is not None and status["salary"]["state"] == READY
+        assert registry.peek("income")["load"] > 3  # rebuilt after the run
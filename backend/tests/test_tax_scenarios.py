@@ -0,0 +1,112 @@
+"""
+Unit Tests for the Vectorized Tax Scenario Sweep
+
+Tests app/modules/tax/scenarios.py:
+1. Cumulative bracket tables match the scalar bracket loop
+2. Swept scenarios match the forecast's scalar tax functions
+3. The efficient frontier holds only non-dominated scenarios
+4. Payment timing drives the underpayment penalty; oversized grids are refused
+
+Run with: pytest tests/test_tax_scenarios.py -v
+"""
+
+import pytest
+import numpy as np
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.tax import forecast
+from app.modules.tax.scenarios import (
+    MAX_SCENARIOS, BracketTable, ScenarioGrid, ScenarioInputs, default_grid, sweep_scenarios,
+)
+
+
+@pytest.fixture
+def inputs():
+    return ScenarioInputs(
+        year=2025, filing_status="MFJ", wages=420000, investment_income=60000,
+        rental_income=30000, rental_depreciation=12000, net_short_term=-8000, net_long_term=25000,
+        above_line_deductions=0, itemized_total=40000, payroll_taxes=30000,
+        federal_withheld=70000, state_withheld=25000, prior_federal_tax=90000, prior_state_tax=35000,
+        k401_contributed=23500, earners=2,
+    )
+
+
+def _scalar(inputs, scenario):
+    """The forecast's scalar functions for one scenario."""
+    income = {
+        "w2_income": {"total_wages": inputs.wages - scenario["extra_401k"], "social_security": inputs.payroll_taxes},
+        "options_income": inputs.investment_income,
+        "rental_income": inputs.rental_income,
+        "rental_depreciation": inputs.rental_depreciation,
+        "capital_gains": {"net_short_term": inputs.net_short_term,
+                          "net_long_term": inputs.net_long_term + scenario["harvested_gains"]},
+        "retirement_contributions": {"ira_deduction": scenario["extra_ira"]},
+    }
+    agi = forecast._calculate_agi(income)
+    taxable = forecast._calculate_taxable_income(agi, {"itemized_total": inputs.itemized_total + scenario["charitable"]}, 2025)
+    return (
+        agi,
+        forecast._calculate_federal_tax(taxable, "MFJ", 2025),
+        forecast._calculate_ca_state_tax(taxable, "MFJ", 2025),
+        forecast._calculate_other_taxes(income, agi, {}),
+    )
+
+
+class TestBracketTable:
+    """searchsorted over cumulative brackets."""
+
+    @pytest.mark.parametrize("year,status", [(2025, "MFJ"), (2025, "Single"), (2024, "MFJ")])
+    def test_matches_scalar_loop(self, year, status):
+        incomes = np.array([0, 1, 23850, 23851, 150000, 394600, 800000, 2500000], dtype=float)
+        federal = BracketTable(forecast._federal_brackets(status, year)).tax(incomes)
+        state = BracketTable(forecast._ca_brackets(status, year)).tax(incomes)
+
+        for income, fed, ca in zip(incomes, federal, state):
+            assert fed == pytest.approx(forecast._bracket_tax(income, forecast._federal_brackets(status, year)))
+            assert ca == pytest.approx(forecast._bracket_tax(income, forecast._ca_brackets(status, year)))
+
+
+class TestSweep:
+    """Vectorized evaluation and the frontier."""
+
+    def test_scenarios_match_forecast_functions(self, inputs):
+        sweep = sweep_scenarios(inputs, default_grid(inputs))
+        assert len(sweep) == default_grid(inputs).size
+
+        for index in np.random.default_rng(7).integers(0, len(sweep), 40):
+            scenario = sweep.scenario(int(index))
+            agi, federal, state, other = _scalar(inputs, scenario)
+            assert scenario["agi"] == pytest.approx(agi, abs=0.01)
+            assert scenario["federal_tax"] == pytest.approx(federal, abs=0.01)
+            assert scenario["state_tax"] == pytest.approx(state, abs=0.01)
+            assert scenario["other_tax"] == pytest.approx(other, abs=0.01)
+
+    def test_frontier_is_not_dominated(self, inputs):
+        sweep = sweep_scenarios(inputs, default_grid(inputs))
+        frontier = sweep.efficient_frontier()
+        cost, cash = sweep.outcomes["total_cost"], sweep.outcomes["cash_committed"]
+
+        assert len(frontier) > 1
+        assert np.all(np.diff(cash[frontier]) > 0) and np.all(np.diff(cost[frontier]) < 0)
+        for index in frontier:
+            dominated = (cost < cost[index] - 0.01) & (cash <= cash[index])
+            assert not dominated.any()
+
+    def test_payment_timing_drives_penalty(self, inputs):
+        grid = ScenarioGrid(payment_timing=["quarterly", "with_return"])
+        sweep = sweep_scenarios(inputs, grid)
+
+        quarterly, with_return = sweep.scenario(0), sweep.scenario(1)
+        assert quarterly["penalty"] == 0
+        assert with_return["penalty"] > 0
+        assert with_return["total_tax"] == quarterly["total_tax"]
+
+    def test_grid_limits(self, inputs):
+        too_big = ScenarioGrid(extra_401k=list(range(MAX_SCENARIOS + 1)))
+        with pytest.raises(ValueError, match="combinations"):
+            sweep_scenarios(inputs, too_big)
+        with pytest.raises(ValueError, match="Unknown payment timing"):
+            sweep_scenarios(inputs, ScenarioGrid(payment_timing=["monthly"]))
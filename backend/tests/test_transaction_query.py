@@ -0,0 +1,195 @@
+"""
+Unit Tests for Keyset-Paginated Transaction Queries
+
+Tests app/modules/investments/transaction_query.py:
+1. Cursors round-trip (transaction_date, id) and reject malformed input
+2. Filter specs normalize request parameters and compile to indexed predicates
+3. Restricting a filter to an income type's transaction types
+4. Pages stop at the limit and hand out the cursor of their last row
+5. Paging a real table across same-date rows has no duplicates or gaps
+
+Run with: pytest tests/test_transaction_query.py -v
+"""
+
+from datetime import date
+from types import SimpleNamespace
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.modules.investments.models import InvestmentTransaction
+from app.modules.investments.transaction_query import (
+    MAX_PAGE_SIZE,
+    TransactionFilter,
+    decode_cursor,
+    encode_cursor,
+    paginate,
+)
+
+
+class FakeQuery:
+    """Records filters and limit; returns the rows it was given."""
+
+    def __init__(self, rows, count=None):
+        self.rows = rows
+        self.count = count
+        self.filters = []
+        self.limit_value = None
+
+    def filter(self, *predicates):
+        self.filters.extend(predicates)
+        return self
+
+    def order_by(self, *columns):
+        return self
+
+    def limit(self, value):
+        self.limit_value = value
+        return self
+
+    def all(self):
+        return self.rows[:self.limit_value]
+
+    def with_entities(self, *columns):
+        return self
+
+    def scalar(self):
+        return self.count
+
+
+def _rows(n):
+    return [SimpleNamespace(id=100 - i, transaction_date=date(2025, 6, 30 - i)) for i in range(n)]
+
+
+class TestCursors:
+    """Opaque cursors over (transaction_date, id)."""
+
+    def test_round_trip(self):
+        cursor = encode_cursor(date(2025, 3, 14), 4217)
+
+        assert decode_cursor(cursor) == (date(2025, 3, 14), 4217)
+        assert "=" not in cursor
+
+    @pytest.mark.parametrize("cursor", ["zzz", "", encode_cursor(date(2025, 1, 1), 1)[:-3] + "!!"])
+    def test_malformed_cursor(self, cursor):
+        with pytest.raises(ValueError):
+            decode_cursor(cursor)
+
+
+class TestTransactionFilter:
+    """Request parameters to predicates."""
+
+    def test_build_normalizes(self):
+        spec = TransactionFilter.build(
+            account_ids=["A1", " ", "A1"],
+            symbols=["aapl", "msft "],
+            transaction_types=["sto"],
+        )
+
+        assert spec.account_ids == ("A1",)
+        assert spec.symbols == ("AAPL", "MSFT")
+        assert spec.transaction_types == ("STO",)
+
+    def test_year_becomes_date_range(self):
+        assert TransactionFilter.build(year=2024).start_date == date(2024, 1, 1)
+        assert TransactionFilter.build(year=2024).end_date == date(2024, 12, 31)
+
+        narrowed = TransactionFilter.build(year=2024, start_date=date(2024, 6, 1), end_date=date(2025, 2, 1))
+        assert (narrowed.start_date, narrowed.end_date) == (date(2024, 6, 1), date(2024, 12, 31))
+
+    def test_predicates_use_plain_columns(self):
+        spec = TransactionFilter.build(account_ids=["A1"], symbols=["AAPL", "MSFT"], year=2024)
+
+        sql = [str(p.compile(compile_kwargs={"literal_binds": True})) for p in spec.predicates()]
+
+        assert sql == [
+            "investment_transactions.account_id = 'A1'",
+            "investment_transactions.symbol IN ('AAPL', 'MSFT')",
+            "investment_transactions.transaction_date >= '2024-01-01'",
+            "investment_transactions.transaction_date <= '2024-12-31'",
+        ]
+        assert TransactionFilter().predicates() == []
+
+    def test_restrict_types(self):
+        dividends = ["DIVIDEND", "CDIV"]
+
+        assert TransactionFilter().restrict_types(dividends).transaction_types == ("DIVIDEND", "CDIV")
+        assert TransactionFilter.build(transaction_types=["cdiv", "buy"]).restrict_types(dividends).transaction_types == ("CDIV",)
+        assert TransactionFilter.build(transaction_types=["buy"]).restrict_types(dividends).transaction_types == ()
+
+
+class TestPaginate:
+    """Pages of a query."""
+
+    def test_full_page_has_next_cursor(self):
+        query = FakeQuery(_rows(6), count=40)
+
+        page = paginate(query, TransactionFilter(), lambda row: row.id, limit=5, include_total=True)
+
+        assert page.items == [100, 99, 98, 97, 96]
+        assert decode_cursor(page.next_cursor) == (date(2025, 6, 26), 96)
+        assert page.total == 40
+        assert query.limit_value == 6
+
+    def test_last_page_and_cursor_filter(self):
+        query = FakeQuery(_rows(3))
+
+        page = paginate(query, TransactionFilter(), lambda row: row.id, cursor=encode_cursor(date(2025, 7, 1), 101), limit=5)
+
+        assert page.to_dict()["has_more"] is False
+        assert page.total is None
+        # Without include_total, "total" is the rows returned, as before pagination
+        assert (page.to_dict()["total"], page.to_dict()["total_is_exact"]) == (3, False)
+        assert len(query.filters) == 1
+
+    def test_limit_is_capped(self):
+        query = FakeQuery([])
+
+        paginate(query, TransactionFilter(), dict, limit=10_000)
+
+        assert query.limit_value == MAX_PAGE_SIZE + 1
+
+
+class TestPaginateDatabase:
+    """Keyset pages over an actual investment_transactions table."""
+
+    @pytest.fixture
+    def db(self):
+        engine = create_engine("sqlite://")
+        InvestmentTransaction.__table__.create(engine)
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+
+    def test_pages_cover_same_date_rows_once(self, db):
+        # Ids deliberately out of date order; most rows share one date
+        days = [date(2025, 3, 3)] * 7 + [date(2025, 3, 4), date(2025, 3, 1), date(2025, 3, 3), date(2025, 3, 2)]
+        for n, day in enumerate(days):
+            db.add(InvestmentTransaction(
+                id=(n * 7) % 11 + 1, source="robinhood", account_id="A1", transaction_date=day,
+                transaction_type="BUY", symbol="AAPL", quantity=1, amount=-100 - n,
+                record_hash=f"h{n}", dedup_hash=f"d{n}",
+            ))
+        db.commit()
+        expected = [
+            t.id for t in sorted(db.query(InvestmentTransaction).all(), key=lambda t: (t.transaction_date, t.id), reverse=True)
+        ]
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = paginate(db.query(InvestmentTransaction), TransactionFilter(), lambda t: t.id,
+                            cursor=cursor, limit=3, include_total=True)
+            seen.extend(page.items)
+            pages += 1
+            assert page.total == len(days)
+            if page.next_cursor is None:
+                break
+            cursor = page.next_cursor
+
+        assert seen == expected
+        assert pages == 4
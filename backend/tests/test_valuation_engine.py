@@ -0,0 +1,230 @@
+"""
+Unit Tests for the Portfolio Valuation Engine
+
+Tests app/modules/investments/valuation_engine.py:
+1. Transactions become trades with signed share changes and cash flows
+2. Replay follows the position ledger rules and values every calendar day
+3. Closes are forward-filled, falling back to the last trade price
+4. Time- and money-weighted returns treat deposits as flows, not gains
+5. Drawdowns and the benchmark comparison
+6. Refresh planning: changed accounts are rewritten, the others extended
+7. Close fetch ranges: backfill before the stored range, re-fetch its tail,
+   and no close for a session that has not ended
+8. The owner filter goes through the accounts' names, not the id shape
+
+Run with: pytest tests/test_valuation_engine.py -v
+"""
+
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pytest
+from sqlalchemy.orm import Query
+
+from app.modules.investments.models import AccountValuation
+from app.modules.investments.valuation_engine import (
+    MARKET_TZ,
+    Trade,
+    _account_filter,
+    annualized,
+    benchmark_stats,
+    build_performance,
+    close_ranges,
+    daily_returns,
+    drawdown_stats,
+    last_closed_day,
+    money_weighted_return,
+    plan_accounts,
+    time_weighted_return,
+    trade_from_row,
+    value_account,
+)
+
+
+def _row(transaction_type, symbol="AAPL", quantity=None, price=None, amount=None, fees=None, day=date(2025, 1, 2)):
+    return SimpleNamespace(
+        transaction_type=transaction_type, symbol=symbol, quantity=quantity,
+        price_per_share=price, amount=amount, fees=fees, transaction_date=day,
+    )
+
+
+def _closes(symbol, points):
+    days = np.array([d for d, _ in points], dtype='datetime64[D]')
+    return {symbol: (days, np.array([c for _, c in points], dtype=float))}
+
+
+class TestTradeFromRow:
+    """Investment transactions to trades."""
+
+    def test_buy_sell_and_assignment(self):
+        buy = trade_from_row(_row("BUY", quantity=10, price=100, amount=-1000, fees=1))
+        sell = trade_from_row(_row("SELL", quantity=4, price=120, amount=480, fees=1))
+        assigned = trade_from_row(_row("OASGN", quantity=1, price=50))
+
+        assert (buy.change, buy.cash) == (10, 1001)
+        assert (sell.change, sell.cash) == (-4, -479)
+        assert (assigned.change, assigned.cash) == (100, 5000)
+
+    def test_dividends_and_ignored_rows(self):
+        dividend = trade_from_row(_row("DIVIDEND", amount=12.5))
+
+        assert (dividend.change, dividend.cash) == (0, -12.5)
+        assert trade_from_row(_row("BUY", symbol="AAPL 01/17/2025 200.00 CALL $2.00", quantity=1, price=2)) is None
+        assert trade_from_row(_row("DIVIDEND", amount=0)) is None
+
+
+class TestValueAccount:
+    """Daily replay and valuation."""
+
+    def test_every_day_is_valued_with_forward_filled_closes(self):
+        trades = [Trade(date(2025, 1, 2), "AAA", 10, 1000.0, 100.0)]
+        closes = _closes("AAA", [("2025-01-02", 100.0), ("2025-01-03", 105.0), ("2025-01-06", 110.0)])
+
+        series = value_account(trades, closes, date(2025, 1, 1), date(2025, 1, 7))
+
+        assert len(series.days) == 7
+        assert series.values.tolist() == [0, 1000, 1050, 1050, 1050, 1100, 1100]
+        assert series.flows.tolist() == [0, 1000, 0, 0, 0, 0, 0]
+
+    def test_sells_follow_the_ledger_rules(self):
+        trades = [
+            Trade(date(2025, 1, 1), "AAA", -5, -500.0, 100.0),  # sell before any buy: ignored
+            Trade(date(2025, 1, 2), "AAA", 10, 1000.0, 100.0),
+            Trade(date(2025, 1, 3), "AAA", -15, -1500.0, 100.0),  # clamped to the 10 held
+        ]
+
+        series = value_account(trades, {}, date(2025, 1, 1), date(2025, 1, 4))
+
+        assert series.quantities[:, 0].tolist() == [0, 10, 0, 0]
+        assert series.flows.tolist() == [0, 1000, -1000, 0]
+
+    def test_trade_price_until_first_close(self):
+        trades = [Trade(date(2025, 1, 1), "NEW", 2, None, 40.0)]
+        closes = _closes("NEW", [("2025-01-03", 50.0)])
+
+        series = value_account(trades, closes, date(2025, 1, 1), date(2025, 1, 3))
+
+        assert series.prices[:, 0].tolist() == [40, 40, 50]
+        # Unknown cash is valued at the day's price
+        assert series.flows[0] == 80
+
+
+class TestReturns:
+    """Time- and money-weighted returns."""
+
+    def test_deposits_are_not_returns(self):
+        values = np.array([100.0, 110.0, 220.0])
+        flows = np.array([100.0, 0.0, 100.0])
+
+        returns = daily_returns(values, flows)
+
+        assert returns.tolist() == pytest.approx([0, 0.1, 0.09090909])
+        assert time_weighted_return(returns) == pytest.approx(0.2)
+
+    def test_money_weighted_return(self):
+        # 1000 in, 1100 out a year later
+        values = np.concatenate((np.full(365, 1000.0), [1100.0]))
+        flows = np.zeros(366)
+        flows[0] = 1000.0
+
+        assert money_weighted_return(values[1:], flows[1:], opening_value=1000.0) == pytest.approx(0.1, abs=1e-4)
+        assert money_weighted_return(np.zeros(3), np.zeros(3)) is None
+
+    def test_annualized(self):
+        assert annualized(0.21, 730) == pytest.approx(0.1, abs=1e-3)
+        assert annualized(0.05, 90) is None
+
+
+class TestDrawdownsAndBenchmark:
+    """Drawdowns and benchmark comparison."""
+
+    def test_drawdown(self):
+        days = np.arange(np.datetime64('2025-01-01'), np.datetime64('2025-01-06'))
+        returns = np.array([0.0, 0.1, -0.5, 0.2, 0.0])
+
+        stats = drawdown_stats(returns, days)
+
+        assert stats["max_drawdown"] == pytest.approx(-0.5)
+        assert (stats["peak"], stats["trough"], stats["recovered"]) == ("2025-01-02", "2025-01-03", None)
+        assert stats["current_drawdown"] == pytest.approx(-0.4)
+
+    def test_benchmark(self):
+        rng = np.random.default_rng(7)
+        bench = rng.normal(0, 0.01, 60)
+        prices = 100 * np.cumprod(np.concatenate(([1.0], 1 + bench)))
+
+        stats = benchmark_stats(2 * bench, prices)
+
+        assert stats["beta"] == pytest.approx(2.0)
+        assert stats["correlation"] == pytest.approx(1.0)
+        assert stats["excess_return"] == pytest.approx(time_weighted_return(2 * bench) - (prices[-1] / prices[0] - 1))
+
+    def test_period_starts_from_the_prior_value(self):
+        days = np.arange(np.datetime64('2024-01-01'), np.datetime64('2025-01-01'))
+        values = np.linspace(100, 200, len(days))
+        flows = np.zeros(len(days))
+        flows[0] = 100.0
+
+        report = build_performance(days, values, flows, "1M")
+
+        assert report["start_date"] == "2024-12-01"
+        assert report["start_value"] == pytest.approx(values[-32], abs=0.01)
+        assert report["twr"] == pytest.approx(values[-1] / values[-32] - 1)
+        assert report["gain_loss"] == pytest.approx(values[-1] - values[-32], abs=0.02)
+
+
+class TestPlanAccounts:
+    """Which accounts a refresh revalues."""
+
+    def test_plan(self):
+        stored = {
+            "a_brokerage": SimpleNamespace(fingerprint="f1", valued_through=date(2025, 1, 9)),
+            "b_ira": SimpleNamespace(fingerprint="old", valued_through=date(2025, 1, 10)),
+            "c_roth": SimpleNamespace(fingerprint="f3", valued_through=date(2025, 1, 10)),
+        }
+        fingerprints = {"a_brokerage": "f1", "b_ira": "f2", "c_roth": "f3", "d_new": "f4"}
+
+        assert plan_accounts(fingerprints, stored, date(2025, 1, 10)) == (["b_ira", "d_new"], ["a_brokerage"])
+        assert plan_accounts(fingerprints, stored, date(2025, 1, 10), force=True)[0] == sorted(fingerprints)
+
+
+class TestCloseRanges:
+    """Which closes a refresh fetches."""
+
+    def test_ranges(self):
+        first_dates = {"NEW": date(2025, 3, 1), "SPY": date(2024, 1, 2), "AAPL": date(2025, 1, 2)}
+        stored = {"SPY": (date(2025, 1, 2), date(2025, 6, 27)), "AAPL": (date(2025, 1, 2), date(2025, 6, 27))}
+
+        ranges = close_ranges(first_dates, stored, date(2025, 6, 30))
+
+        assert dict(ranges) == {
+            (date(2025, 3, 1), date(2025, 6, 30)): ["NEW"],
+            # SPY is now needed from an earlier date: backfilled
+            (date(2024, 1, 2), date(2025, 1, 1)): ["SPY"],
+            # The last RECHECK_DAYS stored closes are fetched again
+            (date(2025, 6, 23), date(2025, 6, 30)): ["SPY", "AAPL"],
+        }
+
+    def test_today_only_after_the_session(self):
+        during = MARKET_TZ.localize(datetime(2025, 6, 30, 10, 15))
+        after = MARKET_TZ.localize(datetime(2025, 6, 30, 13, 5))
+
+        assert last_closed_day(during) == date(2025, 6, 29)
+        assert last_closed_day(after) == date(2025, 6, 30)
+
+
+class TestAccountFilter:
+    """Owner and account selection."""
+
+    def test_owner_joins_the_accounts(self):
+        query = _account_filter(Query(AccountValuation), None, "Neel")
+
+        sql = str(query.statement.compile(compile_kwargs={"literal_binds": True}))
+
+        assert "JOIN investment_accounts ON investment_accounts.source = account_valuations.source" in sql
+        assert "lower(investment_accounts.account_name) LIKE 'neel''s ' || '%'" in sql
@@ -0,0 +1,152 @@
+"""
+Unit Tests for Wash-Sale Detection
+
+Tests app/modules/tax/wash_sales.py:
+1. Interval queries on the per-symbol acquisition index
+2. A loss with a rebuy within 30 days is disallowed into the replacement lot
+3. Acquisitions outside the window and lots of the same trade are ignored
+4. The carried basis reaches the replacement's sale (and can wash again)
+5. Only the matched replacement shares carry the basis adjustment
+6. Retirement account purchases wash a loss without a basis adjustment
+7. Changed sales/lots are written with bulk statements
+
+Run with: pytest tests/test_wash_sales.py -v
+"""
+
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.modules.tax.wash_sales import AcquisitionIndex, WashLot, WashSale, detect_wash_sales, match_wash_sales
+
+
+def _lot(lot_id, purchase_date, quantity, symbol="AAPL", transaction_id=None):
+    return WashLot(lot_id=lot_id, symbol=symbol, purchase_date=purchase_date, quantity=Decimal(str(quantity)),
+                   transaction_id=transaction_id)
+
+
+def _sale(sale_id, lot_id, sale_date, quantity, cost_basis, proceeds, sale_transaction_id=None):
+    cost_basis, proceeds = Decimal(str(cost_basis)), Decimal(str(proceeds))
+    return WashSale(
+        sale_id=sale_id, lot_id=lot_id, sale_date=sale_date, sale_transaction_id=sale_transaction_id,
+        quantity_sold=Decimal(str(quantity)), raw_cost_basis=cost_basis, raw_gain_loss=proceeds - cost_basis,
+    )
+
+
+class TestAcquisitionIndex:
+    """Sorted per-symbol dates."""
+
+    def test_between_is_inclusive_and_per_symbol(self):
+        index = AcquisitionIndex([
+            _lot(3, date(2024, 3, 1), 1), _lot(1, date(2024, 1, 1), 1),
+            _lot(2, date(2024, 2, 1), 1), _lot(4, date(2024, 2, 1), 1, symbol="MSFT"),
+        ])
+
+        assert [lot.lot_id for lot in index.between("AAPL", date(2024, 1, 1), date(2024, 2, 1))] == [1, 2]
+        assert [lot.lot_id for lot in index.between("AAPL", date(2024, 2, 2), date(2024, 12, 31))] == [3]
+        assert index.between("NVDA", date(2024, 1, 1), date(2024, 12, 31)) == []
+
+
+class TestMatching:
+    """Disallowed losses and replacement basis."""
+
+    def test_rebuy_within_window_disallows_loss(self):
+        lots = [_lot(1, date(2024, 1, 2), 10), _lot(2, date(2024, 3, 20), 4)]
+        sales = [_sale(1, 1, date(2024, 3, 1), 10, 1000, 800)]
+
+        matches = match_wash_sales(lots, sales)
+
+        assert [(m.replacement.lot_id, m.quantity, m.disallowed_loss) for m in matches] == [(2, 4, Decimal("80.00"))]
+        assert sales[0].disallowed == Decimal("80.00")
+        assert sales[0].gain_loss == Decimal(-200)  # the loss sale keeps its figures
+        assert lots[1].adjustment == Decimal("80.00")
+
+    def test_outside_window_and_same_trade_are_ignored(self):
+        lots = [
+            _lot(1, date(2024, 1, 2), 10),
+            _lot(2, date(2024, 2, 20), 10),  # sold in the same trade
+            _lot(3, date(2024, 4, 1), 10),   # 31 days after the sale
+            _lot(4, date(2024, 3, 5), 10, symbol="MSFT"),
+        ]
+        sales = [
+            _sale(1, 1, date(2024, 3, 1), 10, 1000, 800, sale_transaction_id=9),
+            _sale(2, 2, date(2024, 3, 1), 10, 1000, 800, sale_transaction_id=9),
+        ]
+
+        assert match_wash_sales(lots, sales) == []
+        assert all(sale.disallowed == 0 for sale in sales)
+
+    def test_adjusted_basis_carries_into_replacement_sale(self):
+        lots = [_lot(1, date(2024, 1, 2), 10), _lot(2, date(2024, 3, 10), 10), _lot(3, date(2024, 6, 1), 5)]
+        sales = [
+            _sale(1, 1, date(2024, 3, 1), 10, 1000, 900),
+            _sale(2, 2, date(2024, 6, 15), 10, 950, 900),
+        ]
+
+        matches = match_wash_sales(lots, sales)
+
+        assert sales[0].disallowed == Decimal("100.00")
+        assert sales[1].basis_adjustment == Decimal("100.00")
+        assert sales[1].cost_basis == Decimal("1050.00")
+        assert sales[1].gain_loss == Decimal("-150.00")
+        # Half of the second loss washes again into lot 3
+        assert [(m.replacement.lot_id, m.disallowed_loss) for m in matches] == [(2, Decimal("100.00")), (3, Decimal("75.00"))]
+
+    def test_only_matched_shares_carry_the_adjustment(self):
+        lots = [_lot(1, date(2024, 1, 2), 4), _lot(2, date(2024, 3, 10), 10)]
+        sales = [
+            _sale(1, 1, date(2024, 3, 1), 4, 400, 320),
+            _sale(2, 2, date(2024, 6, 1), 4, 400, 480),
+            _sale(3, 2, date(2024, 7, 1), 6, 600, 720),
+        ]
+
+        match_wash_sales(lots, sales)
+
+        assert lots[1].adjustment == Decimal("80.00")
+        # The 4 replacement shares carry the whole $80; the other 6 none
+        assert [sale.basis_adjustment for sale in sales[1:]] == [Decimal("80.00"), Decimal("0.00")]
+
+    def test_retirement_purchase_washes_without_basis(self):
+        lots = [_lot(1, date(2024, 1, 2), 10), _lot(None, date(2024, 3, 5), 10, transaction_id=77)]
+        sales = [_sale(1, 1, date(2024, 3, 1), 10, 1000, 800)]
+
+        matches = match_wash_sales(lots, sales)
+
+        assert [(m.replacement.transaction_id, m.disallowed_loss) for m in matches] == [(77, Decimal("200.00"))]
+        assert sales[0].disallowed == Decimal("200.00")
+        assert lots[1].adjustment == 0
+
+
+class TestDetect:
+    """Bulk writes from stored rows."""
+
+    def test_detect_writes_changed_rows(self):
+        db = MagicMock()
+        lot_rows = [
+            SimpleNamespace(lot_id=1, symbol="aapl", purchase_date=date(2024, 1, 2), quantity=Decimal(10),
+                            wash_sale_basis_adjustment=Decimal(0)),
+            SimpleNamespace(lot_id=2, symbol="AAPL", purchase_date=date(2024, 3, 20), quantity=Decimal(10),
+                            wash_sale_basis_adjustment=Decimal(0)),
+        ]
+        sale_rows = [
+            SimpleNamespace(sale_id=1, lot_id=1, sale_date=date(2024, 3, 1), sale_transaction_id=5,
+                            quantity_sold=Decimal(10), cost_basis=Decimal(1000), gain_loss=Decimal(-200),
+                            basis_adjustment=Decimal(0), wash_sale=False, wash_sale_disallowed=None),
+        ]
+        db.query.return_value.all.side_effect = [lot_rows, sale_rows]
+        ira_rows = [SimpleNamespace(id=40, symbol="AAPL", transaction_date=date(2025, 6, 1), quantity=Decimal(5))]
+        db.query.return_value.join.return_value.filter.return_value.all.return_value = ira_rows
+
+        result = detect_wash_sales(db)
+
+        assert (result.wash_sales, result.adjustments, result.sales_updated, result.lots_updated) == (1, 1, 1, 1)
+        assert result.by_year == {2024: 200.0}
+        assert db.execute.call_count == 3  # sales UPDATE, lots UPDATE, adjustments INSERT
+        sale_update = db.execute.call_args_list[0].args[1][0]
+        assert sale_update["wash_sale"] is True and sale_update["wash_sale_disallowed"] == Decimal("200.00")
+        db.commit.assert_not_called()